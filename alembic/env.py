@@ -19,6 +19,7 @@ from src.apps.statistics.services import *
 from src.apps.subscriptions.models import *
 from src.apps.payments.models import *
 from src.apps.ai_code_gen.models import *
+from src.apps.media.models import *
 from src.infrastructure.db.utils import get_dsn
 from src.infrastructure.db.sessions import Base
 
@@ -0,0 +1,137 @@
+"""
+Round-trips and latency of loading a project tree for code generation.
+
+"orm" is the selectinload-based loader, "single" aggregates the whole tree into JSON in one PostgreSQL statement.
+A temporary user with a 10-dialogue, 200-block project is created and removed afterwards.
+
+Run from the repository root against a migrated database (settings are read from .env):
+    python -m benchmarks.code_gen_loader
+"""
+
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import delete, event
+
+from src.apps.blocks.models import (
+    APIBlockModel,
+    CSVBlockModel,
+    EmailBlockModel,
+    ExcelBlockModel,
+    ImageBlockModel,
+    QuestionBlockModel,
+    TextBlockModel,
+)
+from src.apps.code_gen.repositories import CodeGenRepository
+from src.apps.dialogues.models import DialogueModel, DialogueTriggerModel
+from src.apps.enums import AnswerMessageType, HTTPMethod, KeyboardType, TriggerEventType
+from src.apps.projects.models import ProjectModel
+from src.apps.users.models import UserModel
+from src.infrastructure.db.sessions import async_session_maker, engine
+
+DIALOGUES = 10
+BLOCKS_PER_DIALOGUE = 20
+LOADS = 100
+
+
+def make_block(sequence_number: int):
+    block_factories = [
+        lambda: TextBlockModel(message_text=f'Текст {sequence_number}'),
+        lambda: QuestionBlockModel(message_text='Ваш email?', answer_type=AnswerMessageType.EMAIL),
+        lambda: ImageBlockModel(image_path=''),
+        lambda: EmailBlockModel(subject='Тема', text='<answers[1]>', recipient_email='admin@example.com'),
+        lambda: CSVBlockModel(file_path='answers.csv', data={'email': '<answers[1]>'}),
+        lambda: ExcelBlockModel(file_path='answers.xlsx', data={'email': '<answers[1]>'}),
+        lambda: APIBlockModel(url='https://example.com', http_method=HTTPMethod.POST, headers={}, body={'a': 1}),
+    ]
+    block = block_factories[sequence_number % len(block_factories)]()
+    block.sequence_number = sequence_number
+    return block
+
+
+async def create_project() -> tuple[UserModel, ProjectModel]:
+    async with async_session_maker() as session:
+        user = UserModel(tg_id=-random.randint(10**9, 10**12))
+        project = ProjectModel(
+            user=user,
+            name='benchmark',
+            start_message='Главное меню',
+            start_keyboard_type=KeyboardType.REPLY_KEYBOARD,
+        )
+        for dialogue_num in range(1, DIALOGUES + 1):
+            dialogue = DialogueModel(
+                project=project,
+                trigger=DialogueTriggerModel(event_type=TriggerEventType.BUTTON, value=f'Кнопка {dialogue_num}'),
+            )
+            dialogue.blocks = [make_block(sequence_number) for sequence_number in range(1, BLOCKS_PER_DIALOGUE + 1)]
+            session.add(dialogue)
+        await session.commit()
+        return user, project
+
+
+async def remove_project(user: UserModel, project: ProjectModel):
+    async with async_session_maker() as session:
+        dialogues = await session.scalars(
+            delete(DialogueModel)
+            .where(DialogueModel.project_id == project.project_id)
+            .returning(DialogueModel.trigger_id)
+        )
+        trigger_ids = dialogues.all()
+        await session.execute(delete(DialogueTriggerModel).where(DialogueTriggerModel.trigger_id.in_(trigger_ids)))
+        await session.execute(delete(UserModel).where(UserModel.user_id == user.user_id))
+        await session.commit()
+
+
+async def measure(load_method_name: str, project_id: int) -> tuple[list[float], float]:
+    statements = 0
+
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    timings = []
+    event.listen(engine.sync_engine, 'before_cursor_execute', count_statement)
+    try:
+        for _ in range(LOADS):
+            async with async_session_maker() as session:
+                load_method = getattr(CodeGenRepository(session), load_method_name)
+                start = time.perf_counter()
+                projects = await load_method(project_ids=[project_id])
+                timings.append(time.perf_counter() - start)
+                blocks_count = sum(len(dialogue.blocks) for dialogue in projects[0].dialogues)
+                assert blocks_count == DIALOGUES * BLOCKS_PER_DIALOGUE
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', count_statement)
+    return timings, statements / LOADS
+
+
+def report(title: str, timings: list[float], round_trips: float):
+    timings_ms = sorted(timing * 1000 for timing in timings)
+    p99 = timings_ms[int(len(timings_ms) * 0.99) - 1]
+    print(
+        f'{title:<8} round-trips={round_trips:.0f} '
+        f'mean={statistics.mean(timings_ms):.2f}ms p50={statistics.median(timings_ms):.2f}ms p99={p99:.2f}ms'
+    )
+
+
+async def main():
+    user, project = await create_project()
+    try:
+        orm_timings, orm_round_trips = await measure('_get_projects_to_generate_code_with_orm', project.project_id)
+        single_timings, single_round_trips = await measure(
+            '_get_projects_to_generate_code_in_single_query',
+            project.project_id,
+        )
+    finally:
+        await remove_project(user, project)
+        await engine.dispose()
+
+    report('orm', orm_timings, orm_round_trips)
+    report('single', single_timings, single_round_trips)
+    print(f'speedup  x{statistics.mean(orm_timings) / statistics.mean(single_timings):.1f}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
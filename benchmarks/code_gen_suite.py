@@ -0,0 +1,191 @@
+"""
+Offline code generation benchmark on synthetic projects, no database or Redis needed.
+
+Stages are timed separately:
+    generate        building handlers, states groups and keyboards from DTOs (no fragment cache)
+    generate_cached the same with a warm per-dialogue fragment cache
+    render          rendering handlers/custom.py from the prepared context
+    zip             assembling the archive from already generated files
+
+Run from the repository root (settings are read from .env):
+    python -m benchmarks.code_gen_suite --dialogues 10 --blocks 20 --plugins 3 --images 5 --image-size 200000
+    python -m benchmarks.code_gen_suite --save-baseline
+Exits with code 1 when a stage p50 is slower than the stored baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import math
+import random
+import shutil
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from uuid import uuid4
+
+from benchmarks.fixtures import DEFAULT_BLOCK_TYPES_MIX, make_images, make_project
+from src.apps.code_gen.archives import get_generated_files, iter_bot_code_zip, load_static_archive_layer
+from src.apps.code_gen.cache import DialogueCodeFragmentCache
+from src.apps.code_gen.generators import BotCodeGenerator
+from src.apps.code_gen.templates import load_templates
+from src.apps.enums import BlockType
+from src.core.config import MEDIA_DIR, settings
+
+DEFAULT_BASELINE_PATH = Path('benchmarks', 'baselines', 'code_gen.json')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dialogues', type=int, default=10)
+    parser.add_argument('--blocks', type=int, default=20, help='blocks per dialogue')
+    parser.add_argument(
+        '--block-types',
+        default=','.join(f'{block_type.value}={weight}' for block_type, weight in DEFAULT_BLOCK_TYPES_MIX.items()),
+        help='block type weights, e.g. text_block=3,question_block=1',
+    )
+    parser.add_argument('--plugins', type=int, default=0)
+    parser.add_argument('--images', type=int, default=0, help='distinct image files used by image blocks')
+    parser.add_argument('--image-size', type=int, default=100 * 1024, help='image size in bytes')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p50 slowdown against the baseline')
+    return parser.parse_args()
+
+
+def parse_block_types_mix(value: str) -> dict[BlockType, int]:
+    block_types_mix = {}
+    for item in value.split(','):
+        block_type, weight = item.split('=')
+        block_types_mix[BlockType(block_type.strip())] = int(weight)
+    return block_types_mix
+
+
+def get_peak_allocated_mb(func: Callable[[], object]) -> float:
+    # Measured in a separate call, since tracing allocations slows the measured code down
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_allocated = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak_allocated / 1024**2
+
+
+def measure(func: Callable[[], object], iterations: int) -> dict[str, float]:
+    func()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    timings_ms = sorted(timing * 1000 for timing in timings)
+    return {
+        'p50_ms': statistics.median(timings_ms),
+        'p99_ms': timings_ms[math.ceil(len(timings_ms) * 0.99) - 1],
+        'mean_ms': statistics.mean(timings_ms),
+        'throughput_per_s': len(timings) / sum(timings),
+        'peak_allocated_mb': get_peak_allocated_mb(func),
+    }
+
+
+def run(args: argparse.Namespace, images_dir: Path) -> dict[str, dict[str, float]]:
+    rnd = random.Random(args.seed)
+    image_paths = make_images(images_dir, args.images, args.image_size, rnd) if args.images else []
+    project = make_project(
+        dialogues=args.dialogues,
+        blocks_per_dialogue=args.blocks,
+        block_types_mix=parse_block_types_mix(args.block_types),
+        plugins=args.plugins,
+        image_paths=image_paths,
+        seed=args.seed,
+    )
+
+    load_templates()
+    load_static_archive_layer()
+
+    generator = BotCodeGenerator()
+    cached_generator = BotCodeGenerator(fragment_cache=DialogueCodeFragmentCache(max_size=args.dialogues))
+    context = generator.get_custom_handlers_context(project)
+    generated_files = list(get_generated_files(project))
+    chunk_size = settings.CODE_GEN_ZIP_CHUNK_SIZE
+
+    return {
+        'generate': measure(lambda: generator.get_custom_handlers_context(project), args.iterations),
+        'generate_cached': measure(lambda: cached_generator.get_custom_handlers_context(project), args.iterations),
+        'render': measure(lambda: generator.render_custom_handlers_code(context), args.iterations),
+        'zip': measure(lambda: b''.join(iter_bot_code_zip(project, chunk_size, generated_files)), args.iterations),
+    }
+
+
+def get_config(args: argparse.Namespace) -> dict[str, object]:
+    return {
+        'dialogues': args.dialogues,
+        'blocks': args.blocks,
+        'block_types': args.block_types,
+        'plugins': args.plugins,
+        'images': args.images,
+        'image_size': args.image_size,
+        'seed': args.seed,
+    }
+
+
+def compare_with_baseline(results: dict[str, dict[str, float]], baseline: dict, tolerance: float) -> bool:
+    has_regressions = False
+    print(f'\n{"stage":<16}{"baseline p50":>14}{"current p50":>14}{"change":>10}')
+    for stage, stage_results in results.items():
+        baseline_results = baseline['results'].get(stage)
+        if baseline_results is None:
+            continue
+        change = stage_results['p50_ms'] / baseline_results['p50_ms'] - 1
+        is_regression = change > tolerance
+        has_regressions |= is_regression
+        print(
+            f'{stage:<16}{baseline_results["p50_ms"]:>12.3f}ms{stage_results["p50_ms"]:>12.3f}ms'
+            f'{change:>+10.1%}{"  REGRESSION" if is_regression else ""}'
+        )
+    return has_regressions
+
+
+def main():
+    args = parse_args()
+    images_dir = MEDIA_DIR / f'benchmark-{uuid4().hex}'
+    try:
+        results = run(args, images_dir)
+    finally:
+        shutil.rmtree(images_dir, ignore_errors=True)
+
+    print(f'{"stage":<16}{"p50":>10}{"p99":>10}{"mean":>10}{"ops/s":>10}{"peak alloc":>12}')
+    for stage, stage_results in results.items():
+        print(
+            f'{stage:<16}{stage_results["p50_ms"]:>8.3f}ms{stage_results["p99_ms"]:>8.3f}ms'
+            f'{stage_results["mean_ms"]:>8.3f}ms{stage_results["throughput_per_s"]:>10.0f}'
+            f'{stage_results["peak_allocated_mb"]:>10.1f}MB'
+        )
+
+    config = get_config(args)
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({'config': config, 'results': results}, indent=2))
+        print(f'\nBaseline saved to {args.baseline}')
+        return
+
+    if not args.baseline.exists():
+        print(f'\nNo baseline at {args.baseline}, run with --save-baseline to create it')
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline['config'] != config:
+        print(f'\nBaseline at {args.baseline} was recorded with a different configuration: {baseline["config"]}')
+        return
+    if compare_with_baseline(results, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Per-download cost of getting and rendering the bot code templates.
+
+"before" reproduces the old behaviour (read the file and compile it in a brand-new Environment on every call),
+"after" uses the process-wide registry from src.apps.code_gen.templates.
+
+Run from the repository root (settings are read from .env):
+    python -m benchmarks.code_gen_templates
+"""
+
+import statistics
+import time
+from pathlib import Path
+
+from jinja2 import Environment, Template
+
+from src.api.v1.code_gen.schemas import KeyboardSchema
+from src.apps.code_gen.bot_templates import code
+from src.apps.code_gen.templates import get_template, load_templates
+from src.apps.enums import KeyboardType
+from src.core.config import BOT_TEMPLATES_DIR
+
+DOWNLOADS = 500
+
+TEMPLATES_CONTEXT = {
+    'handlers/custom.py.j2': {
+        'utils_funcs': {code.is_email.strip(), code.is_phone_number.strip()},
+        'states_groups': [],
+        'handlers': [],
+        'commands_values': [],
+        'start_keyboard': KeyboardSchema(
+            type=KeyboardType.REPLY_KEYBOARD,
+            declaration=code.reply_keyboard_declaration,
+            buttons=[code.reply_keyboard_button.format(text=f'Кнопка {i}') for i in range(10)],
+        ),
+        'admin_keyboard': KeyboardSchema(
+            type=KeyboardType.REPLY_KEYBOARD,
+            declaration=code.reply_keyboard_declaration,
+        ),
+        'start_message': 'Главное меню',
+    },
+    'handlers/__init__.py.j2': {'handlers_file_names': ['statistic', 'catalog']},
+    'db/__init__.py.j2': {'db_funcs_file_names': ['statistic', 'catalog']},
+}
+
+
+def get_template_without_registry(name: str) -> Template:
+    with open(BOT_TEMPLATES_DIR / Path(name), 'r', encoding='utf-8') as f:
+        template_str = f.read()
+    env = Environment(trim_blocks=True, lstrip_blocks=True)
+    return env.from_string(template_str)
+
+
+def measure(get_template_func) -> list[float]:
+    timings = []
+    for _ in range(DOWNLOADS):
+        start = time.perf_counter()
+        for name, context in TEMPLATES_CONTEXT.items():
+            get_template_func(name).render(context)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(title: str, timings: list[float]):
+    timings_ms = sorted(timing * 1000 for timing in timings)
+    p99 = timings_ms[int(len(timings_ms) * 0.99) - 1]
+    print(
+        f'{title:<8} mean={statistics.mean(timings_ms):.3f}ms p50={statistics.median(timings_ms):.3f}ms p99={p99:.3f}ms'
+    )
+
+
+def main():
+    before = measure(get_template_without_registry)
+    load_templates()
+    after = measure(get_template)
+
+    report('before', before)
+    report('after', after)
+    print(f'speedup  x{statistics.mean(before) / statistics.mean(after):.1f}')
+
+
+if __name__ == '__main__':
+    main()
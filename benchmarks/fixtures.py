@@ -0,0 +1,168 @@
+"""
+Synthetic code generation inputs: ProjectCodeGenReadDTO graphs of a given size, built without a database.
+"""
+
+import random
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+from src.apps.blocks.dto.api import APIBlockReadDTO
+from src.apps.blocks.dto.base import BlockReadDTO
+from src.apps.blocks.dto.csv import CSVBlockReadDTO
+from src.apps.blocks.dto.email import EmailBlockReadDTO
+from src.apps.blocks.dto.excel import ExcelBlockReadDTO
+from src.apps.blocks.dto.image import ImageBlockReadDTO
+from src.apps.blocks.dto.question import QuestionBlockReadDTO
+from src.apps.blocks.dto.text import TextBlockReadDTO
+from src.apps.code_gen.dto import DialogueWithBlocksReadDTO, ProjectCodeGenReadDTO
+from src.apps.dialogues.dto import DialogueTriggerReadDTO
+from src.apps.enums import AnswerMessageType, BlockType, HTTPMethod, KeyboardType, TriggerEventType
+from src.apps.plugins.dto import PluginReadDTO, PluginTriggerReadDTO
+from src.core.config import BOT_TEMPLATES_DIR, MEDIA_DIR
+
+DEFAULT_BLOCK_TYPES_MIX = {
+    BlockType.TEXT_BLOCK: 4,
+    BlockType.QUESTION_BLOCK: 2,
+    BlockType.IMAGE_BLOCK: 1,
+    BlockType.EMAIL_BLOCK: 1,
+    BlockType.CSV_BLOCK: 1,
+    BlockType.EXCEL_BLOCK: 1,
+    BlockType.API_BLOCK: 1,
+}
+
+
+def get_plugin_names() -> list[str]:
+    handlers_dir = BOT_TEMPLATES_DIR / 'handlers'
+    return sorted(
+        path.name.removesuffix('.py.j2')
+        for path in handlers_dir.glob('*.py.j2')
+        if path.name not in ('custom.py.j2', '__init__.py.j2')
+    )
+
+
+def make_images(images_dir: Path, count: int, size: int, rnd: random.Random) -> list[str]:
+    # Random bytes do not compress, just like real JPEG/PNG files
+    images_dir.mkdir(parents=True, exist_ok=True)
+    image_paths = []
+    for image_num in range(count):
+        image_path = images_dir / f'image_{image_num}.jpg'
+        image_path.write_bytes(rnd.randbytes(size))
+        image_paths.append(str(image_path.relative_to(MEDIA_DIR)))
+    return image_paths
+
+
+def make_block(
+    block_type: BlockType,
+    block_id: int,
+    sequence_number: int,
+    image_paths: list[str],
+    rnd: random.Random,
+) -> BlockReadDTO:
+    common_fields = {'block_id': block_id, 'sequence_number': sequence_number, 'type': block_type.value}
+    match block_type:
+        case BlockType.TEXT_BLOCK:
+            return TextBlockReadDTO(**common_fields, message_text=f'Привет, <username>! Сообщение {sequence_number}')
+        case BlockType.QUESTION_BLOCK:
+            return QuestionBlockReadDTO(
+                **common_fields,
+                message_text=f'Вопрос {sequence_number}?',
+                answer_type=rnd.choice(list(AnswerMessageType)),
+            )
+        case BlockType.IMAGE_BLOCK:
+            return ImageBlockReadDTO(**common_fields, image_path=rnd.choice(image_paths) if image_paths else '')
+        case BlockType.EMAIL_BLOCK:
+            return EmailBlockReadDTO(
+                **common_fields,
+                subject='Новая заявка',
+                text='Ответ: <answers[1]>',
+                recipient_email='admin@example.com',
+            )
+        case BlockType.CSV_BLOCK:
+            return CSVBlockReadDTO(**common_fields, file_path='answers.csv', data={'answer': '<answers[1]>'})
+        case BlockType.EXCEL_BLOCK:
+            return ExcelBlockReadDTO(**common_fields, file_path='answers.xlsx', data={'answer': '<answers[1]>'})
+        case BlockType.API_BLOCK:
+            return APIBlockReadDTO(
+                **common_fields,
+                url='https://example.com/api',
+                http_method=rnd.choice(list(HTTPMethod)),
+                headers={'Authorization': 'Bearer token'},
+                body={'answer': '<answers[1]>'},
+            )
+    raise ValueError(f'Unknown block type: {block_type}')
+
+
+def make_project(
+    dialogues: int,
+    blocks_per_dialogue: int,
+    block_types_mix: dict[BlockType, int] = DEFAULT_BLOCK_TYPES_MIX,
+    plugins: int = 0,
+    image_paths: list[str] = (),
+    keyboard_type: KeyboardType = KeyboardType.REPLY_KEYBOARD,
+    seed: int = 0,
+) -> ProjectCodeGenReadDTO:
+    rnd = random.Random(seed)
+    created_at = datetime.now(timezone.utc)
+    block_types = list(block_types_mix)
+    block_types_weights = list(block_types_mix.values())
+
+    dialogues_dto = []
+    for dialogue_id in range(1, dialogues + 1):
+        blocks = [
+            make_block(
+                block_type=rnd.choices(block_types, block_types_weights)[0],
+                block_id=dialogue_id * blocks_per_dialogue + sequence_number,
+                sequence_number=sequence_number,
+                image_paths=list(image_paths),
+                rnd=rnd,
+            )
+            for sequence_number in range(1, blocks_per_dialogue + 1)
+        ]
+        dialogues_dto.append(
+            DialogueWithBlocksReadDTO(
+                dialogue_id=dialogue_id,
+                project_id=1,
+                created_at=created_at,
+                trigger=DialogueTriggerReadDTO(
+                    trigger_id=dialogue_id,
+                    event_type=list(TriggerEventType)[dialogue_id % len(TriggerEventType)],
+                    value=f'Диалог {dialogue_id}',
+                ),
+                blocks=blocks,
+            )
+        )
+
+    plugins_dto = []
+    for plugin_id, plugin_name in enumerate(get_plugin_names()[:plugins], start=1):
+        plugins_dto.append(
+            PluginReadDTO(
+                plugin_id=plugin_id,
+                name=plugin_name,
+                summary='',
+                image_path='',
+                created_at=created_at,
+                handlers_file_path=f'handlers/{plugin_name}.py.j2',
+                db_funcs_file_path=f'db/{plugin_name}.py.j2',
+                readme_file_path='',
+                triggers=[
+                    PluginTriggerReadDTO(
+                        trigger_id=plugin_id,
+                        event_type=TriggerEventType.BUTTON,
+                        value=plugin_name,
+                        is_admin=False,
+                    )
+                ],
+            )
+        )
+
+    return ProjectCodeGenReadDTO(
+        project_id=1,
+        user_id=uuid4(),
+        name='benchmark',
+        start_message='Главное меню',
+        start_keyboard_type=keyboard_type,
+        created_at=created_at,
+        dialogues=dialogues_dto,
+        plugins=plugins_dto,
+    )
@@ -5,7 +5,7 @@ from src.api.v1.users.endpoints import router as users_router
 from src.api.v1.projects.endpoints import router as projects_router
 from src.api.v1.dialogues.endpoints import router as dialogues_router
 from src.api.v1.dialogue_templates.endpoints import router as dialogue_templates_router
-from src.api.v1.blocks.endpoints import router as blocks_router
+from src.api.v1.blocks.endpoints import router as blocks_router, batch_router as blocks_batch_router
 from src.api.v1.plugins.endpoints import router as plugins_router
 from src.api.v1.code_gen.endpoints import router as code_gen_router
 from src.api.v1.ai_code_gen.endpoints import router as ai_code_gen_router
@@ -28,6 +28,7 @@ def get_app_router() -> APIRouter:
         dialogues_router,
         dialogue_templates_router,
         blocks_router,
+        blocks_batch_router,
         plugins_router,
         code_gen_router,
         ai_code_gen_router,
@@ -1,11 +1,14 @@
+import json
 from uuid import UUID
-from typing import Annotated
+from typing import Annotated, AsyncIterator, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, status
 from fastapi.responses import StreamingResponse
 
 from src.apps.auth.dependencies.auth_dependencies import UserIDFromAccessTokenDI, access_token_required
 from src.apps.ai_code_gen.dependencies.services_dependencies import AICodeGenServiceDI
+from src.apps.ai_code_gen.dto import AICodeGenStreamEventDTO
+from src.apps.ai_code_gen.enums import AICodeGenStreamEvent
 from src.api.v1.ai_code_gen.schemas import (
     AICodeGenSessionCreateSchema,
     AICodeGenMessageCreateSchema,
@@ -17,17 +20,18 @@ from src.api.v1.ai_code_gen.exceptions import (
     AICodeGenNoPermissionHTTPException,
     AICodeGenPromptTooLongHTTPException,
     AICodeGenMessagesLimitExceededHTTPException,
-    AICodeGenInvalidResponseHTTPException,
     AICodeGenNoAssistantMessageHTTPException,
+    AICodeGenSessionBusyHTTPException,
 )
 from src.apps.ai_code_gen.errors import (
     AICodeGenSessionNotFoundError,
     AICodeGenSessionNoPermissionError,
     AICodeGenPromptTooLongError,
     AICodeGenMessagesLimitExceededError,
-    AICodeGenInvalidResponseError,
     AICodeGenNoAssistantMessageError,
+    AICodeGenSessionBusyError,
 )
+from src.core.utils import format_sse_event, format_sse_comment
 
 router = APIRouter(
     prefix='/ai-code-gen',
@@ -36,7 +40,7 @@ router = APIRouter(
 )
 
 
-@router.post('/sessions')
+@router.post('/sessions', status_code=status.HTTP_202_ACCEPTED)
 async def create_session(
     ai_code_gen_service: AICodeGenServiceDI,
     payload: AICodeGenSessionCreateSchema,
@@ -46,8 +50,6 @@ async def create_session(
         session = await ai_code_gen_service.create_session(user_id=user_id, prompt=payload.prompt)
     except AICodeGenPromptTooLongError:
         raise AICodeGenPromptTooLongHTTPException
-    except AICodeGenInvalidResponseError:
-        raise AICodeGenInvalidResponseHTTPException
     return AICodeGenSessionWithMessagesReadSchema.from_dto(session)
 
 
@@ -76,7 +78,7 @@ async def get_session(
     return AICodeGenSessionWithMessagesReadSchema.from_dto(session)
 
 
-@router.post('/sessions/{session_id}/messages')
+@router.post('/sessions/{session_id}/messages', status_code=status.HTTP_202_ACCEPTED)
 async def add_message(
     ai_code_gen_service: AICodeGenServiceDI,
     session_id: UUID,
@@ -97,11 +99,45 @@ async def add_message(
         raise AICodeGenPromptTooLongHTTPException
     except AICodeGenMessagesLimitExceededError:
         raise AICodeGenMessagesLimitExceededHTTPException
-    except AICodeGenInvalidResponseError:
-        raise AICodeGenInvalidResponseHTTPException
+    except AICodeGenSessionBusyError:
+        raise AICodeGenSessionBusyHTTPException
     return AICodeGenSessionWithMessagesReadSchema.from_dto(session)
 
 
+@router.get('/sessions/{session_id}/events')
+async def get_session_events(
+    ai_code_gen_service: AICodeGenServiceDI,
+    session_id: UUID,
+    user_id: UserIDFromAccessTokenDI,
+):
+    try:
+        events = await ai_code_gen_service.get_session_events(user_id=user_id, session_id=session_id)
+    except AICodeGenSessionNotFoundError:
+        raise AICodeGenSessionNotFoundHTTPException
+    except AICodeGenSessionNoPermissionError:
+        raise AICodeGenNoPermissionHTTPException
+
+    return StreamingResponse(
+        content=_format_ai_code_gen_events(events),
+        media_type='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        },
+    )
+
+
+async def _format_ai_code_gen_events(events: AsyncIterator[Optional[AICodeGenStreamEventDTO]]) -> AsyncIterator[str]:
+    # Summary and code events carry the text generated since the previous event, the status event ends the stream
+    async for event in events:
+        if event is None:
+            yield format_sse_comment('keep-alive')
+        elif event.event == AICodeGenStreamEvent.STATUS:
+            yield format_sse_event(json.dumps({'status': event.data}), event=event.event)
+        else:
+            yield format_sse_event(json.dumps({'text': event.data}), event=event.event)
+
+
 @router.get('/sessions/{session_id}/download')
 async def download_code(
     ai_code_gen_service: AICodeGenServiceDI,
@@ -33,17 +33,17 @@ class AICodeGenMessagesLimitExceededHTTPException(HTTPException):
         )
 
 
-class AICodeGenInvalidResponseHTTPException(HTTPException):
+class AICodeGenNoAssistantMessageHTTPException(HTTPException):
     def __init__(self):
         super().__init__(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail='Invalid response from LLM',
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='No generated code to download',
         )
 
 
-class AICodeGenNoAssistantMessageHTTPException(HTTPException):
+class AICodeGenSessionBusyHTTPException(HTTPException):
     def __init__(self):
         super().__init__(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='No generated code to download',
+            status_code=status.HTTP_409_CONFLICT,
+            detail='Previous message of this session is still being processed',
         )
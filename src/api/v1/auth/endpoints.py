@@ -4,10 +4,15 @@ from fastapi import APIRouter, status, HTTPException, Header, Body, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 
 from src.apps.auth.dependencies.services_dependencies import AuthServiceDI
-from src.api.v1.auth.exceptions import InvalidCodeHTTPException, ExpiredCodeHTTPException
+from src.api.v1.auth.exceptions import (
+    InvalidCodeHTTPException,
+    ExpiredCodeHTTPException,
+    AuthUnavailableHTTPException,
+)
 from src.apps.auth.errors import InvalidCodeError, ExpiredCodeError
 from src.api.v1.auth.schemas import TelegramCredentialsSchema
 from src.core.config import settings
+from src.infrastructure.cache.errors import CacheUnavailableError
 
 router = APIRouter(tags=['Auth'])
 
@@ -21,7 +26,10 @@ async def save_tg_code(
     if x_bot_secret != settings.AUTH_BOT_SECRET:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid bot secret')
 
-    await auth_service.save_tg_code(tg_id=tg_credentials.tg_id, code=tg_credentials.code)
+    try:
+        await auth_service.save_tg_code(tg_id=tg_credentials.tg_id, code=tg_credentials.code)
+    except CacheUnavailableError:
+        raise AuthUnavailableHTTPException
     return {'detail': 'Code saved'}
 
 
@@ -57,6 +65,8 @@ async def _login_via_telegram(
         raise InvalidCodeHTTPException
     except ExpiredCodeError:
         raise ExpiredCodeHTTPException
+    except CacheUnavailableError:
+        raise AuthUnavailableHTTPException
 
     access_token = await auth_service.register_or_login(tg_id)
     return {'access_token': access_token, 'token_type': 'bearer'}
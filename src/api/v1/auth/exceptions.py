@@ -15,3 +15,11 @@ class ExpiredCodeHTTPException(HTTPException):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Код истек',
         )
+
+
+class AuthUnavailableHTTPException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Авторизация временно недоступна',
+        )
@@ -8,6 +8,8 @@ from src.api.v1.blocks.schemas import (
     UnionBlockUpdateSchema,
     ImageBlockReadSchema,
 )
+from src.api.v1.blocks.schemas.base import BlockMoveSchema
+from src.api.v1.blocks.schemas.batch import BlocksBatchSchema
 from src.api.v1.blocks.utils import convert_block_read_dto_to_schema
 from src.apps.auth.dependencies.auth_dependencies import UserIDFromAccessTokenDI, access_token_required
 from src.apps.blocks.dependencies.services_dependencies import BlockServiceDI
@@ -15,11 +17,17 @@ from src.api.v1.blocks.exceptions import (
     RepeatingBlockSequenceNumberHTTPException,
     BlockNotFoundHTTPException,
     InvalidBlockTypeHTTPException,
+    ImageTooLargeHTTPException,
+    ImageNotFoundHTTPException,
+    InvalidImageHTTPException,
 )
 from src.apps.blocks.errors import (
     RepeatingBlockSequenceNumberError,
     BlockNotFoundError,
     InvalidBlockTypeError,
+    ImageTooLargeError,
+    ImageNotFoundError,
+    InvalidImageError,
 )
 from src.api.v1.blocks.openapi_examples import BLOCK_CREATE_SCHEMA_EXAMPLES, BLOCK_UPDATE_SCHEMA_EXAMPLES
 from src.api.v1.dialogues.exceptions import DialogueNotFoundHTTPException
@@ -36,6 +44,13 @@ router = APIRouter(
     dependencies=[Depends(access_token_required)],
 )
 
+# The batch path has no slash before the action, so it cannot live under the blocks prefix
+batch_router = APIRouter(
+    prefix='/projects/{project_id}/dialogues/{dialogue_id}',
+    tags=['Blocks'],
+    dependencies=[Depends(access_token_required)],
+)
+
 
 @router.post(
     '',
@@ -67,6 +82,8 @@ async def create_block(
         raise DialogueNotFoundHTTPException
     except RepeatingBlockSequenceNumberError:
         raise RepeatingBlockSequenceNumberHTTPException
+    except ImageNotFoundError:
+        raise ImageNotFoundHTTPException
     return convert_block_read_dto_to_schema(block)
 
 
@@ -128,6 +145,41 @@ async def update_block(
         raise BlockNotFoundHTTPException
     except RepeatingBlockSequenceNumberError:
         raise RepeatingBlockSequenceNumberHTTPException
+    except ImageNotFoundError:
+        raise ImageNotFoundHTTPException
+    return convert_block_read_dto_to_schema(block)
+
+
+@router.post(
+    '/{block_id}/move',
+    response_model=UnionBlockReadSchema,
+)
+async def move_block(
+    block_service: BlockServiceDI,
+    project_id: int,
+    dialogue_id: int,
+    block_id: int,
+    position: BlockMoveSchema,
+    user_id: UserIDFromAccessTokenDI,
+):
+    try:
+        block = await block_service.move_block(
+            user_id=user_id,
+            project_id=project_id,
+            dialogue_id=dialogue_id,
+            block_id=block_id,
+            after_block_id=position.after_block_id,
+        )
+    except ProjectNotFoundError:
+        raise ProjectNotFoundHTTPException
+    except NoPermissionForProjectError:
+        raise NoPermissionForProjectHTTPException
+    except DialogueNotFoundError:
+        raise DialogueNotFoundHTTPException
+    except BlockNotFoundError:
+        raise BlockNotFoundHTTPException
+    except RepeatingBlockSequenceNumberError:
+        raise RepeatingBlockSequenceNumberHTTPException
     return convert_block_read_dto_to_schema(block)
 
 
@@ -161,6 +213,10 @@ async def upload_image_for_image_block(
         raise BlockNotFoundHTTPException
     except InvalidBlockTypeError:
         raise InvalidBlockTypeHTTPException
+    except ImageTooLargeError:
+        raise ImageTooLargeHTTPException
+    except InvalidImageError:
+        raise InvalidImageHTTPException
     return ImageBlockReadSchema.from_dto(block)
 
 
@@ -190,3 +246,38 @@ async def delete_block(
         raise DialogueNotFoundHTTPException
     except BlockNotFoundError:
         raise BlockNotFoundHTTPException
+
+
+@batch_router.patch(
+    '/blocks:batch',
+    response_model=list[UnionBlockReadSchema],
+)
+async def apply_blocks_batch(
+    block_service: BlockServiceDI,
+    project_id: int,
+    dialogue_id: int,
+    batch: BlocksBatchSchema,
+    user_id: UserIDFromAccessTokenDI,
+):
+    try:
+        blocks = await block_service.apply_blocks_batch(
+            user_id=user_id,
+            project_id=project_id,
+            dialogue_id=dialogue_id,
+            operations=batch.to_dto(),
+        )
+    except ProjectNotFoundError:
+        raise ProjectNotFoundHTTPException
+    except NoPermissionForProjectError:
+        raise NoPermissionForProjectHTTPException
+    except DialogueNotFoundError:
+        raise DialogueNotFoundHTTPException
+    except BlockNotFoundError:
+        raise BlockNotFoundHTTPException
+    except InvalidBlockTypeError:
+        raise InvalidBlockTypeHTTPException
+    except RepeatingBlockSequenceNumberError:
+        raise RepeatingBlockSequenceNumberHTTPException
+    except ImageNotFoundError:
+        raise ImageNotFoundHTTPException
+    return [convert_block_read_dto_to_schema(block) for block in blocks]
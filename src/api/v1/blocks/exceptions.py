@@ -23,3 +23,27 @@ class InvalidBlockTypeHTTPException(HTTPException):
             status_code=status.HTTP_403_FORBIDDEN,
             detail='Invalid block type',
         )
+
+
+class ImageTooLargeHTTPException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail='Image is too large',
+        )
+
+
+class ImageNotFoundHTTPException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Image does not exist',
+        )
+
+
+class InvalidImageHTTPException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail='Unsupported image format',
+        )
@@ -1,4 +1,4 @@
-from typing import Self
+from typing import Optional, Self
 
 from pydantic import BaseModel, Field
 
@@ -26,3 +26,8 @@ class BlockCreateSchema(BaseModel):
 class BlockUpdateSchema(BaseModel):
     def to_dto(self) -> BlockUpdateDTO:
         raise NotImplementedError
+
+
+class BlockMoveSchema(BaseModel):
+    # The block is moved to the start of the dialogue when no block to follow is given
+    after_block_id: Optional[int] = None
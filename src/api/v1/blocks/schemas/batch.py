@@ -0,0 +1,66 @@
+from typing import Annotated, Literal, Optional, Union
+
+from pydantic import BaseModel, Field
+
+from src.api.v1.blocks.schemas import UnionBlockCreateSchema, UnionBlockUpdateSchema
+from src.apps.blocks.dto.batch import (
+    BlockOperationDTO,
+    BlockCreateOperationDTO,
+    BlockUpdateOperationDTO,
+    BlockDeleteOperationDTO,
+    BlockMoveOperationDTO,
+)
+from src.core.consts import MAX_BLOCKS_BATCH_OPERATIONS
+
+
+class BlockCreateOperationSchema(BaseModel):
+    op: Literal['create']
+    block: UnionBlockCreateSchema
+
+    def to_dto(self) -> BlockCreateOperationDTO:
+        return BlockCreateOperationDTO(block=self.block.to_dto())
+
+
+class BlockUpdateOperationSchema(BaseModel):
+    op: Literal['update']
+    block_id: int
+    block: UnionBlockUpdateSchema
+
+    def to_dto(self) -> BlockUpdateOperationDTO:
+        return BlockUpdateOperationDTO(block_id=self.block_id, block=self.block.to_dto())
+
+
+class BlockDeleteOperationSchema(BaseModel):
+    op: Literal['delete']
+    block_id: int
+
+    def to_dto(self) -> BlockDeleteOperationDTO:
+        return BlockDeleteOperationDTO(block_id=self.block_id)
+
+
+class BlockMoveOperationSchema(BaseModel):
+    op: Literal['move']
+    block_id: int
+    after_block_id: Optional[int] = None
+
+    def to_dto(self) -> BlockMoveOperationDTO:
+        return BlockMoveOperationDTO(block_id=self.block_id, after_block_id=self.after_block_id)
+
+
+UnionBlockOperationSchema = Annotated[
+    Union[
+        BlockCreateOperationSchema,
+        BlockUpdateOperationSchema,
+        BlockDeleteOperationSchema,
+        BlockMoveOperationSchema,
+    ],
+    Field(discriminator='op'),
+]
+
+
+class BlocksBatchSchema(BaseModel):
+    # Operations are applied in order, new blocks are added to the end of the dialogue
+    operations: list[UnionBlockOperationSchema] = Field(min_length=1, max_length=MAX_BLOCKS_BATCH_OPERATIONS)
+
+    def to_dto(self) -> list[BlockOperationDTO]:
+        return [operation.to_dto() for operation in self.operations]
@@ -17,6 +17,9 @@ class BaseImageBlockSchema(BaseModel):
 
 
 class ImageBlockReadSchema(BaseImageBlockSchema, BlockReadSchema):
+    original_image_path: str = ''
+    thumbnail_path: str = ''
+
     @classmethod
     def from_dto(cls, dto: ImageBlockReadDTO) -> Self:
         return cls(
@@ -24,6 +27,8 @@ class ImageBlockReadSchema(BaseImageBlockSchema, BlockReadSchema):
             sequence_number=dto.sequence_number,
             type=dto.type,
             image_path=dto.image_path,
+            original_image_path=dto.original_image_path,
+            thumbnail_path=dto.thumbnail_path,
         )
 
 
@@ -1,8 +1,14 @@
+import json
+from typing import AsyncIterator, Optional
+
 from fastapi import APIRouter, Depends
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, PlainTextResponse
 
 from src.apps.auth.dependencies.auth_dependencies import UserIDFromAccessTokenDI, access_token_required
+from src.api.v1.code_gen.schemas import ProjectsCodeExportSchema
+from src.api.v1.users.exceptions import DontHavePermissionHTTPException, UserNotFoundHTTPException
 from src.apps.code_gen.dependencies.services_dependencies import CodeGenServiceDI
+from src.apps.code_gen.dto import CodePreviewUpdateDTO
 from src.api.v1.dialogues.exceptions import DialoguesLimitExceededHTTPException
 from src.apps.dialogues.errors import DialoguesLimitExceededError
 from src.api.v1.plugins.exceptions import PluginsNotAvailableForFreeUsersHTTPException
@@ -13,6 +19,8 @@ from src.api.v1.projects.exceptions import (
 )
 from src.apps.projects.errors import ProjectNotFoundError, NoPermissionForProjectError
 from src.apps.statistics.dependencies.services_dependencies import StatisticServiceDI
+from src.apps.users.errors import DontHavePermissionError, UserNotFoundError
+from src.core.utils import format_sse_event, format_sse_comment
 
 router = APIRouter(
     prefix='/projects',
@@ -51,3 +59,82 @@ async def get_bot_code(
             'Content-Disposition': 'attachment; filename=bot.zip',
         },
     )
+
+
+@router.post('/code/export')
+async def export_bot_codes(
+    code_gen_service: CodeGenServiceDI,
+    export_filters: ProjectsCodeExportSchema,
+    user_id: UserIDFromAccessTokenDI,
+):
+    try:
+        zipped_bots = await code_gen_service.export_bot_codes_in_zip(
+            user_id=user_id,
+            project_ids=export_filters.project_ids,
+            owner_id=export_filters.user_id,
+        )
+    except UserNotFoundError:
+        raise UserNotFoundHTTPException
+    except DontHavePermissionError:
+        raise DontHavePermissionHTTPException
+    except ProjectNotFoundError:
+        raise ProjectNotFoundHTTPException
+
+    return StreamingResponse(
+        content=zipped_bots,
+        media_type='application/zip',
+        headers={
+            'Content-Disposition': 'attachment; filename=bots.zip',
+        },
+    )
+
+
+@router.get('/{project_id}/code/preview', response_class=PlainTextResponse)
+async def get_bot_code_preview(
+    code_gen_service: CodeGenServiceDI,
+    project_id: int,
+    user_id: UserIDFromAccessTokenDI,
+):
+    try:
+        bot_code = await code_gen_service.get_custom_handlers_code(user_id=user_id, project_id=project_id)
+    except ProjectNotFoundError:
+        raise ProjectNotFoundHTTPException
+    except NoPermissionForProjectError:
+        raise NoPermissionForProjectHTTPException
+
+    return PlainTextResponse(content=bot_code)
+
+
+@router.get('/{project_id}/code/preview/events')
+async def get_bot_code_preview_events(
+    code_gen_service: CodeGenServiceDI,
+    project_id: int,
+    user_id: UserIDFromAccessTokenDI,
+):
+    try:
+        updates = await code_gen_service.get_custom_handlers_code_updates(user_id=user_id, project_id=project_id)
+    except ProjectNotFoundError:
+        raise ProjectNotFoundHTTPException
+    except NoPermissionForProjectError:
+        raise NoPermissionForProjectHTTPException
+
+    return StreamingResponse(
+        content=_format_code_preview_events(updates),
+        media_type='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        },
+    )
+
+
+async def _format_code_preview_events(updates: AsyncIterator[Optional[CodePreviewUpdateDTO]]) -> AsyncIterator[str]:
+    # The first event carries the whole file, the following ones carry unified diffs against the previous version.
+    # Both are JSON encoded, so line breaks of any kind in the code reach the client unchanged
+    async for update in updates:
+        if update is None:
+            yield format_sse_comment('keep-alive')
+        elif update.diff is None:
+            yield format_sse_event(json.dumps({'text': update.code}), event='code')
+        else:
+            yield format_sse_event(json.dumps({'text': update.diff}), event='diff')
@@ -1,9 +1,11 @@
 import re
-from typing import Optional
+from typing import Optional, Self
+from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from src.apps.enums import HandlerType, KeyboardType
+from src.core.config import settings
 
 # TODO: create dto instead of schemas
 
@@ -95,3 +97,18 @@ class KeyboardSchema(BaseModel):
 
     def add_to_buttons(self, code: str):
         self.buttons.append(code)
+
+
+class ProjectsCodeExportSchema(BaseModel):
+    project_ids: Optional[list[int]] = Field(
+        default=None,
+        min_length=1,
+        max_length=settings.CODE_GEN_EXPORT_MAX_PROJECTS,
+    )
+    user_id: Optional[UUID] = None
+
+    @model_validator(mode='after')
+    def validate_filters(self) -> Self:
+        if self.project_ids is None and self.user_id is None:
+            raise ValueError('Either project_ids or user_id must be provided')
+        return self
@@ -3,7 +3,11 @@ from fastapi import APIRouter, Depends
 from src.api.v1.users.exceptions import DontHavePermissionHTTPException
 from src.apps.auth.dependencies.auth_dependencies import UserIDFromAccessTokenDI, access_token_required
 from src.apps.statistics.dependencies.services_dependencies import StatisticServiceDI
-from src.api.v1.statistics.schemas import StatisticReadSchema
+from src.api.v1.statistics.schemas import (
+    StatisticReadSchema,
+    DBPoolStatisticReadSchema,
+    LLMResponseCacheStatisticReadSchema,
+)
 from src.apps.users.errors import DontHavePermissionError
 
 router = APIRouter(
@@ -23,3 +27,27 @@ async def get_statistic(
     except DontHavePermissionError:
         raise DontHavePermissionHTTPException
     return StatisticReadSchema.from_dto(statistic)
+
+
+@router.get('/db-pool', response_model=DBPoolStatisticReadSchema)
+async def get_db_pool_statistic(
+    statistic_service: StatisticServiceDI,
+    user_id: UserIDFromAccessTokenDI,
+):
+    try:
+        statistic = await statistic_service.get_db_pool_statistic(user_id)
+    except DontHavePermissionError:
+        raise DontHavePermissionHTTPException
+    return DBPoolStatisticReadSchema.from_dto(statistic)
+
+
+@router.get('/llm-cache', response_model=LLMResponseCacheStatisticReadSchema)
+async def get_llm_response_cache_statistic(
+    statistic_service: StatisticServiceDI,
+    user_id: UserIDFromAccessTokenDI,
+):
+    try:
+        statistic = await statistic_service.get_llm_response_cache_statistic(user_id)
+    except DontHavePermissionError:
+        raise DontHavePermissionHTTPException
+    return LLMResponseCacheStatisticReadSchema.from_dto(statistic)
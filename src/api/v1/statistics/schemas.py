@@ -2,7 +2,7 @@ from typing import Self
 
 from pydantic import BaseModel
 
-from src.apps.statistics.dto import StatisticReadDTO
+from src.apps.statistics.dto import StatisticReadDTO, DBPoolStatisticReadDTO, LLMResponseCacheStatisticReadDTO
 
 
 class StatisticReadSchema(BaseModel):
@@ -15,3 +15,57 @@ class StatisticReadSchema(BaseModel):
             user_count=dto.user_count,
             project_count=dto.project_count,
         )
+
+
+class DBPoolStatisticReadSchema(BaseModel):
+    pid: int
+    pool_size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checked_out_max: int
+    checkouts: int
+    checkout_timeouts: int
+    checkout_wait_avg: float
+    checkout_wait_max: float
+
+    @classmethod
+    def from_dto(cls, dto: DBPoolStatisticReadDTO) -> Self:
+        return DBPoolStatisticReadSchema(
+            pid=dto.pid,
+            pool_size=dto.pool_size,
+            max_overflow=dto.max_overflow,
+            checked_in=dto.checked_in,
+            checked_out=dto.checked_out,
+            overflow=dto.overflow,
+            checked_out_max=dto.checked_out_max,
+            checkouts=dto.checkouts,
+            checkout_timeouts=dto.checkout_timeouts,
+            checkout_wait_avg=dto.checkout_wait_avg,
+            checkout_wait_max=dto.checkout_wait_max,
+        )
+
+
+class LLMResponseCacheStatisticReadSchema(BaseModel):
+    pid: int
+    enabled: bool
+    size: int
+    max_entries: int
+    exact_hits: int
+    similar_hits: int
+    misses: int
+    hit_rate: float
+
+    @classmethod
+    def from_dto(cls, dto: LLMResponseCacheStatisticReadDTO) -> Self:
+        return LLMResponseCacheStatisticReadSchema(
+            pid=dto.pid,
+            enabled=dto.enabled,
+            size=dto.size,
+            max_entries=dto.max_entries,
+            exact_hits=dto.exact_hits,
+            similar_hits=dto.similar_hits,
+            misses=dto.misses,
+            hit_rate=dto.hit_rate,
+        )
@@ -0,0 +1,79 @@
+import json
+from typing import Optional
+
+from src.apps.ai_code_gen.dto import AICodeGenMessageReadDTO
+from src.apps.ai_code_gen.enums import AICodeGenRole
+from src.infrastructure.llm.enums import LLMChatMemberRole
+from src.infrastructure.llm.tokens import count_message_tokens
+from src.infrastructure.llm.types import LLMChatMessage
+
+
+def build_llm_messages(
+    history: list[AICodeGenMessageReadDTO],
+    system_prompt: str,
+    model: str,
+    max_tokens: int,
+) -> list[LLMChatMessage]:
+    # The system prompt, the latest prompt and the latest generated code are always sent. Earlier turns are added
+    # from the newest one while they fit into the budget, previous versions of the code are left out of them
+    history = [message for message in history if message.role in (AICodeGenRole.USER, AICodeGenRole.ASSISTANT)]
+    latest_code_index = _get_latest_code_index(history)
+    system_message = LLMChatMessage(role=LLMChatMemberRole.SYSTEM, content=system_prompt)
+    messages = [
+        _to_llm_message(message, include_code=index == latest_code_index) for index, message in enumerate(history)
+    ]
+
+    required_indexes = {len(messages) - 1, latest_code_index} - {None}
+    budget = max_tokens - count_message_tokens(system_message, model)
+    budget -= sum(count_message_tokens(messages[index], model) for index in required_indexes)
+
+    included_indexes = set(required_indexes)
+    for turn_indexes in reversed(_split_into_turns(history)):
+        turn_indexes = [index for index in turn_indexes if index not in required_indexes]
+        tokens = sum(count_message_tokens(messages[index], model) for index in turn_indexes)
+        if tokens > budget:
+            break
+        budget -= tokens
+        included_indexes.update(turn_indexes)
+
+    return [system_message, *(messages[index] for index in sorted(included_indexes))]
+
+
+def _split_into_turns(history: list[AICodeGenMessageReadDTO]) -> list[list[int]]:
+    # A turn is a prompt with the answers to it, so an answer is never sent without its prompt
+    turns = []
+    for index, message in enumerate(history):
+        if message.role == AICodeGenRole.USER or not turns:
+            turns.append([])
+        turns[-1].append(index)
+    return turns
+
+
+def get_latest_code(history: list[AICodeGenMessageReadDTO]) -> Optional[str]:
+    latest_code_index = _get_latest_code_index(history)
+    if latest_code_index is None:
+        return None
+    return history[latest_code_index].meta['code']
+
+
+def _get_latest_code_index(history: list[AICodeGenMessageReadDTO]) -> Optional[int]:
+    for index in reversed(range(len(history))):
+        message = history[index]
+        if message.role == AICodeGenRole.ASSISTANT and message.meta and message.meta.get('code'):
+            return index
+    return None
+
+
+def _to_llm_message(message: AICodeGenMessageReadDTO, include_code: bool) -> LLMChatMessage:
+    if message.role == AICodeGenRole.USER:
+        return LLMChatMessage(role=LLMChatMemberRole.USER, content=message.content)
+    if not include_code:
+        return LLMChatMessage(role=LLMChatMemberRole.ASSISTANT, content=message.content)
+
+    # Sent in the response format, so the model edits its own code instead of writing the bot from scratch
+    response = {
+        'summary': message.meta['summary'],
+        'code': message.meta['code'],
+        'requirements': message.meta['requirements'],
+    }
+    return LLMChatMessage(role=LLMChatMemberRole.ASSISTANT, content=json.dumps(response, ensure_ascii=False))
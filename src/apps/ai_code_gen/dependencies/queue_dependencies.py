@@ -0,0 +1,7 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.apps.ai_code_gen.queue import AICodeGenJobQueue
+
+AICodeGenJobQueueDI = Annotated[AICodeGenJobQueue, Depends(AICodeGenJobQueue)]
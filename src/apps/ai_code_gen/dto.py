@@ -4,7 +4,7 @@ from typing import Optional
 from uuid import UUID
 
 from src.api.v1.ai_code_gen.enums import AICodeGenRole
-from src.apps.ai_code_gen.enums import AICodeGenSessionStatus
+from src.apps.ai_code_gen.enums import AICodeGenSessionStatus, AICodeGenStreamEvent
 
 
 @dataclass(frozen=True)
@@ -45,3 +45,16 @@ class AICodeGenMessageReadDTO:
 @dataclass(frozen=True)
 class AICodeGenSessionWithMessagesReadDTO(AICodeGenSessionReadDTO):
     messages: list[AICodeGenMessageReadDTO]
+
+
+@dataclass(frozen=True)
+class AICodeGenResponseDeltaDTO:
+    event: AICodeGenStreamEvent
+    offset: int
+    text: str
+
+
+@dataclass(frozen=True)
+class AICodeGenStreamEventDTO:
+    event: AICodeGenStreamEvent
+    data: str
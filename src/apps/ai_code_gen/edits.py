@@ -0,0 +1,16 @@
+from src.apps.ai_code_gen.errors import AICodeGenInvalidEditError
+from src.apps.ai_code_gen.llm_response import LLMCodeEdit
+
+
+def apply_code_edits(code: str, edits: list[LLMCodeEdit]) -> str:
+    # An ambiguous fragment could be replaced in the wrong place, so every fragment has to be unique
+    for edit in edits:
+        if not edit.search or code.count(edit.search) != 1:
+            raise AICodeGenInvalidEditError
+        code = code.replace(edit.search, edit.replace, 1)
+
+    try:
+        compile(code, 'main.py', 'exec', dont_inherit=True)
+    except (SyntaxError, ValueError):
+        raise AICodeGenInvalidEditError
+    return code
@@ -12,3 +12,9 @@ class AICodeGenRole(StrEnum):
     USER = 'user'
     ASSISTANT = 'assistant'
     SYSTEM = 'system'
+
+
+class AICodeGenStreamEvent(StrEnum):
+    SUMMARY = 'summary'
+    CODE = 'code'
+    STATUS = 'status'
@@ -20,3 +20,11 @@ class AICodeGenInvalidResponseError(Exception):
 
 class AICodeGenNoAssistantMessageError(Exception):
     pass
+
+
+class AICodeGenSessionBusyError(Exception):
+    pass
+
+
+class AICodeGenInvalidEditError(Exception):
+    pass
@@ -0,0 +1,85 @@
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+import redis
+from loguru import logger
+
+from src.apps.ai_code_gen.dto import AICodeGenResponseDeltaDTO
+from src.apps.ai_code_gen.enums import AICodeGenSessionStatus, AICodeGenStreamEvent
+from src.infrastructure.cache.client import CacheSubscription
+from src.infrastructure.cache.dependencies import CacheClientDI
+
+AI_CODEGEN_CHANNEL_PREFIX = 'ai_code_gen'
+AI_CODEGEN_PARTIAL_RESPONSE_TTL = 60 * 60
+
+
+class AICodeGenEvents:
+    # Streaming is best effort, the response is persisted in the database whatever happens to Redis. Text received
+    # so far is also appended to per field keys, so clients that subscribe in the middle of a generation can catch up
+    def __init__(self, cache_client: CacheClientDI):
+        self._cache_client = cache_client
+
+    async def publish_deltas(self, session_id: UUID, deltas: list[AICodeGenResponseDeltaDTO]):
+        channel = self._get_channel(session_id)
+
+        def commands(pipeline):
+            for delta in deltas:
+                partial_response_key = self._get_partial_response_key(session_id, delta.event)
+                pipeline.append(partial_response_key, delta.text)
+                pipeline.expire(partial_response_key, AI_CODEGEN_PARTIAL_RESPONSE_TTL)
+                pipeline.publish(
+                    channel,
+                    json.dumps({'event': delta.event, 'offset': delta.offset, 'text': delta.text}),
+                )
+
+        try:
+            await self._cache_client.transaction(commands)
+        except redis.exceptions.RedisError:
+            logger.warning(f'Failed to publish AI code gen session {session_id} response')
+
+    async def publish_status(self, session_id: UUID, status: AICodeGenSessionStatus):
+        await self._cache_client.publish(
+            self._get_channel(session_id),
+            json.dumps({'event': AICodeGenStreamEvent.STATUS, 'status': status}),
+        )
+
+    async def get_partial_response(self, session_id: UUID) -> Optional[list[AICodeGenResponseDeltaDTO]]:
+        events = [AICodeGenStreamEvent.SUMMARY, AICodeGenStreamEvent.CODE]
+        try:
+            texts = await self._cache_client.pipeline(
+                lambda pipeline: [pipeline.get(self._get_partial_response_key(session_id, event)) for event in events]
+            )
+        except redis.exceptions.RedisError:
+            logger.warning(f'Failed to get AI code gen session {session_id} partial response')
+            return None
+        return [
+            AICodeGenResponseDeltaDTO(event=event, offset=0, text=text.decode())
+            for event, text in zip(events, texts)
+            if text
+        ]
+
+    async def clear_partial_response(self, session_id: UUID):
+        try:
+            await self._cache_client.pipeline(
+                lambda pipeline: [
+                    pipeline.delete(self._get_partial_response_key(session_id, event))
+                    for event in (AICodeGenStreamEvent.SUMMARY, AICodeGenStreamEvent.CODE)
+                ]
+            )
+        except redis.exceptions.RedisError:
+            logger.warning(f'Failed to clear AI code gen session {session_id} partial response')
+
+    @asynccontextmanager
+    async def subscribe(self, session_id: UUID) -> AsyncIterator[CacheSubscription]:
+        async with self._cache_client.subscribe(self._get_channel(session_id)) as subscription:
+            yield subscription
+
+    @staticmethod
+    def _get_channel(session_id: UUID) -> str:
+        return f'{AI_CODEGEN_CHANNEL_PREFIX}:{session_id}'
+
+    @staticmethod
+    def _get_partial_response_key(session_id: UUID, event: AICodeGenStreamEvent) -> str:
+        return f'{AI_CODEGEN_CHANNEL_PREFIX}:{session_id}:partial:{event}'
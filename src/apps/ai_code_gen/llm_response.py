@@ -14,3 +14,14 @@ class LLMResponse(BaseModel):
         if len('\n'.join(value)) > settings.AI_CODEGEN_MAX_REQUIREMENTS_CHARS:
             raise ValueError('Invalid requirements')
         return value
+
+
+class LLMCodeEdit(BaseModel):
+    search: str
+    replace: str
+
+
+class LLMEditResponse(BaseModel):
+    summary: str
+    edits: list[LLMCodeEdit]
+    requirements: list[str]
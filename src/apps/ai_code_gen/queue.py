@@ -0,0 +1,28 @@
+from typing import Optional
+from uuid import UUID
+
+import redis
+from loguru import logger
+
+from src.infrastructure.cache.dependencies import CacheClientDI
+
+AI_CODEGEN_QUEUE_KEY = 'ai_code_gen:queue'
+
+
+class AICodeGenJobQueue:
+    # Session statuses in the database are the source of truth, the list only wakes up idle workers. Jobs lost
+    # together with Redis are picked up by workers polling the database for queued sessions
+    def __init__(self, cache_client: CacheClientDI):
+        self._cache_client = cache_client
+
+    async def push(self, session_id: UUID):
+        try:
+            await self._cache_client.rpush(AI_CODEGEN_QUEUE_KEY, str(session_id))
+        except redis.exceptions.RedisError:
+            logger.warning(f'Failed to enqueue AI code gen session {session_id}')
+
+    async def pop(self, timeout: float) -> Optional[UUID]:
+        session_id = await self._cache_client.blpop(AI_CODEGEN_QUEUE_KEY, timeout=timeout)
+        if session_id is None:
+            return None
+        return UUID(session_id.decode())
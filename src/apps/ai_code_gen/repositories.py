@@ -1,10 +1,11 @@
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from sqlalchemy.orm import selectinload
 
-from src.apps.ai_code_gen.enums import AICodeGenRole
+from src.apps.ai_code_gen.enums import AICodeGenRole, AICodeGenSessionStatus
 from src.core.base_repository import BaseRepository
 from src.apps.ai_code_gen.dto import (
     AICodeGenSessionCreateDTO,
@@ -42,6 +43,42 @@ class AICodeGenRepository(BaseRepository):
         await self._session.refresh(session)
         return session.to_dto()
 
+    async def claim_queued_session(self, session_id: Optional[UUID] = None) -> Optional[UUID]:
+        # The status switch is atomic, so a session is processed by one worker even if it was enqueued twice
+        if session_id is None:
+            session_id = (
+                select(AICodeGenSessionModel.session_id)
+                .where(AICodeGenSessionModel.status == AICodeGenSessionStatus.QUEUED)
+                .order_by(AICodeGenSessionModel.updated_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+        claimed_session_id = await self._session.execute(
+            update(AICodeGenSessionModel)
+            .where(
+                AICodeGenSessionModel.session_id == session_id,
+                AICodeGenSessionModel.status == AICodeGenSessionStatus.QUEUED,
+            )
+            .values(status=AICodeGenSessionStatus.RUNNING)
+            .returning(AICodeGenSessionModel.session_id)
+        )
+        claimed_session_id = claimed_session_id.scalar()
+        await self._session.commit()
+        return claimed_session_id
+
+    async def fail_running_sessions(self, updated_before: datetime) -> int:
+        failed_sessions = await self._session.execute(
+            update(AICodeGenSessionModel)
+            .where(
+                AICodeGenSessionModel.status == AICodeGenSessionStatus.RUNNING,
+                AICodeGenSessionModel.updated_at < updated_before,
+            )
+            .values(status=AICodeGenSessionStatus.FAILED)
+        )
+        await self._session.commit()
+        return failed_sessions.rowcount
+
     async def add_message(self, dto: AICodeGenMessageCreateDTO) -> AICodeGenMessageReadDTO:
         message = AICodeGenMessageModel.from_dto(dto)
         self._session.add(message)
@@ -1,40 +1,66 @@
 import io
+import json
+import time
 import zipfile
+from datetime import datetime, timedelta, timezone
+from typing import Optional, AsyncIterator
 from uuid import UUID
 
 from loguru import logger
 
+from src.apps.ai_code_gen.context import build_llm_messages, get_latest_code
+from src.apps.ai_code_gen.dependencies.events_dependencies import AICodeGenEventsDI
+from src.apps.ai_code_gen.dependencies.queue_dependencies import AICodeGenJobQueueDI
 from src.apps.ai_code_gen.dependencies.repositories_dependencies import AICodeGenRepositoryDI
 from src.apps.ai_code_gen.dto import (
     AICodeGenSessionCreateDTO,
     AICodeGenMessageCreateDTO,
     AICodeGenSessionReadDTO,
     AICodeGenSessionWithMessagesReadDTO,
+    AICodeGenResponseDeltaDTO,
+    AICodeGenStreamEventDTO,
+    AICodeGenMessageReadDTO,
 )
-from src.apps.ai_code_gen.llm_response import LLMResponse
+from src.apps.ai_code_gen.edits import apply_code_edits
+from src.apps.ai_code_gen.llm_response import LLMResponse, LLMEditResponse
 from src.apps.ai_code_gen.errors import (
     AICodeGenMessagesLimitExceededError,
     AICodeGenInvalidResponseError,
     AICodeGenNoAssistantMessageError,
+    AICodeGenSessionBusyError,
+    AICodeGenInvalidEditError,
 )
-from src.apps.ai_code_gen.enums import AICodeGenSessionStatus, AICodeGenRole
-from src.apps.ai_code_gen.prompts import SYSTEM_PROMPT
+from src.apps.ai_code_gen.enums import AICodeGenSessionStatus, AICodeGenRole, AICodeGenStreamEvent
+from src.apps.ai_code_gen.prompts import SYSTEM_PROMPT, EDIT_SYSTEM_PROMPT
 from src.apps.ai_code_gen.validators import validate_user_prompt, validate_session_and_ownership
 from src.core.config import settings, BOT_TEMPLATES_DIR
+from src.infrastructure.db.dependencies import AsyncSessionDI
 from src.infrastructure.llm.cli.openai import AsyncOpenAICli
-from src.infrastructure.llm.enums import LLMChatMemberRole
+from src.infrastructure.llm.dependencies import LLMResponseCacheDI
+from src.infrastructure.llm.streaming import JSONStringFieldsStreamParser
+from src.infrastructure.llm.tokens import load_tokenizer
 from src.infrastructure.llm.types import LLMChatMessage
 
 AI_CODEGEN_SESSIONS_PER_PAGE = 20
 AI_CODEGEN_SESSION_TITLE_MAX_CHARS = 128
+AI_CODEGEN_STREAMED_EVENTS = [AICodeGenStreamEvent.SUMMARY, AICodeGenStreamEvent.CODE]
+AI_CODEGEN_ACTIVE_STATUSES = (AICodeGenSessionStatus.QUEUED, AICodeGenSessionStatus.RUNNING)
 
 
 class AICodeGenService:
     def __init__(
         self,
         ai_code_gen_repository: AICodeGenRepositoryDI,
+        job_queue: AICodeGenJobQueueDI,
+        events: AICodeGenEventsDI,
+        session: AsyncSessionDI,
+        response_cache: LLMResponseCacheDI,
     ):
         self._ai_code_gen_repository = ai_code_gen_repository
+        self._job_queue = job_queue
+        self._events = events
+        self._session = session
+        self._response_cache = response_cache
         self._client = AsyncOpenAICli(model=settings.OPENAI_MODEL)
 
     async def get_sessions(self, user_id: UUID, page: int) -> list[AICodeGenSessionReadDTO]:
@@ -61,7 +87,7 @@ class AICodeGenService:
                 meta=None,
             )
         )
-        await self._generate_and_store_response(session_id=session.session_id)
+        await self._job_queue.push(session.session_id)
         return await self.get_session_with_messages(user_id=user_id, session_id=session.session_id)
 
     async def add_message(self, user_id: UUID, session_id: UUID, prompt: str) -> AICodeGenSessionWithMessagesReadDTO:
@@ -69,6 +95,8 @@ class AICodeGenService:
 
         session = await self._ai_code_gen_repository.get_session_with_messages(session_id)
         validate_session_and_ownership(session=session, user_id=user_id)
+        if session.status in AI_CODEGEN_ACTIVE_STATUSES:
+            raise AICodeGenSessionBusyError
 
         messages_count = await self._ai_code_gen_repository.count_messages(session_id)
         if messages_count >= settings.AI_CODEGEN_MAX_MESSAGES_PER_SESSION:
@@ -82,7 +110,11 @@ class AICodeGenService:
                 meta=None,
             )
         )
-        await self._generate_and_store_response(session_id=session_id)
+        await self._ai_code_gen_repository.update_session_status(
+            session_id=session_id,
+            status=AICodeGenSessionStatus.QUEUED,
+        )
+        await self._job_queue.push(session_id)
         return await self.get_session_with_messages(user_id=user_id, session_id=session_id)
 
     async def get_session_with_messages(self, user_id: UUID, session_id: UUID) -> AICodeGenSessionWithMessagesReadDTO:
@@ -90,6 +122,58 @@ class AICodeGenService:
         validate_session_and_ownership(session=session, user_id=user_id)
         return session
 
+    async def get_session_events(
+        self,
+        user_id: UUID,
+        session_id: UUID,
+    ) -> AsyncIterator[Optional[AICodeGenStreamEventDTO]]:
+        session = await self._ai_code_gen_repository.get_session(session_id)
+        validate_session_and_ownership(session=session, user_id=user_id)
+        await self._session.close()
+        return self._iter_session_events(session_id)
+
+    async def _iter_session_events(self, session_id: UUID) -> AsyncIterator[Optional[AICodeGenStreamEventDTO]]:
+        # None is yielded when nothing has happened for a while, so the caller can keep the connection alive
+        async with self._events.subscribe(session_id) as subscription:
+            # The status is read after subscribing, so a generation finished in between is not missed
+            session = await self._ai_code_gen_repository.get_session(session_id)
+            await self._session.close()
+            if session is None:
+                return
+            if session.status not in AI_CODEGEN_ACTIVE_STATUSES:
+                yield AICodeGenStreamEventDTO(event=AICodeGenStreamEvent.STATUS, data=session.status)
+                return
+
+            partial_response = await self._events.get_partial_response(session_id)
+            if partial_response is None:
+                # Without the text generated so far the client can't follow the stream, so it gets the status instead
+                yield AICodeGenStreamEventDTO(event=AICodeGenStreamEvent.STATUS, data=session.status)
+                return
+
+            received_lengths = {}
+            for delta in partial_response:
+                received_lengths[delta.event] = len(delta.text)
+                yield AICodeGenStreamEventDTO(event=delta.event, data=delta.text)
+
+            while True:
+                message = await subscription.get_message(timeout=settings.AI_CODEGEN_EVENTS_KEEPALIVE_INTERVAL)
+                if message is None:
+                    yield None
+                    continue
+
+                message = json.loads(message)
+                event = AICodeGenStreamEvent(message['event'])
+                if event == AICodeGenStreamEvent.STATUS:
+                    yield AICodeGenStreamEventDTO(event=event, data=message['status'])
+                    return
+
+                # Deltas published before the partial response was read are already sent to the client
+                received_length = received_lengths.get(event, 0)
+                text = message['text'][max(received_length - message['offset'], 0) :]
+                received_lengths[event] = max(received_length, message['offset'] + len(message['text']))
+                if text:
+                    yield AICodeGenStreamEventDTO(event=event, data=text)
+
     async def get_zip(self, user_id: UUID, session_id: UUID) -> io.BytesIO:
         session = await self._ai_code_gen_repository.get_session(session_id)
         validate_session_and_ownership(session=session, user_id=user_id)
@@ -106,21 +190,30 @@ class AICodeGenService:
         zip_data.seek(0)
         return zip_data
 
+    async def process_queued_session(self, session_id: Optional[UUID] = None) -> bool:
+        # Without session_id the oldest queued session is taken, so jobs missing from the queue are still processed
+        claimed_session_id = await self._ai_code_gen_repository.claim_queued_session(session_id)
+        if claimed_session_id is None:
+            return False
+        await self._generate_and_store_response(session_id=claimed_session_id)
+        return True
+
+    async def fail_abandoned_sessions(self) -> int:
+        # Sessions left running by a stopped worker would otherwise block their chats forever
+        updated_before = datetime.now(timezone.utc) - timedelta(seconds=settings.AI_CODEGEN_JOB_TIMEOUT)
+        return await self._ai_code_gen_repository.fail_running_sessions(updated_before)
+
     async def _generate_and_store_response(self, session_id: UUID) -> None:
-        await self._ai_code_gen_repository.update_session_status(
-            session_id=session_id,
-            status=AICodeGenSessionStatus.RUNNING,
-        )
-        messages_for_llm = await self._build_llm_messages(session_id)
+        history = await self._ai_code_gen_repository.get_messages(session_id)
+        # The database connection is not needed while the model is answering
+        await self._session.close()
 
         try:
-            response = await self._client.make_structured_request(
-                object_type=LLMResponse,
-                history=messages_for_llm,
-            )
+            response = await self._get_response(session_id=session_id, history=history)
         except Exception as exc:
             logger.error(str(exc))
             await self._ai_code_gen_repository.update_session_status(session_id, AICodeGenSessionStatus.FAILED)
+            await self._finish_stream(session_id, AICodeGenSessionStatus.FAILED)
             raise AICodeGenInvalidResponseError from exc
 
         await self._ai_code_gen_repository.add_message(
@@ -140,13 +233,100 @@ class AICodeGenService:
             session_id=session_id,
             status=AICodeGenSessionStatus.SUCCEEDED,
         )
+        await self._finish_stream(session_id, AICodeGenSessionStatus.SUCCEEDED)
 
-    async def _build_llm_messages(self, session_id: UUID) -> list[LLMChatMessage]:
-        history = await self._ai_code_gen_repository.get_messages(session_id)
-        messages = [LLMChatMessage(role=LLMChatMemberRole.SYSTEM, content=SYSTEM_PROMPT)]
-        for message in history:
-            if message.role == LLMChatMemberRole.USER:
-                messages.append(LLMChatMessage(role=LLMChatMemberRole.USER, content=message.content))
-            elif message.role == LLMChatMemberRole.ASSISTANT:
-                messages.append(LLMChatMessage(role=LLMChatMemberRole.ASSISTANT, content=message.content))
-        return messages
+    async def _get_response(self, session_id: UUID, history: list[AICodeGenMessageReadDTO]) -> LLMResponse:
+        # Follow-up turns ask only for edits of the latest code, the whole code is regenerated if they can't be applied
+        latest_code = get_latest_code(history) if settings.AI_CODEGEN_EDIT_MODE_ENABLED else None
+        # The standalone worker never runs the app startup, and a tokenizer that failed to load there is retried here
+        await load_tokenizer(settings.OPENAI_MODEL)
+        messages = self._build_llm_messages(history, edit_mode=latest_code is not None)
+
+        if self._response_cache is not None:
+            content = self._response_cache.get(model=settings.OPENAI_MODEL, messages=messages)
+            if content is not None:
+                response = LLMResponse.model_validate_json(content)
+                await self._publish_response(session_id, response)
+                return response
+
+        response = None
+        if latest_code is not None:
+            response = await self._edit_code(messages=messages, code=latest_code)
+            if response is not None:
+                await self._publish_response(session_id, response)
+        if response is None:
+            full_messages = messages if latest_code is None else self._build_llm_messages(history, edit_mode=False)
+            response = LLMResponse.model_validate_json(await self._stream_response(session_id, full_messages))
+
+        if self._response_cache is not None:
+            self._response_cache.set(model=settings.OPENAI_MODEL, messages=messages, content=response.model_dump_json())
+        return response
+
+    async def _edit_code(self, messages: list[LLMChatMessage], code: str) -> Optional[LLMResponse]:
+        try:
+            edit_response = await self._client.make_structured_request(object_type=LLMEditResponse, history=messages)
+            return LLMResponse(
+                summary=edit_response.summary,
+                code=apply_code_edits(code, edit_response.edits),
+                requirements=edit_response.requirements,
+            )
+        except (ValueError, TypeError, AICodeGenInvalidEditError) as exc:
+            logger.warning(f'Failed to edit AI code gen code, regenerating it: {exc!r}')
+            return None
+
+    async def _publish_response(self, session_id: UUID, response: LLMResponse):
+        await self._publish_deltas(
+            session_id=session_id,
+            pending_texts={
+                AICodeGenStreamEvent.SUMMARY: [response.summary],
+                AICodeGenStreamEvent.CODE: [response.code],
+            },
+            published_lengths=dict.fromkeys(AI_CODEGEN_STREAMED_EVENTS, 0),
+        )
+
+    async def _stream_response(self, session_id: UUID, messages: list[LLMChatMessage]) -> str:
+        # Partial summary and code are published in batches, the response is validated only once it is complete
+        parser = JSONStringFieldsStreamParser(fields=AI_CODEGEN_STREAMED_EVENTS)
+        chunks = []
+        pending_texts: dict[AICodeGenStreamEvent, list[str]] = {}
+        published_lengths = dict.fromkeys(AI_CODEGEN_STREAMED_EVENTS, 0)
+        published_at = time.monotonic()
+
+        async for chunk in self._client.stream_structured_request(object_type=LLMResponse, history=messages):
+            chunks.append(chunk)
+            for field, text in parser.feed(chunk):
+                pending_texts.setdefault(AICodeGenStreamEvent(field), []).append(text)
+            if pending_texts and time.monotonic() - published_at >= settings.AI_CODEGEN_STREAM_FLUSH_INTERVAL:
+                await self._publish_deltas(session_id, pending_texts, published_lengths)
+                pending_texts = {}
+                published_at = time.monotonic()
+
+        if pending_texts:
+            await self._publish_deltas(session_id, pending_texts, published_lengths)
+        return ''.join(chunks)
+
+    async def _publish_deltas(
+        self,
+        session_id: UUID,
+        pending_texts: dict[AICodeGenStreamEvent, list[str]],
+        published_lengths: dict[AICodeGenStreamEvent, int],
+    ):
+        deltas = []
+        for event, texts in pending_texts.items():
+            text = ''.join(texts)
+            deltas.append(AICodeGenResponseDeltaDTO(event=event, offset=published_lengths[event], text=text))
+            published_lengths[event] += len(text)
+        await self._events.publish_deltas(session_id, deltas)
+
+    async def _finish_stream(self, session_id: UUID, status: AICodeGenSessionStatus):
+        await self._events.publish_status(session_id, status)
+        await self._events.clear_partial_response(session_id)
+
+    @staticmethod
+    def _build_llm_messages(history: list[AICodeGenMessageReadDTO], edit_mode: bool) -> list[LLMChatMessage]:
+        return build_llm_messages(
+            history=history,
+            system_prompt=EDIT_SYSTEM_PROMPT if edit_mode else SYSTEM_PROMPT,
+            model=settings.OPENAI_MODEL,
+            max_tokens=settings.AI_CODEGEN_CONTEXT_MAX_TOKENS,
+        )
@@ -0,0 +1,131 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+import redis
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.apps.ai_code_gen.errors import AICodeGenInvalidResponseError
+from src.apps.ai_code_gen.events import AICodeGenEvents
+from src.apps.ai_code_gen.queue import AICodeGenJobQueue
+from src.apps.ai_code_gen.repositories import AICodeGenRepository
+from src.apps.ai_code_gen.services import AICodeGenService
+from src.core.config import settings
+from src.infrastructure.cache.client import CacheClient
+from src.infrastructure.db.sessions import async_session_maker
+from src.infrastructure.llm.dependencies import get_llm_response_cache
+
+
+class AICodeGenWorker:
+    def __init__(
+        self,
+        cache_client: CacheClient,
+        concurrency: int,
+        session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+    ):
+        self._cache_client = cache_client
+        self._concurrency = concurrency
+        self._session_maker = session_maker
+        self._job_queue = AICodeGenJobQueue(cache_client)
+        self._events = AICodeGenEvents(cache_client)
+
+    async def run(self):
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(self._sweep_abandoned_sessions())
+            for _ in range(self._concurrency):
+                task_group.create_task(self._process_jobs())
+
+    async def _sweep_abandoned_sessions(self):
+        # Sessions left running by a worker that was stopped are failed periodically, not only on startup, since a
+        # worker restarted before they timed out would never see them again
+        retry_delay = settings.AI_CODEGEN_SWEEP_RETRY_DELAY
+        while True:
+            _raise_if_cancelled()
+            try:
+                async with self._session_maker() as session:
+                    failed_sessions = await self._get_service(session).fail_abandoned_sessions()
+            except Exception:
+                logger.exception(f'Failed to sweep abandoned AI code gen sessions, retrying in {retry_delay}s')
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, settings.AI_CODEGEN_SWEEP_INTERVAL)
+                continue
+
+            if failed_sessions:
+                logger.warning(f'{failed_sessions} abandoned AI code gen sessions marked as failed')
+            retry_delay = settings.AI_CODEGEN_SWEEP_RETRY_DELAY
+            await asyncio.sleep(settings.AI_CODEGEN_SWEEP_INTERVAL)
+
+    async def _process_jobs(self):
+        while True:
+            _raise_if_cancelled()
+            try:
+                session_id = await self._job_queue.pop(timeout=settings.AI_CODEGEN_QUEUE_POLL_INTERVAL)
+            except redis.exceptions.RedisError:
+                # The database is polled instead while Redis is unavailable
+                session_id = None
+                await asyncio.sleep(settings.AI_CODEGEN_QUEUE_POLL_INTERVAL)
+
+            if session_id is not None:
+                await self._process_job(session_id)
+            # Sessions whose ids were lost together with Redis are drained from the database
+            while await self._process_job(None):
+                _raise_if_cancelled()
+
+    async def _process_job(self, session_id: Optional[UUID]) -> bool:
+        try:
+            # A job is never running longer than the timeout after which the sweep fails its session
+            async with asyncio.timeout(settings.AI_CODEGEN_JOB_TIMEOUT), self._session_maker() as session:
+                return await self._get_service(session).process_queued_session(session_id)
+        except AICodeGenInvalidResponseError:
+            return True
+        except Exception:
+            logger.exception('AI code gen job failed')
+            return False
+
+    def _get_service(self, session: AsyncSession) -> AICodeGenService:
+        return AICodeGenService(
+            ai_code_gen_repository=AICodeGenRepository(session),
+            job_queue=self._job_queue,
+            events=self._events,
+            session=session,
+            response_cache=get_llm_response_cache(),
+        )
+
+
+def _raise_if_cancelled():
+    # A cancellation that lands while the database driver is closing a connection can be swallowed by it, so the worker
+    # loops check for a pending one themselves instead of running on forever
+    if asyncio.current_task().cancelling():
+        raise asyncio.CancelledError
+
+
+@asynccontextmanager
+async def run_ai_code_gen_worker(
+    cache_client: CacheClient,
+    session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+) -> AsyncIterator[None]:
+    if not settings.AI_CODEGEN_WORKER_ENABLED:
+        yield
+        return
+
+    worker = AICodeGenWorker(cache_client, concurrency=settings.AI_CODEGEN_WORKERS, session_maker=session_maker)
+    task = asyncio.create_task(worker.run())
+    try:
+        yield
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def main():
+    async with CacheClient() as cache_client:
+        await AICodeGenWorker(cache_client, concurrency=settings.AI_CODEGEN_WORKERS).run()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
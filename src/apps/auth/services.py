@@ -29,14 +29,15 @@ class AuthService:
 
     async def get_tg_id_by_code(self, code: str) -> int:
         key = f'tg_code:{code}'
-        stored_tg_id = await self._cache_cli.get(key)
+        stored_tg_id, ttl = await self._cache_cli.pipeline(lambda pipeline: pipeline.get(key).ttl(key))
         if stored_tg_id is None:
             raise InvalidCodeError
-
-        ttl = await self._cache_cli.ttl(key)
         if ttl == -1:
             raise ExpiredCodeError
 
-        await self._cache_cli.delete(key)
+        # The code is consumed atomically only once it is valid, so it can't be used by two concurrent logins
+        stored_tg_id = await self._cache_cli.getdel(key)
+        if stored_tg_id is None:
+            raise InvalidCodeError
 
         return int(stored_tg_id.decode())
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from src.apps.blocks.dto.base import BlockCreateDTO, BlockUpdateDTO
+
+
+@dataclass(frozen=True)
+class BlockCreateOperationDTO:
+    block: BlockCreateDTO
+
+
+@dataclass(frozen=True)
+class BlockUpdateOperationDTO:
+    block_id: int
+    block: BlockUpdateDTO
+
+
+@dataclass(frozen=True)
+class BlockDeleteOperationDTO:
+    block_id: int
+
+
+@dataclass(frozen=True)
+class BlockMoveOperationDTO:
+    block_id: int
+    after_block_id: Optional[int] = None
+
+
+BlockOperationDTO = Union[
+    BlockCreateOperationDTO,
+    BlockUpdateOperationDTO,
+    BlockDeleteOperationDTO,
+    BlockMoveOperationDTO,
+]
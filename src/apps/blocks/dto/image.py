@@ -8,6 +8,9 @@ from src.apps.enums import BlockType
 @dataclass(frozen=True, kw_only=True)
 class BaseImageBlockDTO:
     image_path: str
+    # Variants produced from the uploaded file, empty for images that were not processed on upload
+    original_image_path: str = ''
+    thumbnail_path: str = ''
     type: Literal[BlockType.IMAGE_BLOCK] = BlockType.IMAGE_BLOCK
 
     @property
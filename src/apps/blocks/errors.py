@@ -8,3 +8,15 @@ class RepeatingBlockSequenceNumberError(Exception):
 
 class InvalidBlockTypeError(Exception):
     pass
+
+
+class ImageTooLargeError(Exception):
+    pass
+
+
+class ImageNotFoundError(Exception):
+    pass
+
+
+class InvalidImageError(Exception):
+    pass
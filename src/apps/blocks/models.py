@@ -64,6 +64,8 @@ class ImageBlockModel(BlockModel):
     block_id: Mapped[int] = mapped_column(ForeignKey('blocks.block_id', ondelete='CASCADE'), primary_key=True)
 
     image_path: Mapped[str] = mapped_column(String(4096))
+    original_image_path: Mapped[str] = mapped_column(String(4096), server_default='')
+    thumbnail_path: Mapped[str] = mapped_column(String(4096), server_default='')
 
     __mapper_args__ = {
         'polymorphic_identity': 'image_block',
@@ -75,6 +77,8 @@ class ImageBlockModel(BlockModel):
             sequence_number=self.sequence_number,
             type=self.type,  # TODO: fix type hint
             image_path=self.image_path,
+            original_image_path=self.original_image_path,
+            thumbnail_path=self.thumbnail_path,
         )
 
 
@@ -1,12 +1,22 @@
 from typing import Optional
 
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectin_polymorphic
 
 from src.apps.blocks.dto.base import BlockCreateDTO, BlockReadDTO, BlockUpdateDTO
+from src.apps.blocks.dto.batch import (
+    BlockOperationDTO,
+    BlockCreateOperationDTO,
+    BlockUpdateOperationDTO,
+    BlockDeleteOperationDTO,
+    BlockMoveOperationDTO,
+)
+from src.apps.blocks.errors import RepeatingBlockSequenceNumberError, BlockNotFoundError
 from src.apps.blocks.models import BlockModel
 from src.apps.blocks import utils
 from src.core.base_repository import BaseRepository
+from src.core.consts import BLOCK_SEQUENCE_NUMBER_STEP
 
 
 class BlockRepository(BaseRepository):
@@ -15,12 +25,18 @@ class BlockRepository(BaseRepository):
         dialogue_id: int,
         block: BlockCreateDTO,
     ) -> BlockReadDTO:
-        blocks = await self.get_blocks(dialogue_id)
+        last_sequence_number = await self._session.execute(
+            select(func.coalesce(func.max(BlockModel.sequence_number), 0)).where(BlockModel.dialogue_id == dialogue_id)
+        )
 
         block_model = utils.get_block_model_by_type(block.type)
-        block = block_model(**block.__dict__, dialogue_id=dialogue_id, sequence_number=len(blocks) + 1)
+        block = block_model(
+            **block.__dict__,
+            dialogue_id=dialogue_id,
+            sequence_number=last_sequence_number.scalar() + BLOCK_SEQUENCE_NUMBER_STEP,
+        )
         self._session.add(block)
-        await self._session.commit()
+        await self._commit_sequence_numbers()
 
         return block.to_dto()
 
@@ -36,10 +52,14 @@ class BlockRepository(BaseRepository):
             )
             .where(BlockModel.dialogue_id == dialogue_id)
             .order_by(BlockModel.sequence_number)
+            .execution_options(populate_existing=True)
         )
         return blocks.unique().scalars().all()
 
     async def get_block(self, block_id: int) -> Optional[BlockReadDTO]:
+        return await self._request_cache.get_or_load(('block', block_id), lambda: self._get_block(block_id))
+
+    async def _get_block(self, block_id: int) -> Optional[BlockReadDTO]:
         block_model = await self._get_block_model_instance(block_id)
         if block_model is None:
             return None
@@ -52,6 +72,8 @@ class BlockRepository(BaseRepository):
                 selectin_polymorphic(BlockModel, BlockModel.__subclasses__()),
             )
             .where(BlockModel.block_id == block_id)
+            # Sequence numbers are changed by UPDATE statements that bypass the loaded instances
+            .execution_options(populate_existing=True)
         )
         return block.scalar()
 
@@ -62,24 +84,172 @@ class BlockRepository(BaseRepository):
         block: BlockUpdateDTO,
     ) -> Optional[BlockReadDTO]:
         existing_block = await self._get_block_model_instance(block_id)
+        if existing_block is None:
+            await self._session.rollback()
+            return None
 
         for key, value in block.__dict__.items():
             setattr(existing_block, key, value)
 
-        await self._update_blocks_sequence_numbers_without_commit(dialogue_id)
         await self._session.commit()
 
         return existing_block.to_dto()
 
-    async def _update_blocks_sequence_numbers_without_commit(self, dialogue_id: int) -> list[BlockReadDTO]:
-        blocks = await self._get_blocks(dialogue_id)
-        blocks_to_return = []
-        for counter, block in enumerate(sorted(blocks, key=lambda x: x.sequence_number), start=1):
-            block.sequence_number = counter
-            blocks_to_return.append(block.to_dto())
-        return blocks_to_return
-
-    async def delete_block(self, dialogue_id: int, block_id: int) -> Optional[BlockReadDTO]:
-        await self._session.execute(delete(BlockModel).where(BlockModel.block_id == block_id))
-        await self._update_blocks_sequence_numbers_without_commit(dialogue_id)
+    async def move_block(
+        self, dialogue_id: int, block_id: int, after_block_id: Optional[int]
+    ) -> Optional[BlockReadDTO]:
+        previous_sequence_number = 0
+        if after_block_id is not None:
+            previous_sequence_number = await self._get_sequence_number(dialogue_id, after_block_id)
+            if previous_sequence_number is None:
+                return None
+
+        sequence_number = await self._get_sequence_number_after(dialogue_id, block_id, previous_sequence_number)
+        if sequence_number is None:
+            # Blocks are spread out again only when there is no gap left between the neighbours
+            await self._rebalance_sequence_numbers_without_commit(dialogue_id)
+            if after_block_id is not None:
+                previous_sequence_number = await self._get_sequence_number(dialogue_id, after_block_id)
+            sequence_number = await self._get_sequence_number_after(dialogue_id, block_id, previous_sequence_number)
+
+        moved_block = await self._session.execute(
+            update(BlockModel)
+            .where(BlockModel.dialogue_id == dialogue_id, BlockModel.block_id == block_id)
+            .values(sequence_number=sequence_number)
+            .returning(BlockModel.block_id)
+            .execution_options(synchronize_session=False)
+        )
+        if moved_block.scalar() is None:
+            await self._session.rollback()
+            return None
+        await self._commit_sequence_numbers()
+
+        return await self.get_block(block_id)
+
+    async def apply_blocks_batch(self, dialogue_id: int, operations: list[BlockOperationDTO]) -> list[BlockReadDTO]:
+        blocks = list(await self._get_blocks(dialogue_id))
+        blocks_by_id = {block.block_id: block for block in blocks}
+        # Blocks may be deleted by a concurrent request after the operations were validated
+        referenced_blocks_ids = set()
+        for operation in operations:
+            if not isinstance(operation, BlockCreateOperationDTO):
+                referenced_blocks_ids.add(operation.block_id)
+            if isinstance(operation, BlockMoveOperationDTO) and operation.after_block_id is not None:
+                referenced_blocks_ids.add(operation.after_block_id)
+        if not referenced_blocks_ids <= blocks_by_id.keys():
+            await self._session.rollback()
+            raise BlockNotFoundError
+
+        deleted_blocks_ids = []
+        for operation in operations:
+            if isinstance(operation, BlockCreateOperationDTO):
+                block_model = utils.get_block_model_by_type(operation.block.type)
+                blocks.append(block_model(**operation.block.__dict__, dialogue_id=dialogue_id))
+            elif isinstance(operation, BlockUpdateOperationDTO):
+                for key, value in operation.block.__dict__.items():
+                    setattr(blocks_by_id[operation.block_id], key, value)
+            elif isinstance(operation, BlockDeleteOperationDTO):
+                blocks.remove(blocks_by_id.pop(operation.block_id))
+                deleted_blocks_ids.append(operation.block_id)
+            elif isinstance(operation, BlockMoveOperationDTO):
+                block = blocks_by_id[operation.block_id]
+                blocks.remove(block)
+                position = (
+                    0 if operation.after_block_id is None else blocks.index(blocks_by_id[operation.after_block_id]) + 1
+                )
+                blocks.insert(position, block)
+
+        if deleted_blocks_ids:
+            await self._session.execute(
+                delete(BlockModel)
+                .where(BlockModel.dialogue_id == dialogue_id, BlockModel.block_id.in_(deleted_blocks_ids))
+                .execution_options(synchronize_session=False)
+            )
+
+        sequence_numbers = utils.get_sparse_sequence_numbers([block.sequence_number for block in blocks])
+        renumbered_blocks_ids = [
+            block.block_id
+            for block, sequence_number in zip(blocks, sequence_numbers)
+            if block.block_id is not None and block.sequence_number != sequence_number
+        ]
+        if renumbered_blocks_ids:
+            # Renumbered blocks step aside first, so new numbers never collide with the old ones
+            await self._session.execute(
+                update(BlockModel)
+                .where(BlockModel.block_id.in_(renumbered_blocks_ids))
+                .values(sequence_number=-BlockModel.sequence_number)
+                .execution_options(synchronize_session=False)
+            )
+
+        for block, sequence_number in zip(blocks, sequence_numbers):
+            block.sequence_number = sequence_number
+        self._session.add_all(blocks)
+        await self._commit_sequence_numbers()
+
+        return [block.to_dto() for block in blocks]
+
+    async def _get_sequence_number(self, dialogue_id: int, block_id: int) -> Optional[int]:
+        sequence_number = await self._session.execute(
+            select(BlockModel.sequence_number).where(
+                BlockModel.dialogue_id == dialogue_id,
+                BlockModel.block_id == block_id,
+            )
+        )
+        return sequence_number.scalar()
+
+    async def _get_sequence_number_after(
+        self,
+        dialogue_id: int,
+        block_id: int,
+        previous_sequence_number: int,
+    ) -> Optional[int]:
+        next_sequence_number = await self._session.execute(
+            select(func.min(BlockModel.sequence_number)).where(
+                BlockModel.dialogue_id == dialogue_id,
+                BlockModel.block_id != block_id,
+                BlockModel.sequence_number > previous_sequence_number,
+            )
+        )
+        next_sequence_number = next_sequence_number.scalar()
+        if next_sequence_number is None:
+            return previous_sequence_number + BLOCK_SEQUENCE_NUMBER_STEP
+        if next_sequence_number - previous_sequence_number < 2:
+            return None
+        return (previous_sequence_number + next_sequence_number) // 2
+
+    async def _rebalance_sequence_numbers_without_commit(self, dialogue_id: int):
+        # Sequence numbers are negated first, so the renumbering never collides with the unique constraint
+        await self._session.execute(
+            update(BlockModel)
+            .where(BlockModel.dialogue_id == dialogue_id)
+            .values(sequence_number=-BlockModel.sequence_number)
+            .execution_options(synchronize_session=False)
+        )
+        positions = (
+            select(
+                BlockModel.block_id,
+                func.row_number().over(order_by=BlockModel.sequence_number.desc()).label('position'),
+            )
+            .where(BlockModel.dialogue_id == dialogue_id)
+            .subquery()
+        )
+        await self._session.execute(
+            update(BlockModel)
+            .where(BlockModel.block_id == positions.c.block_id)
+            .values(sequence_number=positions.c.position * BLOCK_SEQUENCE_NUMBER_STEP)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _commit_sequence_numbers(self):
+        # Concurrent changes in the same dialogue may pick the same sequence number
+        try:
+            await self._session.commit()
+        except IntegrityError:
+            await self._session.rollback()
+            raise RepeatingBlockSequenceNumberError
+
+    async def delete_block(self, dialogue_id: int, block_id: int):
+        await self._session.execute(
+            delete(BlockModel).where(BlockModel.dialogue_id == dialogue_id, BlockModel.block_id == block_id)
+        )
         await self._session.commit()
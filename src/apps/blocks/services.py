@@ -1,15 +1,34 @@
+from collections import Counter
+from dataclasses import replace
+from typing import Optional
 from uuid import UUID
 
 from fastapi import UploadFile
 
 from src.apps.blocks.dependencies.repositories_dependencies import BlockRepositoryDI
 from src.apps.blocks.dto.base import BlockCreateDTO, BlockReadDTO, BlockUpdateDTO
-from src.apps.blocks.dto.image import ImageBlockUpdateDTO, ImageBlockReadDTO
+from src.apps.blocks.dto.batch import (
+    BlockOperationDTO,
+    BlockCreateOperationDTO,
+    BlockUpdateOperationDTO,
+    BlockDeleteOperationDTO,
+    BlockMoveOperationDTO,
+)
+from src.apps.blocks.dto.image import ImageBlockUpdateDTO, ImageBlockReadDTO, ImageBlockCreateDTO
+from src.apps.code_gen.dependencies.events_dependencies import CodePreviewEventsDI
 from src.apps.dialogues.dependencies.services_dependencies import DialogueServiceDI
 from src.apps.enums import BlockType
-from src.apps.blocks.errors import BlockNotFoundError, InvalidBlockTypeError
-from src.core.config import MEDIA_DIR
-from src.core.utils import soft_delete_file
+from src.apps.blocks.errors import (
+    BlockNotFoundError,
+    InvalidBlockTypeError,
+    ImageTooLargeError,
+    ImageNotFoundError,
+    InvalidImageError,
+)
+from src.apps.media.dependencies.services_dependencies import MediaServiceDI
+from src.apps.media.errors import MediaBlobNotFoundError, UnsupportedImageError
+from src.apps.media.utils import is_media_blob_path, get_block_image_paths
+from src.core.errors import FileTooLargeError
 
 
 class BlockService:
@@ -17,9 +36,13 @@ class BlockService:
         self,
         block_repository: BlockRepositoryDI,
         dialogue_service: DialogueServiceDI,
+        code_preview_events: CodePreviewEventsDI,
+        media_service: MediaServiceDI,
     ):
         self._block_repository = block_repository
         self._dialogue_service = dialogue_service
+        self._code_preview_events = code_preview_events
+        self._media_service = media_service
 
     async def create_block(
         self,
@@ -28,11 +51,23 @@ class BlockService:
         dialogue_id: int,
         block: BlockCreateDTO,
     ) -> BlockReadDTO:
-        _ = await self._dialogue_service.get_dialogue(user_id=user_id, project_id=project_id, dialogue_id=dialogue_id)
-        return await self._block_repository.create_block(dialogue_id=dialogue_id, block=block)
+        await self._dialogue_service.check_dialogue_owner(
+            user_id=user_id,
+            project_id=project_id,
+            dialogue_id=dialogue_id,
+        )
+        if isinstance(block, ImageBlockCreateDTO) and block.image_path:
+            await self._acquire_image(block.image_path)
+        created_block = await self._block_repository.create_block(dialogue_id=dialogue_id, block=block)
+        await self._code_preview_events.notify_project_changed(project_id)
+        return created_block
 
     async def get_blocks(self, user_id: UUID, project_id: int, dialogue_id: int) -> list[BlockReadDTO]:
-        _ = await self._dialogue_service.get_dialogue(user_id=user_id, project_id=project_id, dialogue_id=dialogue_id)
+        await self._dialogue_service.check_dialogue_owner(
+            user_id=user_id,
+            project_id=project_id,
+            dialogue_id=dialogue_id,
+        )
         return await self._block_repository.get_blocks(dialogue_id)
 
     async def get_block(
@@ -42,7 +77,11 @@ class BlockService:
         dialogue_id: int,
         block_id: int,
     ) -> BlockReadDTO:
-        _ = await self._dialogue_service.get_dialogue(user_id=user_id, project_id=project_id, dialogue_id=dialogue_id)
+        await self._dialogue_service.check_dialogue_owner(
+            user_id=user_id,
+            project_id=project_id,
+            dialogue_id=dialogue_id,
+        )
         block = await self._block_repository.get_block(block_id)
         if block is None:
             raise BlockNotFoundError
@@ -65,44 +104,218 @@ class BlockService:
         if block.type != BlockType.IMAGE_BLOCK.value:
             raise InvalidBlockTypeError
 
-        # TODO: fix type hint warning
-        if block.image_path:
-            await soft_delete_file(MEDIA_DIR / block.image_path)
-
-        image_path = MEDIA_DIR / f'users/{user_id}/projects/{project_id}/dialogues/{dialogue_id}/{image.filename}'
-
-        # TODO: async
-        if not image_path.parent.exists():
-            image_path.parent.mkdir(parents=True)
-
-        # TODO: async
-        with open(image_path, 'wb+') as buffer:
-            buffer.write(image.file.read())
+        try:
+            saved_image = await self._media_service.save_image(image)
+        except FileTooLargeError:
+            raise ImageTooLargeError
+        except UnsupportedImageError:
+            raise InvalidImageError
 
         block_to_update = ImageBlockUpdateDTO(
             type=block.type,
-            image_path=str(image_path.relative_to(MEDIA_DIR)),
+            image_path=saved_image.image_path,
+            original_image_path=saved_image.original_image_path,
+            thumbnail_path=saved_image.thumbnail_path,
+        )
+        updated_block = await self._block_repository.update_block(
+            dialogue_id=dialogue_id,
+            block_id=block_id,
+            block=block_to_update,
         )
+        if updated_block is None:
+            await self._media_service.release_images(
+                get_block_image_paths(
+                    saved_image.image_path,
+                    saved_image.original_image_path,
+                    saved_image.thumbnail_path,
+                )
+            )
+            raise BlockNotFoundError
 
+        # The previous image is released only after the block points to the new one, so a failed upload keeps the
+        # block intact
         # TODO: fix type hint warning
-        return await self.update_block(
+        await self._media_service.release_images(
+            get_block_image_paths(block.image_path, block.original_image_path, block.thumbnail_path)
+        )
+
+        await self._code_preview_events.notify_project_changed(project_id)
+        # TODO: fix type hint warning
+        return updated_block
+
+    async def update_block(
+        self,
+        user_id: UUID,
+        project_id: int,
+        dialogue_id: int,
+        block_id: int,
+        block: BlockUpdateDTO,
+    ) -> BlockReadDTO:
+        existing_block = await self.get_block(
             user_id=user_id,
             project_id=project_id,
             dialogue_id=dialogue_id,
             block_id=block_id,
-            block=block_to_update,
         )
 
-    async def update_block(
+        acquired_image_path, released_image_paths = None, []
+        if isinstance(existing_block, ImageBlockReadDTO) and isinstance(block, ImageBlockUpdateDTO):
+            if existing_block.image_path == block.image_path:
+                block = replace(
+                    block,
+                    original_image_path=existing_block.original_image_path,
+                    thumbnail_path=existing_block.thumbnail_path,
+                )
+            else:
+                # Variants belong to the uploaded image, so they are dropped when the block points to another one
+                block = replace(block, original_image_path='', thumbnail_path='')
+                acquired_image_path = block.image_path
+                released_image_paths = get_block_image_paths(
+                    existing_block.image_path,
+                    existing_block.original_image_path,
+                    existing_block.thumbnail_path,
+                )
+        if acquired_image_path:
+            await self._acquire_image(acquired_image_path)
+
+        updated_block = await self._block_repository.update_block(
+            dialogue_id=dialogue_id,
+            block_id=block_id,
+            block=block,
+        )
+        if updated_block is None:
+            raise BlockNotFoundError
+
+        await self._media_service.release_images(released_image_paths)
+
+        await self._code_preview_events.notify_project_changed(project_id)
+        return updated_block
+
+    async def move_block(
         self,
         user_id: UUID,
         project_id: int,
         dialogue_id: int,
         block_id: int,
-        block: BlockUpdateDTO,
+        after_block_id: Optional[int],
     ) -> BlockReadDTO:
         _ = await self.get_block(user_id=user_id, project_id=project_id, dialogue_id=dialogue_id, block_id=block_id)
-        return await self._block_repository.update_block(dialogue_id=dialogue_id, block_id=block_id, block=block)
+        if after_block_id == block_id:
+            raise BlockNotFoundError
+
+        moved_block = await self._block_repository.move_block(
+            dialogue_id=dialogue_id,
+            block_id=block_id,
+            after_block_id=after_block_id,
+        )
+        if moved_block is None:
+            raise BlockNotFoundError
+        await self._code_preview_events.notify_project_changed(project_id)
+        return moved_block
+
+    async def apply_blocks_batch(
+        self,
+        user_id: UUID,
+        project_id: int,
+        dialogue_id: int,
+        operations: list[BlockOperationDTO],
+    ) -> list[BlockReadDTO]:
+        await self._dialogue_service.check_dialogue_owner(
+            user_id=user_id,
+            project_id=project_id,
+            dialogue_id=dialogue_id,
+        )
+        blocks = await self._block_repository.get_blocks(dialogue_id)
+
+        operations, acquired_image_paths, released_image_paths = self._prepare_blocks_batch(blocks, operations)
+        try:
+            await self._media_service.acquire_images_without_commit(acquired_image_paths)
+        except MediaBlobNotFoundError:
+            raise ImageNotFoundError
+
+        updated_blocks = await self._block_repository.apply_blocks_batch(
+            dialogue_id=dialogue_id,
+            operations=operations,
+        )
+
+        await self._media_service.release_images(released_image_paths)
+        await self._code_preview_events.notify_project_changed(project_id)
+        return updated_blocks
+
+    @staticmethod
+    def _prepare_blocks_batch(
+        blocks: list[BlockReadDTO],
+        operations: list[BlockOperationDTO],
+    ) -> tuple[list[BlockOperationDTO], list[str], list[str]]:
+        # Operations are validated against the state left by the previous ones, so nothing is written if any fails
+        blocks_types = {block.block_id: block.type for block in blocks}
+        blocks_images = {
+            block.block_id: (block.image_path, block.original_image_path, block.thumbnail_path)
+            for block in blocks
+            if isinstance(block, ImageBlockReadDTO)
+        }
+        initial_image_paths = Counter(
+            path for block_images in blocks_images.values() for path in get_block_image_paths(*block_images)
+        )
+
+        prepared_operations, created_image_paths = [], []
+        for operation in operations:
+            if isinstance(operation, BlockCreateOperationDTO):
+                if isinstance(operation.block, ImageBlockCreateDTO) and operation.block.image_path:
+                    if not is_media_blob_path(operation.block.image_path):
+                        raise ImageNotFoundError
+                    created_image_paths.append(operation.block.image_path)
+                prepared_operations.append(operation)
+                continue
+
+            if operation.block_id not in blocks_types:
+                raise BlockNotFoundError
+
+            if isinstance(operation, BlockUpdateOperationDTO):
+                if operation.block.type != blocks_types[operation.block_id]:
+                    raise InvalidBlockTypeError
+                if isinstance(operation.block, ImageBlockUpdateDTO):
+                    image_path, original_image_path, thumbnail_path = blocks_images[operation.block_id]
+                    if operation.block.image_path != image_path:
+                        if operation.block.image_path and not is_media_blob_path(operation.block.image_path):
+                            raise ImageNotFoundError
+                        original_image_path, thumbnail_path = '', ''
+                    block = replace(
+                        operation.block,
+                        original_image_path=original_image_path,
+                        thumbnail_path=thumbnail_path,
+                    )
+                    blocks_images[operation.block_id] = (block.image_path, original_image_path, thumbnail_path)
+                    operation = replace(operation, block=block)
+
+            elif isinstance(operation, BlockDeleteOperationDTO):
+                blocks_types.pop(operation.block_id)
+                blocks_images.pop(operation.block_id, None)
+
+            elif isinstance(operation, BlockMoveOperationDTO):
+                if operation.after_block_id == operation.block_id or (
+                    operation.after_block_id is not None and operation.after_block_id not in blocks_types
+                ):
+                    raise BlockNotFoundError
+
+            prepared_operations.append(operation)
+
+        final_image_paths = Counter(created_image_paths)
+        final_image_paths.update(
+            path for block_images in blocks_images.values() for path in get_block_image_paths(*block_images)
+        )
+        acquired_image_paths = list((final_image_paths - initial_image_paths).elements())
+        released_image_paths = list((initial_image_paths - final_image_paths).elements())
+        return prepared_operations, acquired_image_paths, released_image_paths
+
+    async def _acquire_image(self, image_path: str):
+        # Only images that were uploaded to the media store can be referenced by a block
+        if not is_media_blob_path(image_path):
+            raise ImageNotFoundError
+        try:
+            await self._media_service.acquire_images_without_commit([image_path])
+        except MediaBlobNotFoundError:
+            raise ImageNotFoundError
 
     async def delete_block(
         self,
@@ -112,8 +325,11 @@ class BlockService:
         block_id: int,
     ):
         block = await self.get_block(user_id=user_id, project_id=project_id, dialogue_id=dialogue_id, block_id=block_id)
+        await self._block_repository.delete_block(dialogue_id, block_id)
         # TODO: fix type hint warning
-        if block.type == BlockType.IMAGE_BLOCK.value and block.image_path:
-            await soft_delete_file(MEDIA_DIR / block.image_path)
+        if block.type == BlockType.IMAGE_BLOCK.value:
+            await self._media_service.release_images(
+                get_block_image_paths(block.image_path, block.original_image_path, block.thumbnail_path)
+            )
 
-        await self._block_repository.delete_block(dialogue_id, block_id)
+        await self._code_preview_events.notify_project_changed(project_id)
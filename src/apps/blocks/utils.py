@@ -1,6 +1,16 @@
-from typing import Type
+import bisect
+from typing import Optional, Type
 
+from src.apps.blocks.dto.api import APIBlockReadDTO
+from src.apps.blocks.dto.base import BlockReadDTO
+from src.apps.blocks.dto.csv import CSVBlockReadDTO
+from src.apps.blocks.dto.email import EmailBlockReadDTO
+from src.apps.blocks.dto.excel import ExcelBlockReadDTO
+from src.apps.blocks.dto.image import ImageBlockReadDTO
+from src.apps.blocks.dto.question import QuestionBlockReadDTO
+from src.apps.blocks.dto.text import TextBlockReadDTO
 from src.apps.enums import BlockType
+from src.core.consts import BLOCK_SEQUENCE_NUMBER_STEP
 from src.apps.blocks.models import (
     TextBlockModel,
     ImageBlockModel,
@@ -26,5 +36,63 @@ def get_block_model_by_type(block_type: BlockType) -> Type[BlockModel]:
     return types_to_blocks[block_type]
 
 
+def get_block_read_dto_by_type(block_type: BlockType) -> Type[BlockReadDTO]:
+    types_to_dto = {
+        BlockType.TEXT_BLOCK: TextBlockReadDTO,
+        BlockType.IMAGE_BLOCK: ImageBlockReadDTO,
+        BlockType.QUESTION_BLOCK: QuestionBlockReadDTO,
+        BlockType.EMAIL_BLOCK: EmailBlockReadDTO,
+        BlockType.CSV_BLOCK: CSVBlockReadDTO,
+        BlockType.EXCEL_BLOCK: ExcelBlockReadDTO,
+        BlockType.API_BLOCK: APIBlockReadDTO,
+    }
+    return types_to_dto[block_type]
+
+
+def get_sparse_sequence_numbers(sequence_numbers: list[Optional[int]]) -> list[int]:
+    # Blocks keep the longest increasing run of their current numbers, the rest is spread over the gaps between them
+    kept_indexes = _get_longest_increasing_indexes(sequence_numbers)
+
+    new_sequence_numbers = list(sequence_numbers)
+    previous_index, previous_sequence_number = -1, 0
+    for kept_index in [*kept_indexes, len(sequence_numbers)]:
+        gap_indexes = range(previous_index + 1, kept_index)
+        if kept_index < len(sequence_numbers):
+            step = (sequence_numbers[kept_index] - previous_sequence_number) // (len(gap_indexes) + 1)
+        else:
+            step = BLOCK_SEQUENCE_NUMBER_STEP
+        if gap_indexes and step < 1:
+            return [BLOCK_SEQUENCE_NUMBER_STEP * position for position in range(1, len(sequence_numbers) + 1)]
+
+        for position, gap_index in enumerate(gap_indexes, start=1):
+            new_sequence_numbers[gap_index] = previous_sequence_number + step * position
+        if kept_index < len(sequence_numbers):
+            previous_index, previous_sequence_number = kept_index, sequence_numbers[kept_index]
+
+    return new_sequence_numbers
+
+
+def _get_longest_increasing_indexes(sequence_numbers: list[Optional[int]]) -> list[int]:
+    tails, tails_indexes, previous_indexes = [], [], {}
+    for index, sequence_number in enumerate(sequence_numbers):
+        if sequence_number is None:
+            continue
+        position = bisect.bisect_left(tails, sequence_number)
+        previous_indexes[index] = tails_indexes[position - 1] if position else None
+        if position == len(tails):
+            tails.append(sequence_number)
+            tails_indexes.append(index)
+        else:
+            tails[position] = sequence_number
+            tails_indexes[position] = index
+
+    indexes = []
+    index = tails_indexes[-1] if tails_indexes else None
+    while index is not None:
+        indexes.append(index)
+        index = previous_indexes[index]
+    return indexes[::-1]
+
+
 def escape_inner_text(text: str) -> str:
     return text.replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,247 @@
+import asyncio
+import functools
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Iterator, Iterable, Optional
+
+import anyio
+from loguru import logger
+
+from src.apps.code_gen.cache import get_dialogue_code_fragment_cache
+from src.apps.code_gen.dto import ProjectCodeGenReadDTO
+from src.apps.code_gen.generators import BotCodeGenerator, get_code_gen_limiter
+from src.apps.code_gen.templates import get_template
+from src.apps.code_gen.zip_writer import (
+    ZIP_STORED,
+    ZipEntry,
+    ZipStreamWriter,
+    build_zip_entry,
+    build_zip_entry_from_file,
+)
+from src.apps.enums import BlockType
+from src.core.config import settings, BOT_TEMPLATES_DIR, MEDIA_DIR
+from src.infrastructure.pools import get_process_pool
+
+STATIC_TEMPLATE_PATHS = [
+    Path('main.py.j2'),
+    Path('loader.py.j2'),
+    Path('config.py.j2'),
+    Path('db', 'base.py.j2'),
+    Path('middlewares.py.j2'),
+    Path('.env.example'),
+    Path('requirements.txt'),
+    Path('Dockerfile'),
+    Path('ИНСТРУКЦИЯ.txt'),
+]
+PLUGINS_TEMPLATES_DIRS = [Path('handlers'), Path('db')]
+RENDERED_TEMPLATE_PATHS = [
+    Path('handlers', 'custom.py.j2'),
+    Path('handlers', '__init__.py.j2'),
+    Path('db', '__init__.py.j2'),
+]
+
+
+class StaticArchiveLayer:
+    # Files that are the same for every bot, compressed once and spliced into archives as ready-made entries
+    def __init__(self, entries: dict[Path, ZipEntry]):
+        self._entries = entries
+
+    @classmethod
+    def build(cls) -> 'StaticArchiveLayer':
+        source_paths = list(STATIC_TEMPLATE_PATHS)
+        for templates_dir in PLUGINS_TEMPLATES_DIRS:
+            for path in sorted((BOT_TEMPLATES_DIR / templates_dir).glob('*.j2')):
+                relative_path = path.relative_to(BOT_TEMPLATES_DIR)
+                if relative_path not in RENDERED_TEMPLATE_PATHS:
+                    source_paths.append(relative_path)
+
+        return cls(
+            {
+                source_path: build_zip_entry_from_file(_get_arcname(source_path), BOT_TEMPLATES_DIR / source_path)
+                for source_path in source_paths
+            }
+        )
+
+    def get_entry(self, source_path: Path) -> ZipEntry:
+        entry = self._entries.get(source_path)
+        if entry is None:
+            entry = build_zip_entry_from_file(_get_arcname(source_path), BOT_TEMPLATES_DIR / source_path)
+        return entry
+
+
+@functools.cache
+def _get_cached_static_archive_layer() -> StaticArchiveLayer:
+    return StaticArchiveLayer.build()
+
+
+def get_static_archive_layer() -> StaticArchiveLayer:
+    if settings.DEBUG:
+        # Templates may be edited on the fly during development
+        return StaticArchiveLayer.build()
+    return _get_cached_static_archive_layer()
+
+
+def load_static_archive_layer():
+    _get_cached_static_archive_layer()
+
+
+async def stream_bot_code_zip(project: ProjectCodeGenReadDTO) -> AsyncIterator[bytes]:
+    chunks = iter_bot_code_zip(project, chunk_size=settings.CODE_GEN_ZIP_CHUNK_SIZE)
+    limiter = get_code_gen_limiter()
+    try:
+        while (chunk := await anyio.to_thread.run_sync(next, chunks, None, limiter=limiter)) is not None:
+            yield chunk
+    finally:
+        chunks.close()
+
+
+async def stream_bot_codes_export_zip(
+    projects: list[ProjectCodeGenReadDTO],
+    missing_project_ids: list[int],
+) -> AsyncIterator[bytes]:
+    writer = ZipStreamWriter()
+    exported_projects = []
+    failed_projects = []
+
+    async for project, entry in _build_bot_code_zip_entries(projects):
+        if isinstance(entry, BaseException):
+            logger.opt(exception=entry).error(f'Failed to export bot code of project {project.project_id}')
+            failed_projects.append({'project_id': project.project_id, 'error': repr(entry)})
+            continue
+
+        exported_projects.append(
+            {
+                'project_id': project.project_id,
+                'user_id': str(project.user_id),
+                'name': project.name,
+                'file_name': entry.name,
+                'size': entry.file_size,
+                'crc32': entry.crc,
+            }
+        )
+        for part in writer.write_entry(entry):
+            yield part
+
+    manifest = {
+        'exported_at': datetime.now(timezone.utc).isoformat(),
+        'projects': exported_projects,
+        'failed_projects': failed_projects,
+        'missing_project_ids': missing_project_ids,
+    }
+    manifest_content = json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+    for part in writer.write_entry(build_zip_entry('manifest.json', manifest_content)):
+        yield part
+    for part in writer.close():
+        yield part
+
+
+async def _build_bot_code_zip_entries(
+    projects: list[ProjectCodeGenReadDTO],
+) -> AsyncIterator[tuple[ProjectCodeGenReadDTO, ZipEntry | BaseException]]:
+    # Only a bounded number of archives is in flight, so memory does not grow with the number of exported projects
+    loop = asyncio.get_running_loop()
+    process_pool = get_process_pool()
+    max_in_flight = settings.PROCESS_POOL_WORKERS * 2
+
+    projects_to_submit = iter(projects)
+    in_flight: dict[asyncio.Future, ProjectCodeGenReadDTO] = {}
+    try:
+        while True:
+            while len(in_flight) < max_in_flight and (project := next(projects_to_submit, None)) is not None:
+                in_flight[loop.run_in_executor(process_pool, build_bot_code_zip_entry, project)] = project
+            if not in_flight:
+                break
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                project = in_flight.pop(future)
+                yield project, future.exception() or future.result()
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def build_bot_code_zip_entry(project: ProjectCodeGenReadDTO) -> ZipEntry:
+    # Runs in a worker process; the archive is already compressed, so it is stored in the outer archive as is
+    content = b''.join(iter_bot_code_zip(project, chunk_size=settings.CODE_GEN_ZIP_CHUNK_SIZE))
+    return build_zip_entry(f'{project.project_id}.zip', content, compress_type=ZIP_STORED)
+
+
+def iter_bot_code_zip(
+    project: ProjectCodeGenReadDTO,
+    chunk_size: int,
+    generated_files: Optional[Iterable[tuple[str, str]]] = None,
+) -> Iterator[bytes]:
+    if generated_files is None:
+        generated_files = get_generated_files(project)
+    return _join_into_chunks(_iter_bot_code_zip_parts(project, chunk_size, generated_files), chunk_size)
+
+
+def _iter_bot_code_zip_parts(
+    project: ProjectCodeGenReadDTO,
+    chunk_size: int,
+    generated_files: Iterable[tuple[str, str]],
+) -> Iterator[bytes]:
+    static_layer = get_static_archive_layer()
+    writer = ZipStreamWriter()
+
+    for arcname, content in generated_files:
+        yield from writer.write_entry(build_zip_entry(arcname, content.encode('utf-8')))
+
+    for plugin in project.plugins:
+        yield from writer.write_entry(static_layer.get_entry(Path(plugin.handlers_file_path)))
+        yield from writer.write_entry(static_layer.get_entry(Path(plugin.db_funcs_file_path)))
+
+    # Blocks that share a media blob point to the same file in the bot project, so it is written once
+    written_images_names = set()
+    for dialogue in project.dialogues:
+        for block in dialogue.blocks:
+            # TODO: fix type hint
+            if block.type == BlockType.IMAGE_BLOCK and block.image_path:
+                image_name = str(Path('img') / Path(block.image_path).name)
+                if image_name in written_images_names:
+                    continue
+                written_images_names.add(image_name)
+                # Images are already compressed, so they are stored as is
+                yield from writer.write_file(
+                    name=image_name,
+                    path=MEDIA_DIR / block.image_path,
+                    chunk_size=chunk_size,
+                )
+
+    for path in STATIC_TEMPLATE_PATHS:
+        yield from writer.write_entry(static_layer.get_entry(path))
+
+    yield from writer.close()
+
+
+def _join_into_chunks(parts: Iterable[bytes], chunk_size: int) -> Iterator[bytes]:
+    buffer = bytearray()
+    for part in parts:
+        buffer += part
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def get_generated_files(project: ProjectCodeGenReadDTO) -> Iterator[tuple[str, str]]:
+    generator = BotCodeGenerator(fragment_cache=get_dialogue_code_fragment_cache())
+    yield str(Path('handlers') / 'custom.py'), generator.generate_custom_handlers_code(project)
+
+    handlers_file_names = [Path(plugin.handlers_file_path).stem for plugin in project.plugins]
+    handlers_init_template = get_template('handlers/__init__.py.j2')
+    yield (
+        str(Path('handlers') / '__init__.py'),
+        handlers_init_template.render(handlers_file_names=handlers_file_names),
+    )
+
+    db_funcs_file_names = [Path(plugin.db_funcs_file_path).stem for plugin in project.plugins]
+    db_funcs_init_template = get_template('db/__init__.py.j2')
+    yield str(Path('db') / '__init__.py'), db_funcs_init_template.render(db_funcs_file_names=db_funcs_file_names)
+
+
+def _get_arcname(source_path: Path) -> str:
+    return str(source_path).removesuffix('.j2')
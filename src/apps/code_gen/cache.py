@@ -0,0 +1,174 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import anyio
+
+from src.api.v1.code_gen import schemas
+from src.apps.code_gen.bot_templates import code
+from src.apps.code_gen.dto import ProjectCodeGenReadDTO, DialogueWithBlocksReadDTO, DialogueCodeFragmentDTO
+from src.apps.enums import BlockType, KeyboardType
+from src.core.config import settings, BOT_TEMPLATES_DIR, MEDIA_DIR
+
+CODE_GEN_MODULES_NAMES = ['archives.py', 'generators.py', 'templates.py', 'zip_writer.py']
+
+
+def get_bot_templates_version() -> str:
+    # Templates are reloaded on change in debug mode, so their version can't be computed only once
+    if settings.DEBUG:
+        return _compute_bot_templates_version()
+    return _get_cached_bot_templates_version()
+
+
+@functools.cache
+def _get_cached_bot_templates_version() -> str:
+    return _compute_bot_templates_version()
+
+
+def _compute_bot_templates_version() -> str:
+    # Any change in the bot templates or in the code generation logic must invalidate cached archives
+    sources = sorted(path for path in BOT_TEMPLATES_DIR.rglob('*') if path.is_file())
+    sources += [Path(module.__file__) for module in (code, schemas)]
+    sources += [Path(__file__).parent / module_name for module_name in CODE_GEN_MODULES_NAMES]
+
+    digest = hashlib.sha256()
+    for path in sources:
+        digest.update(str(path).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def get_project_code_hash(project: ProjectCodeGenReadDTO) -> str:
+    images = []
+    for dialogue in project.dialogues:
+        for block in dialogue.blocks:
+            if block.type == BlockType.IMAGE_BLOCK and block.image_path:
+                # Re-uploaded image may keep the same path, so the file state is a part of the key
+                image_stat = (MEDIA_DIR / block.image_path).stat()
+                images.append([block.image_path, image_stat.st_size, image_stat.st_mtime_ns])
+
+    payload = {
+        'templates_version': get_bot_templates_version(),
+        'start_message': project.start_message,
+        'start_keyboard_type': project.start_keyboard_type,
+        'dialogues': [asdict(dialogue) for dialogue in project.dialogues],
+        'plugins': [asdict(plugin) for plugin in project.plugins],
+        'images': images,
+    }
+    serialized_payload = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(serialized_payload.encode()).hexdigest()
+
+
+def get_dialogue_code_hash(dialogue: DialogueWithBlocksReadDTO, keyboard_type: KeyboardType) -> str:
+    # Dataclass repr covers every field of the dialogue and its blocks and is much cheaper than asdict
+    payload = f'{keyboard_type!r}:{dialogue!r}'
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class DialogueCodeFragmentCache:
+    # Used from code generation worker threads, so every access is guarded by the lock
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._fragments: OrderedDict[str, DialogueCodeFragmentDTO] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[DialogueCodeFragmentDTO]:
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+            return fragment
+
+    def set(self, key: str, fragment: DialogueCodeFragmentDTO):
+        with self._lock:
+            self._fragments[key] = fragment
+            self._fragments.move_to_end(key)
+            while len(self._fragments) > self._max_size:
+                self._fragments.popitem(last=False)
+
+
+@functools.cache
+def _get_cached_dialogue_code_fragment_cache() -> DialogueCodeFragmentCache:
+    return DialogueCodeFragmentCache(max_size=settings.CODE_GEN_FRAGMENT_CACHE_SIZE)
+
+
+def get_dialogue_code_fragment_cache() -> Optional[DialogueCodeFragmentCache]:
+    if not settings.CODE_GEN_CACHE_ENABLED:
+        return None
+    return _get_cached_dialogue_code_fragment_cache()
+
+
+class CodeGenZipCache:
+    FILE_SUFFIX = '.zip'
+
+    def __init__(self, cache_dir: Path, max_size: int, chunk_size: int):
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+        self._chunk_size = chunk_size
+
+    async def get(self, key: str) -> Optional[AsyncIterator[bytes]]:
+        path = self._get_path(key)
+        try:
+            # mtime is used as the last access time for LRU eviction. The file is opened last, so its handle can't
+            # leak if the file is evicted in between
+            await anyio.to_thread.run_sync(os.utime, path)
+            cached_file = await anyio.open_file(path, 'rb')
+        except FileNotFoundError:
+            return None
+        return self._iter_file(cached_file)
+
+    async def store(self, key: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        await anyio.Path(self._cache_dir).mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = await anyio.to_thread.run_sync(
+            functools.partial(tempfile.mkstemp, dir=self._cache_dir, suffix='.tmp')
+        )
+        size = 0
+        try:
+            async with await anyio.open_file(fd, 'wb') as tmp_file:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size <= self._max_size:
+                        await tmp_file.write(chunk)
+                    yield chunk
+        except BaseException:
+            await anyio.Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        if size > self._max_size:
+            await anyio.Path(tmp_path).unlink(missing_ok=True)
+            return
+
+        await anyio.to_thread.run_sync(os.replace, tmp_path, self._get_path(key))
+        await anyio.to_thread.run_sync(self._evict)
+
+    async def _iter_file(self, cached_file: anyio.AsyncFile[bytes]) -> AsyncIterator[bytes]:
+        async with cached_file:
+            while chunk := await cached_file.read(self._chunk_size):
+                yield chunk
+
+    def _evict(self):
+        entries = []
+        total_size = 0
+        for path in self._cache_dir.glob(f'*{self.FILE_SUFFIX}'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total_size += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total_size <= self._max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+    def _get_path(self, key: str) -> Path:
+        return self._cache_dir / f'{key}{self.FILE_SUFFIX}'
@@ -0,0 +1,21 @@
+from typing import Annotated, Optional
+
+from fastapi import Depends
+
+from src.apps.code_gen.cache import CodeGenZipCache
+from src.core.config import settings, CODE_GEN_CACHE_DIR
+
+code_gen_zip_cache = CodeGenZipCache(
+    cache_dir=CODE_GEN_CACHE_DIR,
+    max_size=settings.CODE_GEN_CACHE_MAX_SIZE,
+    chunk_size=settings.CODE_GEN_ZIP_CHUNK_SIZE,
+)
+
+
+def get_code_gen_zip_cache() -> Optional[CodeGenZipCache]:
+    if not settings.CODE_GEN_CACHE_ENABLED:
+        return None
+    return code_gen_zip_cache
+
+
+CodeGenZipCacheDI = Annotated[Optional[CodeGenZipCache], Depends(get_code_gen_zip_cache)]
@@ -0,0 +1,7 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.apps.code_gen.events import CodePreviewEvents
+
+CodePreviewEventsDI = Annotated[CodePreviewEvents, Depends(CodePreviewEvents)]
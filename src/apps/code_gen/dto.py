@@ -1,5 +1,7 @@
 from dataclasses import dataclass
+from typing import Optional
 
+from src.api.v1.code_gen.schemas import HandlerSchema, StatesGroupSchema
 from src.apps.blocks.dto.base import BlockReadDTO
 from src.apps.dialogues.dto import DialogueReadDTO
 from src.apps.plugins.dto import PluginReadDTO
@@ -15,3 +17,18 @@ class DialogueWithBlocksReadDTO(DialogueReadDTO):
 class ProjectCodeGenReadDTO(ProjectReadDTO):
     dialogues: list[DialogueWithBlocksReadDTO]
     plugins: list[PluginReadDTO]
+
+
+@dataclass(frozen=True)
+class DialogueCodeFragmentDTO:
+    handlers: list[HandlerSchema]
+    states_groups: list[StatesGroupSchema]
+    utils_funcs: frozenset[str]
+    keyboard_buttons: list[str]
+    commands_values: list[str]
+
+
+@dataclass(frozen=True)
+class CodePreviewUpdateDTO:
+    code: str
+    diff: Optional[str] = None
@@ -0,0 +1,24 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from src.infrastructure.cache.client import CacheSubscription
+from src.infrastructure.cache.dependencies import CacheClientDI
+
+CODE_PREVIEW_CHANNEL_PREFIX = 'code_preview'
+
+
+class CodePreviewEvents:
+    def __init__(self, cache_client: CacheClientDI):
+        self._cache_client = cache_client
+
+    async def notify_project_changed(self, project_id: int):
+        await self._cache_client.publish(self._get_channel(project_id), str(project_id))
+
+    @asynccontextmanager
+    async def subscribe_to_project_changes(self, project_id: int) -> AsyncIterator[CacheSubscription]:
+        async with self._cache_client.subscribe(self._get_channel(project_id)) as subscription:
+            yield subscription
+
+    @staticmethod
+    def _get_channel(project_id: int) -> str:
+        return f'{CODE_PREVIEW_CHANNEL_PREFIX}:{project_id}'
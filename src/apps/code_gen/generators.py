@@ -0,0 +1,330 @@
+import functools
+from pathlib import Path
+from typing import Any, Optional
+
+import anyio
+
+from src.api.v1.code_gen.schemas import HandlerSchema, StateSchema, StatesGroupSchema, KeyboardSchema
+from src.apps.blocks.utils import escape_inner_text
+from src.apps.code_gen.bot_templates import code
+from src.apps.code_gen.cache import DialogueCodeFragmentCache, get_dialogue_code_hash
+from src.apps.code_gen.dto import ProjectCodeGenReadDTO, DialogueWithBlocksReadDTO, DialogueCodeFragmentDTO
+from src.apps.code_gen.templates import get_template
+from src.apps.enums import (
+    KeyboardType,
+    HandlerType,
+    BlockType,
+    TriggerEventType,
+    AnswerMessageType,
+    HTTPMethod,
+    AiohttpSessionMethod,
+)
+from src.core.config import settings
+
+
+@functools.cache
+def get_code_gen_limiter() -> anyio.CapacityLimiter:
+    return anyio.CapacityLimiter(settings.CODE_GEN_WORKERS)
+
+
+class BotCodeGenerator:
+    def __init__(self, fragment_cache: Optional[DialogueCodeFragmentCache] = None):
+        self._fragment_cache = fragment_cache
+
+    # TODO refactoring
+    # TODO add customize env variables
+    # TODO change start func call
+    def generate_custom_handlers_code(self, project: ProjectCodeGenReadDTO) -> str:
+        return self.render_custom_handlers_code(self.get_custom_handlers_context(project))
+
+    def get_custom_handlers_context(self, project: ProjectCodeGenReadDTO) -> dict[str, Any]:
+        utils_funcs = set()
+        states_groups: list[StatesGroupSchema] = []
+        handlers: list[HandlerSchema] = []
+        commands_values: list[str] = []
+
+        start_keyboard = self._get_start_keyboard(project.start_keyboard_type)
+
+        for dialogue in project.dialogues:
+            if not dialogue.trigger.value:
+                continue
+
+            fragment = self._get_dialogue_code_fragment(dialogue, project.start_keyboard_type)
+            utils_funcs.update(fragment.utils_funcs)
+            states_groups.extend(fragment.states_groups)
+            handlers.extend(fragment.handlers)
+            commands_values.extend(fragment.commands_values)
+            for button in fragment.keyboard_buttons:
+                start_keyboard.add_to_buttons(button)
+
+        admin_keyboard = self._get_start_keyboard(project.start_keyboard_type)
+        for plugin in project.plugins:
+            for trigger in plugin.triggers:
+                if trigger.event_type == TriggerEventType.BUTTON:
+                    if trigger.is_admin:
+                        keyboard = admin_keyboard
+                    else:
+                        keyboard = start_keyboard
+
+                    if project.start_keyboard_type == KeyboardType.INLINE_KEYBOARD:
+                        keyboard.add_to_buttons(code.inline_keyboard_button.format(text=trigger.value))
+                    else:
+                        keyboard.add_to_buttons(code.reply_keyboard_button.format(text=trigger.value))
+
+        return {
+            'utils_funcs': sorted(utils_funcs),
+            'states_groups': states_groups,
+            'handlers': handlers,
+            'commands_values': commands_values,
+            'start_keyboard': start_keyboard,
+            'admin_keyboard': admin_keyboard,
+            'start_message': escape_inner_text(project.start_message) if project.start_message else 'Главное меню',
+        }
+
+    @staticmethod
+    def render_custom_handlers_code(context: dict[str, Any]) -> str:
+        template = get_template('handlers/custom.py.j2')
+        return template.render(context)
+
+    def _get_dialogue_code_fragment(
+        self,
+        dialogue: DialogueWithBlocksReadDTO,
+        keyboard_type: KeyboardType,
+    ) -> DialogueCodeFragmentDTO:
+        if self._fragment_cache is None:
+            return self._generate_dialogue_code_fragment(dialogue, keyboard_type)
+
+        key = get_dialogue_code_hash(dialogue, keyboard_type)
+        fragment = self._fragment_cache.get(key)
+        if fragment is None:
+            fragment = self._generate_dialogue_code_fragment(dialogue, keyboard_type)
+            self._fragment_cache.set(key, fragment)
+        return fragment
+
+    def _generate_dialogue_code_fragment(
+        self,
+        dialogue: DialogueWithBlocksReadDTO,
+        keyboard_type: KeyboardType,
+    ) -> DialogueCodeFragmentDTO:
+        utils_funcs = set()
+        states_groups: list[StatesGroupSchema] = []
+        handlers: list[HandlerSchema] = []
+        keyboard_buttons: list[str] = []
+        commands_values: list[str] = []
+
+        states_group = None
+
+        handler = HandlerSchema()
+        handler.signature = code.func_signature_for_common_handler_with_msg.format(
+            trigger_event_type=dialogue.trigger.event_type.value,
+            dialogue_id=dialogue.dialogue_id,
+        )
+
+        if dialogue.trigger.event_type == TriggerEventType.COMMAND:
+            commands_values.append(dialogue.trigger.value)
+            handler.decorator = code.command_decorator.format(trigger_value=dialogue.trigger.value)
+
+        elif dialogue.trigger.event_type == TriggerEventType.BUTTON:
+            if keyboard_type == KeyboardType.INLINE_KEYBOARD:
+                keyboard_buttons.append(code.inline_keyboard_button.format(text=dialogue.trigger.value))
+                handler.decorator = code.callback_button_decorator.format(trigger_value=dialogue.trigger.value)
+                handler.signature = code.func_signature_for_callback_handler_with_callback.format(
+                    trigger_event_type=dialogue.trigger.event_type.value,
+                    dialogue_id=dialogue.dialogue_id,
+                )
+                handler.type = HandlerType.CALLBACK
+                handler.add_to_body(code.callback_answer)
+                handler.add_to_body(code.callback_message)
+            else:
+                keyboard_buttons.append(code.reply_keyboard_button.format(text=dialogue.trigger.value))
+                handler.decorator = code.text_button_decorator.format(trigger_value=dialogue.trigger.value)
+
+        elif dialogue.trigger.event_type == TriggerEventType.TEXT:
+            handler.decorator = code.text_decorator.format(trigger_value=dialogue.trigger.value)
+
+        if not dialogue.blocks:
+            handler.add_to_body('pass')
+
+        dialogue_blocks = sorted(dialogue.blocks, key=lambda x: x.sequence_number)
+        for block in dialogue_blocks:
+            if block.is_draft:
+                continue
+
+            if block.type == BlockType.TEXT_BLOCK:
+                handler.add_to_body(code.message_answer.format(message_text=escape_inner_text(block.message_text)))
+
+            elif block.type == BlockType.IMAGE_BLOCK:
+                image_path_in_bot_project = Path('img') / Path(block.image_path).name
+                handler.add_to_body(code.image_block.format(image_path=image_path_in_bot_project))
+
+            elif block.type == BlockType.QUESTION_BLOCK:
+                if states_group is None:
+                    state = StateSchema(name=f'state_from_block{block.sequence_number}')
+                    states_group = StatesGroupSchema(
+                        name=f'StatesGroupDialogue{dialogue.dialogue_id}',
+                        states=[state],
+                    )
+                    states_groups.append(states_group)
+
+                    handler.add_to_body(
+                        code.message_answer_with_reply_kb_remove.format(
+                            message_text=escape_inner_text(block.message_text)
+                        )
+                    )
+
+                    handler.add_to_body(
+                        code.set_state.format(states_group_name=states_group.name, state_name=state.name)
+                    )
+
+                    if handler.type == HandlerType.CALLBACK:
+                        handler.signature = code.func_signature_for_callback_handler_with_callback_and_state.format(
+                            trigger_event_type=dialogue.trigger.event_type.value,
+                            dialogue_id=dialogue.dialogue_id,
+                        )
+                    elif handler.type == HandlerType.MESSAGE:
+                        handler.signature = code.func_signature_for_common_handler_with_msg_and_state.format(
+                            trigger_event_type=dialogue.trigger.event_type.value,
+                            dialogue_id=dialogue.dialogue_id,
+                        )
+
+                    handlers.append(handler)
+                else:
+                    state = StateSchema(name=f'state_from_block{block.sequence_number}')
+                    states_group.states.append(state)
+
+                    handler.add_to_body(
+                        code.message_answer_with_reply_kb_remove.format(
+                            message_text=escape_inner_text(block.message_text)
+                        )
+                    )
+                    handler.add_to_body(
+                        code.set_state.format(states_group_name=states_group.name, state_name=state.name)
+                    )
+                    handlers.append(handler)
+
+                handler = HandlerSchema()
+                handler.decorator = code.state_decorator.format(
+                    states_group_name=states_group.name,
+                    state_name=state.name,
+                )
+                handler.signature = code.func_signature_for_state_handler_with_msg_and_state.format(
+                    state_name=state.name,
+                    dialogue_id=dialogue.dialogue_id,
+                )
+
+                answer_type_check_code = self._get_answer_type_check_code(block.answer_type)
+                if answer_type_check_code is not None:
+                    handler.add_to_body(answer_type_check_code)
+
+                utils_func_code_for_answer_type_check = self._get_utils_func_code_for_answer_type_check(
+                    block.answer_type
+                )
+                if utils_func_code_for_answer_type_check is not None:
+                    utils_funcs.add(utils_func_code_for_answer_type_check)
+
+                handler.add_to_body(code.update_state_data.format(answer_num=len(states_group.states)))
+                handler.add_to_body(code.get_state_data)
+
+            elif block.type == BlockType.EMAIL_BLOCK.value:
+                handler.add_to_body(
+                    code.email_block.format(
+                        recipient_email=escape_inner_text(block.recipient_email),
+                        subject=escape_inner_text(block.subject),
+                        text=escape_inner_text(block.text),
+                    )
+                )
+
+                utils_funcs.add(code.send_email.strip())
+                utils_funcs.add(code.is_answer_from_user.strip())
+
+            elif block.type == BlockType.CSV_BLOCK:
+                handler.add_to_body(
+                    code.csv_block.format(
+                        file_path=block.file_path,
+                        data=block.data,
+                    )
+                )
+
+            elif block.type == BlockType.EXCEL_BLOCK:
+                handler.add_to_body(
+                    code.excel_block.format(
+                        file_path=block.file_path,
+                        data=block.data,
+                    )
+                )
+
+            elif block.type == BlockType.API_BLOCK:
+                aiohttp_session_method = self._get_aiohttp_session_method(block.http_method)
+
+                handler.add_to_body(
+                    code.api_block.format(
+                        aiohttp_session_method=aiohttp_session_method.value,
+                        url=block.url,
+                        headers=block.headers,
+                        body=block.body,
+                    )
+                )
+
+        if states_group:
+            handler.add_to_body(code.clear_state)
+
+        handler.add_to_body(code.call_start_func)
+        handlers.append(handler)
+
+        return DialogueCodeFragmentDTO(
+            handlers=handlers,
+            states_groups=states_groups,
+            utils_funcs=frozenset(utils_funcs),
+            keyboard_buttons=keyboard_buttons,
+            commands_values=commands_values,
+        )
+
+    @staticmethod
+    def _get_start_keyboard(keyboard_type: KeyboardType) -> KeyboardSchema:
+        if keyboard_type == KeyboardType.INLINE_KEYBOARD:
+            declaration = code.inline_keyboard_declaration
+        else:
+            declaration = code.reply_keyboard_declaration
+        return KeyboardSchema(type=keyboard_type, declaration=declaration)
+
+    @staticmethod
+    def _get_answer_type_check_code(
+        answer_type: AnswerMessageType,
+    ) -> Optional[str]:
+        types_to_code = {
+            AnswerMessageType.ANY: None,
+            AnswerMessageType.TEXT: code.answer_text_type_check,
+            AnswerMessageType.INT: code.answer_int_type_check,
+            AnswerMessageType.EMAIL: code.answer_email_type_check,
+            AnswerMessageType.PHONE_NUMBER: code.answer_phone_number_type_check,
+        }
+        return types_to_code[answer_type]
+
+    @staticmethod
+    def _get_utils_func_code_for_answer_type_check(
+        answer_type: AnswerMessageType,
+    ) -> Optional[str]:
+        types_to_code = {
+            AnswerMessageType.ANY: None,
+            AnswerMessageType.TEXT: None,
+            AnswerMessageType.INT: None,
+            AnswerMessageType.EMAIL: code.is_email.strip(),
+            AnswerMessageType.PHONE_NUMBER: code.is_phone_number.strip(),
+        }
+        return types_to_code[answer_type]
+
+    @staticmethod
+    def _get_aiohttp_session_method(
+        http_method: HTTPMethod,
+    ) -> AiohttpSessionMethod:
+        http_methods_to_aiohttp_methods = {
+            http_method.GET: AiohttpSessionMethod.GET,
+            http_method.POST: AiohttpSessionMethod.POST,
+            http_method.PUT: AiohttpSessionMethod.PUT,
+            http_method.DELETE: AiohttpSessionMethod.DELETE,
+            http_method.PATCH: AiohttpSessionMethod.PATCH,
+            http_method.CONNECT: AiohttpSessionMethod.CONNECT,
+            http_method.HEAD: AiohttpSessionMethod.HEAD,
+            http_method.OPTIONS: AiohttpSessionMethod.OPTIONS,
+        }
+        return http_methods_to_aiohttp_methods[http_method]
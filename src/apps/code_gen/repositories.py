@@ -1,19 +1,53 @@
-from typing import Optional
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, Select, func, case, literal, literal_column, ColumnElement
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
 from sqlalchemy.orm import selectinload, joinedload
 
+from src.apps.blocks.dto.base import BlockReadDTO
 from src.apps.blocks.models import BlockModel
-from src.apps.code_gen.dto import ProjectCodeGenReadDTO
-from src.apps.dialogues.models import DialogueModel
-from src.apps.plugins.models import PluginModel
+from src.apps.blocks.utils import get_block_read_dto_by_type
+from src.apps.code_gen.dto import ProjectCodeGenReadDTO, DialogueWithBlocksReadDTO
+from src.apps.dialogues.dto import DialogueTriggerReadDTO
+from src.apps.dialogues.models import DialogueModel, DialogueTriggerModel
+from src.apps.enums import BlockType, KeyboardType, TriggerEventType, AnswerMessageType, HTTPMethod
+from src.apps.plugins.dto import PluginReadDTO, PluginTriggerReadDTO
+from src.apps.plugins.models import PluginModel, PluginTriggerModel, projects_plugins
 from src.apps.projects.models import ProjectModel
 from src.core.base_repository import BaseRepository
+from src.core.config import settings
+
+# Enum columns are stored by member name, so they are restored by name as well
+BLOCK_ENUM_FIELDS = {
+    'answer_type': AnswerMessageType,
+    'http_method': HTTPMethod,
+}
 
 
 class CodeGenRepository(BaseRepository):
     async def get_project_to_generate_code(self, project_id: int) -> Optional[ProjectCodeGenReadDTO]:
-        project = await self._session.execute(
+        projects = await self.get_projects_to_generate_code(project_ids=[project_id])
+        if not projects:
+            return None
+        return projects[0]
+
+    async def get_projects_to_generate_code(
+        self,
+        project_ids: Optional[list[int]] = None,
+        user_id: Optional[UUID] = None,
+    ) -> list[ProjectCodeGenReadDTO]:
+        if settings.CODE_GEN_SINGLE_QUERY_LOADER:
+            return await self._get_projects_to_generate_code_in_single_query(project_ids=project_ids, user_id=user_id)
+        return await self._get_projects_to_generate_code_with_orm(project_ids=project_ids, user_id=user_id)
+
+    async def _get_projects_to_generate_code_with_orm(
+        self,
+        project_ids: Optional[list[int]] = None,
+        user_id: Optional[UUID] = None,
+    ) -> list[ProjectCodeGenReadDTO]:
+        query = (
             select(ProjectModel)
             .options(
                 selectinload(ProjectModel.plugins).selectinload(PluginModel.triggers),
@@ -22,9 +56,192 @@ class CodeGenRepository(BaseRepository):
                     selectinload(DialogueModel.blocks).selectin_polymorphic(BlockModel.__subclasses__()),
                 ),
             )
-            .where(ProjectModel.project_id == project_id)
+            .order_by(ProjectModel.project_id)
+        )
+        query = self._filter_projects_query(query, project_ids=project_ids, user_id=user_id)
+
+        projects = await self._session.execute(query)
+        return [project.to_code_gen_dto() for project in projects.scalars()]
+
+    async def _get_projects_to_generate_code_in_single_query(
+        self,
+        project_ids: Optional[list[int]] = None,
+        user_id: Optional[UUID] = None,
+    ) -> list[ProjectCodeGenReadDTO]:
+        # The whole project tree is aggregated into JSON by PostgreSQL, so it takes one round-trip and no ORM state
+        query = select(self._get_project_json()).order_by(ProjectModel.project_id)
+        query = self._filter_projects_query(query, project_ids=project_ids, user_id=user_id)
+
+        projects = await self._session.execute(query)
+        return [self._project_json_to_dto(project) for project in projects.scalars()]
+
+    @staticmethod
+    def _filter_projects_query(
+        query: Select,
+        project_ids: Optional[list[int]] = None,
+        user_id: Optional[UUID] = None,
+    ) -> Select:
+        if project_ids is not None:
+            query = query.where(ProjectModel.project_id.in_(project_ids))
+        if user_id is not None:
+            query = query.where(ProjectModel.user_id == user_id)
+        return query
+
+    @classmethod
+    def _get_project_json(cls) -> ColumnElement:
+        return cls._build_json_object(
+            project_id=ProjectModel.project_id,
+            user_id=ProjectModel.user_id,
+            name=ProjectModel.name,
+            start_message=ProjectModel.start_message,
+            start_keyboard_type=ProjectModel.start_keyboard_type,
+            created_at=ProjectModel.created_at,
+            dialogues=cls._build_json_array(
+                select(func.jsonb_agg(aggregate_order_by(cls._get_dialogue_json(), DialogueModel.dialogue_id)))
+                .join(DialogueModel.trigger)
+                .where(DialogueModel.project_id == ProjectModel.project_id)
+            ),
+            plugins=cls._build_json_array(
+                select(func.jsonb_agg(aggregate_order_by(cls._get_plugin_json(), PluginModel.plugin_id)))
+                .join(projects_plugins, projects_plugins.c.plugin_id == PluginModel.plugin_id)
+                .where(projects_plugins.c.project_id == ProjectModel.project_id)
+            ),
+        )
+
+    @classmethod
+    def _get_dialogue_json(cls) -> ColumnElement:
+        blocks_table = BlockModel.__table__
+        blocks_with_details = blocks_table
+        for block_model in BlockModel.__subclasses__():
+            block_details_table = block_model.__table__
+            blocks_with_details = blocks_with_details.outerjoin(
+                block_details_table,
+                block_details_table.c.block_id == blocks_table.c.block_id,
+            )
+
+        return cls._build_json_object(
+            dialogue_id=DialogueModel.dialogue_id,
+            project_id=DialogueModel.project_id,
+            created_at=DialogueModel.created_at,
+            trigger=cls._build_json_object(
+                trigger_id=DialogueTriggerModel.trigger_id,
+                event_type=DialogueTriggerModel.event_type,
+                value=DialogueTriggerModel.value,
+            ),
+            blocks=cls._build_json_array(
+                select(func.jsonb_agg(aggregate_order_by(cls._get_block_json(), blocks_table.c.sequence_number)))
+                .select_from(blocks_with_details)
+                .where(blocks_table.c.dialogue_id == DialogueModel.dialogue_id)
+            ),
+        )
+
+    @classmethod
+    def _get_block_json(cls) -> ColumnElement:
+        # Every block type keeps its own fields in a separate table, so only the matching one is merged in
+        blocks_table = BlockModel.__table__
+        block_details = []
+        for block_model in BlockModel.__subclasses__():
+            block_details_json = cls._build_json_object(
+                **{column.name: column for column in block_model.__table__.c if column.name != 'block_id'}
+            )
+            block_type = block_model.__mapper__.polymorphic_identity
+            block_details.append((blocks_table.c.type == block_type, block_details_json))
+
+        block_json = cls._build_json_object(
+            block_id=blocks_table.c.block_id,
+            sequence_number=blocks_table.c.sequence_number,
+            type=blocks_table.c.type,
+        )
+        return block_json.op('||', return_type=JSONB)(case(*block_details, else_=literal({}, JSONB)))
+
+    @classmethod
+    def _get_plugin_json(cls) -> ColumnElement:
+        plugin_trigger_json = cls._build_json_object(
+            trigger_id=PluginTriggerModel.trigger_id,
+            event_type=PluginTriggerModel.event_type,
+            value=PluginTriggerModel.value,
+            is_admin=PluginTriggerModel.is_admin,
+        )
+        plugin_triggers_query = select(
+            func.jsonb_agg(aggregate_order_by(plugin_trigger_json, PluginTriggerModel.trigger_id))
+        ).where(PluginTriggerModel.plugin_id == PluginModel.plugin_id)
+        return cls._build_json_object(
+            plugin_id=PluginModel.plugin_id,
+            name=PluginModel.name,
+            summary=PluginModel.summary,
+            image_path=PluginModel.image_path,
+            created_at=PluginModel.created_at,
+            handlers_file_path=PluginModel.handlers_file_path,
+            db_funcs_file_path=PluginModel.db_funcs_file_path,
+            readme_file_path=PluginModel.readme_file_path,
+            triggers=cls._build_json_array(plugin_triggers_query),
+        )
+
+    @staticmethod
+    def _build_json_object(**fields: ColumnElement) -> ColumnElement:
+        # Keys are inlined, they are identifiers from the code and must not turn into dozens of bind parameters
+        arguments = [argument for name, value in fields.items() for argument in (literal_column(f"'{name}'"), value)]
+        return func.jsonb_build_object(*arguments, type_=JSONB)
+
+    @staticmethod
+    def _build_json_array(query: Select) -> ColumnElement:
+        return func.coalesce(query.scalar_subquery(), literal([], JSONB), type_=JSONB)
+
+    @classmethod
+    def _project_json_to_dto(cls, project: dict[str, Any]) -> ProjectCodeGenReadDTO:
+        return ProjectCodeGenReadDTO(
+            project_id=project['project_id'],
+            user_id=UUID(project['user_id']),
+            name=project['name'],
+            start_message=project['start_message'],
+            start_keyboard_type=KeyboardType[project['start_keyboard_type']],
+            created_at=datetime.fromisoformat(project['created_at']),
+            dialogues=[cls._dialogue_json_to_dto(dialogue) for dialogue in project['dialogues']],
+            plugins=[cls._plugin_json_to_dto(plugin) for plugin in project['plugins']],
+        )
+
+    @classmethod
+    def _dialogue_json_to_dto(cls, dialogue: dict[str, Any]) -> DialogueWithBlocksReadDTO:
+        trigger = dialogue['trigger']
+        return DialogueWithBlocksReadDTO(
+            dialogue_id=dialogue['dialogue_id'],
+            project_id=dialogue['project_id'],
+            created_at=datetime.fromisoformat(dialogue['created_at']),
+            trigger=DialogueTriggerReadDTO(
+                trigger_id=trigger['trigger_id'],
+                event_type=TriggerEventType[trigger['event_type']],
+                value=trigger['value'],
+            ),
+            blocks=[cls._block_json_to_dto(block) for block in dialogue['blocks']],
+        )
+
+    @staticmethod
+    def _block_json_to_dto(block: dict[str, Any]) -> BlockReadDTO:
+        block_dto = get_block_read_dto_by_type(BlockType(block['type']))
+        for field, enum_type in BLOCK_ENUM_FIELDS.items():
+            if block.get(field) is not None:
+                block[field] = enum_type[block[field]]
+        return block_dto(**block)
+
+    @staticmethod
+    def _plugin_json_to_dto(plugin: dict[str, Any]) -> PluginReadDTO:
+        triggers = [
+            PluginTriggerReadDTO(
+                trigger_id=trigger['trigger_id'],
+                event_type=TriggerEventType[trigger['event_type']],
+                value=trigger['value'],
+                is_admin=trigger['is_admin'],
+            )
+            for trigger in plugin['triggers']
+        ]
+        return PluginReadDTO(
+            plugin_id=plugin['plugin_id'],
+            name=plugin['name'],
+            summary=plugin['summary'],
+            image_path=plugin['image_path'],
+            created_at=datetime.fromisoformat(plugin['created_at']),
+            handlers_file_path=plugin['handlers_file_path'],
+            db_funcs_file_path=plugin['db_funcs_file_path'],
+            readme_file_path=plugin['readme_file_path'],
+            triggers=triggers,
         )
-        project = project.scalar()
-        if project is None:
-            return None
-        return project.to_code_gen_dto()
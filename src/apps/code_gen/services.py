@@ -1,32 +1,27 @@
-import io
-import zipfile
-from pathlib import Path
-from typing import Optional
+import difflib
+from typing import AsyncIterator, Optional
 from uuid import UUID
 
-from jinja2 import Template, Environment, FileSystemLoader
+import anyio
 
+from src.apps.code_gen.archives import stream_bot_code_zip, stream_bot_codes_export_zip
+from src.apps.code_gen.cache import get_project_code_hash, get_dialogue_code_fragment_cache
+from src.apps.code_gen.dependencies.cache_dependencies import CodeGenZipCacheDI
+from src.apps.code_gen.dependencies.events_dependencies import CodePreviewEventsDI
 from src.apps.code_gen.dependencies.repositories_dependencies import CodeGenRepositoryDI
-from src.apps.code_gen.dto import ProjectCodeGenReadDTO
+from src.apps.code_gen.dto import ProjectCodeGenReadDTO, CodePreviewUpdateDTO
+from src.apps.code_gen.generators import BotCodeGenerator, get_code_gen_limiter
 from src.apps.dialogues.errors import DialoguesLimitExceededError
 from src.apps.plugins.errors import PluginsNotAvailableForFreeUsersError
-from src.apps.enums import (
-    KeyboardType,
-    HandlerType,
-    BlockType,
-    TriggerEventType,
-    AnswerMessageType,
-    HTTPMethod,
-    AiohttpSessionMethod,
-)
-from src.api.v1.code_gen.schemas import HandlerSchema, StateSchema, StatesGroupSchema, KeyboardSchema
 from src.apps.projects.errors import ProjectNotFoundError, NoPermissionForProjectError
 from src.apps.subscriptions.dependencies import SubscriptionServiceDI
-from src.core.config import BOT_TEMPLATES_DIR, MEDIA_DIR
+from src.apps.users.dependencies.services_dependencies import UserServiceDI
+from src.apps.users.errors import DontHavePermissionError
+from src.core.config import settings
 from src.core.consts import MAX_DIALOGUES_WITH_FREE_PLAN
 from src.infrastructure.db.dependencies import AsyncSessionDI
-from src.apps.code_gen.bot_templates import code
-from src.apps.blocks.utils import escape_inner_text
+
+CUSTOM_HANDLERS_FILE_PATH = 'handlers/custom.py'
 
 
 class CodeGenService:
@@ -35,12 +30,18 @@ class CodeGenService:
         session: AsyncSessionDI,
         subscription_service: SubscriptionServiceDI,
         code_gen_repository: CodeGenRepositoryDI,
+        zip_cache: CodeGenZipCacheDI,
+        code_preview_events: CodePreviewEventsDI,
+        user_service: UserServiceDI,
     ):
         self._session = session
         self._subscription_service = subscription_service
         self._code_gen_repository = code_gen_repository
+        self._zip_cache = zip_cache
+        self._code_preview_events = code_preview_events
+        self._user_service = user_service
 
-    async def get_bot_code_in_zip(self, user_id: UUID, project_id: int) -> io.BytesIO:
+    async def get_bot_code_in_zip(self, user_id: UUID, project_id: int) -> AsyncIterator[bytes]:
         project = await self._get_project_to_generate_code(user_id=user_id, project_id=project_id)
 
         active_subscription = await self._subscription_service.get_active_subscription(user_id)
@@ -50,333 +51,100 @@ class CodeGenService:
             if len(project.dialogues) > MAX_DIALOGUES_WITH_FREE_PLAN:
                 raise DialoguesLimitExceededError
 
-        custom_handlers_code = self._generate_custom_handlers_code(project)
-        custom_handlers_path = Path('handlers') / 'custom.py'
-
-        zip_data = io.BytesIO()
-        # TODO: anyio.to_thread
-        with zipfile.ZipFile(zip_data, mode='w') as zipf:
-            zipf.writestr(str(custom_handlers_path), custom_handlers_code)
-
-            self._add_plugins_code_to_zip(project, zipf)
-            self._add_images_to_zip(project, zipf)
-
-            template_paths = [
-                'main.py.j2',
-                'loader.py.j2',
-                'config.py.j2',
-                Path('db/base.py.j2'),
-                'middlewares.py.j2',
-                '.env.example',
-                'requirements.txt',
-                'Dockerfile',
-                'ИНСТРУКЦИЯ.txt',
-            ]
-            for path in template_paths:
-                zipf.write(BOT_TEMPLATES_DIR / path, str(path).removesuffix('.j2'))
-
-        zip_data.seek(0)
-        return zip_data
-
-    # TODO refactoring
-    def _add_plugins_code_to_zip(self, project: ProjectCodeGenReadDTO, zip_file: zipfile.ZipFile):
-        handlers_file_names = []
-        db_funcs_file_names = []
-
-        for plugin in project.plugins:
-            handlers_file_name_without_j2_extension = Path(plugin.handlers_file_path).stem
-            zip_file.write(
-                filename=BOT_TEMPLATES_DIR / plugin.handlers_file_path,
-                arcname=Path('handlers') / handlers_file_name_without_j2_extension,
-            )
-            handlers_file_names.append(handlers_file_name_without_j2_extension)
-
-            db_funcs_file_name_without_j2_extension = Path(plugin.db_funcs_file_path).stem
-            zip_file.write(
-                filename=BOT_TEMPLATES_DIR / plugin.db_funcs_file_path,
-                arcname=Path('db') / db_funcs_file_name_without_j2_extension,
-            )
-            db_funcs_file_names.append(db_funcs_file_name_without_j2_extension)
-
-        handlers_init_template = self._get_template(BOT_TEMPLATES_DIR / 'handlers' / '__init__.py.j2')
-        handlers_init_code = handlers_init_template.render(handlers_file_names=handlers_file_names)
-        zip_file.writestr(str(Path('handlers') / '__init__.py'), handlers_init_code)
-
-        db_funcs_init_template = self._get_template(BOT_TEMPLATES_DIR / 'db' / '__init__.py.j2')
-        db_funcs_init_code = db_funcs_init_template.render(db_funcs_file_names=db_funcs_file_names)
-        zip_file.writestr(str(Path('db') / '__init__.py'), db_funcs_init_code)
-
-    @staticmethod
-    def _add_images_to_zip(project: ProjectCodeGenReadDTO, zip_file: zipfile.ZipFile):
-        for dialogue in project.dialogues:
-            for block in dialogue.blocks:
-                if block.type == BlockType.IMAGE_BLOCK:
-                    # TODO: fix type hint
-                    image_path = MEDIA_DIR / block.image_path
-                    zip_file.write(image_path, Path('img') / Path(block.image_path).name)
-
-    # TODO refactoring
-    # TODO add customize env variables
-    # TODO change start func call
-    def _generate_custom_handlers_code(self, project: ProjectCodeGenReadDTO) -> str:
-        utils_funcs = set()
-        states_groups: list[StatesGroupSchema] = []
-        handlers: list[HandlerSchema] = []
-        commands_values: list[str] = []
-
-        start_keyboard = self._get_start_keyboard(project.start_keyboard_type)
-
-        for dialogue in project.dialogues:
-            if not dialogue.trigger.value:
-                continue
-
-            states_group = None
-
-            handler = HandlerSchema()
-            handler.signature = code.func_signature_for_common_handler_with_msg.format(
-                trigger_event_type=dialogue.trigger.event_type.value,
-                dialogue_id=dialogue.dialogue_id,
-            )
-
-            if dialogue.trigger.event_type == TriggerEventType.COMMAND:
-                commands_values.append(dialogue.trigger.value)
-                handler.decorator = code.command_decorator.format(trigger_value=dialogue.trigger.value)
-
-            elif dialogue.trigger.event_type == TriggerEventType.BUTTON:
-                if project.start_keyboard_type == KeyboardType.INLINE_KEYBOARD:
-                    start_keyboard.add_to_buttons(code.inline_keyboard_button.format(text=dialogue.trigger.value))
-                    handler.decorator = code.callback_button_decorator.format(trigger_value=dialogue.trigger.value)
-                    handler.signature = code.func_signature_for_callback_handler_with_callback.format(
-                        trigger_event_type=dialogue.trigger.event_type.value,
-                        dialogue_id=dialogue.dialogue_id,
-                    )
-                    handler.type = HandlerType.CALLBACK
-                    handler.add_to_body(code.callback_answer)
-                    handler.add_to_body(code.callback_message)
-                else:
-                    start_keyboard.add_to_buttons(code.reply_keyboard_button.format(text=dialogue.trigger.value))
-                    handler.decorator = code.text_button_decorator.format(trigger_value=dialogue.trigger.value)
-
-            elif dialogue.trigger.event_type == TriggerEventType.TEXT:
-                handler.decorator = code.text_decorator.format(trigger_value=dialogue.trigger.value)
-
-            if not dialogue.blocks:
-                handler.add_to_body('pass')
-
-            dialogue_blocks = sorted(dialogue.blocks, key=lambda x: x.sequence_number)
-            for block in dialogue_blocks:
-                if block.is_draft:
-                    continue
-
-                if block.type == BlockType.TEXT_BLOCK:
-                    handler.add_to_body(code.message_answer.format(message_text=escape_inner_text(block.message_text)))
-
-                elif block.type == BlockType.IMAGE_BLOCK:
-                    image_path_in_bot_project = Path('img') / Path(block.image_path).name
-                    handler.add_to_body(code.image_block.format(image_path=image_path_in_bot_project))
-
-                elif block.type == BlockType.QUESTION_BLOCK:
-                    if states_group is None:
-                        state = StateSchema(name=f'state_from_block{block.sequence_number}')
-                        states_group = StatesGroupSchema(name=f'StatesGroup{len(states_groups) + 1}', states=[state])
-                        states_groups.append(states_group)
-
-                        handler.add_to_body(
-                            code.message_answer_with_reply_kb_remove.format(
-                                message_text=escape_inner_text(block.message_text)
-                            )
-                        )
+        if self._zip_cache is None:
+            return stream_bot_code_zip(project)
 
-                        handler.add_to_body(
-                            code.set_state.format(states_group_name=states_group.name, state_name=state.name)
-                        )
+        cache_key = await anyio.to_thread.run_sync(get_project_code_hash, project)
+        cached_zip = await self._zip_cache.get(cache_key)
+        if cached_zip is not None:
+            return cached_zip
 
-                        if handler.type == HandlerType.CALLBACK:
-                            handler.signature = code.func_signature_for_callback_handler_with_callback_and_state.format(
-                                trigger_event_type=dialogue.trigger.event_type.value,
-                                dialogue_id=dialogue.dialogue_id,
-                            )
-                        elif handler.type == HandlerType.MESSAGE:
-                            handler.signature = code.func_signature_for_common_handler_with_msg_and_state.format(
-                                trigger_event_type=dialogue.trigger.event_type.value,
-                                dialogue_id=dialogue.dialogue_id,
-                            )
+        return self._zip_cache.store(cache_key, stream_bot_code_zip(project))
 
-                        handlers.append(handler)
-                    else:
-                        state = StateSchema(name=f'state_from_block{block.sequence_number}')
-                        states_groups[-1].states.append(state)
-
-                        handler.add_to_body(
-                            code.message_answer_with_reply_kb_remove.format(
-                                message_text=escape_inner_text(block.message_text)
-                            )
-                        )
-                        handler.add_to_body(
-                            code.set_state.format(states_group_name=states_group.name, state_name=state.name)
-                        )
-                        handlers.append(handler)
-
-                    handler = HandlerSchema()
-                    handler.decorator = code.state_decorator.format(
-                        states_group_name=states_group.name,
-                        state_name=state.name,
-                    )
-                    handler.signature = code.func_signature_for_state_handler_with_msg_and_state.format(
-                        state_name=state.name,
-                        dialogue_id=dialogue.dialogue_id,
-                    )
-
-                    answer_type_check_code = self._get_answer_type_check_code(block.answer_type)
-                    if answer_type_check_code is not None:
-                        handler.add_to_body(answer_type_check_code)
-
-                    utils_func_code_for_answer_type_check = self._get_utils_func_code_for_answer_type_check(
-                        block.answer_type
-                    )
-                    if utils_func_code_for_answer_type_check is not None:
-                        utils_funcs.add(utils_func_code_for_answer_type_check)
-
-                    handler.add_to_body(code.update_state_data.format(answer_num=len(states_group.states)))
-                    handler.add_to_body(code.get_state_data)
-
-                elif block.type == BlockType.EMAIL_BLOCK.value:
-                    handler.add_to_body(
-                        code.email_block.format(
-                            recipient_email=escape_inner_text(block.recipient_email),
-                            subject=escape_inner_text(block.subject),
-                            text=escape_inner_text(block.text),
-                        )
-                    )
-
-                    utils_funcs.add(code.send_email.strip())
-                    utils_funcs.add(code.is_answer_from_user.strip())
-
-                elif block.type == BlockType.CSV_BLOCK:
-                    handler.add_to_body(
-                        code.csv_block.format(
-                            file_path=block.file_path,
-                            data=block.data,
-                        )
-                    )
-
-                elif block.type == BlockType.EXCEL_BLOCK:
-                    handler.add_to_body(
-                        code.excel_block.format(
-                            file_path=block.file_path,
-                            data=block.data,
-                        )
-                    )
-
-                elif block.type == BlockType.API_BLOCK:
-                    aiohttp_session_method = self._get_aiohttp_session_method(block.http_method)
-
-                    handler.add_to_body(
-                        code.api_block.format(
-                            aiohttp_session_method=aiohttp_session_method.value,
-                            url=block.url,
-                            headers=block.headers,
-                            body=block.body,
-                        )
-                    )
-
-            if states_group:
-                handler.add_to_body(code.clear_state)
-
-            handler.add_to_body(code.call_start_func)
-            handlers.append(handler)
-
-        admin_keyboard = self._get_start_keyboard(project.start_keyboard_type)
-        for plugin in project.plugins:
-            for trigger in plugin.triggers:
-                if trigger.event_type == TriggerEventType.BUTTON:
-                    if trigger.is_admin:
-                        keyboard = admin_keyboard
-                    else:
-                        keyboard = start_keyboard
-
-                    if project.start_keyboard_type == KeyboardType.INLINE_KEYBOARD:
-                        keyboard.add_to_buttons(code.inline_keyboard_button.format(text=trigger.value))
-                    else:
-                        keyboard.add_to_buttons(code.reply_keyboard_button.format(text=trigger.value))
-
-        template = self._get_template(BOT_TEMPLATES_DIR / 'handlers' / 'custom.py.j2')
-        bot_code = template.render(
-            {
-                'utils_funcs': utils_funcs,
-                'states_groups': states_groups,
-                'handlers': handlers,
-                'commands_values': commands_values,
-                'start_keyboard': start_keyboard,
-                'admin_keyboard': admin_keyboard,
-                'start_message': escape_inner_text(project.start_message) if project.start_message else 'Главное меню',
-            }
+    async def export_bot_codes_in_zip(
+        self,
+        user_id: UUID,
+        project_ids: Optional[list[int]] = None,
+        owner_id: Optional[UUID] = None,
+    ) -> AsyncIterator[bytes]:
+        user = await self._user_service.get_user_by_id(user_id)
+        if not user.is_superuser:
+            raise DontHavePermissionError
+
+        projects = await self._code_gen_repository.get_projects_to_generate_code(
+            project_ids=project_ids,
+            user_id=owner_id,
         )
-        return bot_code
+        if not projects:
+            raise ProjectNotFoundError
 
-    @staticmethod
-    def _get_start_keyboard(keyboard_type: KeyboardType) -> KeyboardSchema:
-        if keyboard_type == KeyboardType.INLINE_KEYBOARD:
-            declaration = code.inline_keyboard_declaration
-        else:
-            declaration = code.reply_keyboard_declaration
-        return KeyboardSchema(type=keyboard_type, declaration=declaration)
+        missing_project_ids = []
+        if project_ids is not None:
+            missing_project_ids = sorted(set(project_ids) - {project.project_id for project in projects})
 
-    @staticmethod
-    def _get_answer_type_check_code(
-        answer_type: AnswerMessageType,
-    ) -> Optional[str]:
-        types_to_code = {
-            AnswerMessageType.ANY: None,
-            AnswerMessageType.TEXT: code.answer_text_type_check,
-            AnswerMessageType.INT: code.answer_int_type_check,
-            AnswerMessageType.EMAIL: code.answer_email_type_check,
-            AnswerMessageType.PHONE_NUMBER: code.answer_phone_number_type_check,
-        }
-        return types_to_code[answer_type]
+        # Everything is loaded upfront, so the connection is not held while archives are being generated
+        await self._session.close()
+        return stream_bot_codes_export_zip(projects, missing_project_ids=missing_project_ids)
 
-    @staticmethod
-    def _get_utils_func_code_for_answer_type_check(
-        answer_type: AnswerMessageType,
-    ) -> Optional[str]:
-        types_to_code = {
-            AnswerMessageType.ANY: None,
-            AnswerMessageType.TEXT: None,
-            AnswerMessageType.INT: None,
-            AnswerMessageType.EMAIL: code.is_email.strip(),
-            AnswerMessageType.PHONE_NUMBER: code.is_phone_number.strip(),
-        }
-        return types_to_code[answer_type]
+    async def get_custom_handlers_code(self, user_id: UUID, project_id: int) -> str:
+        project = await self._get_project_to_generate_code(user_id=user_id, project_id=project_id)
+        generator = BotCodeGenerator(fragment_cache=get_dialogue_code_fragment_cache())
+        return await anyio.to_thread.run_sync(
+            generator.generate_custom_handlers_code,
+            project,
+            limiter=get_code_gen_limiter(),
+        )
 
-    @staticmethod
-    def _get_aiohttp_session_method(
-        http_method: HTTPMethod,
-    ) -> AiohttpSessionMethod:
-        http_methods_to_aiohttp_methods = {
-            http_method.GET: AiohttpSessionMethod.GET,
-            http_method.POST: AiohttpSessionMethod.POST,
-            http_method.PUT: AiohttpSessionMethod.PUT,
-            http_method.DELETE: AiohttpSessionMethod.DELETE,
-            http_method.PATCH: AiohttpSessionMethod.PATCH,
-            http_method.CONNECT: AiohttpSessionMethod.CONNECT,
-            http_method.HEAD: AiohttpSessionMethod.HEAD,
-            http_method.OPTIONS: AiohttpSessionMethod.OPTIONS,
-        }
-        return http_methods_to_aiohttp_methods[http_method]
+    async def get_custom_handlers_code_updates(
+        self,
+        user_id: UUID,
+        project_id: int,
+    ) -> AsyncIterator[Optional[CodePreviewUpdateDTO]]:
+        _ = await self._get_project_to_generate_code(user_id=user_id, project_id=project_id)
+        await self._session.close()
+        return self._iter_custom_handlers_code_updates(user_id=user_id, project_id=project_id)
+
+    async def _iter_custom_handlers_code_updates(
+        self,
+        user_id: UUID,
+        project_id: int,
+    ) -> AsyncIterator[Optional[CodePreviewUpdateDTO]]:
+        # None is yielded when nothing has changed for a while, so the caller can keep the connection alive
+        async with self._code_preview_events.subscribe_to_project_changes(project_id) as subscription:
+            bot_code = await self._get_fresh_custom_handlers_code(user_id=user_id, project_id=project_id)
+            if bot_code is None:
+                return
+            yield CodePreviewUpdateDTO(code=bot_code)
+
+            while True:
+                message = await subscription.get_message(timeout=settings.CODE_GEN_PREVIEW_KEEPALIVE_INTERVAL)
+                if message is None:
+                    yield None
+                    continue
 
-    # TODO: remove from service
-    # TODO: async
-    @staticmethod
-    def _get_template(file_path: Path) -> Template:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            template_str = f.read()
+                updated_bot_code = await self._get_fresh_custom_handlers_code(user_id=user_id, project_id=project_id)
+                if updated_bot_code is None:
+                    return
+                if updated_bot_code == bot_code:
+                    continue
 
-        env = Environment(
-            loader=FileSystemLoader(Path('src', 'code_gen', 'bot_templates')),
-            trim_blocks=True,
-            lstrip_blocks=True,
-        )
-        return env.from_string(template_str)
+                diff = difflib.unified_diff(
+                    bot_code.splitlines(keepends=True),
+                    updated_bot_code.splitlines(keepends=True),
+                    fromfile=CUSTOM_HANDLERS_FILE_PATH,
+                    tofile=CUSTOM_HANDLERS_FILE_PATH,
+                )
+                bot_code = updated_bot_code
+                yield CodePreviewUpdateDTO(code=bot_code, diff=''.join(diff))
+
+    async def _get_fresh_custom_handlers_code(self, user_id: UUID, project_id: int) -> Optional[str]:
+        try:
+            return await self.get_custom_handlers_code(user_id=user_id, project_id=project_id)
+        except (ProjectNotFoundError, NoPermissionForProjectError):
+            return None
+        finally:
+            # The stream lives much longer than a request, so the connection and the stale identity map are released
+            await self._session.close()
 
     async def _get_project_to_generate_code(self, user_id: UUID, project_id: int) -> Optional[ProjectCodeGenReadDTO]:
         project = await self._code_gen_repository.get_project_to_generate_code(project_id)
@@ -0,0 +1,32 @@
+import functools
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+from src.core.config import settings, BOT_TEMPLATES_DIR, JINJA_BYTECODE_CACHE_DIR
+
+RENDERED_TEMPLATE_NAMES = [
+    'handlers/custom.py.j2',
+    'handlers/__init__.py.j2',
+    'db/__init__.py.j2',
+]
+
+
+@functools.cache
+def get_templates_environment() -> Environment:
+    JINJA_BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(BOT_TEMPLATES_DIR),
+        bytecode_cache=FileSystemBytecodeCache(str(JINJA_BYTECODE_CACHE_DIR)),
+        auto_reload=settings.DEBUG,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+
+
+def get_template(name: str) -> Template:
+    return get_templates_environment().get_template(name)
+
+
+def load_templates():
+    for name in RENDERED_TEMPLATE_NAMES:
+        get_template(name)
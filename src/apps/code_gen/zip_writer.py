@@ -0,0 +1,218 @@
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+_LOCAL_FILE_HEADER = struct.Struct('<IHHHHHIIIHH')
+_LOCAL_FILE_HEADER_SIGNATURE = 0x04034B50
+_CENTRAL_DIRECTORY_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+_CENTRAL_DIRECTORY_HEADER_SIGNATURE = 0x02014B50
+_END_OF_CENTRAL_DIRECTORY = struct.Struct('<IHHHHIIH')
+_END_OF_CENTRAL_DIRECTORY_SIGNATURE = 0x06054B50
+
+_VERSION = 20
+_VERSION_MADE_BY_UNIX = (3 << 8) | _VERSION
+_UTF8_FLAG = 0x800
+_FILE_EXTERNAL_ATTR = 0o100644 << 16
+_ZIP_MAX_SIZE = 0xFFFFFFFF
+_ZIP_MAX_ENTRIES = 0xFFFF
+
+
+@dataclass(frozen=True)
+class ZipEntry:
+    name: str
+    compress_type: int
+    crc: int
+    file_size: int
+    compressed_size: int
+    date_time: tuple[int, int, int, int, int, int]
+    data: bytes
+
+
+def build_zip_entry(
+    name: str,
+    content: bytes,
+    compress_type: int = ZIP_DEFLATED,
+    date_time: tuple[int, int, int, int, int, int] | None = None,
+) -> ZipEntry:
+    if compress_type == ZIP_DEFLATED:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        data = compressor.compress(content) + compressor.flush()
+    else:
+        data = content
+
+    return ZipEntry(
+        name=name,
+        compress_type=compress_type,
+        crc=zlib.crc32(content),
+        file_size=len(content),
+        compressed_size=len(data),
+        date_time=date_time or time.localtime()[:6],
+        data=data,
+    )
+
+
+def build_zip_entry_from_file(name: str, path: Path, compress_type: int = ZIP_DEFLATED) -> ZipEntry:
+    return build_zip_entry(
+        name=name,
+        content=path.read_bytes(),
+        compress_type=compress_type,
+        date_time=time.localtime(path.stat().st_mtime)[:6],
+    )
+
+
+@dataclass(frozen=True)
+class _CentralDirectoryRecord:
+    name: bytes
+    flags: int
+    compress_type: int
+    dos_time: int
+    dos_date: int
+    crc: int
+    file_size: int
+    compressed_size: int
+    offset: int
+
+
+class ZipStreamWriter:
+    # Writes every entry with known CRC and sizes, so the output never needs seeking or data descriptors
+    def __init__(self):
+        self._offset = 0
+        self._central_directory: list[_CentralDirectoryRecord] = []
+
+    def write_entry(self, entry: ZipEntry) -> Iterator[bytes]:
+        yield self._start_entry(
+            name=entry.name,
+            compress_type=entry.compress_type,
+            crc=entry.crc,
+            file_size=entry.file_size,
+            compressed_size=entry.compressed_size,
+            date_time=entry.date_time,
+        )
+        yield entry.data
+        self._offset += entry.compressed_size
+
+    def write_file(self, name: str, path: Path, chunk_size: int) -> Iterator[bytes]:
+        # Stored as is: the file is read twice (CRC first, then data) to keep memory bounded by chunk_size
+        crc = 0
+        file_size = 0
+        with open(path, 'rb') as f:
+            while data := f.read(chunk_size):
+                crc = zlib.crc32(data, crc)
+                file_size += len(data)
+
+        yield self._start_entry(
+            name=name,
+            compress_type=ZIP_STORED,
+            crc=crc,
+            file_size=file_size,
+            compressed_size=file_size,
+            date_time=time.localtime(path.stat().st_mtime)[:6],
+        )
+        with open(path, 'rb') as f:
+            written = 0
+            while written < file_size and (data := f.read(min(chunk_size, file_size - written))):
+                written += len(data)
+                yield data
+        if written != file_size:
+            raise RuntimeError(f'File {path} was changed while writing to archive')
+        self._offset += file_size
+
+    def close(self) -> Iterator[bytes]:
+        if len(self._central_directory) > _ZIP_MAX_ENTRIES:
+            raise ValueError('Too many entries for ZIP archive without ZIP64')
+
+        central_directory_offset = self._offset
+        central_directory_size = 0
+        for record in self._central_directory:
+            header = _CENTRAL_DIRECTORY_HEADER.pack(
+                _CENTRAL_DIRECTORY_HEADER_SIGNATURE,
+                _VERSION_MADE_BY_UNIX,
+                _VERSION,
+                record.flags,
+                record.compress_type,
+                record.dos_time,
+                record.dos_date,
+                record.crc,
+                record.compressed_size,
+                record.file_size,
+                len(record.name),
+                0,
+                0,
+                0,
+                0,
+                _FILE_EXTERNAL_ATTR,
+                record.offset,
+            )
+            central_directory_size += len(header) + len(record.name)
+            yield header + record.name
+
+        yield _END_OF_CENTRAL_DIRECTORY.pack(
+            _END_OF_CENTRAL_DIRECTORY_SIGNATURE,
+            0,
+            0,
+            len(self._central_directory),
+            len(self._central_directory),
+            central_directory_size,
+            central_directory_offset,
+            0,
+        )
+
+    def _start_entry(
+        self,
+        name: str,
+        compress_type: int,
+        crc: int,
+        file_size: int,
+        compressed_size: int,
+        date_time: tuple[int, int, int, int, int, int],
+    ) -> bytes:
+        if self._offset + compressed_size > _ZIP_MAX_SIZE or file_size > _ZIP_MAX_SIZE:
+            raise ValueError('Archive is too large for ZIP without ZIP64')
+
+        encoded_name = name.encode('utf-8')
+        flags = 0 if name.isascii() else _UTF8_FLAG
+        dos_time, dos_date = self._get_dos_time_and_date(date_time)
+
+        self._central_directory.append(
+            _CentralDirectoryRecord(
+                name=encoded_name,
+                flags=flags,
+                compress_type=compress_type,
+                dos_time=dos_time,
+                dos_date=dos_date,
+                crc=crc,
+                file_size=file_size,
+                compressed_size=compressed_size,
+                offset=self._offset,
+            )
+        )
+
+        header = _LOCAL_FILE_HEADER.pack(
+            _LOCAL_FILE_HEADER_SIGNATURE,
+            _VERSION,
+            flags,
+            compress_type,
+            dos_time,
+            dos_date,
+            crc,
+            compressed_size,
+            file_size,
+            len(encoded_name),
+            0,
+        )
+        self._offset += len(header) + len(encoded_name)
+        return header + encoded_name
+
+    @staticmethod
+    def _get_dos_time_and_date(date_time: tuple[int, int, int, int, int, int]) -> tuple[int, int]:
+        year, month, day, hour, minute, second = date_time
+        year = max(year, 1980)
+        dos_date = (year - 1980) << 9 | month << 5 | day
+        dos_time = hour << 11 | minute << 5 | second // 2
+        return dos_time, dos_date
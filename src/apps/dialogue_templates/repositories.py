@@ -3,12 +3,13 @@ from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload, selectinload, DeclarativeBase
 
-from src.apps.blocks.models import BlockModel
+from src.apps.blocks.models import BlockModel, ImageBlockModel
 from src.apps.dialogue_templates.dto import DialogueTemplateReadDTO
 from src.core.base_repository import BaseRepository
 from src.apps.dialogue_templates.models import DialogueTemplateModel
 from src.apps.blocks import utils
 from src.apps.dialogues.models import DialogueModel, DialogueTriggerModel
+from src.apps.media.utils import get_block_image_paths
 
 
 class DialogueTemplateRepository(BaseRepository):
@@ -27,6 +28,15 @@ class DialogueTemplateRepository(BaseRepository):
             return None
         return template.to_dto()
 
+    async def get_template_image_paths(self, template_id: int) -> list[str]:
+        image_paths = await self._session.execute(
+            select(ImageBlockModel.image_path, ImageBlockModel.original_image_path, ImageBlockModel.thumbnail_path)
+            .select_from(ImageBlockModel)
+            .join(DialogueTemplateModel, DialogueTemplateModel.dialogue_id == BlockModel.dialogue_id)
+            .where(DialogueTemplateModel.template_id == template_id)
+        )
+        return [path for block_image_paths in image_paths.all() for path in get_block_image_paths(*block_image_paths)]
+
     async def create_dialogue_from_template(self, project_id: int, template_id: int):
         template = await self._session.execute(
             select(DialogueTemplateModel)
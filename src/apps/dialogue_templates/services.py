@@ -1,9 +1,11 @@
 from uuid import UUID
 
+from src.apps.code_gen.dependencies.events_dependencies import CodePreviewEventsDI
 from src.apps.dialogue_templates.dependencies.repositories_dependencies import DialogueTemplateRepositoryDI
 from src.apps.dialogue_templates.dto import DialogueTemplateReadDTO
 from src.apps.dialogue_templates.errors import DialogueTemplateNotFoundError
 from src.apps.dialogues.errors import DialoguesLimitExceededError
+from src.apps.media.dependencies.services_dependencies import MediaServiceDI
 from src.apps.projects.dependencies.services_dependencies import ProjectServiceDI
 from src.apps.subscriptions.dependencies.services_dependencies import SubscriptionServiceDI
 from src.core.consts import MAX_DIALOGUES_WITH_FREE_PLAN, MAX_DIALOGUES_WITH_PRO_PLAN
@@ -17,10 +19,14 @@ class DialogueTemplateService:
         dialogue_template_repository: DialogueTemplateRepositoryDI,
         project_service: ProjectServiceDI,
         subscription_service: SubscriptionServiceDI,
+        code_preview_events: CodePreviewEventsDI,
+        media_service: MediaServiceDI,
     ):
         self._dialogue_template_repository = dialogue_template_repository
         self._project_service = project_service
         self._subscription_service = subscription_service
+        self._code_preview_events = code_preview_events
+        self._media_service = media_service
 
     async def get_templates(self, page: int) -> list[DialogueTemplateReadDTO]:
         return await self._dialogue_template_repository.get_templates(
@@ -45,7 +51,11 @@ class DialogueTemplateService:
 
         _ = await self.get_template(template_id)
 
+        # Images of the template are shared with the new dialogue instead of being copied
+        image_paths = await self._dialogue_template_repository.get_template_image_paths(template_id)
+        await self._media_service.acquire_images(image_paths)
         await self._dialogue_template_repository.create_dialogue_from_template(
             project_id=project_id,
             template_id=template_id,
         )
+        await self._code_preview_events.notify_project_changed(project_id)
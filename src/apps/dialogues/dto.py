@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
+from uuid import UUID
 
 from src.apps.enums import TriggerEventType
 
@@ -38,3 +39,9 @@ class DialogueReadDTO(DialogueCreateDTO):
     dialogue_id: int
     trigger: DialogueTriggerReadDTO
     created_at: datetime
+
+
+@dataclass(frozen=True)
+class DialogueOwnerReadDTO:
+    user_id: UUID
+    dialogue_exists: bool
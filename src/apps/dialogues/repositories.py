@@ -1,9 +1,15 @@
 from typing import Optional
 
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, and_
 from sqlalchemy.orm import joinedload
 
-from src.apps.dialogues.dto import DialogueCreateDTO, DialogueReadDTO, DialogueTriggerUpdateDTO
+from src.apps.dialogues.dto import (
+    DialogueCreateDTO,
+    DialogueReadDTO,
+    DialogueTriggerUpdateDTO,
+    DialogueOwnerReadDTO,
+)
+from src.apps.projects.models import ProjectModel
 from src.core.base_repository import BaseRepository
 from src.apps.dialogues.models import DialogueModel
 
@@ -39,11 +45,36 @@ class DialogueRepository(BaseRepository):
         return dialogue.scalar()
 
     async def get_dialogue(self, dialogue_id: int) -> Optional[DialogueReadDTO]:
+        return await self._request_cache.get_or_load(('dialogue', dialogue_id), lambda: self._get_dialogue(dialogue_id))
+
+    async def _get_dialogue(self, dialogue_id: int) -> Optional[DialogueReadDTO]:
         dialogue = await self._get_dialogue_model_instance(dialogue_id)
         if dialogue is None:
             return None
         return dialogue.to_dto()
 
+    async def get_dialogue_owner(self, project_id: int, dialogue_id: int) -> Optional[DialogueOwnerReadDTO]:
+        return await self._request_cache.get_or_load(
+            ('dialogue_owner', project_id, dialogue_id),
+            lambda: self._get_dialogue_owner(project_id, dialogue_id),
+        )
+
+    async def _get_dialogue_owner(self, project_id: int, dialogue_id: int) -> Optional[DialogueOwnerReadDTO]:
+        # Resolves the project owner and the dialogue membership by primary keys in one round trip
+        owner = await self._session.execute(
+            select(ProjectModel.user_id, DialogueModel.dialogue_id)
+            .select_from(ProjectModel)
+            .outerjoin(
+                DialogueModel,
+                and_(DialogueModel.project_id == ProjectModel.project_id, DialogueModel.dialogue_id == dialogue_id),
+            )
+            .where(ProjectModel.project_id == project_id)
+        )
+        owner = owner.first()
+        if owner is None:
+            return None
+        return DialogueOwnerReadDTO(user_id=owner.user_id, dialogue_exists=owner.dialogue_id is not None)
+
     async def delete_dialogue(self, dialogue_id: int):
         await self._session.execute(delete(DialogueModel).where(DialogueModel.dialogue_id == dialogue_id))
         await self._session.commit()
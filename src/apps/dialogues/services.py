@@ -1,9 +1,12 @@
 from uuid import UUID
 
+from src.apps.code_gen.dependencies.events_dependencies import CodePreviewEventsDI
 from src.apps.dialogues.dependencies.repositories_dependencies import DialogueRepositoryDI
 from src.apps.dialogues.dto import DialogueCreateDTO, DialogueReadDTO, DialogueTriggerUpdateDTO
 from src.apps.dialogues.errors import DialogueNotFoundError, DialoguesLimitExceededError
+from src.apps.media.dependencies.services_dependencies import MediaServiceDI
 from src.apps.projects.dependencies.services_dependencies import ProjectServiceDI
+from src.apps.projects.errors import ProjectNotFoundError, NoPermissionForProjectError
 from src.apps.subscriptions.dependencies.services_dependencies import SubscriptionServiceDI
 from src.core.config import MEDIA_DIR
 from src.core.consts import MAX_DIALOGUES_WITH_FREE_PLAN, MAX_DIALOGUES_WITH_PRO_PLAN
@@ -16,10 +19,14 @@ class DialogueService:
         dialogue_repository: DialogueRepositoryDI,
         project_service: ProjectServiceDI,
         subscription_service: SubscriptionServiceDI,
+        code_preview_events: CodePreviewEventsDI,
+        media_service: MediaServiceDI,
     ):
         self._dialogue_repository = dialogue_repository
         self._project_service = project_service
         self._subscription_service = subscription_service
+        self._code_preview_events = code_preview_events
+        self._media_service = media_service
 
     async def create_dialogue(self, user_id: UUID, dialogue: DialogueCreateDTO) -> DialogueReadDTO:
         project = await self._project_service.get_project_with_dialogues(
@@ -33,7 +40,9 @@ class DialogueService:
         if len(project.dialogues) >= max_dialogues:
             raise DialoguesLimitExceededError
 
-        return await self._dialogue_repository.create_dialogue(dialogue)
+        created_dialogue = await self._dialogue_repository.create_dialogue(dialogue)
+        await self._code_preview_events.notify_project_changed(dialogue.project_id)
+        return created_dialogue
 
     async def update_dialogue_trigger(
         self,
@@ -42,17 +51,35 @@ class DialogueService:
         dialogue_id: int,
         trigger: DialogueTriggerUpdateDTO,
     ) -> DialogueReadDTO:
-        _ = await self.get_dialogue(user_id=user_id, project_id=project_id, dialogue_id=dialogue_id)
-        return await self._dialogue_repository.update_dialogue_trigger(dialogue_id=dialogue_id, trigger=trigger)
+        await self.check_dialogue_owner(user_id=user_id, project_id=project_id, dialogue_id=dialogue_id)
+        updated_dialogue = await self._dialogue_repository.update_dialogue_trigger(
+            dialogue_id=dialogue_id,
+            trigger=trigger,
+        )
+        await self._code_preview_events.notify_project_changed(project_id)
+        return updated_dialogue
 
     async def get_dialogue(self, user_id: UUID, project_id: int, dialogue_id: int) -> DialogueReadDTO:
-        project = await self._project_service.get_project(user_id=user_id, project_id=project_id)
+        await self._project_service.check_project_owner(user_id=user_id, project_id=project_id)
         dialogue = await self._dialogue_repository.get_dialogue(dialogue_id=dialogue_id)
-        if dialogue is None or dialogue.project_id != project.project_id:
+        if dialogue is None or dialogue.project_id != project_id:
             raise DialogueNotFoundError
         return dialogue
 
+    async def check_dialogue_owner(self, user_id: UUID, project_id: int, dialogue_id: int):
+        owner = await self._dialogue_repository.get_dialogue_owner(project_id=project_id, dialogue_id=dialogue_id)
+        if owner is None:
+            raise ProjectNotFoundError
+        if owner.user_id != user_id:
+            raise NoPermissionForProjectError
+        if not owner.dialogue_exists:
+            raise DialogueNotFoundError
+
     async def delete_dialogue(self, user_id: UUID, project_id: int, dialogue_id: int):
-        _ = await self.get_dialogue(user_id=user_id, project_id=project_id, dialogue_id=dialogue_id)
+        await self.check_dialogue_owner(user_id=user_id, project_id=project_id, dialogue_id=dialogue_id)
+        image_paths = await self._media_service.get_dialogue_image_paths(project_id=project_id, dialogue_id=dialogue_id)
+        # Images uploaded before the media store was introduced are kept in the dialogue directory
         await soft_delete_dir(MEDIA_DIR / f'users/{user_id}/projects/{project_id}/dialogues/{dialogue_id}')
         await self._dialogue_repository.delete_dialogue(dialogue_id)
+        await self._media_service.release_images(image_paths)
+        await self._code_preview_events.notify_project_changed(project_id)
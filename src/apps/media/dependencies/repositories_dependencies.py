@@ -0,0 +1,7 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.apps.media.repositories import MediaBlobRepository
+
+MediaBlobRepositoryDI = Annotated[MediaBlobRepository, Depends(MediaBlobRepository)]
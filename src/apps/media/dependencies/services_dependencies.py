@@ -0,0 +1,7 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.apps.media.services import MediaService
+
+MediaServiceDI = Annotated[MediaService, Depends(MediaService)]
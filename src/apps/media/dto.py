@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class MediaBlobCreateDTO:
+    path: str
+    sha256: str
+    size: int
+
+
+@dataclass(frozen=True)
+class ProcessedImageDTO:
+    path: Path
+    sha256: str
+    size: int
+    suffix: str
+
+
+@dataclass(frozen=True)
+class SavedImageDTO:
+    image_path: str
+    original_image_path: str
+    thumbnail_path: str
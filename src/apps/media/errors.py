@@ -0,0 +1,6 @@
+class MediaBlobNotFoundError(Exception):
+    pass
+
+
+class UnsupportedImageError(Exception):
+    pass
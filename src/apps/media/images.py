@@ -0,0 +1,79 @@
+import hashlib
+import io
+from pathlib import Path
+from typing import Optional
+
+from src.apps.media.dto import ProcessedImageDTO
+from src.apps.media.errors import UnsupportedImageError
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:
+    Image = None
+
+NORMALIZED_IMAGE_FORMAT, NORMALIZED_IMAGE_SUFFIX = 'JPEG', '.jpg'
+THUMBNAIL_FORMAT, THUMBNAIL_SUFFIX = 'WEBP', '.webp'
+THUMBNAIL_QUALITY = 75
+
+
+def is_image_processing_available() -> bool:
+    return Image is not None
+
+
+def process_image(
+    source_path: Path,
+    normalized_path: Path,
+    thumbnail_path: Path,
+    max_side: int,
+    thumbnail_side: int,
+    quality: int,
+) -> tuple[Optional[ProcessedImageDTO], ProcessedImageDTO]:
+    # Runs in the process pool. Metadata is never passed to the encoder, so EXIF and other chunks are dropped
+    try:
+        with Image.open(source_path) as image:
+            is_animated = getattr(image, 'is_animated', False)
+            image = _to_rgb(ImageOps.exif_transpose(image))
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise UnsupportedImageError
+
+    # Re-encoding would drop every frame but the first one, so animations are sent as uploaded
+    normalized_image = None
+    if not is_animated:
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        normalized_image = _save_image(
+            image,
+            normalized_path,
+            NORMALIZED_IMAGE_FORMAT,
+            NORMALIZED_IMAGE_SUFFIX,
+            quality=quality,
+            optimize=True,
+            progressive=True,
+        )
+
+    image.thumbnail((thumbnail_side, thumbnail_side), Image.Resampling.LANCZOS)
+    thumbnail = _save_image(image, thumbnail_path, THUMBNAIL_FORMAT, THUMBNAIL_SUFFIX, quality=THUMBNAIL_QUALITY)
+    return normalized_image, thumbnail
+
+
+def _to_rgb(image: 'Image.Image') -> 'Image.Image':
+    if image.mode == 'RGB':
+        return image
+
+    # Telegram photos have no transparency, so transparent areas are rendered on white like in the client
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def _save_image(image: 'Image.Image', path: Path, image_format: str, suffix: str, **params) -> ProcessedImageDTO:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **params)
+    content = buffer.getvalue()
+    path.write_bytes(content)
+    return ProcessedImageDTO(
+        path=path,
+        sha256=hashlib.sha256(content).hexdigest(),
+        size=len(content),
+        suffix=suffix,
+    )
@@ -0,0 +1,21 @@
+import datetime
+
+from sqlalchemy import BigInteger, DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.infrastructure.db.sessions import Base
+
+
+class MediaBlobModel(Base):
+    __tablename__ = 'media_blobs'
+
+    blob_id: Mapped[int] = mapped_column(primary_key=True)
+
+    path: Mapped[str] = mapped_column(String(256), unique=True)
+    sha256: Mapped[str] = mapped_column(String(64))
+    size: Mapped[int] = mapped_column(BigInteger)
+    ref_count: Mapped[int] = mapped_column(Integer, server_default='0')
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
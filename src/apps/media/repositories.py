@@ -0,0 +1,89 @@
+from collections import Counter
+from typing import Awaitable, Callable, Iterable, Optional
+
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.postgresql import insert
+
+from src.apps.blocks.models import ImageBlockModel, BlockModel
+from src.apps.dialogues.models import DialogueModel
+from src.apps.media.dto import MediaBlobCreateDTO
+from src.apps.media.models import MediaBlobModel
+from src.apps.media.utils import get_block_image_paths
+from src.core.base_repository import BaseRepository
+
+
+class MediaBlobRepository(BaseRepository):
+    async def acquire_blob(self, blob: MediaBlobCreateDTO):
+        await self._session.execute(
+            insert(MediaBlobModel)
+            .values(path=blob.path, sha256=blob.sha256, size=blob.size, ref_count=1)
+            .on_conflict_do_update(
+                index_elements=[MediaBlobModel.path],
+                set_={'ref_count': MediaBlobModel.ref_count + 1},
+            )
+        )
+        await self._session.commit()
+
+    async def acquire_blobs(self, paths: Iterable[str]) -> list[str]:
+        acquired_paths = await self._acquire_blobs_without_commit(paths)
+        await self._session.commit()
+        return acquired_paths
+
+    async def acquire_all_blobs_without_commit(self, paths: Iterable[str]) -> bool:
+        paths = list(paths)
+        acquired_paths = await self._acquire_blobs_without_commit(paths)
+        if set(acquired_paths) != set(paths):
+            await self._session.rollback()
+            return False
+        return True
+
+    async def _acquire_blobs_without_commit(self, paths: Iterable[str]) -> list[str]:
+        acquired_paths = []
+        for path, count in Counter(paths).items():
+            acquired_path = await self._session.execute(
+                update(MediaBlobModel)
+                .where(MediaBlobModel.path == path)
+                .values(ref_count=MediaBlobModel.ref_count + count)
+                .returning(MediaBlobModel.path)
+            )
+            if acquired_path.scalar() is not None:
+                acquired_paths.append(path)
+        return acquired_paths
+
+    async def release_blobs(
+        self,
+        paths: Iterable[str],
+        remove_files: Callable[[list[str]], Awaitable[None]],
+    ):
+        paths_counter = Counter(paths)
+        for path, count in paths_counter.items():
+            await self._session.execute(
+                update(MediaBlobModel)
+                .where(MediaBlobModel.path == path)
+                .values(ref_count=MediaBlobModel.ref_count - count)
+            )
+        unreferenced_paths = await self._session.execute(
+            delete(MediaBlobModel)
+            .where(MediaBlobModel.path.in_(paths_counter), MediaBlobModel.ref_count <= 0)
+            .returning(MediaBlobModel.path)
+        )
+        # Files are removed while the deleted rows are still locked, so a concurrent upload of the same content
+        # waits for this transaction and then puts the file back
+        try:
+            await remove_files(list(unreferenced_paths.scalars().all()))
+        except BaseException:
+            await self._session.rollback()
+            raise
+        await self._session.commit()
+
+    async def get_image_paths(self, project_id: int, dialogue_id: Optional[int] = None) -> list[str]:
+        query = (
+            select(ImageBlockModel.image_path, ImageBlockModel.original_image_path, ImageBlockModel.thumbnail_path)
+            .select_from(ImageBlockModel)
+            .join(DialogueModel, DialogueModel.dialogue_id == BlockModel.dialogue_id)
+            .where(DialogueModel.project_id == project_id)
+        )
+        if dialogue_id is not None:
+            query = query.where(DialogueModel.dialogue_id == dialogue_id)
+        image_paths = await self._session.execute(query)
+        return [path for block_image_paths in image_paths.all() for path in get_block_image_paths(*block_image_paths)]
@@ -0,0 +1,148 @@
+import asyncio
+import functools
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+from uuid import uuid4
+
+import anyio
+from fastapi import UploadFile
+
+from src.apps.media.dependencies.repositories_dependencies import MediaBlobRepositoryDI
+from src.apps.media.dto import MediaBlobCreateDTO, ProcessedImageDTO, SavedImageDTO
+from src.apps.media.errors import MediaBlobNotFoundError
+from src.apps.media.images import is_image_processing_available, process_image
+from src.apps.media.utils import MEDIA_BLOBS_DIR, get_media_blob_path, is_media_blob_path, get_block_image_paths
+from src.core.config import settings, MEDIA_DIR
+from src.core.utils import save_upload_file, soft_delete_file
+from src.infrastructure.pools import get_process_pool
+
+MEDIA_BLOBS_UPLOADS_DIR = MEDIA_BLOBS_DIR / 'uploads'
+
+
+class MediaService:
+    def __init__(self, media_blob_repository: MediaBlobRepositoryDI):
+        self._media_blob_repository = media_blob_repository
+
+    async def save_image(self, image: UploadFile) -> SavedImageDTO:
+        upload_path = MEDIA_DIR / MEDIA_BLOBS_UPLOADS_DIR / uuid4().hex
+        normalized_path = upload_path.with_name(f'{upload_path.name}.normalized')
+        thumbnail_path = upload_path.with_name(f'{upload_path.name}.thumbnail')
+        try:
+            sha256 = await save_upload_file(
+                upload_file=image,
+                path=upload_path,
+                max_size=settings.IMAGE_UPLOAD_MAX_SIZE,
+                chunk_size=settings.UPLOAD_CHUNK_SIZE,
+            )
+            upload_stat = await anyio.Path(upload_path).stat()
+            normalized_image, thumbnail = await self._process_image(upload_path, normalized_path, thumbnail_path)
+
+            original_image_path = await self._save_blob(
+                ProcessedImageDTO(
+                    path=upload_path,
+                    sha256=sha256,
+                    size=upload_stat.st_size,
+                    suffix=Path(image.filename or '').suffix,
+                )
+            )
+            saved_paths = [original_image_path]
+            try:
+                image_path = await self._save_blob(normalized_image) if normalized_image else original_image_path
+                saved_paths.append(image_path)
+                thumbnail_image_path = await self._save_blob(thumbnail) if thumbnail else ''
+                saved_paths.append(thumbnail_image_path)
+            except BaseException:
+                await self.release_images(get_block_image_paths(*saved_paths))
+                raise
+        finally:
+            for path in (upload_path, normalized_path, thumbnail_path):
+                await anyio.Path(path).unlink(missing_ok=True)
+
+        return SavedImageDTO(
+            image_path=image_path,
+            original_image_path=original_image_path,
+            thumbnail_path=thumbnail_image_path,
+        )
+
+    @staticmethod
+    async def _process_image(
+        upload_path: Path,
+        normalized_path: Path,
+        thumbnail_path: Path,
+    ) -> tuple[Optional[ProcessedImageDTO], Optional[ProcessedImageDTO]]:
+        # Images are kept as uploaded when Pillow is not installed
+        if not is_image_processing_available():
+            return None, None
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_process_pool(),
+            functools.partial(
+                process_image,
+                source_path=upload_path,
+                normalized_path=normalized_path,
+                thumbnail_path=thumbnail_path,
+                max_side=settings.IMAGE_MAX_SIDE,
+                thumbnail_side=settings.IMAGE_THUMBNAIL_SIDE,
+                quality=settings.IMAGE_QUALITY,
+            ),
+        )
+
+    async def _save_blob(self, image: ProcessedImageDTO) -> str:
+        blob_path = get_media_blob_path(image.sha256, image.suffix)
+        await self._media_blob_repository.acquire_blob(
+            MediaBlobCreateDTO(path=blob_path, sha256=image.sha256, size=image.size)
+        )
+        try:
+            await self._move_to_blob(image.path, MEDIA_DIR / blob_path)
+        except BaseException:
+            await self.release_images([blob_path])
+            raise
+        return blob_path
+
+    @staticmethod
+    async def _move_to_blob(path: Path, blob_path: Path):
+        if await anyio.Path(blob_path).exists():
+            return
+        await anyio.Path(blob_path.parent).mkdir(parents=True, exist_ok=True)
+        await anyio.to_thread.run_sync(os.replace, path, blob_path)
+
+    async def acquire_images(self, image_paths: Iterable[str]):
+        # Images saved before the blob store are not reference counted and are only ever owned by one block
+        blob_paths = [image_path for image_path in image_paths if is_media_blob_path(image_path)]
+        if not blob_paths:
+            return
+
+        acquired_paths = await self._media_blob_repository.acquire_blobs(blob_paths)
+        if set(acquired_paths) != set(blob_paths):
+            await self.release_images([path for path in blob_paths if path in acquired_paths])
+            raise MediaBlobNotFoundError
+
+    async def acquire_images_without_commit(self, image_paths: Iterable[str]):
+        # The references are committed together with the block that holds them, so a failed block write can't leak them
+        blob_paths = [image_path for image_path in image_paths if is_media_blob_path(image_path)]
+        if blob_paths and not await self._media_blob_repository.acquire_all_blobs_without_commit(blob_paths):
+            raise MediaBlobNotFoundError
+
+    async def release_images(self, image_paths: Iterable[str]):
+        blob_paths = []
+        for image_path in image_paths:
+            if is_media_blob_path(image_path):
+                blob_paths.append(image_path)
+            else:
+                await soft_delete_file(MEDIA_DIR / image_path)
+
+        if blob_paths:
+            await self._media_blob_repository.release_blobs(blob_paths, remove_files=self._remove_blob_files)
+
+    @staticmethod
+    async def _remove_blob_files(blob_paths: list[str]):
+        for blob_path in blob_paths:
+            await soft_delete_file(MEDIA_DIR / blob_path)
+
+    async def get_project_image_paths(self, project_id: int) -> list[str]:
+        return await self._media_blob_repository.get_image_paths(project_id)
+
+    async def get_dialogue_image_paths(self, project_id: int, dialogue_id: int) -> list[str]:
+        return await self._media_blob_repository.get_image_paths(project_id, dialogue_id=dialogue_id)
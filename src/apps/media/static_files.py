@@ -0,0 +1,140 @@
+import functools
+import gzip
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+import anyio
+from loguru import logger
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from src.apps.media.utils import is_media_blob_path
+from src.core.config import MEDIA_DIR
+
+MEDIA_ASSETS_DIRS = [Path('plugins'), Path('dialogue_templates')]
+PRECOMPRESSED_SUFFIXES = {'.svg': 'image/svg+xml'}
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+
+
+class MediaAssets:
+    def __init__(self):
+        self._etags: dict[str, tuple[int, int, str]] = {}
+
+    def build(self):
+        # Assets are shipped with the app, so their content hashes are computed once instead of per request
+        for assets_dir in MEDIA_ASSETS_DIRS:
+            for path in sorted((MEDIA_DIR / assets_dir).rglob('*')):
+                if path.suffix in PRECOMPRESSED_SUFFIXES:
+                    _precompress_file(path)
+
+            for path in sorted((MEDIA_DIR / assets_dir).rglob('*')):
+                if path.is_file():
+                    path_stat = path.stat()
+                    content_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+                    self._etags[str(path.relative_to(MEDIA_DIR))] = (
+                        path_stat.st_mtime_ns,
+                        path_stat.st_size,
+                        content_hash,
+                    )
+
+    def get_etag(self, path: str, stat_result: os.stat_result) -> Optional[str]:
+        if is_media_blob_path(path):
+            # Blobs are named after the sha256 of their content
+            return f'"{Path(path).stem}"'
+
+        # Files changed after the startup fall back to the ETag built from their modification time
+        mtime_ns, size, content_hash = self._etags.get(path, (None, None, None))
+        if (mtime_ns, size) != (stat_result.st_mtime_ns, stat_result.st_size):
+            return None
+        return f'"{content_hash}"'
+
+
+def _precompress_file(path: Path):
+    compressed_path = path.with_name(f'{path.name}.gz')
+    if compressed_path.exists() and compressed_path.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        return
+
+    content = path.read_bytes()
+    compressed_content = gzip.compress(content, compresslevel=9, mtime=0)
+    if len(compressed_content) >= len(content):
+        return
+    try:
+        compressed_path.write_bytes(compressed_content)
+    except OSError:
+        logger.warning(f'Failed to precompress {path}')
+
+
+@functools.cache
+def get_media_assets() -> MediaAssets:
+    media_assets = MediaAssets()
+    media_assets.build()
+    return media_assets
+
+
+class MediaStaticFiles(StaticFiles):
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        media_type = PRECOMPRESSED_SUFFIXES.get(Path(path).suffix)
+        if media_type is None or scope['method'] not in ('GET', 'HEAD'):
+            return await super().get_response(path, scope)
+
+        response = None
+        if _accepts_gzip(Headers(scope=scope)):
+            response = await self._get_precompressed_response(path, media_type, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        response.headers['vary'] = 'Accept-Encoding'
+        return response
+
+    async def _get_precompressed_response(self, path: str, media_type: str, scope: Scope) -> Optional[Response]:
+        compressed_path = f'{path}.gz'
+        try:
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, compressed_path)
+        except (OSError, ValueError):
+            return None
+        if stat_result is None:
+            return None
+
+        response = self.file_response(full_path, stat_result, scope, media_path=compressed_path, media_type=media_type)
+        response.headers['content-encoding'] = 'gzip'
+        return response
+
+    def file_response(
+        self,
+        full_path: os.PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+        media_path: Optional[str] = None,
+        media_type: Optional[str] = None,
+    ) -> Response:
+        media_path = media_path or str(Path(full_path).relative_to(Path(self.directory).resolve()))
+        headers = {
+            'cache-control': IMMUTABLE_CACHE_CONTROL if is_media_blob_path(media_path) else REVALIDATE_CACHE_CONTROL,
+        }
+        if etag := get_media_assets().get_etag(media_path, stat_result):
+            headers['etag'] = etag
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def _accepts_gzip(headers: Headers) -> bool:
+    for encoding in headers.get('accept-encoding', '').split(','):
+        name, _, params = encoding.strip().partition(';')
+        if name.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
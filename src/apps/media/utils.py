@@ -0,0 +1,21 @@
+import re
+from pathlib import Path
+
+MEDIA_BLOBS_DIR = Path('blobs')
+MEDIA_BLOB_SUFFIX_PATTERN = re.compile(r'\.[a-z0-9]{1,10}')
+
+
+def get_media_blob_path(sha256: str, suffix: str) -> str:
+    suffix = suffix.lower()
+    if not MEDIA_BLOB_SUFFIX_PATTERN.fullmatch(suffix):
+        suffix = ''
+    return str(MEDIA_BLOBS_DIR / sha256[:2] / f'{sha256}{suffix}')
+
+
+def is_media_blob_path(path: str) -> bool:
+    return Path(path).parts[:1] == MEDIA_BLOBS_DIR.parts
+
+
+def get_block_image_paths(*image_paths: str) -> list[str]:
+    # An image block holds one reference per distinct file, even if its variants point to the same blob
+    return list(dict.fromkeys(image_path for image_path in image_paths if image_path))
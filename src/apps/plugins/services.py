@@ -1,5 +1,6 @@
 from uuid import UUID
 
+from src.apps.code_gen.dependencies.events_dependencies import CodePreviewEventsDI
 from src.apps.plugins.dependencies.repositories_dependencies import PluginRepositoryDI
 from src.apps.plugins.dto import PluginReadDTO
 from src.apps.plugins.errors import (
@@ -21,10 +22,12 @@ class PluginService:
         plugin_repository: PluginRepositoryDI,
         user_service: UserServiceDI,
         project_service: ProjectServiceDI,
+        code_preview_events: CodePreviewEventsDI,
     ):
         self._plugin_repository = plugin_repository
         self._user_service = user_service
         self._project_service = project_service
+        self._code_preview_events = code_preview_events
 
     async def get_plugins(self, page: int) -> list[PluginReadDTO]:
         return await self._plugin_repository.get_plugins(
@@ -48,9 +51,11 @@ class PluginService:
 
         _ = await self.get_plugin(plugin_id)
         await self._plugin_repository.add_plugin_to_project(project_id=project_id, plugin_id=plugin_id)
+        await self._code_preview_events.notify_project_changed(project_id)
 
     async def remove_plugin_from_project(self, user_id: UUID, project_id: int, plugin_id: int):
         project = await self._project_service.get_project_with_plugins(user_id=user_id, project_id=project_id)
         if not project.contains_specific_plugin(plugin_id):
             raise PluginIsNotInProjectError
         await self._plugin_repository.remove_plugin_from_project(project_id=project_id, plugin_id=plugin_id)
+        await self._code_preview_events.notify_project_changed(project_id)
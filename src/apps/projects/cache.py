@@ -0,0 +1,43 @@
+from typing import Optional
+from uuid import UUID
+
+import redis
+from loguru import logger
+
+from src.core.config import settings
+from src.infrastructure.cache.dependencies import CacheClientDI
+
+PROJECT_OWNER_KEY_PREFIX = 'project_owner'
+
+
+class ProjectOwnerCache:
+    # The owner of a project never changes, so entries only have to be dropped when the project is deleted.
+    # Redis errors are not fatal here, the owner is read from the database instead
+    def __init__(self, cache_client: CacheClientDI):
+        self._cache_client = cache_client
+
+    async def get(self, project_id: int) -> Optional[UUID]:
+        try:
+            user_id = await self._cache_client.get(self._get_key(project_id))
+        except redis.exceptions.RedisError:
+            logger.warning(f'Failed to get owner of project {project_id} from cache')
+            return None
+        if user_id is None:
+            return None
+        return UUID(user_id.decode())
+
+    async def set(self, project_id: int, user_id: UUID):
+        try:
+            await self._cache_client.set(self._get_key(project_id), str(user_id), ex=settings.PROJECT_OWNER_CACHE_TTL)
+        except redis.exceptions.RedisError:
+            logger.warning(f'Failed to cache owner of project {project_id}')
+
+    async def delete(self, project_id: int):
+        try:
+            await self._cache_client.delete(self._get_key(project_id))
+        except redis.exceptions.RedisError:
+            logger.warning(f'Failed to remove owner of project {project_id} from cache')
+
+    @staticmethod
+    def _get_key(project_id: int) -> str:
+        return f'{PROJECT_OWNER_KEY_PREFIX}:{project_id}'
@@ -0,0 +1,16 @@
+from typing import Annotated, Optional
+
+from fastapi import Depends
+
+from src.apps.projects.cache import ProjectOwnerCache
+from src.core.config import settings
+from src.infrastructure.cache.dependencies import CacheClientDI
+
+
+def get_project_owner_cache(cache_client: CacheClientDI) -> Optional[ProjectOwnerCache]:
+    if not settings.PROJECT_OWNER_CACHE_ENABLED:
+        return None
+    return ProjectOwnerCache(cache_client)
+
+
+ProjectOwnerCacheDI = Annotated[Optional[ProjectOwnerCache], Depends(get_project_owner_cache)]
@@ -67,11 +67,17 @@ class ProjectRepository(BaseRepository):
         return project.to_dto_with_dialogues()
 
     async def get_project(self, project_id: int) -> Optional[ProjectReadDTO]:
+        return await self._request_cache.get_or_load(('project', project_id), lambda: self._get_project(project_id))
+
+    async def _get_project(self, project_id: int) -> Optional[ProjectReadDTO]:
         project = await self._get_project_model_instance(project_id)
         if not project:
             return None
         return project.to_dto()
 
+    async def get_project_owner_id(self, project_id: int) -> Optional[UUID]:
+        return await self._session.scalar(select(ProjectModel.user_id).where(ProjectModel.project_id == project_id))
+
     async def update_project(self, project: ProjectUpdateDTO) -> Optional[ProjectReadDTO]:
         project_for_update = await self._get_project_model_instance(project.project_id)
         if project_for_update is None:
@@ -97,12 +103,5 @@ class ProjectRepository(BaseRepository):
         )
 
     async def _get_project_model_instance(self, project_id: int) -> Optional[ProjectModel]:
-        project = await self._session.execute(
-            select(ProjectModel)
-            .options(
-                selectinload(ProjectModel.dialogues).joinedload(DialogueModel.trigger),
-                selectinload(ProjectModel.plugins).selectinload(PluginModel.triggers),
-            )
-            .where(ProjectModel.project_id == project_id)
-        )
+        project = await self._session.execute(select(ProjectModel).where(ProjectModel.project_id == project_id))
         return project.scalar()
@@ -1,6 +1,8 @@
 from typing import Optional
 from uuid import UUID
 
+from src.apps.code_gen.dependencies.events_dependencies import CodePreviewEventsDI
+from src.apps.projects.dependencies.cache_dependencies import ProjectOwnerCacheDI
 from src.apps.projects.dependencies.repositories_dependencies import ProjectRepositoryDI
 from src.apps.projects.dto import (
     ProjectCreateDTO,
@@ -15,10 +17,12 @@ from src.apps.projects.errors import (
     NoPermissionForProjectError,
     ProjectsLimitExceededError,
 )
+from src.apps.media.dependencies.services_dependencies import MediaServiceDI
 from src.apps.subscriptions.dependencies.services_dependencies import SubscriptionServiceDI
 from src.core.config import MEDIA_DIR
 from src.core.consts import MAX_PROJECTS_WITH_FREE_PLAN, MAX_PROJECTS_WITH_PRO_PLAN
 from src.core.utils import soft_delete_dir
+from src.infrastructure.db.dependencies import RequestCacheDI
 
 
 class ProjectService:
@@ -26,9 +30,17 @@ class ProjectService:
         self,
         project_repository: ProjectRepositoryDI,
         subscription_service: SubscriptionServiceDI,
+        code_preview_events: CodePreviewEventsDI,
+        media_service: MediaServiceDI,
+        project_owner_cache: ProjectOwnerCacheDI,
+        request_cache: RequestCacheDI,
     ):
         self._project_repository = project_repository
         self._subscription_service = subscription_service
+        self._code_preview_events = code_preview_events
+        self._media_service = media_service
+        self._project_owner_cache = project_owner_cache
+        self._request_cache = request_cache
 
     async def create_project(self, project: ProjectCreateDTO) -> ProjectReadDTO:
         project_count = await self._project_repository.count_projects(project.user_id)
@@ -48,6 +60,27 @@ class ProjectService:
             raise NoPermissionForProjectError
         return project
 
+    async def check_project_owner(self, user_id: UUID, project_id: int):
+        owner_id = await self._get_project_owner_id(project_id)
+        if owner_id is None:
+            raise ProjectNotFoundError
+        if owner_id != user_id:
+            raise NoPermissionForProjectError
+
+    async def _get_project_owner_id(self, project_id: int) -> Optional[UUID]:
+        return await self._request_cache.get_or_load(
+            ('project_owner', project_id),
+            lambda: self._load_project_owner_id(project_id),
+        )
+
+    async def _load_project_owner_id(self, project_id: int) -> Optional[UUID]:
+        owner_id = await self._project_owner_cache.get(project_id) if self._project_owner_cache else None
+        if owner_id is None:
+            owner_id = await self._project_repository.get_project_owner_id(project_id)
+            if owner_id is not None and self._project_owner_cache:
+                await self._project_owner_cache.set(project_id, owner_id)
+        return owner_id
+
     async def get_project_with_plugins(self, user_id: UUID, project_id: int) -> ProjectWithPluginsReadDTO:
         project = await self._project_repository.get_project_with_plugins(project_id)
         if project is None:
@@ -71,13 +104,21 @@ class ProjectService:
         return await self._project_repository.get_projects_with_dialogues_and_plugins(user_id)
 
     async def update_project(self, project: ProjectUpdateDTO) -> Optional[ProjectReadDTO]:
-        _ = await self.get_project(user_id=project.user_id, project_id=project.project_id)
-        return await self._project_repository.update_project(project)
+        await self.check_project_owner(user_id=project.user_id, project_id=project.project_id)
+        updated_project = await self._project_repository.update_project(project)
+        await self._code_preview_events.notify_project_changed(project.project_id)
+        return updated_project
 
     async def delete_project(self, user_id: UUID, project_id: int):
-        _ = await self.get_project(user_id=user_id, project_id=project_id)
+        await self.check_project_owner(user_id=user_id, project_id=project_id)
+        image_paths = await self._media_service.get_project_image_paths(project_id)
+        # Images uploaded before the media store was introduced are kept in the project directory
         await soft_delete_dir(MEDIA_DIR / f'users/{user_id}/projects/{project_id}')
         await self._project_repository.delete_project(project_id)
+        if self._project_owner_cache:
+            await self._project_owner_cache.delete(project_id)
+        await self._media_service.release_images(image_paths)
+        await self._code_preview_events.notify_project_changed(project_id)
 
     async def count_projects(self, user_id: UUID) -> int:
         return await self._project_repository.count_projects(user_id)
@@ -5,3 +5,30 @@ from dataclasses import dataclass
 class StatisticReadDTO:
     user_count: int
     project_count: int
+
+
+@dataclass(frozen=True)
+class DBPoolStatisticReadDTO:
+    pid: int
+    pool_size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checked_out_max: int
+    checkouts: int
+    checkout_timeouts: int
+    checkout_wait_avg: float
+    checkout_wait_max: float
+
+
+@dataclass(frozen=True)
+class LLMResponseCacheStatisticReadDTO:
+    pid: int
+    enabled: bool
+    size: int
+    max_entries: int
+    exact_hits: int
+    similar_hits: int
+    misses: int
+    hit_rate: float
@@ -1,9 +1,14 @@
+import os
 from uuid import UUID
 
 from src.apps.statistics.dependencies.repositories_dependencies import StatisticRepositoryDI
-from src.apps.statistics.dto import StatisticReadDTO
+from src.apps.statistics.dto import StatisticReadDTO, DBPoolStatisticReadDTO, LLMResponseCacheStatisticReadDTO
 from src.apps.users.errors import DontHavePermissionError
 from src.apps.users.dependencies.services_dependencies import UserServiceDI
+from src.core.config import settings
+from src.infrastructure.db.pool import db_pool_metrics
+from src.infrastructure.db.sessions import engine
+from src.infrastructure.llm.response_cache import llm_response_cache
 
 
 class StatisticService:
@@ -16,9 +21,7 @@ class StatisticService:
         self._statistic_repository = statistic_repository
 
     async def get_statistic(self, user_id: UUID) -> StatisticReadDTO:
-        user = await self._user_service.get_user_by_id(user_id)
-        if user is None or not user.is_superuser:
-            raise DontHavePermissionError
+        await self._check_superuser(user_id)
 
         user_count = await self._statistic_repository.count_users()
         project_count = await self._statistic_repository.count_projects()
@@ -28,5 +31,45 @@ class StatisticService:
             project_count=project_count,
         )
 
+    async def get_db_pool_statistic(self, user_id: UUID) -> DBPoolStatisticReadDTO:
+        await self._check_superuser(user_id)
+
+        pool = engine.pool
+        checkouts = db_pool_metrics.checkouts
+        return DBPoolStatisticReadDTO(
+            pid=os.getpid(),
+            pool_size=pool.size(),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            checked_out_max=db_pool_metrics.checked_out_max,
+            checkouts=checkouts,
+            checkout_timeouts=db_pool_metrics.checkout_timeouts,
+            checkout_wait_avg=db_pool_metrics.checkout_wait_total / checkouts if checkouts else 0.0,
+            checkout_wait_max=db_pool_metrics.checkout_wait_max,
+        )
+
+    async def get_llm_response_cache_statistic(self, user_id: UUID) -> LLMResponseCacheStatisticReadDTO:
+        await self._check_superuser(user_id)
+
+        hits = llm_response_cache.exact_hits + llm_response_cache.similar_hits
+        lookups = hits + llm_response_cache.misses
+        return LLMResponseCacheStatisticReadDTO(
+            pid=os.getpid(),
+            enabled=settings.LLM_RESPONSE_CACHE_ENABLED,
+            size=llm_response_cache.size,
+            max_entries=llm_response_cache.max_entries,
+            exact_hits=llm_response_cache.exact_hits,
+            similar_hits=llm_response_cache.similar_hits,
+            misses=llm_response_cache.misses,
+            hit_rate=hits / lookups if lookups else 0.0,
+        )
+
+    async def _check_superuser(self, user_id: UUID):
+        user = await self._user_service.get_user_by_id(user_id)
+        if user is None or not user.is_superuser:
+            raise DontHavePermissionError
+
     async def save_download_to_history(self, user_id: UUID, project_id: int) -> None:
         await self._statistic_repository.save_download_to_history(user_id=user_id, project_id=project_id)
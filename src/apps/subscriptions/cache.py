@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+import redis
+from loguru import logger
+
+from src.apps.subscriptions.schemas import SubscriptionReadSchema
+from src.core.config import settings
+from src.infrastructure.cache.dependencies import CacheClientDI
+
+ACTIVE_SUBSCRIPTION_KEY_PREFIX = 'active_subscription'
+NO_ACTIVE_SUBSCRIPTION = b''
+
+
+class ActiveSubscriptionCache:
+    # Users without a subscription are cached too, because they are the common case for tariff checks.
+    # Redis errors are not fatal here, the subscription is read from the database instead
+    def __init__(self, cache_client: CacheClientDI):
+        self._cache_client = cache_client
+
+    async def get(self, user_id: UUID) -> tuple[bool, Optional[SubscriptionReadSchema]]:
+        try:
+            subscription = await self._cache_client.get(self._get_key(user_id))
+        except redis.exceptions.RedisError:
+            logger.warning(f'Failed to get active subscription of user {user_id} from cache')
+            return False, None
+
+        if subscription is None:
+            return False, None
+        if subscription == NO_ACTIVE_SUBSCRIPTION:
+            return True, None
+        return True, SubscriptionReadSchema.model_validate_json(subscription)
+
+    async def set(self, user_id: UUID, subscription: Optional[SubscriptionReadSchema]):
+        # A reader that loaded "no subscription" before a subscription was created may write after the invalidation.
+        # Such an entry never replaces an existing one and lives only for a short time
+        if subscription is None:
+            value, ttl, nx = NO_ACTIVE_SUBSCRIPTION, settings.SUBSCRIPTION_CACHE_MISSING_TTL, True
+        else:
+            value, ttl, nx = subscription.model_dump_json(), self._get_ttl(subscription.expires_at), False
+            if ttl <= 0:
+                return
+
+        try:
+            await self._cache_client.set(self._get_key(user_id), value, ex=ttl, nx=nx)
+        except redis.exceptions.RedisError:
+            logger.warning(f'Failed to cache active subscription of user {user_id}')
+
+    async def delete(self, user_id: UUID):
+        try:
+            await self._cache_client.delete(self._get_key(user_id))
+        except redis.exceptions.RedisError:
+            logger.warning(f'Failed to remove active subscription of user {user_id} from cache')
+
+    @staticmethod
+    def _get_ttl(expires_at: datetime) -> int:
+        # The entry must expire together with the subscription, so a stale one never grants the paid tariff
+        now = datetime.now(timezone.utc) if expires_at.tzinfo else datetime.now()
+        return min(int((expires_at - now).total_seconds()), settings.SUBSCRIPTION_CACHE_TTL)
+
+    @staticmethod
+    def _get_key(user_id: UUID) -> str:
+        return f'{ACTIVE_SUBSCRIPTION_KEY_PREFIX}:{user_id}'
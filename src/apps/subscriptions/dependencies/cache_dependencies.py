@@ -0,0 +1,16 @@
+from typing import Annotated, Optional
+
+from fastapi import Depends
+
+from src.apps.subscriptions.cache import ActiveSubscriptionCache
+from src.core.config import settings
+from src.infrastructure.cache.dependencies import CacheClientDI
+
+
+def get_active_subscription_cache(cache_client: CacheClientDI) -> Optional[ActiveSubscriptionCache]:
+    if not settings.SUBSCRIPTION_CACHE_ENABLED:
+        return None
+    return ActiveSubscriptionCache(cache_client)
+
+
+ActiveSubscriptionCacheDI = Annotated[Optional[ActiveSubscriptionCache], Depends(get_active_subscription_cache)]
@@ -53,8 +53,12 @@ class SubscriptionRepository(BaseRepository):
 
         return SubscriptionReadSchema.model_validate(subscription)
 
-    async def delete_subscription(self, subscription_id: UUID):
-        await self._session.execute(
-            delete(SubscriptionModel).where(SubscriptionModel.subscription_id == subscription_id)
+    async def delete_subscription(self, subscription_id: UUID) -> Optional[UUID]:
+        user_id = await self._session.execute(
+            delete(SubscriptionModel)
+            .where(SubscriptionModel.subscription_id == subscription_id)
+            .returning(SubscriptionModel.user_id)
         )
+        user_id = user_id.scalar()
         await self._session.commit()
+        return user_id
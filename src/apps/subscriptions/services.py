@@ -1,10 +1,15 @@
 from typing import Optional
 from uuid import UUID
 
+from src.apps.subscriptions.dependencies.cache_dependencies import ActiveSubscriptionCacheDI
 from src.apps.subscriptions.dependencies.repositories_dependencies import SubscriptionRepositoryDI
 from src.apps.subscriptions.schemas import SubscriptionReadSchema, SubscriptionCreateSchema
-from src.apps.subscriptions.exceptions.services_exceptions import SubscriptionAlreadyExistsError
+from src.apps.subscriptions.exceptions.services_exceptions import (
+    SubscriptionAlreadyExistsError,
+    SubscriptionNotFoundError,
+)
 from src.apps.users.dependencies.services_dependencies import UserServiceDI
+from src.infrastructure.db.dependencies import RequestCacheDI
 
 
 class SubscriptionService:
@@ -12,23 +17,59 @@ class SubscriptionService:
         self,
         subscription_repository: SubscriptionRepositoryDI,
         user_service: UserServiceDI,
+        active_subscription_cache: ActiveSubscriptionCacheDI,
+        request_cache: RequestCacheDI,
     ):
         self._subscription_repository = subscription_repository
         self._user_service = user_service
+        self._active_subscription_cache = active_subscription_cache
+        self._request_cache = request_cache
 
     async def create_subscription(
         self,
         user_id: UUID,
         subscription: SubscriptionCreateSchema,
     ) -> SubscriptionReadSchema:
-        active_subscription = await self.get_active_subscription(user_id)
+        # The cache is bypassed, because a stale entry must not allow a second subscription
+        await self._user_service.raise_error_if_not_exists(user_id)
+        active_subscription = await self._subscription_repository.get_active_subscription(user_id)
         if active_subscription is not None:
             raise SubscriptionAlreadyExistsError
-        return await self._subscription_repository.create_subscription(user_id, subscription)
+
+        # The repository commits before returning, so the entry is dropped only once readers can see the subscription
+        created_subscription = await self._subscription_repository.create_subscription(user_id, subscription)
+        await self._invalidate_active_subscription(user_id)
+        return created_subscription
 
     async def get_active_subscription(self, user_id: UUID) -> Optional[SubscriptionReadSchema]:
+        return await self._request_cache.get_or_load(
+            ('active_subscription', user_id),
+            lambda: self._load_active_subscription(user_id),
+        )
+
+    async def _load_active_subscription(self, user_id: UUID) -> Optional[SubscriptionReadSchema]:
+        # Only users that exist get into the cache, so a cached entry also answers the existence check
+        if self._active_subscription_cache:
+            is_cached, active_subscription = await self._active_subscription_cache.get(user_id)
+            if is_cached:
+                return active_subscription
+
         await self._user_service.raise_error_if_not_exists(user_id)
-        return await self._subscription_repository.get_active_subscription(user_id)
+        active_subscription = await self._subscription_repository.get_active_subscription(user_id)
+        if self._active_subscription_cache:
+            await self._active_subscription_cache.set(user_id, active_subscription)
+        return active_subscription
+
+    async def delete_subscription(self, subscription_id: UUID):
+        # As with a created subscription, the entry is dropped after the repository commits the deletion
+        user_id = await self._subscription_repository.delete_subscription(subscription_id)
+        if user_id is None:
+            raise SubscriptionNotFoundError
+        await self._invalidate_active_subscription(user_id)
+
+    async def _invalidate_active_subscription(self, user_id: UUID):
+        if self._active_subscription_cache:
+            await self._active_subscription_cache.delete(user_id)
 
     async def get_subscriptions(self, user_id: UUID) -> list[SubscriptionReadSchema]:
         await self._user_service.raise_error_if_not_exists(user_id)
@@ -35,6 +35,9 @@ class UserRepository(BaseRepository):
         return user.scalar()
 
     async def get_user_by_id(self, user_id: UUID) -> Optional[UserReadDTO]:
+        return await self._request_cache.get_or_load(('user', user_id), lambda: self._get_user_by_id(user_id))
+
+    async def _get_user_by_id(self, user_id: UUID) -> Optional[UserReadDTO]:
         user = await self._get_user_model_instance_by_id(user_id)
         if user is None:
             return None
@@ -53,6 +56,9 @@ class UserRepository(BaseRepository):
         await self._session.commit()
 
     async def exists_by_id(self, user_id: UUID) -> bool:
+        return await self._request_cache.get_or_load(('user_exists', user_id), lambda: self._exists_by_id(user_id))
+
+    async def _exists_by_id(self, user_id: UUID) -> bool:
         return await self._session.scalar(
             select(
                 exists().where(
@@ -1,6 +1,12 @@
 from src.infrastructure.db.dependencies import AsyncSessionDI
+from src.infrastructure.db.request_cache import RequestCache, get_request_cache
 
 
 class BaseRepository:
     def __init__(self, session: AsyncSessionDI):
         self._session = session
+
+    @property
+    def _request_cache(self) -> RequestCache:
+        # Looked up on every use, since a released session starts the next request with a new cache
+        return get_request_cache(self._session)
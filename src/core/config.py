@@ -23,12 +23,29 @@ class Settings(BaseSettings):
     DB_NAME: str
     DB_USER: str
     DB_PASS: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10
+    DB_POOL_RECYCLE: int = 30 * 60
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: float = 60
+    # Milliseconds, the server cancels statements that run longer
+    DB_STATEMENT_TIMEOUT: int = 60 * 1000
+    DB_APPLICATION_NAME: str = 'freebots'
 
     REDIS_HOST: str
     REDIS_PORT: int
     REDIS_PASSWORD: str
     REDIS_USER: str
     REDIS_USER_PASSWORD: str
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 1
+    REDIS_SOCKET_TIMEOUT: float = 1
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 1
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    REDIS_CIRCUIT_BREAKER_RESET_TIMEOUT: float = 10
 
     AUTH_BOT_SECRET: str
 
@@ -47,6 +64,47 @@ class Settings(BaseSettings):
     AI_CODEGEN_MAX_CODE_CHARS: int = 60000
     AI_CODEGEN_MAX_REQUIREMENTS_CHARS: int = 2000
     AI_CODEGEN_MAX_MESSAGES_PER_SESSION: int = 20
+    AI_CODEGEN_CONTEXT_MAX_TOKENS: int = 24000
+    AI_CODEGEN_EDIT_MODE_ENABLED: bool = True
+    AI_CODEGEN_WORKER_ENABLED: bool = True
+    AI_CODEGEN_WORKERS: int = 2
+    AI_CODEGEN_QUEUE_POLL_INTERVAL: float = 5
+    AI_CODEGEN_JOB_TIMEOUT: int = 10 * 60
+    AI_CODEGEN_SWEEP_INTERVAL: float = 60
+    AI_CODEGEN_SWEEP_RETRY_DELAY: float = 1
+    AI_CODEGEN_STREAM_FLUSH_INTERVAL: float = 0.1
+    AI_CODEGEN_EVENTS_KEEPALIVE_INTERVAL: float = 15
+
+    LLM_RESPONSE_CACHE_ENABLED: bool = True
+    LLM_RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    LLM_RESPONSE_CACHE_TTL: int = 24 * 60 * 60
+    LLM_RESPONSE_CACHE_SIMILARITY_ENABLED: bool = False
+    LLM_RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = 0.9
+
+    CODE_GEN_WORKERS: int = 4
+    CODE_GEN_ZIP_CHUNK_SIZE: int = 64 * 1024
+    CODE_GEN_CACHE_ENABLED: bool = True
+    CODE_GEN_CACHE_MAX_SIZE: int = 256 * 1024 * 1024
+    CODE_GEN_FRAGMENT_CACHE_SIZE: int = 2048
+    CODE_GEN_PREVIEW_KEEPALIVE_INTERVAL: float = 15
+    CODE_GEN_EXPORT_MAX_PROJECTS: int = 500
+    CODE_GEN_SINGLE_QUERY_LOADER: bool = True
+
+    PROCESS_POOL_WORKERS: int = 2
+
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    IMAGE_UPLOAD_MAX_SIZE: int = 10 * 1024 * 1024
+    # Telegram downscales photos to 2560 px on the longest side, so larger images only cost disk and traffic
+    IMAGE_MAX_SIDE: int = 2560
+    IMAGE_QUALITY: int = 85
+    IMAGE_THUMBNAIL_SIDE: int = 320
+
+    PROJECT_OWNER_CACHE_ENABLED: bool = False
+    PROJECT_OWNER_CACHE_TTL: int = 24 * 60 * 60
+
+    SUBSCRIPTION_CACHE_ENABLED: bool = True
+    SUBSCRIPTION_CACHE_TTL: int = 60 * 60
+    SUBSCRIPTION_CACHE_MISSING_TTL: int = 30
 
     @field_validator('YOOKASSA_IPS', mode='before')
     @classmethod
@@ -74,3 +132,7 @@ MEDIA_DIR = Path('src', 'media')
 
 # Code templates
 BOT_TEMPLATES_DIR = Path('src', 'apps', 'code_gen', 'bot_templates', 'project_structure')
+
+# Generated code cache
+CODE_GEN_CACHE_DIR = Path('cache', 'code_gen')
+JINJA_BYTECODE_CACHE_DIR = Path('cache', 'jinja')
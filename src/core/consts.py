@@ -9,3 +9,7 @@ MAX_DIALOGUES_WITH_PRO_PLAN = 10
 
 # Common limits
 MAX_PLUGINS_PER_PROJECT = 3
+
+# Blocks are ordered by sparse sequence numbers, so a block can be inserted or moved without renumbering the others
+BLOCK_SEQUENCE_NUMBER_STEP = 1024
+MAX_BLOCKS_BATCH_OPERATIONS = 200
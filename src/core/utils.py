@@ -1,8 +1,14 @@
+import hashlib
 import os
 import shutil
 from pathlib import Path
+from typing import Optional
+from uuid import uuid4
 
 import anyio
+from fastapi import UploadFile
+
+from src.core.errors import FileTooLargeError
 
 
 async def soft_delete_dir(path: Path):
@@ -13,3 +19,39 @@ async def soft_delete_dir(path: Path):
 async def soft_delete_file(path: Path):
     if path.exists():
         await anyio.to_thread.run_sync(os.remove, path)
+
+
+async def save_upload_file(upload_file: UploadFile, path: Path, max_size: int, chunk_size: int) -> str:
+    # Streams the upload to a temporary file next to the target and returns the sha256 of its content
+    if upload_file.size is not None and upload_file.size > max_size:
+        raise FileTooLargeError
+
+    await anyio.Path(path.parent).mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'.{path.name}.{uuid4().hex}.tmp')
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with await anyio.open_file(tmp_path, 'wb') as tmp_file:
+            while chunk := await upload_file.read(chunk_size):
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLargeError
+                digest.update(chunk)
+                await tmp_file.write(chunk)
+        await anyio.to_thread.run_sync(os.replace, tmp_path, path)
+    except BaseException:
+        await anyio.Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return digest.hexdigest()
+
+
+def format_sse_event(data: str, event: Optional[str] = None) -> str:
+    # Only line feeds separate the data lines, a trailing one is kept as an empty line. Carriage returns would end the
+    # line for the client too, so text that may contain them is sent JSON encoded
+    lines = [f'event: {event}'] if event else []
+    lines += [f'data: {line}' for line in data.split('\n')]
+    return '\n'.join(lines) + '\n\n'
+
+
+def format_sse_comment(comment: str) -> str:
+    return f': {comment}\n\n'
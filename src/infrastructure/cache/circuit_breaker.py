@@ -0,0 +1,25 @@
+import time
+from typing import Optional
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+
+    def is_open(self) -> bool:
+        # Once the reset timeout passes calls are let through again, and the first failure opens the circuit anew
+        if self._opened_at is None:
+            return False
+        return time.monotonic() - self._opened_at < self._reset_timeout
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self):
+        self._failures += 1
+        if self._failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
@@ -1,47 +1,151 @@
-from typing import Self, Any
+from contextlib import asynccontextmanager
+from typing import Self, Any, AsyncIterator, Optional, Callable, Awaitable, TypeVar
 
 import redis
 from loguru import logger
-from redis.asyncio import Redis
+from redis.asyncio import Redis, BlockingConnectionPool, ConnectionPool
+from redis.asyncio.client import PubSub, Pipeline
 
 from src.core.config import settings
+from src.infrastructure.cache.circuit_breaker import CircuitBreaker
+from src.infrastructure.cache.errors import CacheUnavailableError
+
+T = TypeVar('T')
+
+
+class CacheSubscription:
+    def __init__(self, pubsub: PubSub):
+        self._pubsub = pubsub
+
+    async def get_message(self, timeout: float) -> Optional[bytes]:
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return message['data']
 
 
 class CacheClient:
     def __init__(self):
         self._client = None
+        self._blocking_client = None
+        self._circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.REDIS_CIRCUIT_BREAKER_RESET_TIMEOUT,
+        )
 
     async def __aenter__(self) -> Self:
-        self._client = Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            username=settings.REDIS_USER,
-            password=settings.REDIS_USER_PASSWORD,
+        connection_params = {
+            'host': settings.REDIS_HOST,
+            'port': settings.REDIS_PORT,
+            'username': settings.REDIS_USER,
+            'password': settings.REDIS_USER_PASSWORD,
+            'socket_connect_timeout': settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+            'health_check_interval': settings.REDIS_HEALTH_CHECK_INTERVAL,
+        }
+        # Requests wait for a free connection only for a short time, so a slow Redis can't pile up the whole app
+        self._client = Redis.from_pool(
+            BlockingConnectionPool(
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                **connection_params,
+            )
         )
+        # Subscriptions and blocking commands hold their connections for a long time, so they must not take up the
+        # shared pool and are not limited by the socket timeout
+        self._blocking_client = Redis.from_pool(ConnectionPool(**connection_params))
         await self.ping()
         return self
 
     async def ping(self):
         try:
-            await self._client.ping()
-        except redis.exceptions.ConnectionError:
+            await self._execute(self._client.ping)
+        except CacheUnavailableError:
             logger.warning('Redis connection failed')
 
+    async def _execute(self, command: Callable[[], Awaitable[T]]) -> T:
+        # Callers get CacheUnavailableError right away while Redis is considered down instead of waiting for timeouts
+        if self._circuit_breaker.is_open():
+            raise CacheUnavailableError('Redis is unavailable')
+
+        try:
+            result = await command()
+        except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError, OSError) as error:
+            # Only errors that mean Redis can't be reached open the circuit, including socket errors and timeouts that
+            # are raised unwrapped. Command errors and bugs in the caller are raised as they are
+            self._circuit_breaker.record_failure()
+            raise CacheUnavailableError(str(error)) from error
+        self._circuit_breaker.record_success()
+        return result
+
     async def get(self, name: str) -> Any:
-        return await self._client.get(name)
+        return await self._execute(lambda: self._client.get(name))
 
-    async def set(self, name: str, value: int | float | str, ex: int) -> None:
-        await self._client.set(name=name, value=value, ex=ex)
+    async def set(self, name: str, value: int | float | str | bytes, ex: int, nx: bool = False) -> None:
+        await self._execute(lambda: self._client.set(name=name, value=value, ex=ex, nx=nx))
 
     async def delete(self, name: str) -> None:
-        await self._client.delete(name)
+        await self._execute(lambda: self._client.delete(name))
+
+    async def getdel(self, name: str) -> Any:
+        return await self._execute(lambda: self._client.getdel(name))
 
     async def incr(self, name: str, amount: int = 1) -> Any:
-        return await self._client.incr(name, amount)
+        return await self._execute(lambda: self._client.incr(name, amount))
 
     async def ttl(self, name: str) -> Any:
-        return await self._client.ttl(name)
+        return await self._execute(lambda: self._client.ttl(name))
+
+    async def rpush(self, name: str, *values: int | float | str | bytes) -> int:
+        return await self._execute(lambda: self._client.rpush(name, *values))
+
+    async def blpop(self, name: str, timeout: float) -> Optional[bytes]:
+        item = await self._execute(lambda: self._blocking_client.blpop([name], timeout=timeout))
+        if item is None:
+            return None
+        return item[1]
+
+    async def pipeline(self, commands: Callable[[Pipeline], Any], transaction: bool = False) -> list[Any]:
+        # All queued commands are sent in one round trip. With transaction they are also applied atomically
+        async def execute() -> list[Any]:
+            async with self._client.pipeline(transaction=transaction) as pipeline:
+                commands(pipeline)
+                return await pipeline.execute()
+
+        return await self._execute(execute)
+
+    async def transaction(self, commands: Callable[[Pipeline], Any]) -> list[Any]:
+        return await self.pipeline(commands, transaction=True)
+
+    async def publish(self, channel: str, message: str) -> int:
+        # Notifications are best effort and must not break the operation that triggered them
+        try:
+            return await self._execute(lambda: self._client.publish(channel, message))
+        except redis.exceptions.RedisError:
+            logger.warning(f'Failed to publish message to {channel} channel')
+            return 0
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[CacheSubscription]:
+        pubsub = self._blocking_client.pubsub()
+        try:
+            await self._execute(lambda: pubsub.subscribe(channel))
+        except BaseException:
+            await pubsub.aclose()
+            raise
+
+        try:
+            yield CacheSubscription(pubsub)
+        finally:
+            # A failed unsubscribe must not replace the error that ended the subscription
+            try:
+                await pubsub.unsubscribe(channel)
+            except redis.exceptions.RedisError:
+                logger.warning(f'Failed to unsubscribe from {channel} channel')
+            await pubsub.aclose()
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self._client:
             await self._client.aclose()
+        if self._blocking_client:
+            await self._blocking_client.aclose()
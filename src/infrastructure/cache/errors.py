@@ -0,0 +1,5 @@
+import redis
+
+
+class CacheUnavailableError(redis.exceptions.ConnectionError):
+    pass
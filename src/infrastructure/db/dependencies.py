@@ -3,6 +3,14 @@ from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.infrastructure.db.request_cache import RequestCache, get_request_cache
 from src.infrastructure.db.sessions import get_async_session
 
 AsyncSessionDI = Annotated[AsyncSession, Depends(get_async_session)]
+
+
+def get_request_cache_dependency(session: AsyncSessionDI) -> RequestCache:
+    return get_request_cache(session)
+
+
+RequestCacheDI = Annotated[RequestCache, Depends(get_request_cache_dependency)]
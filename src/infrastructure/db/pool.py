@@ -0,0 +1,42 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+
+class DBPoolMetrics:
+    # Counters are per process, every uvicorn worker has its own engine and pool
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.checked_out_max = 0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, wait: float, checked_out: int):
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_total += wait
+            self.checkout_wait_max = max(self.checkout_wait_max, wait)
+            self.checked_out_max = max(self.checked_out_max, checked_out)
+
+    def record_checkout_timeout(self):
+        with self._lock:
+            self.checkout_timeouts += 1
+
+
+db_pool_metrics = DBPoolMetrics()
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            db_pool_metrics.record_checkout_timeout()
+            raise
+        db_pool_metrics.record_checkout(time.perf_counter() - started_at, self.checkedout())
+        return connection
@@ -0,0 +1,55 @@
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+T = TypeVar('T')
+
+REQUEST_CACHE_INFO_KEY = 'request_cache'
+
+
+class RequestCache:
+    # Lives in the session info, so every repository and service of a request shares it. Any commit or rollback
+    # clears it, which keeps the cached rows consistent with the writes made by the request itself
+    def __init__(self):
+        self._values: dict[Hashable, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        if key in self._values:
+            self.hits += 1
+            return self._values[key]
+
+        self.misses += 1
+        value = await load()
+        self._values[key] = value
+        return value
+
+    def clear(self):
+        self._values.clear()
+
+
+def get_request_cache(session: AsyncSession) -> RequestCache:
+    request_cache = session.info.get(REQUEST_CACHE_INFO_KEY)
+    if request_cache is None:
+        request_cache = session.info[REQUEST_CACHE_INFO_KEY] = RequestCache()
+    return request_cache
+
+
+def release_request_cache(session: AsyncSession):
+    # Called when a request is done with its session, so a session that outlives the request starts the next one
+    # with an empty cache
+    request_cache = session.info.pop(REQUEST_CACHE_INFO_KEY, None)
+    if request_cache is not None:
+        logger.debug(f'Request cache: {request_cache.hits} hits, {request_cache.misses} misses')
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _clear_request_cache(session: Session):
+    request_cache = session.info.get(REQUEST_CACHE_INFO_KEY)
+    if request_cache is not None:
+        request_cache.clear()
@@ -3,6 +3,9 @@ from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
+from src.core.config import settings
+from src.infrastructure.db.pool import InstrumentedAsyncAdaptedQueuePool
+from src.infrastructure.db.request_cache import release_request_cache
 from src.infrastructure.db.utils import get_dsn
 
 
@@ -10,10 +13,31 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(get_dsn(prefix='postgresql+asyncpg'))
+engine = create_async_engine(
+    get_dsn(prefix='postgresql+asyncpg'),
+    poolclass=InstrumentedAsyncAdaptedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={
+        # Both caches have to be disabled when connecting through PgBouncer in transaction mode
+        'statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE,
+        'prepared_statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE,
+        'command_timeout': settings.DB_COMMAND_TIMEOUT,
+        'server_settings': {
+            'application_name': settings.DB_APPLICATION_NAME,
+            'statement_timeout': str(settings.DB_STATEMENT_TIMEOUT),
+        },
+    },
+)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
-        yield session
+        try:
+            yield session
+        finally:
+            release_request_cache(session)
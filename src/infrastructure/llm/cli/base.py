@@ -1,4 +1,4 @@
-from typing import Type, TypeVar, Optional
+from typing import Type, TypeVar, Optional, AsyncIterator
 
 from src.infrastructure.llm.types import LLMChatMessage
 
@@ -18,3 +18,12 @@ class AsyncLLMClient:
         max_tokens: int = 5000,
     ) -> T:
         raise NotImplementedError
+
+    def stream_structured_request(
+        self,
+        object_type: Type[T],
+        history: list[LLMChatMessage],
+        model: Optional[str] = None,
+        max_tokens: int = 5000,
+    ) -> AsyncIterator[str]:
+        raise NotImplementedError
@@ -1,5 +1,5 @@
 import json
-from typing import TypeVar, Type, Optional
+from typing import TypeVar, Type, Optional, AsyncIterator
 
 from openai import AsyncOpenAI
 from openai.lib._parsing import type_to_response_format_param
@@ -35,3 +35,27 @@ class AsyncOpenAICli(AsyncLLMClient):
         )
         data = json.loads(response.choices[0].message.content)
         return object_type(**data)
+
+    async def stream_structured_request(
+        self,
+        object_type: Type[T],
+        history: list[LLMChatMessage],
+        model: Optional[str] = None,
+        max_tokens: int = settings.OPENAI_MAX_OUTPUT_TOKENS,
+    ) -> AsyncIterator[str]:
+        # Yields raw chunks of the JSON document, the caller parses and validates it
+        if model is None:
+            model = self.model
+
+        json_schema = type_to_response_format_param(object_type)
+        stream = await self._client.chat.completions.create(
+            model=model,
+            messages=history,
+            max_completion_tokens=max_tokens,
+            response_format=json_schema,
+            stream=True,
+        )
+        async with stream:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
@@ -0,0 +1,15 @@
+from typing import Annotated, Optional
+
+from fastapi import Depends
+
+from src.core.config import settings
+from src.infrastructure.llm.response_cache import LLMResponseCache, llm_response_cache
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    if not settings.LLM_RESPONSE_CACHE_ENABLED:
+        return None
+    return llm_response_cache
+
+
+LLMResponseCacheDI = Annotated[Optional[LLMResponseCache], Depends(get_llm_response_cache)]
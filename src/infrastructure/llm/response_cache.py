@@ -0,0 +1,165 @@
+import hashlib
+import json
+import random
+import re
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from src.core.config import settings
+from src.infrastructure.llm.enums import LLMChatMemberRole
+from src.infrastructure.llm.types import LLMChatMessage
+
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 16
+MINHASH_SHINGLE_SIZE = 3
+MINHASH_PRIME = (1 << 61) - 1
+
+_minhash_random = random.Random(0)
+MINHASH_COEFFICIENTS = [
+    (_minhash_random.randrange(1, MINHASH_PRIME), _minhash_random.randrange(0, MINHASH_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+@dataclass
+class LLMResponseCacheEntry:
+    content: str
+    expires_at: float
+    context_key: str
+    signature: Optional[tuple[int, ...]]
+
+
+class LLMResponseCache:
+    # Lives in the process memory, so every process running generations has its own cache and counters.
+    # Responses are looked up by the exact conversation first, then, if similarity_threshold is set, by a conversation
+    # that differs only in a similar enough last prompt
+    def __init__(self, max_entries: int, ttl: float, similarity_threshold: Optional[float] = None):
+        self.max_entries = max_entries
+        self._ttl = ttl
+        self._similarity_threshold = similarity_threshold
+        self._entries: OrderedDict[str, LLMResponseCacheEntry] = OrderedDict()
+        self._buckets: dict[tuple[str, int, tuple[int, ...]], set[str]] = {}
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    def get(self, model: str, messages: list[LLMChatMessage]) -> Optional[str]:
+        entry = self._get_entry(_get_messages_key(model, messages))
+        if entry is not None:
+            self.exact_hits += 1
+            return entry.content
+
+        if self._similarity_threshold is not None:
+            entry = self._get_similar_entry(model, messages)
+            if entry is not None:
+                self.similar_hits += 1
+                return entry.content
+
+        self.misses += 1
+        return None
+
+    def set(self, model: str, messages: list[LLMChatMessage], content: str):
+        key = _get_messages_key(model, messages)
+        self._remove_entry(key)
+
+        entry = LLMResponseCacheEntry(
+            content=content,
+            expires_at=time.monotonic() + self._ttl,
+            context_key=_get_messages_key(model, messages[:-1]),
+            signature=None,
+        )
+        if self._similarity_threshold is not None:
+            entry.signature = _get_minhash_signature(messages[-1]['content'])
+            for bucket in _get_minhash_buckets(entry.context_key, entry.signature):
+                self._buckets.setdefault(bucket, set()).add(key)
+        self._entries[key] = entry
+
+        while len(self._entries) > self.max_entries:
+            self._remove_entry(next(iter(self._entries)))
+
+    def _get_entry(self, key: str) -> Optional[LLMResponseCacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove_entry(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _get_similar_entry(self, model: str, messages: list[LLMChatMessage]) -> Optional[LLMResponseCacheEntry]:
+        # Candidates share at least one band of the signature, which is very likely for similar prompts
+        context_key = _get_messages_key(model, messages[:-1])
+        signature = _get_minhash_signature(messages[-1]['content'])
+        candidate_keys = set()
+        for bucket in _get_minhash_buckets(context_key, signature):
+            candidate_keys.update(self._buckets.get(bucket, ()))
+
+        similar_key, max_similarity = None, self._similarity_threshold
+        for key in candidate_keys:
+            similarity = _get_minhash_similarity(signature, self._entries[key].signature)
+            if similarity >= max_similarity:
+                similar_key, max_similarity = key, similarity
+
+        if similar_key is None:
+            return None
+        return self._get_entry(similar_key)
+
+    def _remove_entry(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None or entry.signature is None:
+            return
+
+        for bucket in _get_minhash_buckets(entry.context_key, entry.signature):
+            bucket_keys = self._buckets[bucket]
+            bucket_keys.discard(key)
+            if not bucket_keys:
+                del self._buckets[bucket]
+
+
+def _normalize_text(text: str) -> str:
+    return ' '.join(text.split()).casefold()
+
+
+def _get_messages_key(model: str, messages: list[LLMChatMessage]) -> str:
+    # Only prompts are normalized. System prompts and answers carry code, where indentation and case change its meaning
+    normalized_messages = [
+        [
+            message['role'],
+            _normalize_text(message['content']) if message['role'] == LLMChatMemberRole.USER else message['content'],
+        ]
+        for message in messages
+    ]
+    return hashlib.sha256(json.dumps([model, normalized_messages], ensure_ascii=False).encode()).hexdigest()
+
+
+def _get_minhash_signature(text: str) -> tuple[int, ...]:
+    text = ' '.join(re.sub(r'[^\w\s]', ' ', _normalize_text(text)).split())
+    shingles = {text[i : i + MINHASH_SHINGLE_SIZE] for i in range(max(len(text) - MINHASH_SHINGLE_SIZE + 1, 1))}
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingles]
+    return tuple(min((a * value + b) % MINHASH_PRIME for value in hashes) for a, b in MINHASH_COEFFICIENTS)
+
+
+def _get_minhash_buckets(context_key: str, signature: tuple[int, ...]) -> list[tuple[str, int, tuple[int, ...]]]:
+    rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+    return [(context_key, band, signature[band * rows : (band + 1) * rows]) for band in range(MINHASH_BANDS)]
+
+
+def _get_minhash_similarity(signature: tuple[int, ...], other_signature: tuple[int, ...]) -> float:
+    return sum(value == other_value for value, other_value in zip(signature, other_signature)) / len(signature)
+
+
+llm_response_cache = LLMResponseCache(
+    max_entries=settings.LLM_RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=settings.LLM_RESPONSE_CACHE_TTL,
+    similarity_threshold=(
+        settings.LLM_RESPONSE_CACHE_SIMILARITY_THRESHOLD if settings.LLM_RESPONSE_CACHE_SIMILARITY_ENABLED else None
+    ),
+)
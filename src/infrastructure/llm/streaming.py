@@ -0,0 +1,100 @@
+from typing import Iterable, Optional
+
+JSON_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JSONStringFieldsStreamParser:
+    # Decodes string values of the top level object keys from a JSON document that arrives in chunks. Every character
+    # is looked at once, so a long response costs the same as parsing it at the end. Other values are only tracked to
+    # find the top level keys, the complete document is still validated by the caller
+    def __init__(self, fields: Iterable[str]):
+        self._fields = set(fields)
+        self._depth = 0
+        self._expects_key = False
+        self._in_string = False
+        self._is_key = False
+        self._key: list[str] = []
+        self._field: Optional[str] = None
+        self._escape: Optional[str] = None
+        self._high_surrogate: Optional[str] = None
+
+    def feed(self, chunk: str) -> list[tuple[str, str]]:
+        parts: list[tuple[str, str]] = []
+        text: list[str] = []
+        for char in chunk:
+            if not self._in_string:
+                self._feed_structure(char)
+                continue
+
+            if self._escape is not None:
+                decoded = self._feed_escape(char)
+            elif char == '\\':
+                self._escape = ''
+                continue
+            elif char == '"':
+                decoded = self._take_high_surrogate()
+                if self._field is not None and (text or decoded):
+                    parts.append((self._field, ''.join(text) + decoded))
+                text = []
+                self._close_string()
+                continue
+            else:
+                decoded = self._take_high_surrogate() + char
+
+            if self._is_key:
+                self._key.append(decoded)
+            elif self._field is not None:
+                text.append(decoded)
+
+        if self._field is not None and text:
+            parts.append((self._field, ''.join(text)))
+        return parts
+
+    def _feed_structure(self, char: str):
+        if char == '"':
+            self._in_string = True
+            self._is_key = self._depth == 1 and self._expects_key
+            if self._is_key:
+                self._key = []
+            elif self._depth == 1 and ''.join(self._key) in self._fields:
+                self._field = ''.join(self._key)
+        elif char in '{[':
+            self._depth += 1
+            self._expects_key = char == '{' and self._depth == 1
+        elif char in '}]':
+            self._depth -= 1
+        elif char == ',' and self._depth == 1:
+            self._expects_key = True
+        elif char == ':' and self._depth == 1:
+            self._expects_key = False
+
+    def _feed_escape(self, char: str) -> str:
+        if self._escape == '' and char != 'u':
+            self._escape = None
+            return self._take_high_surrogate() + JSON_ESCAPES.get(char, char)
+
+        self._escape += char
+        if len(self._escape) < 5:
+            return ''
+        decoded = chr(int(self._escape[1:], 16))
+        self._escape = None
+
+        # Characters outside the BMP are escaped as surrogate pairs which are joined like json.loads does
+        if '\ud800' <= decoded <= '\udbff':
+            pending = self._take_high_surrogate()
+            self._high_surrogate = decoded
+            return pending
+        if '\udc00' <= decoded <= '\udfff' and self._high_surrogate is not None:
+            high_surrogate = ord(self._take_high_surrogate())
+            return chr(0x10000 + ((high_surrogate - 0xD800) << 10) + (ord(decoded) - 0xDC00))
+        return self._take_high_surrogate() + decoded
+
+    def _take_high_surrogate(self) -> str:
+        high_surrogate, self._high_surrogate = self._high_surrogate or '', None
+        return high_surrogate
+
+    def _close_string(self):
+        self._in_string = False
+        if not self._is_key:
+            self._field = None
+        self._is_key = False
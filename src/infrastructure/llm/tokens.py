@@ -0,0 +1,56 @@
+import time
+
+import anyio
+from loguru import logger
+
+from src.infrastructure.llm.types import LLMChatMessage
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+FALLBACK_ENCODING = 'o200k_base'
+FALLBACK_BYTES_PER_TOKEN = 4
+MESSAGE_TOKENS_OVERHEAD = 4
+TOKENIZER_RETRY_INTERVAL = 5 * 60
+
+_encodings: dict[str, 'tiktoken.Encoding'] = {}
+_failed_loads: dict[str, float] = {}
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = _encodings.get(model)
+    if encoding is None:
+        # Counted in UTF-8 bytes, so Cyrillic text that takes more tokens per character is not underestimated
+        return -(-len(text.encode()) // FALLBACK_BYTES_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(message: LLMChatMessage, model: str) -> int:
+    return count_tokens(message['content'], model) + MESSAGE_TOKENS_OVERHEAD
+
+
+async def load_tokenizer(model: str):
+    # Encodings are downloaded on the first use, so they are loaded in a thread instead of blocking the event loop.
+    # Tokens are estimated until the encoding is loaded, a failed load is retried after an interval
+    if tiktoken is None or model in _encodings:
+        return
+    failed_at = _failed_loads.get(model)
+    if failed_at is not None and time.monotonic() - failed_at < TOKENIZER_RETRY_INTERVAL:
+        return
+
+    try:
+        _encodings[model] = await anyio.to_thread.run_sync(_get_encoding, model)
+    except (OSError, ValueError) as exc:
+        _failed_loads[model] = time.monotonic()
+        logger.warning(f'Failed to load {model} tokenizer, retrying in {TOKENIZER_RETRY_INTERVAL}s: {exc!r}')
+        return
+    _failed_loads.pop(model, None)
+
+
+def _get_encoding(model: str) -> 'tiktoken.Encoding':
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
@@ -0,0 +1,25 @@
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from src.core.config import settings
+
+
+@functools.cache
+def get_process_pool() -> ProcessPoolExecutor:
+    # Workers are spawned instead of forked, since forking a process that already runs threads can copy a held lock
+    # into the child and deadlock it
+    return ProcessPoolExecutor(
+        max_workers=settings.PROCESS_POOL_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+    )
+
+
+def start_process_pool():
+    get_process_pool()
+
+
+def shutdown_process_pool():
+    if get_process_pool.cache_info().currsize:
+        get_process_pool().shutdown(cancel_futures=True)
+        get_process_pool.cache_clear()
@@ -6,28 +6,41 @@ from authx.exceptions import JWTDecodeError, MissingTokenError
 from fastapi import FastAPI, HTTPException, status
 from fastapi.requests import Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 import src.core.config
 from src.core.config import settings, MEDIA_DIR
 from src.api.router import get_app_router
+from src.apps.ai_code_gen.worker import run_ai_code_gen_worker
+from src.apps.code_gen.archives import load_static_archive_layer
+from src.apps.code_gen.templates import load_templates
+from src.apps.media.static_files import MediaStaticFiles, get_media_assets
 from src.infrastructure.cache.client import CacheClient
 from src.infrastructure.db.seeds.orm import seed_database
+from src.infrastructure.llm.tokens import load_tokenizer
+from src.infrastructure.pools import start_process_pool, shutdown_process_pool
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    start_process_pool()
     auth_security = AuthX(config=src.core.config.auth_config)
     auth_security.handle_errors(app)
 
     await seed_database()
+    load_templates()
+    load_static_archive_layer()
+    get_media_assets()
+    await load_tokenizer(settings.OPENAI_MODEL)
 
-    async with CacheClient() as cache_client:
-        yield {'auth_security': auth_security, 'cache_cli': cache_client}
+    try:
+        async with CacheClient() as cache_client, run_ai_code_gen_worker(cache_client):
+            yield {'auth_security': auth_security, 'cache_cli': cache_client}
+    finally:
+        shutdown_process_pool()
 
 
 app = FastAPI(title='Freebots', lifespan=lifespan, debug=settings.DEBUG)
-app.mount('/api/media', StaticFiles(directory=MEDIA_DIR), name='media')
+app.mount('/api/media', MediaStaticFiles(directory=MEDIA_DIR), name='media')
 app.include_router(get_app_router())
 
 origins = [
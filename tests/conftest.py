@@ -1,25 +1,31 @@
 import random
+import shutil
 
 import pytest
 import pytest_asyncio
 from asgi_lifespan import LifespanManager
+from authx import AuthX
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
-from src.api.v1.auth.schemas import AuthCredentialsSchema
-from src.core.config import settings
+from src.core.config import settings, auth_config, MEDIA_DIR
+from src.apps.ai_code_gen import services as ai_code_gen_services
+from src.apps.dialogues.dto import DialogueReadDTO
 from src.apps.dialogues.repositories import DialogueRepository
-from src.api.v1.dialogues.schemas import DialogueReadSchema
+from src.apps.media.utils import MEDIA_BLOBS_DIR
+from src.infrastructure.cache.client import CacheClient
+from src.infrastructure.db.request_cache import release_request_cache
 from src.infrastructure.db.sessions import get_async_session, Base
 from src.infrastructure.db.utils import get_dsn
 from src.main import app
+from src.apps.projects.dto import ProjectReadDTO
 from src.apps.projects.repositories import ProjectRepository
-from src.api.v1.projects.schemas import ProjectReadSchema
+from src.apps.users.dto import UserReadDTO
 from src.apps.users.repositories import UserRepository
-from src.apps.users.schemas import UserReadSchema
 from tests.factories.dialogues import DialogueCreateSchemaFactory
 from tests.factories.projects import ProjectCreateSchemaFactory
+from tests.utils.llm import FakeLLMClient
 
 SQLALCHEMY_DATABASE_URL = get_dsn(
     prefix='postgresql+asyncpg',
@@ -55,24 +61,57 @@ async def session():
         yield session
 
 
+@pytest_asyncio.fixture(scope='session')
+async def session_maker(session) -> async_sessionmaker[AsyncSession]:
+    # Sessions independent of the one shared with the app, for work that runs next to a request
+    return async_session_maker
+
+
+@pytest_asyncio.fixture(scope='session')
+async def cache_client() -> CacheClient:
+    async with CacheClient() as cache_client:
+        yield cache_client
+
+
 @pytest_asyncio.fixture(scope='function', loop_scope='session', autouse=True)
 async def cleanup_tables(session):
     yield
+    # Tests that read through the session directly may leave its transaction open
+    await session.rollback()
     async with session.begin():
         for table in reversed(Base.metadata.sorted_tables):
             await session.execute(text(f'TRUNCATE TABLE {table.name} RESTART IDENTITY CASCADE'))
         await session.commit()
 
 
+@pytest.fixture
+def media_blobs_dir():
+    blobs_dir = MEDIA_DIR / MEDIA_BLOBS_DIR
+    yield blobs_dir
+    shutil.rmtree(blobs_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def llm_client(monkeypatch) -> FakeLLMClient:
+    llm_client = FakeLLMClient()
+    monkeypatch.setattr(ai_code_gen_services, 'AsyncOpenAICli', lambda **kwargs: llm_client)
+    # Responses cached by another test would be returned instead of the queued ones
+    monkeypatch.setattr(settings, 'LLM_RESPONSE_CACHE_ENABLED', False)
+    return llm_client
+
+
 @pytest_asyncio.fixture(scope='session')
 async def client(session) -> AsyncClient:
     async def override_get_session():
         try:
             yield session
         finally:
+            release_request_cache(session)
             await session.close()
 
     app.dependency_overrides[get_async_session] = override_get_session
+    # The worker opens its own database sessions, so tests that need it run it against the test database themselves
+    settings.AI_CODEGEN_WORKER_ENABLED = False
     async with LifespanManager(app) as manager:
         async with AsyncClient(
             transport=ASGITransport(app=manager.app),
@@ -86,62 +125,49 @@ async def user_repository(session) -> UserRepository:
     return UserRepository(session)
 
 
-@pytest_asyncio.fixture(scope='session')
-async def test_user_credentials(session) -> AuthCredentialsSchema:
-    return AuthCredentialsSchema(
-        email='test@test.com',
-        password='password',
-    )
-
-
 @pytest_asyncio.fixture(scope='function', loop_scope='session')
-async def test_user(user_repository: UserRepository, test_user_credentials: AuthCredentialsSchema) -> UserReadSchema:
-    user = await user_repository.create_user(test_user_credentials)
+async def test_user(user_repository: UserRepository) -> UserReadDTO:
+    user = await user_repository.create_user(tg_id=1)
     yield user
     await user_repository.delete_user(user.user_id)
 
 
-@pytest_asyncio.fixture(scope='session')
-async def another_user_credentials(session) -> AuthCredentialsSchema:
-    return AuthCredentialsSchema(
-        email='another@test.com',
-        password='password',
-    )
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def another_user(user_repository: UserRepository) -> UserReadDTO:
+    user = await user_repository.create_user(tg_id=2)
+    yield user
+    await user_repository.delete_user(user.user_id)
 
 
 @pytest_asyncio.fixture(scope='function', loop_scope='session')
-async def another_user(
-    user_repository: UserRepository, another_user_credentials: AuthCredentialsSchema
-) -> UserReadSchema:
-    user = await user_repository.create_user(another_user_credentials)
+async def test_superuser(user_repository: UserRepository) -> UserReadDTO:
+    user = await user_repository.create_user(tg_id=3, is_superuser=True)
     yield user
     await user_repository.delete_user(user.user_id)
 
 
+def get_auth_headers(user: UserReadDTO) -> dict[str, str]:
+    access_token = AuthX(config=auth_config).create_access_token(uid=str(user.user_id))
+    return {'Authorization': f'Bearer {access_token}'}
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def authorized_test_client(client: AsyncClient, test_user: UserReadDTO) -> AsyncClient:
+    client.headers.update(get_auth_headers(test_user))
+    yield client
+    client.headers.pop('Authorization')
+
+
 @pytest_asyncio.fixture(scope='function', loop_scope='session')
-async def authorized_test_client(
-    client: AsyncClient,
-    test_user: UserReadSchema,
-    test_user_credentials: AuthCredentialsSchema,
-) -> AsyncClient:
-    response = await client.post('/login', json=test_user_credentials.model_dump())
-
-    access_token = response.json()['access_token']
-    client.headers['Authorization'] = access_token
+async def authorized_another_client(client: AsyncClient, another_user: UserReadDTO) -> AsyncClient:
+    client.headers.update(get_auth_headers(another_user))
     yield client
     client.headers.pop('Authorization')
 
 
 @pytest_asyncio.fixture(scope='function', loop_scope='session')
-async def authorized_another_client(
-    client: AsyncClient,
-    another_user: UserReadSchema,
-    another_user_credentials: AuthCredentialsSchema,
-) -> AsyncClient:
-    response = await client.post('/login', json=another_user_credentials.model_dump())
-
-    access_token = response.json()['access_token']
-    client.headers['Authorization'] = access_token
+async def authorized_superuser_client(client: AsyncClient, test_superuser: UserReadDTO) -> AsyncClient:
+    client.headers.update(get_auth_headers(test_superuser))
     yield client
     client.headers.pop('Authorization')
 
@@ -153,37 +179,28 @@ async def project_repository(session) -> ProjectRepository:
 
 @pytest_asyncio.fixture(scope='function', loop_scope='session')
 async def test_project(
-    test_user: UserReadSchema,
+    test_user: UserReadDTO,
     project_repository: ProjectRepository,
-) -> ProjectReadSchema:
-    project = await project_repository.create_project(
-        user_id=test_user.user_id,
-        project_data=ProjectCreateSchemaFactory(),
-    )
+) -> ProjectReadDTO:
+    project = await project_repository.create_project(ProjectCreateSchemaFactory().to_dto(test_user.user_id))
     yield project
     await project_repository.delete_project(project.project_id)
 
 
 @pytest_asyncio.fixture(scope='function', loop_scope='session')
 async def created_projects(
-    test_user: UserReadSchema,
+    test_user: UserReadDTO,
     project_repository: ProjectRepository,
     dialogue_repository: DialogueRepository,
     request,
-) -> list[ProjectReadSchema]:
+) -> list[ProjectReadDTO]:
     num_projects = getattr(request, 'param', 1)
 
     projects = []
     for _ in range(num_projects):
-        project = await project_repository.create_project(
-            user_id=test_user.user_id,
-            project_data=ProjectCreateSchemaFactory(),
-        )
+        project = await project_repository.create_project(ProjectCreateSchemaFactory().to_dto(test_user.user_id))
         for _ in range(random.randint(0, 10)):
-            await dialogue_repository.create_dialogue(
-                project_id=project.project_id,
-                dialogue_data=DialogueCreateSchemaFactory(),
-            )
+            await dialogue_repository.create_dialogue(DialogueCreateSchemaFactory().to_dto(project.project_id))
 
         project = await project_repository.get_project(project.project_id)
         projects.append(project)
@@ -198,13 +215,9 @@ async def dialogue_repository(session) -> DialogueRepository:
 
 @pytest_asyncio.fixture(scope='function', loop_scope='session')
 async def test_dialogue(
-    test_project: ProjectReadSchema,
+    test_project: ProjectReadDTO,
     dialogue_repository: DialogueRepository,
-) -> DialogueReadSchema:
-    dialogue = DialogueCreateSchemaFactory()
-    dialogue = await dialogue_repository.create_dialogue(
-        project_id=test_project.project_id,
-        dialogue_data=dialogue,
-    )
+) -> DialogueReadDTO:
+    dialogue = await dialogue_repository.create_dialogue(DialogueCreateSchemaFactory().to_dto(test_project.project_id))
     yield dialogue
     await dialogue_repository.delete_dialogue(dialogue.dialogue_id)
@@ -0,0 +1,130 @@
+import pytest
+from httpx import AsyncClient
+
+from src.apps.ai_code_gen.edits import apply_code_edits
+from src.apps.ai_code_gen.enums import AICodeGenSessionStatus
+from src.apps.ai_code_gen.errors import AICodeGenInvalidEditError
+from src.apps.ai_code_gen.llm_response import LLMCodeEdit, LLMEditResponse
+from src.apps.ai_code_gen.prompts import EDIT_SYSTEM_PROMPT, SYSTEM_PROMPT
+from src.apps.ai_code_gen.worker import run_ai_code_gen_worker
+from src.core.config import settings
+from src.infrastructure.cache.client import CacheClient
+from tests.utils.ai_code_gen import create_ai_code_gen_session, wait_for_session_status
+from tests.utils.llm import FakeLLMClient, make_llm_response
+
+CODE = 'def echo(text):\n    return text\n\n\nprint(echo("Hello"))\n'
+
+
+@pytest.fixture
+def run_follow_up(
+    authorized_test_client: AsyncClient,
+    cache_client: CacheClient,
+    session_maker,
+    monkeypatch,
+):
+    monkeypatch.setattr(settings, 'AI_CODEGEN_WORKER_ENABLED', True)
+    monkeypatch.setattr(settings, 'AI_CODEGEN_QUEUE_POLL_INTERVAL', 0.1)
+
+    async def run_follow_up() -> dict:
+        async with run_ai_code_gen_worker(cache_client, session_maker=session_maker):
+            ai_code_gen_session = await create_ai_code_gen_session(authorized_test_client)
+            session_id = ai_code_gen_session['session_id']
+            await wait_for_session_status(authorized_test_client, session_id, AICodeGenSessionStatus.SUCCEEDED)
+            response = await authorized_test_client.post(
+                f'/ai-code-gen/sessions/{session_id}/messages',
+                json={'prompt': 'Shout the answer'},
+            )
+            assert response.status_code == 202
+            response_data = await wait_for_session_status(
+                authorized_test_client,
+                session_id,
+                AICodeGenSessionStatus.SUCCEEDED,
+            )
+        return response_data['messages'][-1]['meta']
+
+    return run_follow_up
+
+
+class TestApplyCodeEdits:
+    def test_edits_are_applied_in_order(self):
+        edits = [
+            LLMCodeEdit(search='return text', replace='return text.upper()'),
+            LLMCodeEdit(search='text.upper()', replace='text.upper() + "!"'),
+        ]
+        assert apply_code_edits(CODE, edits) == CODE.replace('return text', 'return text.upper() + "!"')
+
+    def test_no_edits(self):
+        assert apply_code_edits(CODE, []) == CODE
+
+    @pytest.mark.parametrize(
+        'edit',
+        [
+            LLMCodeEdit(search='return text.lower()', replace='return text'),
+            LLMCodeEdit(search='text', replace='message'),
+            LLMCodeEdit(search='', replace='import asyncio\n'),
+            LLMCodeEdit(search='return text', replace='return (text'),
+        ],
+        ids=['missing', 'ambiguous', 'empty', 'syntax_error'],
+    )
+    def test_invalid_edit(self, edit: LLMCodeEdit):
+        with pytest.raises(AICodeGenInvalidEditError):
+            apply_code_edits(CODE, [edit])
+
+
+class TestAICodeGenEditMode:
+    @pytest.mark.asyncio
+    async def test_follow_up_prompt_edits_code(self, llm_client: FakeLLMClient, run_follow_up):
+        edit_response = LLMEditResponse(
+            summary='Echo bot that shouts',
+            edits=[LLMCodeEdit(search='return text', replace='return text.upper()')],
+            requirements=['aiogram==3.4.1'],
+        )
+        llm_client.responses.extend([make_llm_response(code=CODE).model_dump_json(), edit_response.model_dump_json()])
+
+        meta = await run_follow_up()
+        assert meta['summary'] == edit_response.summary
+        assert meta['code'] == CODE.replace('return text', 'return text.upper()')
+        assert llm_client.requests[1][0]['content'] == EDIT_SYSTEM_PROMPT
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        'edit_response',
+        [
+            LLMEditResponse(
+                summary='Echo bot that shouts',
+                edits=[LLMCodeEdit(search='return message', replace='return message.upper()')],
+                requirements=['aiogram==3.4.1'],
+            ).model_dump_json(),
+            '{"summary": "Echo bot that shouts"}',
+        ],
+        ids=['invalid_edit', 'invalid_response'],
+    )
+    async def test_code_is_regenerated_if_edit_fails(
+        self,
+        llm_client: FakeLLMClient,
+        run_follow_up,
+        edit_response: str,
+    ):
+        llm_response = make_llm_response(summary='Echo bot that shouts', code=CODE.replace('text', 'text.upper()', 1))
+        llm_client.responses.extend(
+            [make_llm_response(code=CODE).model_dump_json(), edit_response, llm_response.model_dump_json()]
+        )
+
+        meta = await run_follow_up()
+        assert meta['summary'] == llm_response.summary
+        assert meta['code'] == llm_response.code
+        assert [request[0]['content'] for request in llm_client.requests] == [
+            SYSTEM_PROMPT,
+            EDIT_SYSTEM_PROMPT,
+            SYSTEM_PROMPT,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_edit_mode_disabled(self, llm_client: FakeLLMClient, run_follow_up, monkeypatch):
+        monkeypatch.setattr(settings, 'AI_CODEGEN_EDIT_MODE_ENABLED', False)
+        llm_response = make_llm_response(summary='Echo bot that shouts')
+        llm_client.responses.extend([make_llm_response(code=CODE).model_dump_json(), llm_response.model_dump_json()])
+
+        meta = await run_follow_up()
+        assert meta['code'] == llm_response.code
+        assert llm_client.requests[1][0]['content'] == SYSTEM_PROMPT
@@ -0,0 +1,194 @@
+import asyncio
+import itertools
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from src.apps.ai_code_gen.dto import AICodeGenResponseDeltaDTO, AICodeGenSessionCreateDTO
+from src.apps.ai_code_gen.enums import AICodeGenSessionStatus, AICodeGenStreamEvent
+from src.apps.ai_code_gen.events import AICodeGenEvents
+from src.apps.ai_code_gen.repositories import AICodeGenRepository
+from src.apps.ai_code_gen.worker import run_ai_code_gen_worker
+from src.apps.users.dto import UserReadDTO
+from src.core.config import settings
+from src.infrastructure.cache.client import CacheClient
+from src.infrastructure.llm.streaming import JSONStringFieldsStreamParser
+from tests.utils.ai_code_gen import create_ai_code_gen_session
+from tests.utils.events import parse_sse_events, wait_for_subscriber
+from tests.utils.llm import FakeLLMClient, make_llm_response
+
+STREAMED_FIELDS = ['summary', 'code']
+
+
+def parse_in_chunks(document: str, chunk_size: int) -> dict[str, str]:
+    parser = JSONStringFieldsStreamParser(fields=STREAMED_FIELDS)
+    texts = dict.fromkeys(STREAMED_FIELDS, '')
+    for start in range(0, len(document), chunk_size):
+        for field, text in parser.feed(document[start : start + chunk_size]):
+            texts[field] += text
+    return texts
+
+
+def get_streamed_texts(events: list[tuple[str, str]]) -> dict[str, str]:
+    texts = dict.fromkeys(STREAMED_FIELDS, '')
+    for event, data in events:
+        if event in texts:
+            texts[event] += json.loads(data)['text']
+    return texts
+
+
+class TestJSONStringFieldsStreamParser:
+    @pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 1000])
+    def test_fields_are_decoded(self, chunk_size: int):
+        response = {
+            'summary': 'Бот "эхо" \\ отвечает /тем же/ 🤖',
+            'code': 'def main():\n\tprint("Hello\\n")\r\n',
+            'requirements': ['aiogram', 'code'],
+        }
+        assert parse_in_chunks(json.dumps(response), chunk_size) == {
+            'summary': response['summary'],
+            'code': response['code'],
+        }
+
+    @pytest.mark.parametrize('chunk_size', [1, 5, 1000])
+    def test_unescaped_unicode(self, chunk_size: int):
+        document = json.dumps({'summary': 'Бот 🤖', 'code': ''}, ensure_ascii=False)
+        assert parse_in_chunks(document, chunk_size) == {'summary': 'Бот 🤖', 'code': ''}
+
+    def test_nested_keys_are_ignored(self):
+        document = json.dumps(
+            {
+                'meta': {'summary': 'nested', 'code': ['nested']},
+                'requirements': [{'code': 'nested'}],
+                'summary': 'top',
+                'code': 'level',
+            }
+        )
+        assert parse_in_chunks(document, 4) == {'summary': 'top', 'code': 'level'}
+
+    def test_parts_follow_chunks(self):
+        parser = JSONStringFieldsStreamParser(fields=STREAMED_FIELDS)
+        assert parser.feed('{"summary": "Ec') == [('summary', 'Ec')]
+        assert parser.feed('ho", "co') == [('summary', 'ho')]
+        assert parser.feed('de": "pri') == [('code', 'pri')]
+        assert parser.feed('nt()"}') == [('code', 'nt()')]
+
+
+class TestAICodeGenEventsAPI:
+    @pytest.mark.asyncio
+    async def test_stream_catches_up_with_partial_response(
+        self,
+        authorized_test_client: AsyncClient,
+        cache_client: CacheClient,
+    ):
+        session_id = (await create_ai_code_gen_session(authorized_test_client))['session_id']
+        events = AICodeGenEvents(cache_client)
+        await events.publish_deltas(
+            session_id,
+            [
+                AICodeGenResponseDeltaDTO(event=AICodeGenStreamEvent.SUMMARY, offset=0, text='Echo '),
+                AICodeGenResponseDeltaDTO(event=AICodeGenStreamEvent.CODE, offset=0, text='import '),
+            ],
+        )
+
+        request = asyncio.create_task(authorized_test_client.get(f'/ai-code-gen/sessions/{session_id}/events'))
+        await wait_for_subscriber(f'ai_code_gen:{session_id}')
+        # Text the client already got with the partial response is not sent again
+        await events.publish_deltas(
+            session_id,
+            [AICodeGenResponseDeltaDTO(event=AICodeGenStreamEvent.SUMMARY, offset=0, text='Echo bot')],
+        )
+        await events.publish_deltas(
+            session_id,
+            [AICodeGenResponseDeltaDTO(event=AICodeGenStreamEvent.CODE, offset=7, text='aiogram')],
+        )
+        await events.publish_status(session_id, AICodeGenSessionStatus.SUCCEEDED)
+
+        response = await asyncio.wait_for(request, timeout=5)
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/event-stream')
+        sse_events = parse_sse_events(response.text)
+        assert get_streamed_texts(sse_events) == {'summary': 'Echo bot', 'code': 'import aiogram'}
+        assert sse_events[-1] == ('status', json.dumps({'status': AICodeGenSessionStatus.SUCCEEDED}))
+        await events.clear_partial_response(session_id)
+
+    @pytest.mark.asyncio
+    async def test_finished_session(self, session, authorized_test_client: AsyncClient):
+        session_id = (await create_ai_code_gen_session(authorized_test_client))['session_id']
+        await AICodeGenRepository(session).update_session_status(session_id, AICodeGenSessionStatus.SUCCEEDED)
+
+        response = await authorized_test_client.get(f'/ai-code-gen/sessions/{session_id}/events')
+        assert parse_sse_events(response.text) == [
+            ('status', json.dumps({'status': AICodeGenSessionStatus.SUCCEEDED})),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_session_events_not_found(self, authorized_test_client: AsyncClient):
+        response = await authorized_test_client.get('/ai-code-gen/sessions/00000000-0000-0000-0000-000000000000/events')
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_session_events_no_permission(
+        self,
+        session,
+        authorized_another_client: AsyncClient,
+        test_user: UserReadDTO,
+    ):
+        ai_code_gen_session = await AICodeGenRepository(session).create_session(
+            AICodeGenSessionCreateDTO(
+                user_id=test_user.user_id,
+                title='Echo bot',
+                status=AICodeGenSessionStatus.QUEUED,
+            )
+        )
+
+        response = await authorized_another_client.get(f'/ai-code-gen/sessions/{ai_code_gen_session.session_id}/events')
+        assert response.status_code == 403
+
+
+class TestAICodeGenResponseStreaming:
+    @pytest.mark.asyncio
+    async def test_worker_publishes_response_while_it_is_generated(
+        self,
+        authorized_test_client: AsyncClient,
+        cache_client: CacheClient,
+        session_maker,
+        llm_client: FakeLLMClient,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(settings, 'AI_CODEGEN_WORKER_ENABLED', True)
+        monkeypatch.setattr(settings, 'AI_CODEGEN_QUEUE_POLL_INTERVAL', 0.1)
+        monkeypatch.setattr(settings, 'AI_CODEGEN_STREAM_FLUSH_INTERVAL', 0)
+        llm_response = make_llm_response(summary='Bot that repeats "messages"', code='print("\\n")\n' * 10)
+        llm_client.responses.append(llm_response.model_dump_json())
+
+        llm_client.release.clear()
+
+        session_id = (await create_ai_code_gen_session(authorized_test_client))['session_id']
+        messages = []
+        async with run_ai_code_gen_worker(cache_client, session_maker=session_maker):
+            async with AICodeGenEvents(cache_client).subscribe(session_id) as subscription:
+                llm_client.release.set()
+                async with asyncio.timeout(5):
+                    while True:
+                        message = await subscription.get_message(timeout=1)
+                        if message is None:
+                            continue
+                        messages.append(json.loads(message))
+                        if messages[-1]['event'] == AICodeGenStreamEvent.STATUS:
+                            break
+
+        deltas = [message for message in messages if message['event'] == AICodeGenStreamEvent.CODE]
+        # The code is published in many parts, each continuing the previous one
+        assert len(deltas) > 1
+        assert [delta['offset'] for delta in deltas] == list(
+            itertools.accumulate((len(delta['text']) for delta in deltas[:-1]), initial=0)
+        )
+        assert ''.join(delta['text'] for delta in deltas) == llm_response.code
+        assert (
+            ''.join(message['text'] for message in messages if message['event'] == AICodeGenStreamEvent.SUMMARY)
+            == llm_response.summary
+        )
+        assert messages[-1] == {'event': 'status', 'status': AICodeGenSessionStatus.SUCCEEDED}
+        assert await AICodeGenEvents(cache_client).get_partial_response(session_id) == []
@@ -0,0 +1,175 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from src.apps.ai_code_gen.enums import AICodeGenSessionStatus
+from src.apps.ai_code_gen.models import AICodeGenSessionModel
+from src.apps.ai_code_gen.queue import AI_CODEGEN_QUEUE_KEY, AICodeGenJobQueue
+from src.apps.ai_code_gen.repositories import AICodeGenRepository
+from src.apps.ai_code_gen.worker import run_ai_code_gen_worker
+from src.core.config import settings
+from src.infrastructure.cache.client import CacheClient
+from tests.utils.ai_code_gen import create_ai_code_gen_session, wait_for_session_status
+from tests.utils.llm import FakeLLMClient, make_llm_response
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def job_queue(cache_client: CacheClient) -> AICodeGenJobQueue:
+    await cache_client.delete(AI_CODEGEN_QUEUE_KEY)
+    yield AICodeGenJobQueue(cache_client)
+    await cache_client.delete(AI_CODEGEN_QUEUE_KEY)
+
+
+@pytest.fixture
+def run_worker(cache_client: CacheClient, session_maker, job_queue: AICodeGenJobQueue, monkeypatch):
+    monkeypatch.setattr(settings, 'AI_CODEGEN_WORKER_ENABLED', True)
+    monkeypatch.setattr(settings, 'AI_CODEGEN_QUEUE_POLL_INTERVAL', 0.1)
+    return lambda: run_ai_code_gen_worker(cache_client, session_maker=session_maker)
+
+
+class TestAICodeGenJobQueue:
+    @pytest.mark.asyncio
+    async def test_created_session_is_queued(
+        self,
+        authorized_test_client: AsyncClient,
+        job_queue: AICodeGenJobQueue,
+        llm_client: FakeLLMClient,
+    ):
+        response = await authorized_test_client.post('/ai-code-gen/sessions', json={'prompt': 'Echo bot'})
+        assert response.status_code == 202
+
+        response_data = response.json()
+        assert response_data['session']['status'] == AICodeGenSessionStatus.QUEUED
+        assert [message['role'] for message in response_data['messages']] == ['user']
+        assert str(await job_queue.pop(timeout=1)) == response_data['session']['session_id']
+        assert llm_client.requests == []
+
+    @pytest.mark.asyncio
+    async def test_pop_from_empty_queue(self, job_queue: AICodeGenJobQueue):
+        assert await job_queue.pop(timeout=0.1) is None
+
+    @pytest.mark.asyncio
+    async def test_session_is_claimed_once(
+        self,
+        authorized_test_client: AsyncClient,
+        session_maker,
+        job_queue: AICodeGenJobQueue,
+    ):
+        ai_code_gen_session = await create_ai_code_gen_session(authorized_test_client)
+
+        async with session_maker() as session, session_maker() as another_session:
+            claimed_session_ids = await asyncio.gather(
+                AICodeGenRepository(session).claim_queued_session(),
+                AICodeGenRepository(another_session).claim_queued_session(ai_code_gen_session['session_id']),
+            )
+        assert {str(session_id) for session_id in claimed_session_ids} == {'None', ai_code_gen_session['session_id']}
+
+    @pytest.mark.asyncio
+    async def test_message_to_busy_session(self, authorized_test_client: AsyncClient, job_queue: AICodeGenJobQueue):
+        ai_code_gen_session = await create_ai_code_gen_session(authorized_test_client)
+
+        response = await authorized_test_client.post(
+            f'/ai-code-gen/sessions/{ai_code_gen_session["session_id"]}/messages',
+            json={'prompt': 'Add a /help command'},
+        )
+        assert response.status_code == 409
+
+
+class TestAICodeGenWorker:
+    @pytest.mark.asyncio
+    async def test_worker_stores_response(
+        self,
+        authorized_test_client: AsyncClient,
+        llm_client: FakeLLMClient,
+        run_worker,
+    ):
+        llm_response = make_llm_response()
+        llm_client.responses.append(llm_response.model_dump_json())
+
+        async with run_worker():
+            ai_code_gen_session = await create_ai_code_gen_session(authorized_test_client)
+            response_data = await wait_for_session_status(
+                authorized_test_client,
+                ai_code_gen_session['session_id'],
+                AICodeGenSessionStatus.SUCCEEDED,
+            )
+
+        assert [message['role'] for message in response_data['messages']] == ['user', 'assistant']
+        assert response_data['messages'][1]['content'] == llm_response.summary
+        assert response_data['messages'][1]['meta']['code'] == llm_response.code
+        assert response_data['messages'][1]['meta']['requirements'] == llm_response.requirements
+
+    @pytest.mark.asyncio
+    async def test_failed_generation(
+        self,
+        authorized_test_client: AsyncClient,
+        llm_client: FakeLLMClient,
+        run_worker,
+    ):
+        llm_client.responses.append(RuntimeError('The model is unavailable'))
+
+        async with run_worker():
+            ai_code_gen_session = await create_ai_code_gen_session(authorized_test_client)
+            response_data = await wait_for_session_status(
+                authorized_test_client,
+                ai_code_gen_session['session_id'],
+                AICodeGenSessionStatus.FAILED,
+            )
+        assert [message['role'] for message in response_data['messages']] == ['user']
+
+        # A failed session accepts the next message
+        response = await authorized_test_client.post(
+            f'/ai-code-gen/sessions/{ai_code_gen_session["session_id"]}/messages',
+            json={'prompt': 'Try again'},
+        )
+        assert response.status_code == 202
+
+    @pytest.mark.asyncio
+    async def test_session_missing_from_queue_is_processed(
+        self,
+        authorized_test_client: AsyncClient,
+        cache_client: CacheClient,
+        llm_client: FakeLLMClient,
+        run_worker,
+    ):
+        llm_client.responses.append(make_llm_response().model_dump_json())
+        ai_code_gen_session = await create_ai_code_gen_session(authorized_test_client)
+        await cache_client.delete(AI_CODEGEN_QUEUE_KEY)
+
+        async with run_worker():
+            await wait_for_session_status(
+                authorized_test_client,
+                ai_code_gen_session['session_id'],
+                AICodeGenSessionStatus.SUCCEEDED,
+            )
+
+    @pytest.mark.asyncio
+    async def test_abandoned_session_is_failed(
+        self,
+        session,
+        authorized_test_client: AsyncClient,
+        llm_client: FakeLLMClient,
+        run_worker,
+    ):
+        ai_code_gen_session = await create_ai_code_gen_session(authorized_test_client)
+        await session.execute(
+            update(AICodeGenSessionModel)
+            .where(AICodeGenSessionModel.session_id == ai_code_gen_session['session_id'])
+            .values(
+                status=AICodeGenSessionStatus.RUNNING,
+                updated_at=datetime.now(timezone.utc) - timedelta(seconds=settings.AI_CODEGEN_JOB_TIMEOUT + 1),
+            )
+        )
+        await session.commit()
+
+        async with run_worker():
+            await wait_for_session_status(
+                authorized_test_client,
+                ai_code_gen_session['session_id'],
+                AICodeGenSessionStatus.FAILED,
+            )
+        assert llm_client.requests == []
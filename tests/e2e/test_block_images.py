@@ -0,0 +1,150 @@
+import hashlib
+import io
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from fastapi import UploadFile
+from httpx import AsyncClient
+
+from src.apps.dialogues.dto import DialogueReadDTO
+from src.apps.projects.dto import ProjectReadDTO
+from src.core.config import settings, MEDIA_DIR
+from src.core.errors import FileTooLargeError
+from src.core.utils import save_upload_file
+from tests.factories.blocks import TextBlockCreateSchemaFactory
+from tests.utils.blocks import create_image_block, get_blocks_url
+from tests.utils.images import make_image_bytes
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def image_block(
+    authorized_test_client: AsyncClient,
+    test_project: ProjectReadDTO,
+    test_dialogue: DialogueReadDTO,
+) -> dict:
+    return await create_image_block(authorized_test_client, test_project, test_dialogue)
+
+
+class TestBlockImageUploadAPI:
+    @pytest.mark.asyncio
+    async def test_upload_image(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        image_block: dict,
+        media_blobs_dir: Path,
+    ):
+        response = await authorized_test_client.post(
+            f'{get_blocks_url(test_project, test_dialogue)}/{image_block["block_id"]}/upload-image',
+            files={'image': ('cover.png', make_image_bytes(), 'image/png')},
+        )
+        assert response.status_code == 200
+
+        response_data = response.json()
+        assert response_data['block_id'] == image_block['block_id']
+        for path in (response_data['image_path'], response_data['original_image_path']):
+            assert (MEDIA_DIR / path).is_file()
+        assert list((media_blobs_dir / 'uploads').iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_upload_image_too_large(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        image_block: dict,
+        media_blobs_dir: Path,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(settings, 'IMAGE_UPLOAD_MAX_SIZE', 100)
+
+        response = await authorized_test_client.post(
+            f'{get_blocks_url(test_project, test_dialogue)}/{image_block["block_id"]}/upload-image',
+            files={'image': ('cover.png', make_image_bytes(size=(512, 512)), 'image/png')},
+        )
+        assert response.status_code == 413
+        assert response.json() == {'detail': 'Image is too large'}
+        assert list(media_blobs_dir.rglob('*.*')) == []
+
+    @pytest.mark.asyncio
+    async def test_upload_invalid_image(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        image_block: dict,
+        media_blobs_dir: Path,
+    ):
+        response = await authorized_test_client.post(
+            f'{get_blocks_url(test_project, test_dialogue)}/{image_block["block_id"]}/upload-image',
+            files={'image': ('cover.png', b'not an image', 'image/png')},
+        )
+        assert response.status_code == 415
+        assert response.json() == {'detail': 'Unsupported image format'}
+        assert list(media_blobs_dir.rglob('*.*')) == []
+
+    @pytest.mark.asyncio
+    async def test_upload_image_for_text_block(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        media_blobs_dir: Path,
+    ):
+        response = await authorized_test_client.post(
+            get_blocks_url(test_project, test_dialogue),
+            json=TextBlockCreateSchemaFactory().model_dump(mode='json'),
+        )
+        assert response.status_code == 201
+
+        response = await authorized_test_client.post(
+            f'{get_blocks_url(test_project, test_dialogue)}/{response.json()["block_id"]}/upload-image',
+            files={'image': ('cover.png', make_image_bytes(), 'image/png')},
+        )
+        assert response.status_code == 403
+        assert response.json() == {'detail': 'Invalid block type'}
+
+    @pytest.mark.asyncio
+    async def test_upload_image_block_not_found(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        response = await authorized_test_client.post(
+            f'{get_blocks_url(test_project, test_dialogue)}/999999/upload-image',
+            files={'image': ('cover.png', make_image_bytes(), 'image/png')},
+        )
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Block does not exist'}
+
+
+class TestSaveUploadFile:
+    @pytest.mark.asyncio
+    async def test_save_in_chunks(self, tmp_path):
+        content = bytes(range(256)) * 10
+        path = tmp_path / 'uploads' / 'image'
+
+        sha256 = await save_upload_file(UploadFile(io.BytesIO(content)), path, max_size=len(content), chunk_size=100)
+        assert sha256 == hashlib.sha256(content).hexdigest()
+        assert path.read_bytes() == content
+        assert [file.name for file in path.parent.iterdir()] == ['image']
+
+    @pytest.mark.asyncio
+    async def test_declared_size_too_large(self, tmp_path):
+        upload_file = UploadFile(io.BytesIO(b'a' * 10), size=10)
+
+        with pytest.raises(FileTooLargeError):
+            await save_upload_file(upload_file, tmp_path / 'image', max_size=5, chunk_size=2)
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_streamed_size_too_large(self, tmp_path):
+        # The size of a streamed upload is unknown in advance, so the limit is checked while writing it
+        upload_file = UploadFile(io.BytesIO(b'a' * 10))
+
+        with pytest.raises(FileTooLargeError):
+            await save_upload_file(upload_file, tmp_path / 'image', max_size=5, chunk_size=2)
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,224 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from src.apps.blocks.models import BlockModel
+from src.apps.blocks.repositories import BlockRepository
+from src.apps.blocks.utils import get_sparse_sequence_numbers
+from src.apps.dialogues.dto import DialogueReadDTO
+from src.apps.projects.dto import ProjectReadDTO
+from src.core.consts import BLOCK_SEQUENCE_NUMBER_STEP as STEP
+from tests.factories.blocks import TextBlockCreateSchemaFactory
+from tests.utils.blocks import create_text_blocks, get_blocks_url
+
+
+async def get_sequence_numbers(client: AsyncClient, project: ProjectReadDTO, dialogue: DialogueReadDTO) -> dict:
+    response = await client.get(get_blocks_url(project, dialogue))
+    assert response.status_code == 200
+    return {block['block_id']: block['sequence_number'] for block in response.json()}
+
+
+async def get_blocks_order(client: AsyncClient, project: ProjectReadDTO, dialogue: DialogueReadDTO) -> list[int]:
+    sequence_numbers = await get_sequence_numbers(client, project, dialogue)
+    return sorted(sequence_numbers, key=sequence_numbers.get)
+
+
+class TestSparseSequenceNumbers:
+    @pytest.mark.parametrize(
+        'sequence_numbers, expected',
+        [
+            ([], []),
+            ([STEP, 2 * STEP, 3 * STEP], [STEP, 2 * STEP, 3 * STEP]),
+            # New blocks fill the gaps between the kept ones or follow the last one
+            ([None, STEP, None], [STEP // 2, STEP, 2 * STEP]),
+            ([STEP, None, None, 4 * STEP], [STEP, 2 * STEP, 3 * STEP, 4 * STEP]),
+            # Only the block that is out of order gets a new number
+            ([3 * STEP, STEP, 2 * STEP], [STEP // 2, STEP, 2 * STEP]),
+            ([STEP, 3 * STEP, 2 * STEP, 4 * STEP], [STEP, 3 * STEP // 2, 2 * STEP, 4 * STEP]),
+        ],
+    )
+    def test_sparse_sequence_numbers(self, sequence_numbers, expected):
+        assert get_sparse_sequence_numbers(sequence_numbers) == expected
+
+    def test_blocks_are_renumbered_when_there_is_no_gap(self):
+        assert get_sparse_sequence_numbers([1, 2, None, 3]) == [STEP, 2 * STEP, 3 * STEP, 4 * STEP]
+
+    def test_sequence_numbers_are_increasing(self):
+        sequence_numbers = get_sparse_sequence_numbers([5 * STEP, None, STEP, 3 * STEP, None, 2 * STEP, None])
+        assert sequence_numbers == sorted(set(sequence_numbers))
+
+
+class TestBlockOrderingAPI:
+    @pytest.mark.asyncio
+    async def test_create_block_after_last_one(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        first_block, second_block, third_block = await create_text_blocks(
+            authorized_test_client, test_project, test_dialogue, count=3
+        )
+        assert [first_block['sequence_number'], second_block['sequence_number'], third_block['sequence_number']] == [
+            STEP,
+            2 * STEP,
+            3 * STEP,
+        ]
+
+        response = await authorized_test_client.delete(
+            f'{get_blocks_url(test_project, test_dialogue)}/{third_block["block_id"]}'
+        )
+        assert response.status_code == 204
+        response = await authorized_test_client.delete(
+            f'{get_blocks_url(test_project, test_dialogue)}/{first_block["block_id"]}'
+        )
+        assert response.status_code == 204
+
+        # Deleting a block leaves the numbers of the remaining ones as they were
+        (new_block,) = await create_text_blocks(authorized_test_client, test_project, test_dialogue, count=1)
+        assert await get_sequence_numbers(authorized_test_client, test_project, test_dialogue) == {
+            second_block['block_id']: 2 * STEP,
+            new_block['block_id']: 3 * STEP,
+        }
+
+    @pytest.mark.asyncio
+    async def test_move_block_to_start(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        first_block, second_block, third_block = await create_text_blocks(
+            authorized_test_client, test_project, test_dialogue, count=3
+        )
+
+        response = await authorized_test_client.post(
+            f'{get_blocks_url(test_project, test_dialogue)}/{third_block["block_id"]}/move',
+            json={'after_block_id': None},
+        )
+        assert response.status_code == 200
+        assert response.json()['block_id'] == third_block['block_id']
+        assert response.json()['sequence_number'] == STEP // 2
+
+        assert await get_sequence_numbers(authorized_test_client, test_project, test_dialogue) == {
+            first_block['block_id']: STEP,
+            second_block['block_id']: 2 * STEP,
+            third_block['block_id']: STEP // 2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_move_block_after_another_block(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        first_block, second_block, third_block = await create_text_blocks(
+            authorized_test_client, test_project, test_dialogue, count=3
+        )
+
+        response = await authorized_test_client.post(
+            f'{get_blocks_url(test_project, test_dialogue)}/{first_block["block_id"]}/move',
+            json={'after_block_id': second_block['block_id']},
+        )
+        assert response.status_code == 200
+        assert await get_blocks_order(authorized_test_client, test_project, test_dialogue) == [
+            second_block['block_id'],
+            first_block['block_id'],
+            third_block['block_id'],
+        ]
+
+        response = await authorized_test_client.post(
+            f'{get_blocks_url(test_project, test_dialogue)}/{second_block["block_id"]}/move',
+            json={'after_block_id': third_block['block_id']},
+        )
+        assert response.status_code == 200
+        assert await get_blocks_order(authorized_test_client, test_project, test_dialogue) == [
+            first_block['block_id'],
+            third_block['block_id'],
+            second_block['block_id'],
+        ]
+
+    @pytest.mark.asyncio
+    async def test_move_block_rebalances_dialogue_without_gaps(
+        self,
+        session,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        blocks = await create_text_blocks(authorized_test_client, test_project, test_dialogue, count=3)
+        for sequence_number, block in enumerate(blocks, start=1):
+            await session.execute(
+                update(BlockModel)
+                .where(BlockModel.block_id == block['block_id'])
+                .values(sequence_number=sequence_number)
+            )
+        await session.commit()
+        first_block, second_block, third_block = blocks
+
+        response = await authorized_test_client.post(
+            f'{get_blocks_url(test_project, test_dialogue)}/{third_block["block_id"]}/move',
+            json={'after_block_id': first_block['block_id']},
+        )
+        assert response.status_code == 200
+
+        assert await get_sequence_numbers(authorized_test_client, test_project, test_dialogue) == {
+            first_block['block_id']: STEP,
+            second_block['block_id']: 2 * STEP,
+            third_block['block_id']: 3 * STEP // 2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_move_block_after_itself(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        (block,) = await create_text_blocks(authorized_test_client, test_project, test_dialogue, count=1)
+
+        response = await authorized_test_client.post(
+            f'{get_blocks_url(test_project, test_dialogue)}/{block["block_id"]}/move',
+            json={'after_block_id': block['block_id']},
+        )
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Block does not exist'}
+
+    @pytest.mark.asyncio
+    async def test_move_block_after_unknown_block(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        (block,) = await create_text_blocks(authorized_test_client, test_project, test_dialogue, count=1)
+
+        response = await authorized_test_client.post(
+            f'{get_blocks_url(test_project, test_dialogue)}/{block["block_id"]}/move',
+            json={'after_block_id': 999999},
+        )
+        assert response.status_code == 404
+        assert await get_sequence_numbers(authorized_test_client, test_project, test_dialogue) == {
+            block['block_id']: STEP
+        }
+
+    @pytest.mark.asyncio
+    async def test_move_block_no_permission(
+        self,
+        session,
+        authorized_another_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        block = await BlockRepository(session).create_block(
+            dialogue_id=test_dialogue.dialogue_id,
+            block=TextBlockCreateSchemaFactory().to_dto(),
+        )
+
+        response = await authorized_another_client.post(
+            f'{get_blocks_url(test_project, test_dialogue)}/{block.block_id}/move',
+            json={'after_block_id': None},
+        )
+        assert response.status_code == 403
+        assert (await BlockRepository(session).get_block(block.block_id)).sequence_number == STEP
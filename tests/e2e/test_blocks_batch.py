@@ -0,0 +1,291 @@
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from src.apps.blocks.dto.batch import (
+    BlockCreateOperationDTO,
+    BlockDeleteOperationDTO,
+    BlockMoveOperationDTO,
+    BlockUpdateOperationDTO,
+)
+from src.apps.blocks.dto.image import ImageBlockCreateDTO, ImageBlockReadDTO, ImageBlockUpdateDTO
+from src.apps.blocks.dto.text import TextBlockReadDTO, TextBlockUpdateDTO
+from src.apps.blocks.errors import BlockNotFoundError, ImageNotFoundError, InvalidBlockTypeError
+from src.apps.blocks.services import BlockService
+from src.apps.dialogues.dto import DialogueReadDTO
+from src.apps.media.models import MediaBlobModel
+from src.apps.projects.dto import ProjectReadDTO
+from src.core.config import MEDIA_DIR
+from src.core.consts import BLOCK_SEQUENCE_NUMBER_STEP, MAX_BLOCKS_BATCH_OPERATIONS
+from tests.factories.blocks import ImageBlockCreateSchemaFactory, TextBlockCreateSchemaFactory
+from tests.utils.blocks import create_image_block, create_text_blocks, get_blocks_url, upload_block_image
+from tests.utils.images import make_image_bytes
+
+TEXT_BLOCK = TextBlockReadDTO(block_id=1, sequence_number=BLOCK_SEQUENCE_NUMBER_STEP, message_text='Hello')
+IMAGE_BLOCK = ImageBlockReadDTO(
+    block_id=2,
+    sequence_number=2 * BLOCK_SEQUENCE_NUMBER_STEP,
+    image_path='blobs/aa/a.jpg',
+    original_image_path='blobs/aa/a.png',
+    thumbnail_path='blobs/aa/a.webp',
+)
+
+
+def get_batch_url(project: ProjectReadDTO, dialogue: DialogueReadDTO) -> str:
+    return f'{get_blocks_url(project, dialogue)}:batch'
+
+
+class TestPrepareBlocksBatch:
+    def test_operations_are_validated_in_order(self):
+        with pytest.raises(BlockNotFoundError):
+            BlockService._prepare_blocks_batch(
+                [TEXT_BLOCK],
+                [
+                    BlockDeleteOperationDTO(block_id=TEXT_BLOCK.block_id),
+                    BlockUpdateOperationDTO(block_id=TEXT_BLOCK.block_id, block=TextBlockUpdateDTO(message_text='Hi')),
+                ],
+            )
+
+    def test_update_with_another_block_type(self):
+        with pytest.raises(InvalidBlockTypeError):
+            BlockService._prepare_blocks_batch(
+                [TEXT_BLOCK],
+                [
+                    BlockUpdateOperationDTO(
+                        block_id=TEXT_BLOCK.block_id,
+                        block=ImageBlockUpdateDTO(image_path=''),
+                    )
+                ],
+            )
+
+    @pytest.mark.parametrize('after_block_id', [TEXT_BLOCK.block_id, IMAGE_BLOCK.block_id, 999])
+    def test_move_after_missing_block(self, after_block_id: int):
+        with pytest.raises(BlockNotFoundError):
+            BlockService._prepare_blocks_batch(
+                [TEXT_BLOCK, IMAGE_BLOCK],
+                [
+                    BlockDeleteOperationDTO(block_id=IMAGE_BLOCK.block_id),
+                    BlockMoveOperationDTO(block_id=TEXT_BLOCK.block_id, after_block_id=after_block_id),
+                ],
+            )
+
+    def test_create_image_block_outside_media_store(self):
+        with pytest.raises(ImageNotFoundError):
+            BlockService._prepare_blocks_batch(
+                [],
+                [BlockCreateOperationDTO(block=ImageBlockCreateDTO(image_path='users/1/image.png'))],
+            )
+
+    def test_changed_image_drops_its_variants(self):
+        operations, acquired_image_paths, released_image_paths = BlockService._prepare_blocks_batch(
+            [IMAGE_BLOCK],
+            [
+                BlockUpdateOperationDTO(
+                    block_id=IMAGE_BLOCK.block_id,
+                    block=ImageBlockUpdateDTO(image_path='blobs/bb/b.jpg'),
+                )
+            ],
+        )
+        assert operations[0].block == ImageBlockUpdateDTO(image_path='blobs/bb/b.jpg')
+        assert acquired_image_paths == ['blobs/bb/b.jpg']
+        assert sorted(released_image_paths) == ['blobs/aa/a.jpg', 'blobs/aa/a.png', 'blobs/aa/a.webp']
+
+    def test_unchanged_image_keeps_its_variants(self):
+        operations, acquired_image_paths, released_image_paths = BlockService._prepare_blocks_batch(
+            [IMAGE_BLOCK],
+            [
+                BlockUpdateOperationDTO(
+                    block_id=IMAGE_BLOCK.block_id,
+                    block=ImageBlockUpdateDTO(image_path=IMAGE_BLOCK.image_path),
+                )
+            ],
+        )
+        assert operations[0].block == ImageBlockUpdateDTO(
+            image_path=IMAGE_BLOCK.image_path,
+            original_image_path=IMAGE_BLOCK.original_image_path,
+            thumbnail_path=IMAGE_BLOCK.thumbnail_path,
+        )
+        assert acquired_image_paths == []
+        assert released_image_paths == []
+
+    def test_image_passed_between_blocks_keeps_its_reference(self):
+        _, acquired_image_paths, released_image_paths = BlockService._prepare_blocks_batch(
+            [IMAGE_BLOCK],
+            [
+                BlockCreateOperationDTO(block=ImageBlockCreateDTO(image_path=IMAGE_BLOCK.image_path)),
+                BlockDeleteOperationDTO(block_id=IMAGE_BLOCK.block_id),
+            ],
+        )
+        assert acquired_image_paths == []
+        assert sorted(released_image_paths) == ['blobs/aa/a.png', 'blobs/aa/a.webp']
+
+
+class TestBlocksBatchAPI:
+    @pytest.mark.asyncio
+    async def test_apply_blocks_batch(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        first_block, second_block, third_block = await create_text_blocks(
+            authorized_test_client, test_project, test_dialogue, count=3
+        )
+        new_block = TextBlockCreateSchemaFactory()
+        updated_block = TextBlockCreateSchemaFactory()
+
+        response = await authorized_test_client.patch(
+            get_batch_url(test_project, test_dialogue),
+            json={
+                'operations': [
+                    {'op': 'create', 'block': new_block.model_dump(mode='json')},
+                    {
+                        'op': 'update',
+                        'block_id': first_block['block_id'],
+                        'block': updated_block.model_dump(mode='json'),
+                    },
+                    {'op': 'delete', 'block_id': second_block['block_id']},
+                    {'op': 'move', 'block_id': third_block['block_id']},
+                ]
+            },
+        )
+        assert response.status_code == 200
+
+        response_data = response.json()
+        assert [block['message_text'] for block in response_data] == [
+            third_block['message_text'],
+            updated_block.message_text,
+            new_block.message_text,
+        ]
+        assert response_data[0]['block_id'] == third_block['block_id']
+        assert response_data[1]['block_id'] == first_block['block_id']
+        # Blocks that kept their relative order keep their sequence numbers
+        assert response_data[1]['sequence_number'] == first_block['sequence_number']
+        sequence_numbers = [block['sequence_number'] for block in response_data]
+        assert sequence_numbers == sorted(set(sequence_numbers))
+
+        response = await authorized_test_client.get(get_blocks_url(test_project, test_dialogue))
+        assert response.json() == response_data
+
+    @pytest.mark.asyncio
+    async def test_failed_operation_changes_nothing(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        blocks = await create_text_blocks(authorized_test_client, test_project, test_dialogue, count=2)
+
+        response = await authorized_test_client.patch(
+            get_batch_url(test_project, test_dialogue),
+            json={
+                'operations': [
+                    {'op': 'delete', 'block_id': blocks[0]['block_id']},
+                    {'op': 'create', 'block': TextBlockCreateSchemaFactory().model_dump(mode='json')},
+                    {'op': 'move', 'block_id': blocks[1]['block_id'], 'after_block_id': blocks[0]['block_id']},
+                ]
+            },
+        )
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Block does not exist'}
+
+        response = await authorized_test_client.get(get_blocks_url(test_project, test_dialogue))
+        assert response.json() == blocks
+
+    @pytest.mark.asyncio
+    async def test_update_with_another_block_type(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        (block,) = await create_text_blocks(authorized_test_client, test_project, test_dialogue, count=1)
+
+        response = await authorized_test_client.patch(
+            get_batch_url(test_project, test_dialogue),
+            json={
+                'operations': [
+                    {
+                        'op': 'update',
+                        'block_id': block['block_id'],
+                        'block': ImageBlockCreateSchemaFactory().model_dump(mode='json'),
+                    }
+                ]
+            },
+        )
+        assert response.status_code == 403
+        assert response.json() == {'detail': 'Invalid block type'}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('operations_count', [0, MAX_BLOCKS_BATCH_OPERATIONS + 1])
+    async def test_invalid_operations_count(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        operations_count: int,
+    ):
+        operation = {'op': 'create', 'block': TextBlockCreateSchemaFactory().model_dump(mode='json')}
+
+        response = await authorized_test_client.patch(
+            get_batch_url(test_project, test_dialogue),
+            json={'operations': [operation] * operations_count},
+        )
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_apply_blocks_batch_no_permission(
+        self,
+        authorized_another_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        response = await authorized_another_client.patch(
+            get_batch_url(test_project, test_dialogue),
+            json={'operations': [{'op': 'create', 'block': TextBlockCreateSchemaFactory().model_dump(mode='json')}]},
+        )
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_image_references_follow_batch(
+        self,
+        session,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        media_blobs_dir: Path,
+    ):
+        image_block = await create_image_block(authorized_test_client, test_project, test_dialogue)
+        response = await upload_block_image(
+            authorized_test_client,
+            test_project,
+            test_dialogue,
+            image_block['block_id'],
+            make_image_bytes(),
+        )
+        image_block = response.json()
+
+        response = await authorized_test_client.patch(
+            get_batch_url(test_project, test_dialogue),
+            json={
+                'operations': [
+                    {
+                        'op': 'create',
+                        'block': ImageBlockCreateSchemaFactory(image_path=image_block['image_path']).model_dump(
+                            mode='json'
+                        ),
+                    },
+                    {'op': 'delete', 'block_id': image_block['block_id']},
+                ]
+            },
+        )
+        assert response.status_code == 200
+        assert [block['image_path'] for block in response.json()] == [image_block['image_path']]
+
+        blobs = await session.execute(select(MediaBlobModel.path, MediaBlobModel.ref_count))
+        assert dict(blobs.all()) == {image_block['image_path']: 1}
+        await session.rollback()
+        assert (MEDIA_DIR / image_block['image_path']).is_file()
+        assert not (MEDIA_DIR / image_block['original_image_path']).exists()
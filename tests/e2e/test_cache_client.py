@@ -0,0 +1,214 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+import redis
+from httpx import AsyncClient
+
+from src.core.config import settings
+from src.infrastructure.cache.circuit_breaker import CircuitBreaker
+from src.infrastructure.cache.client import CacheClient
+from src.infrastructure.cache.dependencies import get_cache_client
+from src.infrastructure.cache.errors import CacheUnavailableError
+from src.main import app
+
+TG_ID = 12345
+TG_CODE = '123456'
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def unavailable_cache_client(monkeypatch) -> CacheClient:
+    # Nothing listens on the port, so every command fails to connect
+    monkeypatch.setattr(settings, 'REDIS_PORT', 1)
+    monkeypatch.setattr(settings, 'REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD', 2)
+    async with CacheClient() as cache_client:
+        yield cache_client
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def single_failure_cache_client(monkeypatch) -> CacheClient:
+    monkeypatch.setattr(settings, 'REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD', 1)
+    async with CacheClient() as cache_client:
+        yield cache_client
+
+
+async def raise_error(error: BaseException):
+    raise error
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def tg_code(cache_client: CacheClient) -> str:
+    yield TG_CODE
+    await cache_client.delete(f'tg_code:{TG_CODE}')
+
+
+@pytest.fixture
+def telegram_login(monkeypatch):
+    monkeypatch.setattr(settings, 'DEBUG', False)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_failure_threshold(self):
+        circuit_breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+        for _ in range(2):
+            circuit_breaker.record_failure()
+        assert not circuit_breaker.is_open()
+
+        circuit_breaker.record_failure()
+        assert circuit_breaker.is_open()
+
+    def test_success_resets_failures(self):
+        circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        circuit_breaker.record_failure()
+        circuit_breaker.record_success()
+        circuit_breaker.record_failure()
+        assert not circuit_breaker.is_open()
+
+    def test_calls_are_let_through_after_reset_timeout(self, monkeypatch):
+        now = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: now)
+        circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        for _ in range(2):
+            circuit_breaker.record_failure()
+        assert circuit_breaker.is_open()
+
+        monkeypatch.setattr(time, 'monotonic', lambda: now + 10)
+        assert not circuit_breaker.is_open()
+
+        # A failed trial call opens the circuit again right away
+        circuit_breaker.record_failure()
+        assert circuit_breaker.is_open()
+
+    def test_successful_trial_call_closes_circuit(self, monkeypatch):
+        now = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: now)
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        circuit_breaker.record_failure()
+
+        monkeypatch.setattr(time, 'monotonic', lambda: now + 10)
+        circuit_breaker.record_success()
+        monkeypatch.setattr(time, 'monotonic', lambda: now)
+        assert not circuit_breaker.is_open()
+
+
+class TestCacheClient:
+    @pytest.mark.asyncio
+    async def test_pipeline(self, cache_client: CacheClient):
+        key = 'test_cache_client:pipeline'
+        try:
+            results = await cache_client.pipeline(lambda pipeline: pipeline.set(key, 'value', ex=60).get(key).ttl(key))
+            assert results[1:] == [b'value', 60]
+        finally:
+            await cache_client.delete(key)
+
+    @pytest.mark.asyncio
+    async def test_transaction(self, cache_client: CacheClient):
+        key = 'test_cache_client:transaction'
+        try:
+            assert await cache_client.transaction(lambda pipeline: pipeline.incr(key).incr(key, 2)) == [1, 3]
+        finally:
+            await cache_client.delete(key)
+
+    @pytest.mark.asyncio
+    async def test_publish_and_subscribe(self, cache_client: CacheClient):
+        channel = 'test_cache_client:channel'
+        async with cache_client.subscribe(channel) as subscription:
+            assert await cache_client.publish(channel, 'message') == 1
+            async with asyncio.timeout(5):
+                while (message := await subscription.get_message(timeout=1)) is None:
+                    pass
+            assert message == b'message'
+        assert await cache_client.publish(channel, 'message') == 0
+
+    @pytest.mark.asyncio
+    async def test_unavailable_redis(self, unavailable_cache_client: CacheClient):
+        # The failed ping on enter already counts as the first failure
+        with pytest.raises(CacheUnavailableError):
+            await unavailable_cache_client.get('key')
+
+        with pytest.raises(CacheUnavailableError, match='Redis is unavailable'):
+            await unavailable_cache_client.get('key')
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('error', [ConnectionResetError(), asyncio.TimeoutError(), redis.exceptions.TimeoutError()])
+    async def test_connection_errors_open_circuit(self, single_failure_cache_client: CacheClient, error: Exception):
+        with pytest.raises(CacheUnavailableError):
+            await single_failure_cache_client._execute(lambda: raise_error(error))
+        with pytest.raises(CacheUnavailableError, match='Redis is unavailable'):
+            await single_failure_cache_client.get('key')
+
+    @pytest.mark.asyncio
+    async def test_command_errors_do_not_open_circuit(self, single_failure_cache_client: CacheClient):
+        key = 'test_cache_client:not_a_number'
+        try:
+            await single_failure_cache_client.set(key, 'value', ex=60)
+            with pytest.raises(redis.exceptions.ResponseError):
+                await single_failure_cache_client.incr(key)
+            with pytest.raises(TypeError):
+                await single_failure_cache_client._execute(lambda: raise_error(TypeError()))
+            assert await single_failure_cache_client.get(key) == b'value'
+        finally:
+            await single_failure_cache_client.delete(key)
+
+    @pytest.mark.asyncio
+    async def test_publish_to_unavailable_redis(self, unavailable_cache_client: CacheClient):
+        assert await unavailable_cache_client.publish('test_cache_client:channel', 'message') == 0
+
+
+class TestTelegramLoginAPI:
+    @pytest.mark.asyncio
+    async def test_login_with_code(self, client: AsyncClient, tg_code: str, telegram_login):
+        response = await client.post(
+            '/save_tg_code',
+            json={'tg_id': TG_ID, 'code': tg_code},
+            headers={'X-BOT-SECRET': settings.AUTH_BOT_SECRET},
+        )
+        assert response.status_code == 201
+
+        response = await client.post('/login_via_telegram', json={'code': int(tg_code)})
+        assert response.status_code == 200
+        assert response.json()['token_type'] == 'bearer'
+
+        # A code can be used only once
+        response = await client.post('/login_via_telegram', json={'code': int(tg_code)})
+        assert response.status_code == 401
+        assert response.json() == {'detail': 'Неверный код'}
+
+    @pytest.mark.asyncio
+    async def test_save_code_with_invalid_secret(self, client: AsyncClient, tg_code: str):
+        response = await client.post(
+            '/save_tg_code',
+            json={'tg_id': TG_ID, 'code': tg_code},
+            headers={'X-BOT-SECRET': 'invalid'},
+        )
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_code_without_expiration(
+        self,
+        client: AsyncClient,
+        cache_client: CacheClient,
+        tg_code: str,
+        telegram_login,
+    ):
+        await cache_client.pipeline(lambda pipeline: pipeline.set(f'tg_code:{tg_code}', TG_ID))
+
+        response = await client.post('/login_via_telegram', json={'code': int(tg_code)})
+        assert response.status_code == 401
+        assert response.json() == {'detail': 'Код истек'}
+        assert await cache_client.get(f'tg_code:{tg_code}') == str(TG_ID).encode()
+
+    @pytest.mark.asyncio
+    async def test_login_with_unavailable_redis(
+        self,
+        client: AsyncClient,
+        unavailable_cache_client: CacheClient,
+        telegram_login,
+    ):
+        app.dependency_overrides[get_cache_client] = lambda: unavailable_cache_client
+        try:
+            response = await client.post('/login_via_telegram', json={'code': int(TG_CODE)})
+        finally:
+            app.dependency_overrides.pop(get_cache_client)
+        assert response.status_code == 503
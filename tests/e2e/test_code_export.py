@@ -0,0 +1,92 @@
+import io
+import json
+import zipfile
+
+import pytest
+from httpx import AsyncClient
+
+from src.apps.projects.dto import ProjectReadDTO
+from src.apps.projects.repositories import ProjectRepository
+from src.apps.users.dto import UserReadDTO
+from tests.factories.projects import ProjectCreateSchemaFactory
+
+
+def read_export(content: bytes) -> tuple[dict, dict[str, bytes]]:
+    with zipfile.ZipFile(io.BytesIO(content)) as zipf:
+        assert zipf.testzip() is None
+        manifest = json.loads(zipf.read('manifest.json'))
+        archives = {name: zipf.read(name) for name in zipf.namelist() if name != 'manifest.json'}
+    return manifest, archives
+
+
+class TestCodeExportAPI:
+    @pytest.mark.asyncio
+    async def test_export_by_project_ids(
+        self,
+        authorized_superuser_client: AsyncClient,
+        test_project: ProjectReadDTO,
+    ):
+        response = await authorized_superuser_client.post(
+            '/projects/code/export',
+            json={'project_ids': [test_project.project_id, 999999]},
+        )
+        assert response.status_code == 200
+        assert response.headers['content-disposition'] == 'attachment; filename=bots.zip'
+
+        manifest, archives = read_export(response.content)
+        assert manifest['missing_project_ids'] == [999999]
+        assert manifest['failed_projects'] == []
+        assert [project['project_id'] for project in manifest['projects']] == [test_project.project_id]
+        assert manifest['projects'][0]['user_id'] == str(test_project.user_id)
+
+        archive = archives[f'{test_project.project_id}.zip']
+        assert len(archive) == manifest['projects'][0]['size']
+        with zipfile.ZipFile(io.BytesIO(archive)) as zipf:
+            assert zipf.testzip() is None
+            assert test_project.start_message in zipf.read('handlers/custom.py').decode()
+
+    @pytest.mark.asyncio
+    async def test_export_by_user_id(
+        self,
+        authorized_superuser_client: AsyncClient,
+        test_user: UserReadDTO,
+        project_repository: ProjectRepository,
+    ):
+        project_ids = []
+        for _ in range(3):
+            project = await project_repository.create_project(ProjectCreateSchemaFactory().to_dto(test_user.user_id))
+            project_ids.append(project.project_id)
+
+        response = await authorized_superuser_client.post(
+            '/projects/code/export',
+            json={'user_id': str(test_user.user_id)},
+        )
+        assert response.status_code == 200
+
+        manifest, archives = read_export(response.content)
+        assert sorted(project['project_id'] for project in manifest['projects']) == project_ids
+        assert sorted(archives) == sorted(f'{project_id}.zip' for project_id in project_ids)
+
+    @pytest.mark.asyncio
+    async def test_export_projects_not_found(self, authorized_superuser_client: AsyncClient):
+        response = await authorized_superuser_client.post('/projects/code/export', json={'project_ids': [999999]})
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Project does not exist'}
+
+    @pytest.mark.asyncio
+    async def test_export_without_filters(self, authorized_superuser_client: AsyncClient):
+        response = await authorized_superuser_client.post('/projects/code/export', json={})
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_export_not_superuser(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+    ):
+        response = await authorized_test_client.post(
+            '/projects/code/export',
+            json={'project_ids': [test_project.project_id]},
+        )
+        assert response.status_code == 403
+        assert response.json() == {'detail': 'Dont have permission'}
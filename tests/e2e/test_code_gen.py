@@ -0,0 +1,152 @@
+import io
+import os
+import zipfile
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+
+from src.apps.code_gen.cache import CodeGenZipCache
+from src.apps.code_gen.dependencies.cache_dependencies import get_code_gen_zip_cache
+from src.apps.projects.dto import ProjectReadDTO
+from src.main import app
+from tests.factories.projects import ProjectUpdateSchemaFactory
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def code_gen_zip_cache(tmp_path) -> CodeGenZipCache:
+    zip_cache = CodeGenZipCache(cache_dir=tmp_path, max_size=10 * 1024 * 1024, chunk_size=1024)
+    app.dependency_overrides[get_code_gen_zip_cache] = lambda: zip_cache
+    yield zip_cache
+    app.dependency_overrides.pop(get_code_gen_zip_cache)
+
+
+async def collect_chunks(chunks) -> bytes:
+    return b''.join([chunk async for chunk in chunks])
+
+
+async def iter_chunks(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+class TestCodeGenAPI:
+    @pytest.mark.asyncio
+    async def test_get_bot_code_success(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        code_gen_zip_cache: CodeGenZipCache,
+    ):
+        response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code')
+        assert response.status_code == 200
+        assert response.headers['content-type'] == 'application/zip'
+
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zipf:
+            assert zipf.testzip() is None
+            assert 'main.py' in zipf.namelist()
+
+    @pytest.mark.asyncio
+    async def test_get_bot_code_returns_cached_archive(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        code_gen_zip_cache: CodeGenZipCache,
+        tmp_path,
+    ):
+        first_response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code')
+        assert first_response.status_code == 200
+        cached_archives = list(tmp_path.glob('*.zip'))
+        assert len(cached_archives) == 1
+        assert cached_archives[0].read_bytes() == first_response.content
+
+        second_response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code')
+        assert second_response.status_code == 200
+        assert second_response.content == first_response.content
+        assert list(tmp_path.glob('*.zip')) == cached_archives
+
+    @pytest.mark.asyncio
+    async def test_get_bot_code_cache_invalidated_on_project_update(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        code_gen_zip_cache: CodeGenZipCache,
+        tmp_path,
+    ):
+        first_response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code')
+        assert first_response.status_code == 200
+
+        response = await authorized_test_client.put(
+            f'/projects/{test_project.project_id}',
+            json=ProjectUpdateSchemaFactory().model_dump(mode='json'),
+        )
+        assert response.status_code == 200
+
+        second_response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code')
+        assert second_response.status_code == 200
+        assert second_response.content != first_response.content
+        assert len(list(tmp_path.glob('*.zip'))) == 2
+
+    @pytest.mark.asyncio
+    async def test_get_bot_code_project_not_found(
+        self,
+        authorized_test_client: AsyncClient,
+        code_gen_zip_cache: CodeGenZipCache,
+    ):
+        response = await authorized_test_client.get('/projects/999999/code')
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Project does not exist'}
+
+    @pytest.mark.asyncio
+    async def test_get_bot_code_no_permission(
+        self,
+        authorized_another_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        code_gen_zip_cache: CodeGenZipCache,
+    ):
+        response = await authorized_another_client.get(f'/projects/{test_project.project_id}/code')
+        assert response.status_code == 403
+
+
+class TestCodeGenZipCache:
+    @pytest.mark.asyncio
+    async def test_get_missing_archive(self, tmp_path):
+        zip_cache = CodeGenZipCache(cache_dir=tmp_path, max_size=1024, chunk_size=4)
+        assert await zip_cache.get('missing') is None
+
+    @pytest.mark.asyncio
+    async def test_store_and_get_archive(self, tmp_path):
+        zip_cache = CodeGenZipCache(cache_dir=tmp_path, max_size=1024, chunk_size=4)
+
+        stored = await collect_chunks(zip_cache.store('key', iter_chunks(b'first', b'second')))
+        assert stored == b'firstsecond'
+
+        cached_chunks = await zip_cache.get('key')
+        assert cached_chunks is not None
+        assert await collect_chunks(cached_chunks) == b'firstsecond'
+        assert list(tmp_path.glob('*.tmp')) == []
+
+    @pytest.mark.asyncio
+    async def test_archive_larger_than_cache_is_not_stored(self, tmp_path):
+        zip_cache = CodeGenZipCache(cache_dir=tmp_path, max_size=8, chunk_size=4)
+
+        stored = await collect_chunks(zip_cache.store('key', iter_chunks(b'first', b'second')))
+        assert stored == b'firstsecond'
+        assert await zip_cache.get('key') is None
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_archive_is_evicted(self, tmp_path):
+        zip_cache = CodeGenZipCache(cache_dir=tmp_path, max_size=10, chunk_size=4)
+        await collect_chunks(zip_cache.store('first', iter_chunks(b'aaaa')))
+        await collect_chunks(zip_cache.store('second', iter_chunks(b'bbbb')))
+        os.utime(tmp_path / 'first.zip', ns=(1, 1))
+        os.utime(tmp_path / 'second.zip', ns=(2, 2))
+
+        # Reading an archive makes it the most recently used one
+        await collect_chunks(await zip_cache.get('first'))
+
+        await collect_chunks(zip_cache.store('third', iter_chunks(b'cccc')))
+        assert await zip_cache.get('second') is None
+        assert await collect_chunks(await zip_cache.get('first')) == b'aaaa'
+        assert await collect_chunks(await zip_cache.get('third')) == b'cccc'
@@ -0,0 +1,82 @@
+import io
+import json
+import shutil
+import sys
+import zipfile
+from uuid import uuid4
+
+from benchmarks.code_gen_suite import (
+    DEFAULT_BASELINE_PATH,
+    compare_with_baseline,
+    get_config,
+    get_peak_allocated_mb,
+    measure,
+    parse_args,
+    run,
+)
+from benchmarks.fixtures import make_project
+from src.apps.code_gen.archives import iter_bot_code_zip
+from src.apps.enums import BlockType
+from src.core.config import MEDIA_DIR
+
+STAGES = ['generate', 'generate_cached', 'render', 'zip']
+METRICS = ['p50_ms', 'p99_ms', 'mean_ms', 'throughput_per_s', 'peak_allocated_mb']
+
+
+def get_args(monkeypatch, *argv: str):
+    monkeypatch.setattr(sys, 'argv', ['code_gen_suite', *argv])
+    return parse_args()
+
+
+class TestCodeGenBenchmarks:
+    def test_synthetic_project_is_reproducible(self):
+        project = make_project(dialogues=5, blocks_per_dialogue=7, plugins=2, seed=1)
+        assert len(project.dialogues) == 5
+        assert all(len(dialogue.blocks) == 7 for dialogue in project.dialogues)
+        assert len(project.plugins) == 2
+
+        same_project = make_project(dialogues=5, blocks_per_dialogue=7, plugins=2, seed=1)
+        assert [dialogue.blocks for dialogue in same_project.dialogues] == [
+            dialogue.blocks for dialogue in project.dialogues
+        ]
+
+    def test_synthetic_project_generates_valid_archive(self):
+        project = make_project(
+            dialogues=3,
+            blocks_per_dialogue=5,
+            block_types_mix={block_type: 1 for block_type in BlockType if block_type != BlockType.IMAGE_BLOCK},
+        )
+        with zipfile.ZipFile(io.BytesIO(b''.join(iter_bot_code_zip(project, chunk_size=1024)))) as zipf:
+            assert zipf.testzip() is None
+            assert 'handlers/custom.py' in zipf.namelist()
+
+    def test_run_measures_every_stage(self, monkeypatch):
+        args = get_args(monkeypatch, '--dialogues', '2', '--blocks', '3', '--images', '1', '--iterations', '2')
+        images_dir = MEDIA_DIR / f'benchmark-{uuid4().hex}'
+        try:
+            results = run(args, images_dir)
+        finally:
+            shutil.rmtree(images_dir, ignore_errors=True)
+
+        assert list(results) == STAGES
+        for stage_results in results.values():
+            assert list(stage_results) == METRICS
+            assert stage_results['p99_ms'] >= stage_results['p50_ms'] > 0
+            assert stage_results['peak_allocated_mb'] > 0
+
+    def test_peak_allocation_is_measured(self):
+        assert get_peak_allocated_mb(lambda: bytearray(2 * 1024**2)) >= 2
+        assert measure(lambda: None, iterations=3)['peak_allocated_mb'] < 1
+
+    def test_regressions_are_detected(self):
+        baseline = {'results': {'generate': {'p50_ms': 10}, 'render': {'p50_ms': 10}}}
+
+        assert not compare_with_baseline({'generate': {'p50_ms': 11}, 'zip': {'p50_ms': 100}}, baseline, 0.2)
+        assert compare_with_baseline({'generate': {'p50_ms': 11}, 'render': {'p50_ms': 13}}, baseline, 0.2)
+
+    def test_committed_baseline_matches_default_config(self, monkeypatch):
+        baseline = json.loads(DEFAULT_BASELINE_PATH.read_text())
+        assert baseline['config'] == get_config(get_args(monkeypatch))
+        assert list(baseline['results']) == STAGES
+        for stage_results in baseline['results'].values():
+            assert list(stage_results) == METRICS
@@ -0,0 +1,121 @@
+import pytest
+from httpx import AsyncClient
+
+from src.apps.code_gen.cache import DialogueCodeFragmentCache, get_dialogue_code_hash
+from src.apps.code_gen.dto import DialogueCodeFragmentDTO
+from src.apps.code_gen.generators import BotCodeGenerator
+from src.apps.code_gen.repositories import CodeGenRepository
+from src.apps.dialogues.dto import DialogueReadDTO
+from src.apps.enums import KeyboardType
+from src.apps.projects.dto import ProjectReadDTO
+from tests.factories.blocks import TextBlockCreateSchemaFactory
+
+
+def build_fragment() -> DialogueCodeFragmentDTO:
+    return DialogueCodeFragmentDTO(
+        handlers=[],
+        states_groups=[],
+        utils_funcs=frozenset(),
+        keyboard_buttons=[],
+        commands_values=[],
+    )
+
+
+class TestDialogueCodeFragmentCache:
+    def test_get_missing_fragment(self):
+        assert DialogueCodeFragmentCache(max_size=2).get('missing') is None
+
+    def test_set_and_get_fragment(self):
+        fragment_cache = DialogueCodeFragmentCache(max_size=2)
+        fragment = build_fragment()
+        fragment_cache.set('key', fragment)
+        assert fragment_cache.get('key') is fragment
+
+    def test_least_recently_used_fragment_is_evicted(self):
+        fragment_cache = DialogueCodeFragmentCache(max_size=2)
+        first_fragment, second_fragment, third_fragment = build_fragment(), build_fragment(), build_fragment()
+        fragment_cache.set('first', first_fragment)
+        fragment_cache.set('second', second_fragment)
+
+        assert fragment_cache.get('first') is first_fragment
+        fragment_cache.set('third', third_fragment)
+
+        assert fragment_cache.get('second') is None
+        assert fragment_cache.get('first') is first_fragment
+        assert fragment_cache.get('third') is third_fragment
+
+
+class TestBotCodeGeneratorFragments:
+    @pytest.mark.asyncio
+    async def test_unchanged_dialogue_fragment_is_reused(
+        self,
+        session,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        project = await CodeGenRepository(session).get_project_to_generate_code(test_project.project_id)
+        fragment_cache = DialogueCodeFragmentCache(max_size=10)
+        generator = BotCodeGenerator(fragment_cache=fragment_cache)
+
+        code = generator.generate_custom_handlers_code(project)
+        key = get_dialogue_code_hash(project.dialogues[0], project.start_keyboard_type)
+        fragment = fragment_cache.get(key)
+        assert fragment is not None
+
+        assert generator.generate_custom_handlers_code(project) == code
+        assert fragment_cache.get(key) is fragment
+        assert BotCodeGenerator().generate_custom_handlers_code(project) == code
+
+    @pytest.mark.asyncio
+    async def test_fragment_key_depends_on_dialogue_and_keyboard(
+        self,
+        session,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        code_gen_repository = CodeGenRepository(session)
+        project = await code_gen_repository.get_project_to_generate_code(test_project.project_id)
+        dialogue = project.dialogues[0]
+        key = get_dialogue_code_hash(dialogue, KeyboardType.INLINE_KEYBOARD)
+        assert key == get_dialogue_code_hash(dialogue, KeyboardType.INLINE_KEYBOARD)
+        assert key != get_dialogue_code_hash(dialogue, KeyboardType.REPLY_KEYBOARD)
+
+        response = await authorized_test_client.post(
+            f'/projects/{test_project.project_id}/dialogues/{test_dialogue.dialogue_id}/blocks',
+            json=TextBlockCreateSchemaFactory().model_dump(mode='json'),
+        )
+        assert response.status_code == 201
+
+        project = await code_gen_repository.get_project_to_generate_code(test_project.project_id)
+        assert get_dialogue_code_hash(project.dialogues[0], KeyboardType.INLINE_KEYBOARD) != key
+
+
+class TestCodePreviewAPI:
+    @pytest.mark.asyncio
+    async def test_preview_reflects_added_block(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code/preview')
+        assert response.status_code == 200
+        first_code = response.text
+
+        block = TextBlockCreateSchemaFactory()
+        response = await authorized_test_client.post(
+            f'/projects/{test_project.project_id}/dialogues/{test_dialogue.dialogue_id}/blocks',
+            json=block.model_dump(mode='json'),
+        )
+        assert response.status_code == 201
+
+        response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code/preview')
+        assert response.status_code == 200
+        assert response.text != first_code
+        assert block.message_text in response.text
+
+    @pytest.mark.asyncio
+    async def test_preview_project_not_found(self, authorized_test_client: AsyncClient):
+        response = await authorized_test_client.get('/projects/999999/code/preview')
+        assert response.status_code == 404
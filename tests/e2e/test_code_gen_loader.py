@@ -0,0 +1,87 @@
+import pytest
+from httpx import AsyncClient
+
+from src.apps.code_gen.repositories import CodeGenRepository
+from src.apps.dialogues.dto import DialogueReadDTO
+from src.apps.dialogues.repositories import DialogueRepository
+from src.apps.projects.dto import ProjectReadDTO
+from src.apps.projects.repositories import ProjectRepository
+from src.apps.users.dto import UserReadDTO
+from tests.factories.blocks import (
+    APIBlockCreateSchemaFactory,
+    EmailBlockCreateSchemaFactory,
+    ExcelBlockCreateSchemaFactory,
+    QuestionBlockCreateSchemaFactory,
+    TextBlockCreateSchemaFactory,
+)
+from tests.factories.dialogues import DialogueCreateSchemaFactory
+from tests.factories.projects import ProjectCreateSchemaFactory
+
+BLOCK_FACTORIES = [
+    TextBlockCreateSchemaFactory,
+    QuestionBlockCreateSchemaFactory,
+    APIBlockCreateSchemaFactory,
+    EmailBlockCreateSchemaFactory,
+    ExcelBlockCreateSchemaFactory,
+]
+
+
+class TestCodeGenProjectLoader:
+    @pytest.mark.asyncio
+    async def test_single_query_loader_matches_orm_loader(
+        self,
+        session,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        dialogue_repository: DialogueRepository,
+    ):
+        another_dialogue = await dialogue_repository.create_dialogue(
+            DialogueCreateSchemaFactory().to_dto(test_project.project_id)
+        )
+        for dialogue in (test_dialogue, another_dialogue):
+            for block_factory in BLOCK_FACTORIES:
+                response = await authorized_test_client.post(
+                    f'/projects/{test_project.project_id}/dialogues/{dialogue.dialogue_id}/blocks',
+                    json=block_factory().model_dump(mode='json'),
+                )
+                assert response.status_code == 201
+
+        code_gen_repository = CodeGenRepository(session)
+        projects = await code_gen_repository._get_projects_to_generate_code_in_single_query(
+            project_ids=[test_project.project_id]
+        )
+        assert projects == await code_gen_repository._get_projects_to_generate_code_with_orm(
+            project_ids=[test_project.project_id]
+        )
+
+        project = projects[0]
+        assert [dialogue.dialogue_id for dialogue in project.dialogues] == [
+            test_dialogue.dialogue_id,
+            another_dialogue.dialogue_id,
+        ]
+        for dialogue in project.dialogues:
+            assert len(dialogue.blocks) == len(BLOCK_FACTORIES)
+            assert [block.sequence_number for block in dialogue.blocks] == sorted(
+                block.sequence_number for block in dialogue.blocks
+            )
+
+    @pytest.mark.asyncio
+    async def test_loaders_filter_by_owner(
+        self,
+        session,
+        test_user: UserReadDTO,
+        another_user: UserReadDTO,
+        project_repository: ProjectRepository,
+    ):
+        project = await project_repository.create_project(ProjectCreateSchemaFactory().to_dto(test_user.user_id))
+        await project_repository.create_project(ProjectCreateSchemaFactory().to_dto(another_user.user_id))
+
+        code_gen_repository = CodeGenRepository(session)
+        projects = await code_gen_repository._get_projects_to_generate_code_in_single_query(user_id=test_user.user_id)
+        assert [project.project_id for project in projects] == [project.project_id]
+        assert projects == await code_gen_repository._get_projects_to_generate_code_with_orm(user_id=test_user.user_id)
+
+    @pytest.mark.asyncio
+    async def test_project_not_found(self, session):
+        assert await CodeGenRepository(session).get_project_to_generate_code(999999) is None
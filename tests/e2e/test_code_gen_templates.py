@@ -0,0 +1,33 @@
+import pytest
+from httpx import AsyncClient
+
+from src.apps.code_gen.templates import RENDERED_TEMPLATE_NAMES, get_template, get_templates_environment, load_templates
+from src.apps.projects.dto import ProjectReadDTO
+from src.core.config import JINJA_BYTECODE_CACHE_DIR
+
+
+class TestCodeGenTemplates:
+    def test_environment_is_shared(self):
+        assert get_templates_environment() is get_templates_environment()
+
+    def test_template_is_compiled_once(self):
+        load_templates()
+        for name in RENDERED_TEMPLATE_NAMES:
+            assert get_template(name) is get_template(name)
+
+    def test_compiled_templates_are_cached_on_disk(self):
+        load_templates()
+        assert any(JINJA_BYTECODE_CACHE_DIR.iterdir())
+
+    @pytest.mark.asyncio
+    async def test_preview_renders_with_shared_environment(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+    ):
+        first_response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code/preview')
+        assert first_response.status_code == 200
+        assert test_project.start_message in first_response.text
+
+        second_response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code/preview')
+        assert second_response.text == first_response.text
@@ -0,0 +1,172 @@
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.apps.code_gen.dto import CodePreviewUpdateDTO
+from src.apps.code_gen.events import CodePreviewEvents
+from src.apps.code_gen.repositories import CodeGenRepository
+from src.apps.code_gen.services import CUSTOM_HANDLERS_FILE_PATH, CodeGenService
+from src.apps.projects.dto import ProjectReadDTO
+from src.apps.projects.repositories import ProjectRepository
+from src.core.config import settings
+from src.core.utils import format_sse_event
+from src.infrastructure.cache.client import CacheClient
+from tests.factories.projects import ProjectUpdateSchemaFactory
+from tests.utils.events import parse_sse_events
+
+
+def get_code_gen_service(session: AsyncSession, cache_client: CacheClient) -> CodeGenService:
+    return CodeGenService(
+        session=session,
+        subscription_service=None,
+        code_gen_repository=CodeGenRepository(session),
+        zip_cache=None,
+        code_preview_events=CodePreviewEvents(cache_client),
+        user_service=None,
+    )
+
+
+async def get_next_change(updates: AsyncIterator[Optional[CodePreviewUpdateDTO]]) -> CodePreviewUpdateDTO:
+    # Keep-alives may come at any time, e.g. for the subscription confirmation
+    while (update := await anext(updates)) is None:
+        pass
+    return update
+
+
+class TestCodePreviewUpdates:
+    @pytest.mark.asyncio
+    async def test_updates_carry_code_and_diffs(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        cache_client: CacheClient,
+        test_project: ProjectReadDTO,
+    ):
+        code_preview_events = CodePreviewEvents(cache_client)
+        async with session_maker() as stream_session, session_maker() as session:
+            updates = await get_code_gen_service(stream_session, cache_client).get_custom_handlers_code_updates(
+                user_id=test_project.user_id,
+                project_id=test_project.project_id,
+            )
+
+            first_update = await anext(updates)
+            assert first_update.diff is None
+            assert test_project.start_message in first_update.code
+
+            # A change that doesn't affect the generated code is not sent
+            await code_preview_events.notify_project_changed(test_project.project_id)
+            project_data = ProjectUpdateSchemaFactory()
+            await ProjectRepository(session).update_project(
+                project_data.to_dto(project_id=test_project.project_id, user_id=test_project.user_id)
+            )
+            await code_preview_events.notify_project_changed(test_project.project_id)
+
+            second_update = await get_next_change(updates)
+            assert project_data.start_message in second_update.code
+            assert second_update.diff.startswith(f'--- {CUSTOM_HANDLERS_FILE_PATH}\n+++ {CUSTOM_HANDLERS_FILE_PATH}\n')
+            added_lines = [line for line in second_update.diff.splitlines() if line.startswith('+')]
+            assert any(project_data.start_message in line for line in added_lines)
+
+            await ProjectRepository(session).delete_project(test_project.project_id)
+            await code_preview_events.notify_project_changed(test_project.project_id)
+            with pytest.raises(StopAsyncIteration):
+                await get_next_change(updates)
+
+    @pytest.mark.asyncio
+    async def test_keep_alive_is_yielded_while_nothing_changes(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        cache_client: CacheClient,
+        test_project: ProjectReadDTO,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(settings, 'CODE_GEN_PREVIEW_KEEPALIVE_INTERVAL', 0.01)
+        async with session_maker() as stream_session:
+            updates = await get_code_gen_service(stream_session, cache_client).get_custom_handlers_code_updates(
+                user_id=test_project.user_id,
+                project_id=test_project.project_id,
+            )
+            assert await anext(updates) is not None
+            assert await anext(updates) is None
+            await updates.aclose()
+
+
+class TestSSEEvents:
+    @pytest.mark.parametrize(
+        'data',
+        [
+            '',
+            'print("Hello")',
+            'line\n\nafter empty line\n',
+            'ends with two line feeds\n\n',
+        ],
+    )
+    def test_round_trip(self, data: str):
+        assert parse_sse_events(format_sse_event(data, event='code')) == [('code', data)]
+
+    def test_line_breaks_in_code_survive_json_encoding(self):
+        code = 'a\rb\r\nc\x0bd\x0ce\x1cf\x1dg\x1eh\x85i\u2028j\u2029k\n'
+        [(_, data)] = parse_sse_events(format_sse_event(json.dumps({'text': code}), event='code'))
+        assert json.loads(data)['text'] == code
+
+
+class TestCodePreviewAPI:
+    @pytest.mark.asyncio
+    async def test_preview_events_stream(
+        self,
+        authorized_test_client: AsyncClient,
+        session_maker: async_sessionmaker[AsyncSession],
+        cache_client: CacheClient,
+        test_project: ProjectReadDTO,
+        monkeypatch,
+    ):
+        # The project has to be deleted only after the stream loaded its code, otherwise nothing is sent
+        code_loaded = asyncio.Event()
+        get_fresh_custom_handlers_code = CodeGenService._get_fresh_custom_handlers_code
+
+        async def get_fresh_custom_handlers_code_and_notify(self, **kwargs) -> Optional[str]:
+            bot_code = await get_fresh_custom_handlers_code(self, **kwargs)
+            code_loaded.set()
+            return bot_code
+
+        monkeypatch.setattr(
+            CodeGenService,
+            '_get_fresh_custom_handlers_code',
+            get_fresh_custom_handlers_code_and_notify,
+        )
+        request = asyncio.create_task(
+            authorized_test_client.get(f'/projects/{test_project.project_id}/code/preview/events')
+        )
+        await asyncio.wait_for(code_loaded.wait(), timeout=5)
+
+        # The stream ends once the project is gone
+        async with session_maker() as session:
+            await ProjectRepository(session).delete_project(test_project.project_id)
+        await CodePreviewEvents(cache_client).notify_project_changed(test_project.project_id)
+
+        response = await asyncio.wait_for(request, timeout=5)
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/event-stream')
+        events = parse_sse_events(response.text)
+        assert len(events) == 1
+        event, data = events[0]
+        assert event == 'code'
+        assert test_project.start_message in json.loads(data)['text']
+
+    @pytest.mark.asyncio
+    async def test_preview_events_project_not_found(self, authorized_test_client: AsyncClient):
+        response = await authorized_test_client.get('/projects/999999/code/preview/events')
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Project does not exist'}
+
+    @pytest.mark.asyncio
+    async def test_preview_events_no_permission(
+        self,
+        authorized_another_client: AsyncClient,
+        test_project: ProjectReadDTO,
+    ):
+        response = await authorized_another_client.get(f'/projects/{test_project.project_id}/code/preview/events')
+        assert response.status_code == 403
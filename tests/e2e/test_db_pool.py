@@ -0,0 +1,123 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.apps.statistics import services as statistic_services
+from src.core.config import settings
+from src.infrastructure.db import pool as db_pool
+from src.infrastructure.db.pool import DBPoolMetrics, InstrumentedAsyncAdaptedQueuePool
+from src.infrastructure.db.sessions import engine
+from src.infrastructure.db.utils import get_dsn
+
+
+@pytest.fixture
+def db_pool_metrics(monkeypatch) -> DBPoolMetrics:
+    db_pool_metrics = DBPoolMetrics()
+    monkeypatch.setattr(db_pool, 'db_pool_metrics', db_pool_metrics)
+    monkeypatch.setattr(statistic_services, 'db_pool_metrics', db_pool_metrics)
+    return db_pool_metrics
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def single_connection_engine(db_pool_metrics: DBPoolMetrics) -> AsyncEngine:
+    single_connection_engine = create_async_engine(
+        get_dsn(prefix='postgresql+asyncpg', database=settings.TEST_DB_NAME),
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+        connect_args={
+            'server_settings': {
+                'application_name': settings.DB_APPLICATION_NAME,
+                'statement_timeout': str(settings.DB_STATEMENT_TIMEOUT),
+            },
+        },
+    )
+    yield single_connection_engine
+    await single_connection_engine.dispose()
+
+
+class TestInstrumentedPool:
+    @pytest.mark.asyncio
+    async def test_checkouts_are_recorded(
+        self,
+        single_connection_engine: AsyncEngine,
+        db_pool_metrics: DBPoolMetrics,
+    ):
+        for _ in range(2):
+            async with single_connection_engine.connect() as connection:
+                await connection.execute(text('SELECT 1'))
+
+        assert db_pool_metrics.checkouts == 2
+        assert db_pool_metrics.checked_out_max == 1
+        assert db_pool_metrics.checkout_timeouts == 0
+        assert 0 <= db_pool_metrics.checkout_wait_max <= db_pool_metrics.checkout_wait_total
+
+    @pytest.mark.asyncio
+    async def test_checkout_timeout_is_recorded(
+        self,
+        single_connection_engine: AsyncEngine,
+        db_pool_metrics: DBPoolMetrics,
+    ):
+        async with single_connection_engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with single_connection_engine.connect():
+                    pass
+
+        assert db_pool_metrics.checkouts == 1
+        assert db_pool_metrics.checkout_timeouts == 1
+
+    @pytest.mark.asyncio
+    async def test_server_settings(self, single_connection_engine: AsyncEngine):
+        async with single_connection_engine.connect() as connection:
+            application_name = await connection.scalar(text('SHOW application_name'))
+            statement_timeout = await connection.scalar(
+                text("SELECT setting FROM pg_settings WHERE name = 'statement_timeout'")
+            )
+
+        assert application_name == settings.DB_APPLICATION_NAME
+        assert int(statement_timeout) == settings.DB_STATEMENT_TIMEOUT
+
+    def test_app_engine_pool(self):
+        pool = engine.pool
+        assert isinstance(pool, InstrumentedAsyncAdaptedQueuePool)
+        assert pool.size() == settings.DB_POOL_SIZE
+        assert pool.timeout() == settings.DB_POOL_TIMEOUT
+        assert pool._recycle == settings.DB_POOL_RECYCLE
+        assert pool._pre_ping == settings.DB_POOL_PRE_PING
+
+
+class TestDBPoolStatisticAPI:
+    @pytest.mark.asyncio
+    async def test_get_db_pool_statistic(
+        self,
+        authorized_superuser_client: AsyncClient,
+        db_pool_metrics: DBPoolMetrics,
+    ):
+        db_pool_metrics.record_checkout(0.2, 3)
+        db_pool_metrics.record_checkout(0.4, 2)
+        db_pool_metrics.record_checkout_timeout()
+
+        response = await authorized_superuser_client.get('/statistics/db-pool')
+        assert response.status_code == 200
+
+        response_data = response.json()
+        assert response_data['pool_size'] == settings.DB_POOL_SIZE
+        assert response_data['max_overflow'] == settings.DB_MAX_OVERFLOW
+        assert response_data['checkouts'] == 2
+        assert response_data['checked_out_max'] == 3
+        assert response_data['checkout_timeouts'] == 1
+        assert response_data['checkout_wait_avg'] == pytest.approx(0.3)
+        assert response_data['checkout_wait_max'] == pytest.approx(0.4)
+
+    @pytest.mark.asyncio
+    async def test_get_db_pool_statistic_no_permission(self, authorized_test_client: AsyncClient):
+        response = await authorized_test_client.get('/statistics/db-pool')
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_get_db_pool_statistic_unauthorized(self, client: AsyncClient):
+        response = await client.get('/statistics/db-pool')
+        assert response.status_code == 401
@@ -0,0 +1,159 @@
+import hashlib
+import io
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from PIL import Image
+
+from src.apps.dialogues.dto import DialogueReadDTO
+from src.apps.media.errors import UnsupportedImageError
+from src.apps.media.images import NORMALIZED_IMAGE_SUFFIX, THUMBNAIL_SUFFIX, process_image
+from src.apps.projects.dto import ProjectReadDTO
+from src.core.config import settings, MEDIA_DIR
+from tests.utils.blocks import create_image_block, get_blocks_url, upload_block_image
+from tests.utils.images import make_image_bytes
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+
+def make_exif_image_bytes(size: tuple[int, int], orientation: int) -> bytes:
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION_TAG] = orientation
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, format='JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+def make_animated_image_bytes() -> bytes:
+    frames = [Image.new('RGB', (32, 32), color) for color in ('red', 'green', 'blue')]
+    buffer = io.BytesIO()
+    frames[0].save(buffer, format='GIF', save_all=True, append_images=frames[1:], duration=100, loop=0)
+    return buffer.getvalue()
+
+
+def run_process_image(tmp_path: Path, content: bytes, max_side: int = 100, thumbnail_side: int = 20):
+    source_path = tmp_path / 'source'
+    source_path.write_bytes(content)
+    return process_image(
+        source_path=source_path,
+        normalized_path=tmp_path / 'normalized',
+        thumbnail_path=tmp_path / 'thumbnail',
+        max_side=max_side,
+        thumbnail_side=thumbnail_side,
+        quality=85,
+    )
+
+
+class TestProcessImage:
+    def test_image_is_downscaled_and_reencoded(self, tmp_path):
+        normalized_image, thumbnail = run_process_image(tmp_path, make_image_bytes(size=(400, 200)))
+
+        assert normalized_image.suffix == NORMALIZED_IMAGE_SUFFIX
+        assert normalized_image.sha256 == hashlib.sha256(normalized_image.path.read_bytes()).hexdigest()
+        with Image.open(normalized_image.path) as image:
+            assert image.format == 'JPEG'
+            assert image.size == (100, 50)
+
+        assert thumbnail.suffix == THUMBNAIL_SUFFIX
+        with Image.open(thumbnail.path) as image:
+            assert image.format == 'WEBP'
+            assert image.size == (20, 10)
+
+    def test_small_image_is_not_upscaled(self, tmp_path):
+        normalized_image, _ = run_process_image(tmp_path, make_image_bytes(size=(40, 30)))
+
+        with Image.open(normalized_image.path) as image:
+            assert image.size == (40, 30)
+
+    def test_metadata_is_stripped_after_orientation_is_applied(self, tmp_path):
+        # Orientation 6 means the camera was rotated, so the stored pixels are displayed rotated by 90 degrees
+        normalized_image, _ = run_process_image(tmp_path, make_exif_image_bytes(size=(80, 40), orientation=6))
+
+        with Image.open(normalized_image.path) as image:
+            assert image.size == (40, 80)
+            assert not image.getexif()
+
+    def test_transparent_image_is_rendered_on_white(self, tmp_path):
+        buffer = io.BytesIO()
+        Image.new('RGBA', (10, 10), (0, 0, 0, 0)).save(buffer, format='PNG')
+
+        normalized_image, _ = run_process_image(tmp_path, buffer.getvalue())
+
+        with Image.open(normalized_image.path) as image:
+            assert image.mode == 'RGB'
+            assert all(channel > 250 for channel in image.getpixel((5, 5)))
+
+    def test_animated_image_is_kept_as_uploaded(self, tmp_path):
+        normalized_image, thumbnail = run_process_image(tmp_path, make_animated_image_bytes())
+
+        assert normalized_image is None
+        assert not (tmp_path / 'normalized').exists()
+        with Image.open(thumbnail.path) as image:
+            assert image.format == 'WEBP'
+
+    def test_invalid_image(self, tmp_path):
+        with pytest.raises(UnsupportedImageError):
+            run_process_image(tmp_path, b'not an image')
+
+
+class TestImageProcessingAPI:
+    @pytest.mark.asyncio
+    async def test_upload_keeps_original_and_derived_variants(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        media_blobs_dir: Path,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(settings, 'IMAGE_MAX_SIDE', 100)
+        monkeypatch.setattr(settings, 'IMAGE_THUMBNAIL_SIDE', 20)
+        content = make_image_bytes(size=(400, 200))
+
+        block = await create_image_block(authorized_test_client, test_project, test_dialogue)
+        response = await upload_block_image(
+            authorized_test_client,
+            test_project,
+            test_dialogue,
+            block['block_id'],
+            content,
+        )
+        assert response.status_code == 200
+
+        response_data = response.json()
+        assert (MEDIA_DIR / response_data['original_image_path']).read_bytes() == content
+        assert response_data['image_path'].endswith(NORMALIZED_IMAGE_SUFFIX)
+        with Image.open(MEDIA_DIR / response_data['image_path']) as image:
+            assert image.size == (100, 50)
+        assert response_data['thumbnail_path'].endswith(THUMBNAIL_SUFFIX)
+        with Image.open(MEDIA_DIR / response_data['thumbnail_path']) as image:
+            assert image.size == (20, 10)
+
+        response = await authorized_test_client.get(get_blocks_url(test_project, test_dialogue))
+        assert response.status_code == 200
+        assert response.json() == [response_data]
+
+    @pytest.mark.asyncio
+    async def test_upload_animated_image(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        media_blobs_dir: Path,
+    ):
+        block = await create_image_block(authorized_test_client, test_project, test_dialogue)
+        response = await upload_block_image(
+            authorized_test_client,
+            test_project,
+            test_dialogue,
+            block['block_id'],
+            make_animated_image_bytes(),
+            filename='demo.gif',
+        )
+        assert response.status_code == 200
+
+        response_data = response.json()
+        assert response_data['image_path'] == response_data['original_image_path']
+        assert response_data['image_path'].endswith('.gif')
+        assert response_data['thumbnail_path'].endswith(THUMBNAIL_SUFFIX)
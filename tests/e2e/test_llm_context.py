@@ -0,0 +1,227 @@
+import json
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+from httpx import AsyncClient
+
+from src.apps.ai_code_gen.context import build_llm_messages, get_latest_code
+from src.apps.ai_code_gen.dto import AICodeGenMessageReadDTO
+from src.apps.ai_code_gen.enums import AICodeGenRole, AICodeGenSessionStatus
+from src.apps.ai_code_gen.prompts import SYSTEM_PROMPT
+from src.apps.ai_code_gen.worker import run_ai_code_gen_worker
+from src.core.config import settings
+from src.infrastructure.cache.client import CacheClient
+from src.infrastructure.llm import tokens
+from src.infrastructure.llm.enums import LLMChatMemberRole
+from src.infrastructure.llm.tokens import count_message_tokens, count_tokens, load_tokenizer
+from src.infrastructure.llm.types import LLMChatMessage
+from tests.utils.ai_code_gen import create_ai_code_gen_session, wait_for_session_status
+from tests.utils.llm import FakeLLMClient, make_llm_response
+
+MODEL = 'gpt-4o'
+SYSTEM_MESSAGE = LLMChatMessage(role=LLMChatMemberRole.SYSTEM, content='You write Telegram bots')
+
+
+def make_message(role: AICodeGenRole, content: str, code: Optional[str] = None) -> AICodeGenMessageReadDTO:
+    return AICodeGenMessageReadDTO(
+        message_id=uuid.uuid4(),
+        session_id=uuid.uuid4(),
+        role=role,
+        content=content,
+        meta={'summary': content, 'code': code, 'requirements': ['aiogram==3.4.1']} if code is not None else None,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def get_contents(messages: list[LLMChatMessage]) -> list[str]:
+    return [message['content'] for message in messages]
+
+
+def get_tokens(*messages: LLMChatMessage) -> int:
+    return sum(count_message_tokens(message, MODEL) for message in messages)
+
+
+@pytest.fixture
+def fake_tiktoken(monkeypatch):
+    monkeypatch.setattr(tokens, '_encodings', {})
+    monkeypatch.setattr(tokens, '_failed_loads', {})
+    return lambda fake_tiktoken: monkeypatch.setattr(tokens, 'tiktoken', fake_tiktoken)
+
+
+@pytest.fixture
+def history() -> list[AICodeGenMessageReadDTO]:
+    return [
+        make_message(AICodeGenRole.USER, 'Echo bot'),
+        make_message(AICodeGenRole.ASSISTANT, 'Echo bot', code='print("echo")\n'),
+        make_message(AICodeGenRole.USER, 'Add /help'),
+        make_message(AICodeGenRole.ASSISTANT, 'Echo bot with /help', code='print("help")\n'),
+        make_message(AICodeGenRole.USER, 'Add /start'),
+    ]
+
+
+class TestTokens:
+    @pytest.mark.asyncio
+    async def test_estimated_without_tokenizer(self, fake_tiktoken):
+        fake_tiktoken(None)
+        await load_tokenizer(MODEL)
+
+        assert count_tokens('', MODEL) == 0
+        assert count_tokens('abcdefgh', MODEL) == 2
+        assert count_tokens('abcdefghi', MODEL) == 3
+        # Cyrillic letters take two bytes each
+        assert count_tokens('Бот', MODEL) == 2
+        assert (
+            count_message_tokens(LLMChatMessage(role='user', content='abcd'), MODEL)
+            == 1 + tokens.MESSAGE_TOKENS_OVERHEAD
+        )
+
+    @pytest.mark.asyncio
+    async def test_unknown_model_uses_fallback_encoding(self, fake_tiktoken):
+        encoding = SimpleNamespace(encode=lambda text, disallowed_special: text.split())
+
+        def encoding_for_model(model: str):
+            raise KeyError(model)
+
+        def get_encoding(name: str):
+            assert name == tokens.FALLBACK_ENCODING
+            return encoding
+
+        fake_tiktoken(SimpleNamespace(encoding_for_model=encoding_for_model, get_encoding=get_encoding))
+        # Until the tokenizer is loaded tokens are estimated
+        assert count_tokens('print hello world', 'unknown-model') == 5
+        await load_tokenizer('unknown-model')
+        assert count_tokens('print hello world', 'unknown-model') == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_load_is_retried_after_interval(self, fake_tiktoken, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(tokens, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+        loads = []
+        encoding = SimpleNamespace(encode=lambda text, disallowed_special: text.split())
+
+        def encoding_for_model(model: str):
+            loads.append(model)
+            if len(loads) == 1:
+                raise ConnectionError
+            return encoding
+
+        fake_tiktoken(SimpleNamespace(encoding_for_model=encoding_for_model))
+        await load_tokenizer(MODEL)
+        assert count_tokens('abcdefgh', MODEL) == 2
+
+        now[0] += tokens.TOKENIZER_RETRY_INTERVAL - 1
+        await load_tokenizer(MODEL)
+        assert len(loads) == 1
+
+        now[0] += 1
+        await load_tokenizer(MODEL)
+        assert count_tokens('abcdefgh', MODEL) == 1
+        await load_tokenizer(MODEL)
+        assert len(loads) == 2
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_is_raised(self, fake_tiktoken):
+        def encoding_for_model(model: str):
+            raise AttributeError('encoding_for_model')
+
+        fake_tiktoken(SimpleNamespace(encoding_for_model=encoding_for_model))
+        with pytest.raises(AttributeError):
+            await load_tokenizer(MODEL)
+
+
+class TestBuildLLMMessages:
+    def test_whole_history_fits(self, history: list[AICodeGenMessageReadDTO]):
+        messages = build_llm_messages(history, SYSTEM_MESSAGE['content'], MODEL, max_tokens=100000)
+
+        assert [message['role'] for message in messages] == ['system', 'user', 'assistant', 'user', 'assistant', 'user']
+        # Only the latest code is sent, earlier answers are left with their summaries
+        assert messages[2]['content'] == 'Echo bot'
+        assert json.loads(messages[4]['content']) == {
+            'summary': 'Echo bot with /help',
+            'code': 'print("help")\n',
+            'requirements': ['aiogram==3.4.1'],
+        }
+        assert messages[5]['content'] == 'Add /start'
+
+    def test_oldest_turns_are_dropped(self, history: list[AICodeGenMessageReadDTO]):
+        full_messages = build_llm_messages(history, SYSTEM_MESSAGE['content'], MODEL, max_tokens=100000)
+        # Everything but the first turn fits
+        max_tokens = get_tokens(*full_messages) - 1
+
+        messages = build_llm_messages(history, SYSTEM_MESSAGE['content'], MODEL, max_tokens=max_tokens)
+        assert messages == [full_messages[0], *full_messages[3:]]
+
+    def test_budget_is_inclusive(self, history: list[AICodeGenMessageReadDTO]):
+        full_messages = build_llm_messages(history, SYSTEM_MESSAGE['content'], MODEL, max_tokens=100000)
+
+        messages = build_llm_messages(history, SYSTEM_MESSAGE['content'], MODEL, max_tokens=get_tokens(*full_messages))
+        assert messages == full_messages
+
+    def test_required_messages_are_sent_over_budget(self, history: list[AICodeGenMessageReadDTO]):
+        messages = build_llm_messages(history, SYSTEM_MESSAGE['content'], MODEL, max_tokens=0)
+
+        assert get_contents(messages)[::2] == [SYSTEM_MESSAGE['content'], 'Add /start']
+        assert json.loads(messages[1]['content'])['code'] == 'print("help")\n'
+
+    def test_answer_is_not_sent_without_its_prompt(self, history: list[AICodeGenMessageReadDTO]):
+        full_messages = build_llm_messages(history, SYSTEM_MESSAGE['content'], MODEL, max_tokens=100000)
+        # The answer of the first turn would fit alone
+        max_tokens = get_tokens(*full_messages) - get_tokens(full_messages[1])
+
+        messages = build_llm_messages(history, SYSTEM_MESSAGE['content'], MODEL, max_tokens=max_tokens)
+        assert messages == [full_messages[0], *full_messages[3:]]
+
+    def test_first_prompt(self):
+        history = [make_message(AICodeGenRole.USER, 'Echo bot')]
+
+        messages = build_llm_messages(history, SYSTEM_MESSAGE['content'], MODEL, max_tokens=0)
+        assert messages == [SYSTEM_MESSAGE, LLMChatMessage(role=LLMChatMemberRole.USER, content='Echo bot')]
+
+
+class TestGetLatestCode:
+    def test_latest_code(self, history: list[AICodeGenMessageReadDTO]):
+        assert get_latest_code(history) == 'print("help")\n'
+
+    def test_answer_without_code_is_skipped(self, history: list[AICodeGenMessageReadDTO]):
+        history.append(make_message(AICodeGenRole.ASSISTANT, 'Failed to generate the code'))
+        assert get_latest_code(history) == 'print("help")\n'
+
+    def test_no_code(self):
+        assert get_latest_code([make_message(AICodeGenRole.USER, 'Echo bot')]) is None
+        assert get_latest_code([]) is None
+
+
+class TestAICodeGenContext:
+    @pytest.mark.asyncio
+    async def test_follow_up_prompt_gets_previous_code(
+        self,
+        authorized_test_client: AsyncClient,
+        cache_client: CacheClient,
+        session_maker,
+        llm_client: FakeLLMClient,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(settings, 'AI_CODEGEN_WORKER_ENABLED', True)
+        monkeypatch.setattr(settings, 'AI_CODEGEN_QUEUE_POLL_INTERVAL', 0.1)
+        monkeypatch.setattr(settings, 'AI_CODEGEN_EDIT_MODE_ENABLED', False)
+        llm_response = make_llm_response()
+        llm_client.responses.extend([llm_response.model_dump_json(), make_llm_response().model_dump_json()])
+
+        async with run_ai_code_gen_worker(cache_client, session_maker=session_maker):
+            ai_code_gen_session = await create_ai_code_gen_session(authorized_test_client)
+            session_id = ai_code_gen_session['session_id']
+            await wait_for_session_status(authorized_test_client, session_id, AICodeGenSessionStatus.SUCCEEDED)
+            response = await authorized_test_client.post(
+                f'/ai-code-gen/sessions/{session_id}/messages',
+                json={'prompt': 'Add /help'},
+            )
+            assert response.status_code == 202
+            await wait_for_session_status(authorized_test_client, session_id, AICodeGenSessionStatus.SUCCEEDED)
+
+        messages = llm_client.requests[1]
+        assert [message['role'] for message in messages] == ['system', 'user', 'assistant', 'user']
+        assert get_contents(messages)[::3] == [SYSTEM_PROMPT, 'Add /help']
+        assert json.loads(messages[2]['content']) == llm_response.model_dump()
@@ -0,0 +1,222 @@
+import pytest
+from httpx import AsyncClient
+
+from src.apps.ai_code_gen.enums import AICodeGenSessionStatus
+from src.apps.ai_code_gen.worker import run_ai_code_gen_worker
+from src.apps.statistics import services as statistic_services
+from src.core.config import settings
+from src.infrastructure.cache.client import CacheClient
+from src.infrastructure.llm import dependencies as llm_dependencies
+from src.infrastructure.llm import response_cache as llm_response_cache_module
+from src.infrastructure.llm.response_cache import LLMResponseCache
+from src.infrastructure.llm.types import LLMChatMessage
+from tests.utils.ai_code_gen import create_ai_code_gen_session, wait_for_session_status
+from tests.utils.llm import FakeLLMClient, make_llm_response
+
+MODEL = 'gpt-4o-mini'
+
+
+CODE = 'if message.text:\n    reply(message.text)\nsend(message)\n'
+
+
+def make_messages(prompt: str, *history: str) -> list[LLMChatMessage]:
+    messages = [LLMChatMessage(role='system', content='You write Telegram bots')]
+    for content in history:
+        messages.append(LLMChatMessage(role='user', content=content))
+    messages.append(LLMChatMessage(role='user', content=prompt))
+    return messages
+
+
+def make_follow_up_messages(prompt: str, code: str) -> list[LLMChatMessage]:
+    messages = make_messages('Echo bot')
+    messages.append(LLMChatMessage(role='assistant', content=code))
+    messages.append(LLMChatMessage(role='user', content=prompt))
+    return messages
+
+
+@pytest.fixture
+def llm_response_cache(monkeypatch) -> LLMResponseCache:
+    llm_response_cache = LLMResponseCache(max_entries=10, ttl=60)
+    monkeypatch.setattr(llm_dependencies, 'llm_response_cache', llm_response_cache)
+    monkeypatch.setattr(statistic_services, 'llm_response_cache', llm_response_cache)
+    return llm_response_cache
+
+
+@pytest.fixture
+def now(monkeypatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(llm_response_cache_module.time, 'monotonic', lambda: now[0])
+    return now
+
+
+class TestLLMResponseCache:
+    def test_exact_hit(self):
+        cache = LLMResponseCache(max_entries=10, ttl=60)
+        cache.set(MODEL, make_messages('Echo bot'), 'response')
+
+        # Whitespace and case don't make another conversation
+        assert cache.get(MODEL, make_messages('  echo   BOT ')) == 'response'
+        assert cache.get('gpt-4o', make_messages('Echo bot')) is None
+        assert cache.get(MODEL, make_messages('Echo bot', 'Hello')) is None
+        assert (cache.exact_hits, cache.similar_hits, cache.misses) == (1, 0, 2)
+
+    @pytest.mark.parametrize(
+        'code',
+        [
+            CODE.replace('    reply', 'reply').replace('send', '    send'),
+            CODE.replace('reply', 'Reply'),
+        ],
+        ids=['indentation', 'case'],
+    )
+    def test_answers_are_not_normalized(self, code: str):
+        cache = LLMResponseCache(max_entries=10, ttl=60)
+        cache.set(MODEL, make_follow_up_messages('Add /help', CODE), 'response')
+
+        assert cache.get(MODEL, make_follow_up_messages('  add   /HELP ', CODE)) == 'response'
+        assert cache.get(MODEL, make_follow_up_messages('Add /help', code)) is None
+
+    def test_entry_expires(self, now: list[float]):
+        cache = LLMResponseCache(max_entries=10, ttl=60)
+        cache.set(MODEL, make_messages('Echo bot'), 'response')
+
+        now[0] += 59
+        assert cache.get(MODEL, make_messages('Echo bot')) == 'response'
+        now[0] += 1
+        assert cache.get(MODEL, make_messages('Echo bot')) is None
+        assert cache.size == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LLMResponseCache(max_entries=2, ttl=60)
+        cache.set(MODEL, make_messages('Echo bot'), 'echo')
+        cache.set(MODEL, make_messages('Weather bot'), 'weather')
+        cache.get(MODEL, make_messages('Echo bot'))
+        cache.set(MODEL, make_messages('Quiz bot'), 'quiz')
+
+        assert cache.size == 2
+        assert cache.get(MODEL, make_messages('Weather bot')) is None
+        assert cache.get(MODEL, make_messages('Echo bot')) == 'echo'
+        assert cache.get(MODEL, make_messages('Quiz bot')) == 'quiz'
+
+    def test_set_replaces_entry(self):
+        cache = LLMResponseCache(max_entries=10, ttl=60, similarity_threshold=0.5)
+        cache.set(MODEL, make_messages('Echo bot'), 'response')
+        cache.set(MODEL, make_messages('Echo bot'), 'new response')
+
+        assert cache.size == 1
+        assert cache.get(MODEL, make_messages('Echo bot')) == 'new response'
+
+
+class TestLLMResponseCacheSimilarity:
+    PROMPT = 'Write a bot that replies to every message with the same text and counts the messages of each user'
+    SIMILAR_PROMPT = 'Write a bot that replies to every message with the same text, and counts messages of each user!'
+
+    def test_similar_prompt_hit(self):
+        cache = LLMResponseCache(max_entries=10, ttl=60, similarity_threshold=0.5)
+        cache.set(MODEL, make_messages(self.PROMPT), 'response')
+
+        assert cache.get(MODEL, make_messages(self.SIMILAR_PROMPT)) == 'response'
+        assert (cache.exact_hits, cache.similar_hits, cache.misses) == (0, 1, 0)
+
+    def test_different_prompt_miss(self):
+        cache = LLMResponseCache(max_entries=10, ttl=60, similarity_threshold=0.5)
+        cache.set(MODEL, make_messages(self.PROMPT), 'response')
+
+        assert cache.get(MODEL, make_messages('Make a weather forecast bot using an external API')) is None
+
+    def test_similar_prompt_in_another_conversation_miss(self):
+        cache = LLMResponseCache(max_entries=10, ttl=60, similarity_threshold=0.5)
+        cache.set(MODEL, make_messages(self.PROMPT), 'response')
+
+        assert cache.get(MODEL, make_messages(self.SIMILAR_PROMPT, 'Echo bot')) is None
+        assert cache.get('gpt-4o', make_messages(self.SIMILAR_PROMPT)) is None
+
+    def test_similar_prompt_after_other_code_miss(self):
+        cache = LLMResponseCache(max_entries=10, ttl=60, similarity_threshold=0.5)
+        cache.set(MODEL, make_follow_up_messages(self.PROMPT, CODE), 'response')
+
+        assert cache.get(MODEL, make_follow_up_messages(self.SIMILAR_PROMPT, CODE)) == 'response'
+        assert cache.get(MODEL, make_follow_up_messages(self.SIMILAR_PROMPT, CODE.replace('    ', '  '))) is None
+
+    def test_similarity_disabled(self):
+        cache = LLMResponseCache(max_entries=10, ttl=60)
+        cache.set(MODEL, make_messages(self.PROMPT), 'response')
+
+        assert cache.get(MODEL, make_messages(self.SIMILAR_PROMPT)) is None
+
+    def test_evicted_entry_is_not_found_by_similarity(self):
+        cache = LLMResponseCache(max_entries=1, ttl=60, similarity_threshold=0.5)
+        cache.set(MODEL, make_messages(self.PROMPT), 'response')
+        cache.set(MODEL, make_messages('Make a weather forecast bot using an external API'), 'weather')
+
+        assert cache.get(MODEL, make_messages(self.SIMILAR_PROMPT)) is None
+        assert all(keys <= cache._entries.keys() for keys in cache._buckets.values())
+
+
+class TestLLMResponseCacheAICodeGen:
+    @pytest.mark.asyncio
+    async def test_repeated_prompt_is_answered_from_cache(
+        self,
+        authorized_test_client: AsyncClient,
+        cache_client: CacheClient,
+        session_maker,
+        llm_client: FakeLLMClient,
+        llm_response_cache: LLMResponseCache,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(settings, 'AI_CODEGEN_WORKER_ENABLED', True)
+        monkeypatch.setattr(settings, 'AI_CODEGEN_QUEUE_POLL_INTERVAL', 0.1)
+        monkeypatch.setattr(settings, 'LLM_RESPONSE_CACHE_ENABLED', True)
+        llm_response = make_llm_response()
+        llm_client.responses.append(llm_response.model_dump_json())
+
+        async with run_ai_code_gen_worker(cache_client, session_maker=session_maker):
+            responses_data = []
+            for _ in range(2):
+                ai_code_gen_session = await create_ai_code_gen_session(authorized_test_client)
+                responses_data.append(
+                    await wait_for_session_status(
+                        authorized_test_client,
+                        ai_code_gen_session['session_id'],
+                        AICodeGenSessionStatus.SUCCEEDED,
+                    )
+                )
+
+        assert len(llm_client.requests) == 1
+        assert responses_data[0]['messages'][1]['meta'] == responses_data[1]['messages'][1]['meta']
+        assert responses_data[1]['messages'][1]['meta']['code'] == llm_response.code
+        assert (llm_response_cache.size, llm_response_cache.exact_hits, llm_response_cache.misses) == (1, 1, 1)
+
+
+class TestLLMResponseCacheStatisticAPI:
+    @pytest.mark.asyncio
+    async def test_get_llm_response_cache_statistic(
+        self,
+        authorized_superuser_client: AsyncClient,
+        llm_response_cache: LLMResponseCache,
+    ):
+        llm_response_cache.set(MODEL, make_messages('Echo bot'), 'response')
+        llm_response_cache.get(MODEL, make_messages('Echo bot'))
+        llm_response_cache.get(MODEL, make_messages('Weather bot'))
+        llm_response_cache.get(MODEL, make_messages('Quiz bot'))
+
+        response = await authorized_superuser_client.get('/statistics/llm-cache')
+        assert response.status_code == 200
+
+        response_data = response.json()
+        assert response_data['enabled'] == settings.LLM_RESPONSE_CACHE_ENABLED
+        assert response_data['size'] == 1
+        assert response_data['max_entries'] == 10
+        assert response_data['exact_hits'] == 1
+        assert response_data['similar_hits'] == 0
+        assert response_data['misses'] == 2
+        assert response_data['hit_rate'] == pytest.approx(1 / 3)
+
+    @pytest.mark.asyncio
+    async def test_get_llm_response_cache_statistic_no_permission(self, authorized_test_client: AsyncClient):
+        response = await authorized_test_client.get('/statistics/llm-cache')
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_get_llm_response_cache_statistic_unauthorized(self, client: AsyncClient):
+        response = await client.get('/statistics/llm-cache')
+        assert response.status_code == 401
@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from starlette.datastructures import Headers
+
+from src.apps.dialogues.dto import DialogueReadDTO
+from src.apps.media.static_files import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    MediaAssets,
+    _accepts_gzip,
+    _precompress_file,
+)
+from src.apps.projects.dto import ProjectReadDTO
+from src.core.config import MEDIA_DIR
+from tests.utils.blocks import create_image_block, upload_block_image
+from tests.utils.images import make_image_bytes
+
+DEMO_GIF_PATH = 'plugins/catalog/add_product_demo.gif'
+COVER_SVG_PATH = 'plugins/catalog/cover.svg'
+
+
+class TestMediaAssets:
+    def test_asset_etag_is_content_hash(self):
+        media_assets = MediaAssets()
+        media_assets.build()
+
+        etag = media_assets.get_etag(DEMO_GIF_PATH, (MEDIA_DIR / DEMO_GIF_PATH).stat())
+        assert etag == f'"{hashlib.sha256((MEDIA_DIR / DEMO_GIF_PATH).read_bytes()).hexdigest()}"'
+
+    def test_changed_asset_has_no_content_etag(self):
+        media_assets = MediaAssets()
+        media_assets.build()
+
+        stat_result = (MEDIA_DIR / DEMO_GIF_PATH).stat()
+        changed_stat_result = os.stat_result((*stat_result[:8], stat_result.st_mtime + 1, stat_result.st_ctime))
+        assert media_assets.get_etag(DEMO_GIF_PATH, changed_stat_result) is None
+
+    def test_blob_etag_is_its_name(self):
+        sha256 = hashlib.sha256(b'image').hexdigest()
+        assert MediaAssets().get_etag(f'blobs/{sha256[:2]}/{sha256}.png', os.stat(__file__)) == f'"{sha256}"'
+
+
+class TestPrecompressFile:
+    def test_precompress_file(self, tmp_path):
+        path = tmp_path / 'cover.svg'
+        path.write_bytes(b'<svg></svg>' * 100)
+
+        _precompress_file(path)
+        assert gzip.decompress((tmp_path / 'cover.svg.gz').read_bytes()) == path.read_bytes()
+
+    def test_incompressible_file_is_skipped(self, tmp_path):
+        path = tmp_path / 'cover.svg'
+        path.write_bytes(b'<svg/>')
+
+        _precompress_file(path)
+        assert not (tmp_path / 'cover.svg.gz').exists()
+
+    def test_stale_compressed_file_is_rebuilt(self, tmp_path):
+        path = tmp_path / 'cover.svg'
+        compressed_path = tmp_path / 'cover.svg.gz'
+        path.write_bytes(b'<svg></svg>' * 100)
+        compressed_path.write_bytes(b'stale')
+        os.utime(compressed_path, ns=(1, 1))
+
+        _precompress_file(path)
+        assert gzip.decompress(compressed_path.read_bytes()) == path.read_bytes()
+
+    @pytest.mark.parametrize(
+        'accept_encoding, expected',
+        [
+            ('gzip, deflate, br', True),
+            ('br;q=1.0, gzip;q=0.8', True),
+            ('*', True),
+            ('gzip;q=0', False),
+            ('br', False),
+            ('', False),
+        ],
+    )
+    def test_accepts_gzip(self, accept_encoding: str, expected: bool):
+        assert _accepts_gzip(Headers({'accept-encoding': accept_encoding})) is expected
+
+
+class TestMediaStaticFilesAPI:
+    @pytest.mark.asyncio
+    async def test_asset_is_revalidated_by_etag(self, client: AsyncClient):
+        response = await client.get(f'/media/{DEMO_GIF_PATH}')
+        assert response.status_code == 200
+        assert response.headers['cache-control'] == REVALIDATE_CACHE_CONTROL
+        etag = response.headers['etag']
+        assert etag == f'"{hashlib.sha256(response.content).hexdigest()}"'
+
+        response = await client.get(f'/media/{DEMO_GIF_PATH}', headers={'if-none-match': etag})
+        assert response.status_code == 304
+        assert response.content == b''
+
+    @pytest.mark.asyncio
+    async def test_asset_range_request(self, client: AsyncClient):
+        content = (MEDIA_DIR / DEMO_GIF_PATH).read_bytes()
+
+        response = await client.get(f'/media/{DEMO_GIF_PATH}', headers={'range': 'bytes=100-199'})
+        assert response.status_code == 206
+        assert response.headers['content-range'] == f'bytes 100-199/{len(content)}'
+        assert response.content == content[100:200]
+
+    @pytest.mark.asyncio
+    async def test_precompressed_svg(self, client: AsyncClient):
+        response = await client.get(f'/media/{COVER_SVG_PATH}', headers={'accept-encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['content-encoding'] == 'gzip'
+        assert response.headers['content-type'].startswith('image/svg+xml')
+        assert 'Accept-Encoding' in response.headers['vary']
+        # httpx decodes the body, so it matches the uncompressed file
+        assert response.content == (MEDIA_DIR / COVER_SVG_PATH).read_bytes()
+        assert int(response.headers['content-length']) == (MEDIA_DIR / f'{COVER_SVG_PATH}.gz').stat().st_size
+
+    @pytest.mark.asyncio
+    async def test_svg_without_gzip_support(self, client: AsyncClient):
+        response = await client.get(f'/media/{COVER_SVG_PATH}', headers={'accept-encoding': 'identity'})
+        assert response.status_code == 200
+        assert 'content-encoding' not in response.headers
+        assert 'Accept-Encoding' in response.headers['vary']
+        assert response.content == (MEDIA_DIR / COVER_SVG_PATH).read_bytes()
+
+    @pytest.mark.asyncio
+    async def test_blob_is_immutable(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        media_blobs_dir: Path,
+    ):
+        block = await create_image_block(authorized_test_client, test_project, test_dialogue)
+        response = await upload_block_image(
+            authorized_test_client,
+            test_project,
+            test_dialogue,
+            block['block_id'],
+            make_image_bytes(),
+        )
+        image_path = response.json()['image_path']
+
+        response = await authorized_test_client.get(f'/media/{image_path}')
+        assert response.status_code == 200
+        assert response.headers['cache-control'] == IMMUTABLE_CACHE_CONTROL
+        assert response.headers['etag'] == f'"{Path(image_path).stem}"'
+        assert response.content == (MEDIA_DIR / image_path).read_bytes()
+
+        response = await authorized_test_client.get(
+            f'/media/{image_path}',
+            headers={'if-none-match': response.headers['etag']},
+        )
+        assert response.status_code == 304
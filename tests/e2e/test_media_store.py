@@ -0,0 +1,246 @@
+import hashlib
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from src.apps.code_gen import services as code_gen_services
+from src.apps.code_gen.dependencies.cache_dependencies import get_code_gen_zip_cache
+from src.apps.dialogues.dto import DialogueReadDTO
+from src.apps.dialogues.repositories import DialogueRepository
+from src.apps.media.dto import MediaBlobCreateDTO
+from src.apps.media.models import MediaBlobModel
+from src.apps.media.repositories import MediaBlobRepository
+from src.apps.media.utils import get_block_image_paths, get_media_blob_path, is_media_blob_path
+from src.apps.projects.dto import ProjectReadDTO
+from src.core.config import MEDIA_DIR
+from src.main import app
+from tests.factories.blocks import ImageBlockCreateSchemaFactory
+from tests.factories.dialogues import DialogueCreateSchemaFactory
+from tests.utils.blocks import create_image_block, get_blocks_url, upload_block_image
+from tests.utils.images import make_image_bytes
+
+
+@pytest_asyncio.fixture(scope='session')
+async def media_blob_repository(session) -> MediaBlobRepository:
+    return MediaBlobRepository(session)
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def disabled_code_gen_zip_cache():
+    app.dependency_overrides[get_code_gen_zip_cache] = lambda: None
+    yield
+    app.dependency_overrides.pop(get_code_gen_zip_cache)
+
+
+async def get_ref_counts(session) -> dict[str, int]:
+    blobs = await session.execute(select(MediaBlobModel.path, MediaBlobModel.ref_count))
+    ref_counts = dict(blobs.all())
+    await session.rollback()
+    return ref_counts
+
+
+def make_blob(content: bytes, suffix: str = '.png') -> MediaBlobCreateDTO:
+    sha256 = hashlib.sha256(content).hexdigest()
+    return MediaBlobCreateDTO(path=get_media_blob_path(sha256, suffix), sha256=sha256, size=len(content))
+
+
+class TestMediaBlobPaths:
+    def test_blob_path_is_content_addressed(self):
+        sha256 = hashlib.sha256(b'image').hexdigest()
+        assert get_media_blob_path(sha256, '.PNG') == f'blobs/{sha256[:2]}/{sha256}.png'
+
+    @pytest.mark.parametrize('suffix', ['', '.', '.tar/../x', '.verylongsuffix'])
+    def test_unsafe_suffix_is_dropped(self, suffix):
+        sha256 = hashlib.sha256(b'image').hexdigest()
+        assert get_media_blob_path(sha256, suffix) == f'blobs/{sha256[:2]}/{sha256}'
+
+    def test_is_media_blob_path(self):
+        assert is_media_blob_path(get_media_blob_path(hashlib.sha256(b'image').hexdigest(), '.png'))
+        assert not is_media_blob_path('users/1/projects/1/dialogues/1/image.png')
+
+    def test_block_image_paths_are_distinct(self):
+        assert get_block_image_paths('blobs/a.jpg', 'blobs/a.jpg', '') == ['blobs/a.jpg']
+        assert get_block_image_paths('blobs/a.jpg', 'blobs/b.png', 'blobs/c.webp') == [
+            'blobs/a.jpg',
+            'blobs/b.png',
+            'blobs/c.webp',
+        ]
+
+
+class TestMediaBlobRepository:
+    @pytest.mark.asyncio
+    async def test_acquire_and_release_blob(self, session, media_blob_repository: MediaBlobRepository):
+        blob = make_blob(b'image')
+        await media_blob_repository.acquire_blob(blob)
+        await media_blob_repository.acquire_blob(blob)
+        assert await get_ref_counts(session) == {blob.path: 2}
+
+        removed_paths = []
+
+        async def remove_files(paths: list[str]):
+            removed_paths.extend(paths)
+
+        await media_blob_repository.release_blobs([blob.path], remove_files=remove_files)
+        assert await get_ref_counts(session) == {blob.path: 1}
+        assert removed_paths == []
+
+        await media_blob_repository.release_blobs([blob.path], remove_files=remove_files)
+        assert await get_ref_counts(session) == {}
+        assert removed_paths == [blob.path]
+
+    @pytest.mark.asyncio
+    async def test_acquire_existing_blobs_only(self, session, media_blob_repository: MediaBlobRepository):
+        blob = make_blob(b'image')
+        await media_blob_repository.acquire_blob(blob)
+
+        acquired_paths = await media_blob_repository.acquire_blobs([blob.path, blob.path, 'blobs/missing.png'])
+        assert acquired_paths == [blob.path]
+        assert await get_ref_counts(session) == {blob.path: 3}
+
+    @pytest.mark.asyncio
+    async def test_acquire_all_blobs_rolls_back_on_missing_blob(
+        self,
+        session,
+        media_blob_repository: MediaBlobRepository,
+    ):
+        blob = make_blob(b'image')
+        await media_blob_repository.acquire_blob(blob)
+
+        assert not await media_blob_repository.acquire_all_blobs_without_commit([blob.path, 'blobs/missing.png'])
+        assert await get_ref_counts(session) == {blob.path: 1}
+
+
+class TestMediaStoreAPI:
+    @pytest.mark.asyncio
+    async def test_identical_images_share_blobs(
+        self,
+        session,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        media_blobs_dir: Path,
+    ):
+        content = make_image_bytes()
+        uploaded_blocks = []
+        for _ in range(2):
+            block = await create_image_block(authorized_test_client, test_project, test_dialogue)
+            response = await upload_block_image(
+                authorized_test_client,
+                test_project,
+                test_dialogue,
+                block['block_id'],
+                content,
+            )
+            assert response.status_code == 200
+            uploaded_blocks.append(response.json())
+
+        first_block, second_block = uploaded_blocks
+        image_paths = get_block_image_paths(
+            first_block['image_path'],
+            first_block['original_image_path'],
+            first_block['thumbnail_path'],
+        )
+        assert image_paths == get_block_image_paths(
+            second_block['image_path'],
+            second_block['original_image_path'],
+            second_block['thumbnail_path'],
+        )
+        assert first_block['original_image_path'] == get_media_blob_path(hashlib.sha256(content).hexdigest(), '.png')
+        assert await get_ref_counts(session) == {path: 2 for path in image_paths}
+
+        response = await authorized_test_client.delete(
+            f'{get_blocks_url(test_project, test_dialogue)}/{first_block["block_id"]}'
+        )
+        assert response.status_code == 204
+        assert await get_ref_counts(session) == {path: 1 for path in image_paths}
+        assert all((MEDIA_DIR / path).is_file() for path in image_paths)
+
+        response = await authorized_test_client.delete(
+            f'{get_blocks_url(test_project, test_dialogue)}/{second_block["block_id"]}'
+        )
+        assert response.status_code == 204
+        assert await get_ref_counts(session) == {}
+        assert not any((MEDIA_DIR / path).exists() for path in image_paths)
+
+    @pytest.mark.asyncio
+    async def test_create_block_with_uploaded_image(
+        self,
+        session,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        media_blobs_dir: Path,
+    ):
+        block = await create_image_block(authorized_test_client, test_project, test_dialogue)
+        response = await upload_block_image(
+            authorized_test_client,
+            test_project,
+            test_dialogue,
+            block['block_id'],
+            make_image_bytes(),
+        )
+        image_path = response.json()['image_path']
+
+        response = await authorized_test_client.post(
+            get_blocks_url(test_project, test_dialogue),
+            json=ImageBlockCreateSchemaFactory(image_path=image_path).model_dump(mode='json'),
+        )
+        assert response.status_code == 201
+        assert response.json()['image_path'] == image_path
+        assert (await get_ref_counts(session))[image_path] == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('image_path', ['blobs/00/missing.png', 'users/1/image.png'])
+    async def test_create_block_with_unknown_image(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        image_path: str,
+    ):
+        response = await authorized_test_client.post(
+            get_blocks_url(test_project, test_dialogue),
+            json=ImageBlockCreateSchemaFactory(image_path=image_path).model_dump(mode='json'),
+        )
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Image does not exist'}
+
+    @pytest.mark.asyncio
+    async def test_shared_image_is_written_to_bot_code_once(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+        dialogue_repository: DialogueRepository,
+        media_blobs_dir: Path,
+        disabled_code_gen_zip_cache,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(code_gen_services, 'MAX_DIALOGUES_WITH_FREE_PLAN', 2)
+        another_dialogue = await dialogue_repository.create_dialogue(
+            DialogueCreateSchemaFactory().to_dto(test_project.project_id)
+        )
+        content = make_image_bytes()
+        for dialogue in (test_dialogue, another_dialogue):
+            block = await create_image_block(authorized_test_client, test_project, dialogue)
+            response = await upload_block_image(
+                authorized_test_client,
+                test_project,
+                dialogue,
+                block['block_id'],
+                content,
+            )
+            assert response.status_code == 200
+        image_path = response.json()['image_path']
+
+        response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code')
+        assert response.status_code == 200
+
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zipf:
+            assert [name for name in zipf.namelist() if name.startswith('img/')] == [f'img/{Path(image_path).name}']
+            assert zipf.read(f'img/{Path(image_path).name}') == (MEDIA_DIR / image_path).read_bytes()
@@ -0,0 +1,154 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+
+from src.apps.dialogues.dto import DialogueOwnerReadDTO, DialogueReadDTO
+from src.apps.dialogues.repositories import DialogueRepository
+from src.apps.projects.cache import ProjectOwnerCache
+from src.apps.projects.dto import ProjectReadDTO
+from src.apps.projects.repositories import ProjectRepository
+from src.apps.users.dto import UserReadDTO
+from src.core.config import settings
+from src.infrastructure.cache.client import CacheClient
+from tests.factories.dialogues import DialogueCreateSchemaFactory
+from tests.factories.projects import ProjectCreateSchemaFactory, ProjectUpdateSchemaFactory
+from tests.utils.blocks import get_blocks_url
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def project_owner_cache(cache_client: CacheClient, test_project: ProjectReadDTO, monkeypatch):
+    monkeypatch.setattr(settings, 'PROJECT_OWNER_CACHE_ENABLED', True)
+    project_owner_cache = ProjectOwnerCache(cache_client)
+    yield project_owner_cache
+    await project_owner_cache.delete(test_project.project_id)
+
+
+class TestOwnerRepositories:
+    @pytest.mark.asyncio
+    async def test_get_project_owner_id(
+        self,
+        project_repository: ProjectRepository,
+        test_user: UserReadDTO,
+        test_project: ProjectReadDTO,
+    ):
+        assert await project_repository.get_project_owner_id(test_project.project_id) == test_user.user_id
+        assert await project_repository.get_project_owner_id(999999) is None
+
+    @pytest.mark.asyncio
+    async def test_get_dialogue_owner(
+        self,
+        dialogue_repository: DialogueRepository,
+        project_repository: ProjectRepository,
+        test_user: UserReadDTO,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        another_project = await project_repository.create_project(
+            ProjectCreateSchemaFactory().to_dto(test_user.user_id)
+        )
+        another_dialogue = await dialogue_repository.create_dialogue(
+            DialogueCreateSchemaFactory().to_dto(another_project.project_id)
+        )
+
+        assert await dialogue_repository.get_dialogue_owner(
+            test_project.project_id,
+            test_dialogue.dialogue_id,
+        ) == DialogueOwnerReadDTO(user_id=test_user.user_id, dialogue_exists=True)
+        assert await dialogue_repository.get_dialogue_owner(
+            test_project.project_id,
+            another_dialogue.dialogue_id,
+        ) == DialogueOwnerReadDTO(user_id=test_user.user_id, dialogue_exists=False)
+        assert await dialogue_repository.get_dialogue_owner(999999, test_dialogue.dialogue_id) is None
+
+
+class TestProjectOwnerCache:
+    @pytest.mark.asyncio
+    async def test_set_get_delete(
+        self,
+        project_owner_cache: ProjectOwnerCache,
+        test_user: UserReadDTO,
+        test_project: ProjectReadDTO,
+    ):
+        assert await project_owner_cache.get(test_project.project_id) is None
+
+        await project_owner_cache.set(test_project.project_id, test_user.user_id)
+        assert await project_owner_cache.get(test_project.project_id) == test_user.user_id
+
+        await project_owner_cache.delete(test_project.project_id)
+        assert await project_owner_cache.get(test_project.project_id) is None
+
+
+class TestOwnershipAPI:
+    @pytest.mark.asyncio
+    async def test_dialogue_of_another_project(
+        self,
+        authorized_test_client: AsyncClient,
+        project_repository: ProjectRepository,
+        test_user: UserReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        another_project = await project_repository.create_project(
+            ProjectCreateSchemaFactory().to_dto(test_user.user_id)
+        )
+
+        response = await authorized_test_client.get(get_blocks_url(another_project, test_dialogue))
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Dialogue does not exist'}
+
+    @pytest.mark.asyncio
+    async def test_dialogue_of_another_user(
+        self,
+        authorized_another_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        response = await authorized_another_client.get(get_blocks_url(test_project, test_dialogue))
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_missing_project(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        response = await authorized_test_client.get(
+            f'/projects/999999/dialogues/{test_dialogue.dialogue_id}/blocks',
+        )
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Project does not exist'}
+
+    @pytest.mark.asyncio
+    async def test_owner_is_cached_until_project_is_deleted(
+        self,
+        authorized_test_client: AsyncClient,
+        project_owner_cache: ProjectOwnerCache,
+        test_user: UserReadDTO,
+        test_project: ProjectReadDTO,
+    ):
+        response = await authorized_test_client.put(
+            f'/projects/{test_project.project_id}',
+            json=ProjectUpdateSchemaFactory().model_dump(mode='json'),
+        )
+        assert response.status_code == 200
+        assert await project_owner_cache.get(test_project.project_id) == test_user.user_id
+
+        response = await authorized_test_client.delete(f'/projects/{test_project.project_id}')
+        assert response.status_code == 204
+        assert await project_owner_cache.get(test_project.project_id) is None
+
+    @pytest.mark.asyncio
+    async def test_cached_owner_is_checked(
+        self,
+        authorized_test_client: AsyncClient,
+        project_owner_cache: ProjectOwnerCache,
+        another_user: UserReadDTO,
+        test_project: ProjectReadDTO,
+    ):
+        await project_owner_cache.set(test_project.project_id, another_user.user_id)
+
+        response = await authorized_test_client.put(
+            f'/projects/{test_project.project_id}',
+            json=ProjectUpdateSchemaFactory().model_dump(mode='json'),
+        )
+        assert response.status_code == 403
@@ -0,0 +1,143 @@
+import pytest
+from httpx import AsyncClient
+from loguru import logger
+from sqlalchemy import select
+
+from src.apps.blocks.repositories import BlockRepository
+from src.apps.dialogues.dto import DialogueReadDTO
+from src.apps.projects.dto import ProjectReadDTO
+from src.infrastructure.db.request_cache import (
+    REQUEST_CACHE_INFO_KEY,
+    RequestCache,
+    get_request_cache,
+    release_request_cache,
+)
+from tests.factories.blocks import TextBlockCreateSchemaFactory, TextBlockUpdateSchemaFactory
+from tests.utils.blocks import create_text_blocks, get_blocks_url
+
+
+class TestRequestCache:
+    @pytest.mark.asyncio
+    async def test_value_is_loaded_once(self):
+        request_cache = RequestCache()
+        loads = []
+
+        async def load():
+            loads.append(1)
+            return 'value'
+
+        assert await request_cache.get_or_load('key', load) == 'value'
+        assert await request_cache.get_or_load('key', load) == 'value'
+        assert len(loads) == 1
+        assert (request_cache.hits, request_cache.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_missing_value_is_cached(self):
+        request_cache = RequestCache()
+        loads = []
+
+        async def load():
+            loads.append(1)
+            return None
+
+        assert await request_cache.get_or_load('key', load) is None
+        assert await request_cache.get_or_load('key', load) is None
+        assert len(loads) == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_is_shared_by_session(self, session_maker):
+        async with session_maker() as session:
+            assert get_request_cache(session) is get_request_cache(session)
+            async with session_maker() as another_session:
+                assert get_request_cache(session) is not get_request_cache(another_session)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('end_transaction', ['commit', 'rollback'])
+    async def test_cache_is_cleared_with_transaction(self, session_maker, end_transaction: str):
+        async with session_maker() as session:
+            request_cache = get_request_cache(session)
+            await session.execute(select(1))
+            await request_cache.get_or_load('key', self._load_value)
+
+            await getattr(session, end_transaction)()
+            await request_cache.get_or_load('key', self._load_value)
+            assert (request_cache.hits, request_cache.misses) == (0, 2)
+
+    @pytest.mark.asyncio
+    async def test_release_request_cache(self, session_maker):
+        async with session_maker() as session:
+            request_cache = get_request_cache(session)
+            release_request_cache(session)
+            assert REQUEST_CACHE_INFO_KEY not in session.info
+            assert get_request_cache(session) is not request_cache
+
+    @staticmethod
+    async def _load_value():
+        return 'value'
+
+
+class TestRepositoryRequestCache:
+    @pytest.mark.asyncio
+    async def test_block_is_read_once(self, session_maker, test_dialogue: DialogueReadDTO):
+        async with session_maker() as session:
+            block = await BlockRepository(session).create_block(
+                dialogue_id=test_dialogue.dialogue_id,
+                block=TextBlockCreateSchemaFactory().to_dto(),
+            )
+
+            assert await BlockRepository(session).get_block(block.block_id) == block
+            # Repositories of the same request share the cache
+            assert await BlockRepository(session).get_block(block.block_id) == block
+            assert get_request_cache(session).hits == 1
+
+    @pytest.mark.asyncio
+    async def test_written_block_is_read_again(self, session_maker, test_dialogue: DialogueReadDTO):
+        async with session_maker() as session:
+            block_repository = BlockRepository(session)
+            block = await block_repository.create_block(
+                dialogue_id=test_dialogue.dialogue_id,
+                block=TextBlockCreateSchemaFactory().to_dto(),
+            )
+            await block_repository.get_block(block.block_id)
+
+            updated_block = TextBlockUpdateSchemaFactory().to_dto()
+            await block_repository.update_block(test_dialogue.dialogue_id, block.block_id, updated_block)
+            assert (await block_repository.get_block(block.block_id)).message_text == updated_block.message_text
+
+    @pytest.mark.asyncio
+    async def test_repository_uses_cache_of_next_request(self, session_maker, test_dialogue: DialogueReadDTO):
+        async with session_maker() as session:
+            block_repository = BlockRepository(session)
+            block = await block_repository.create_block(
+                dialogue_id=test_dialogue.dialogue_id,
+                block=TextBlockCreateSchemaFactory().to_dto(),
+            )
+            await block_repository.get_block(block.block_id)
+            release_request_cache(session)
+
+            await block_repository.get_block(block.block_id)
+            assert (get_request_cache(session).hits, get_request_cache(session).misses) == (0, 1)
+
+
+class TestRequestCacheAPI:
+    @pytest.mark.asyncio
+    async def test_cache_is_released_after_request(
+        self,
+        session,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        test_dialogue: DialogueReadDTO,
+    ):
+        messages = []
+        handler_id = logger.add(
+            messages.append, level='DEBUG', filter=lambda record: 'Request cache' in record['message']
+        )
+        try:
+            (block,) = await create_text_blocks(authorized_test_client, test_project, test_dialogue, count=1)
+            response = await authorized_test_client.get(get_blocks_url(test_project, test_dialogue))
+        finally:
+            logger.remove(handler_id)
+
+        assert response.json() == [block]
+        assert REQUEST_CACHE_INFO_KEY not in session.info
+        assert len(messages) == 2
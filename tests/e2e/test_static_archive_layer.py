@@ -0,0 +1,67 @@
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from src.apps.code_gen.archives import (
+    STATIC_TEMPLATE_PATHS,
+    StaticArchiveLayer,
+    _get_cached_static_archive_layer,
+    get_static_archive_layer,
+)
+from src.apps.code_gen.zip_writer import ZipStreamWriter
+from src.apps.projects.dto import ProjectReadDTO
+from src.core.config import BOT_TEMPLATES_DIR, settings
+
+
+class TestStaticArchiveLayer:
+    def test_entries_are_built_once(self, monkeypatch):
+        monkeypatch.setattr(settings, 'DEBUG', False)
+        static_layer = get_static_archive_layer()
+        assert static_layer is get_static_archive_layer()
+        for path in STATIC_TEMPLATE_PATHS:
+            assert static_layer.get_entry(path) is static_layer.get_entry(path)
+
+    def test_layer_is_rebuilt_in_debug(self, monkeypatch):
+        monkeypatch.setattr(settings, 'DEBUG', True)
+        static_layer = get_static_archive_layer()
+        assert static_layer is not get_static_archive_layer()
+        assert static_layer is not _get_cached_static_archive_layer()
+        for path in STATIC_TEMPLATE_PATHS:
+            assert static_layer.get_entry(path).name == str(path).removesuffix('.j2')
+
+    def test_entries_match_template_files(self):
+        static_layer = StaticArchiveLayer.build()
+        writer = ZipStreamWriter()
+        parts = []
+        for path in STATIC_TEMPLATE_PATHS:
+            parts.extend(writer.write_entry(static_layer.get_entry(path)))
+        parts.extend(writer.close())
+
+        with zipfile.ZipFile(io.BytesIO(b''.join(parts))) as zipf:
+            assert zipf.testzip() is None
+            for path in STATIC_TEMPLATE_PATHS:
+                assert zipf.read(str(path).removesuffix('.j2')) == (BOT_TEMPLATES_DIR / path).read_bytes()
+
+    def test_unknown_entry_is_built_on_demand(self):
+        static_layer = StaticArchiveLayer({})
+        entry = static_layer.get_entry(Path('main.py.j2'))
+        assert entry.name == 'main.py'
+        assert entry.file_size == (BOT_TEMPLATES_DIR / 'main.py.j2').stat().st_size
+
+
+class TestStaticArchiveLayerAPI:
+    @pytest.mark.asyncio
+    async def test_bot_code_contains_static_files(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+    ):
+        response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code')
+        assert response.status_code == 200
+
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zipf:
+            for path in STATIC_TEMPLATE_PATHS:
+                assert zipf.read(str(path).removesuffix('.j2')) == (BOT_TEMPLATES_DIR / path).read_bytes()
@@ -0,0 +1,221 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+
+from src.apps.dialogues.repositories import DialogueRepository
+from src.apps.projects.dto import ProjectReadDTO
+from src.apps.subscriptions.cache import ActiveSubscriptionCache
+from src.apps.subscriptions.repositories import SubscriptionRepository
+from src.apps.subscriptions.exceptions.services_exceptions import SubscriptionNotFoundError
+from src.apps.subscriptions.schemas import SubscriptionCreateSchema, SubscriptionReadSchema, SubscriptionTariff
+from src.apps.subscriptions.services import SubscriptionService
+from src.apps.users.dto import UserReadDTO
+from src.apps.users.errors import UserNotFoundError
+from src.apps.users.repositories import UserRepository
+from src.apps.users.services import UserService
+from src.core.config import settings
+from src.infrastructure.cache.client import CacheClient
+from src.infrastructure.db.request_cache import get_request_cache, release_request_cache
+from tests.factories.dialogues import DialogueCreateSchemaFactory
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def active_subscription_cache(cache_client: CacheClient, test_user: UserReadDTO) -> ActiveSubscriptionCache:
+    active_subscription_cache = ActiveSubscriptionCache(cache_client)
+    yield active_subscription_cache
+    await active_subscription_cache.delete(test_user.user_id)
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def subscription_service(session, active_subscription_cache: ActiveSubscriptionCache) -> SubscriptionService:
+    subscription_service = SubscriptionService(
+        subscription_repository=SubscriptionRepository(session),
+        user_service=UserService(UserRepository(session)),
+        active_subscription_cache=active_subscription_cache,
+        request_cache=get_request_cache(session),
+    )
+    yield subscription_service
+    release_request_cache(session)
+
+
+def make_subscription(user_id: uuid.UUID, expires_in: timedelta) -> SubscriptionReadSchema:
+    return SubscriptionReadSchema(
+        subscription_id=uuid.uuid4(),
+        tariff=SubscriptionTariff.PRO,
+        expires_at=datetime.now() + expires_in,
+        created_at=datetime.now(),
+        user_id=user_id,
+    )
+
+
+class TestActiveSubscriptionCache:
+    @pytest.mark.asyncio
+    async def test_missing_entry(self, active_subscription_cache: ActiveSubscriptionCache, test_user: UserReadDTO):
+        assert await active_subscription_cache.get(test_user.user_id) == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_user_without_subscription_is_cached(
+        self,
+        cache_client: CacheClient,
+        active_subscription_cache: ActiveSubscriptionCache,
+        test_user: UserReadDTO,
+    ):
+        await active_subscription_cache.set(test_user.user_id, None)
+
+        assert await active_subscription_cache.get(test_user.user_id) == (True, None)
+        ttl = await cache_client.ttl(f'active_subscription:{test_user.user_id}')
+        assert 0 < ttl <= settings.SUBSCRIPTION_CACHE_MISSING_TTL
+
+    @pytest.mark.asyncio
+    async def test_subscription_expires_with_entry(
+        self,
+        cache_client: CacheClient,
+        active_subscription_cache: ActiveSubscriptionCache,
+        test_user: UserReadDTO,
+    ):
+        subscription = make_subscription(test_user.user_id, expires_in=timedelta(minutes=5))
+        await active_subscription_cache.set(test_user.user_id, subscription)
+
+        assert await active_subscription_cache.get(test_user.user_id) == (True, subscription)
+        ttl = await cache_client.ttl(f'active_subscription:{test_user.user_id}')
+        assert 5 * 60 - 5 <= ttl <= 5 * 60
+
+    @pytest.mark.asyncio
+    async def test_long_subscription_is_cached_for_cache_ttl(
+        self,
+        cache_client: CacheClient,
+        active_subscription_cache: ActiveSubscriptionCache,
+        test_user: UserReadDTO,
+    ):
+        await active_subscription_cache.set(
+            test_user.user_id,
+            make_subscription(test_user.user_id, expires_in=timedelta(days=30)),
+        )
+
+        ttl = await cache_client.ttl(f'active_subscription:{test_user.user_id}')
+        assert settings.SUBSCRIPTION_CACHE_TTL - 5 <= ttl <= settings.SUBSCRIPTION_CACHE_TTL
+
+    @pytest.mark.asyncio
+    async def test_expired_subscription_is_not_cached(
+        self,
+        active_subscription_cache: ActiveSubscriptionCache,
+        test_user: UserReadDTO,
+    ):
+        await active_subscription_cache.set(
+            test_user.user_id,
+            make_subscription(test_user.user_id, expires_in=timedelta(seconds=-1)),
+        )
+        assert await active_subscription_cache.get(test_user.user_id) == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_missing_subscription_does_not_replace_subscription(
+        self,
+        active_subscription_cache: ActiveSubscriptionCache,
+        test_user: UserReadDTO,
+    ):
+        subscription = make_subscription(test_user.user_id, expires_in=timedelta(minutes=5))
+        await active_subscription_cache.set(test_user.user_id, subscription)
+
+        await active_subscription_cache.set(test_user.user_id, None)
+        assert await active_subscription_cache.get(test_user.user_id) == (True, subscription)
+
+
+class TestSubscriptionService:
+    @pytest.mark.asyncio
+    async def test_active_subscription_is_cached(
+        self,
+        session,
+        subscription_service: SubscriptionService,
+        active_subscription_cache: ActiveSubscriptionCache,
+        test_user: UserReadDTO,
+    ):
+        assert await subscription_service.get_active_subscription(test_user.user_id) is None
+        assert await active_subscription_cache.get(test_user.user_id) == (True, None)
+
+        # The cached entry answers without the database, so a subscription written behind the service's back is
+        # not seen until the entry is dropped
+        await SubscriptionRepository(session).create_subscription(
+            test_user.user_id,
+            SubscriptionCreateSchema(duration_days=30),
+        )
+        assert await subscription_service.get_active_subscription(test_user.user_id) is None
+
+    @pytest.mark.asyncio
+    async def test_created_subscription_invalidates_cache(
+        self,
+        subscription_service: SubscriptionService,
+        active_subscription_cache: ActiveSubscriptionCache,
+        test_user: UserReadDTO,
+    ):
+        assert await subscription_service.get_active_subscription(test_user.user_id) is None
+
+        subscription = await subscription_service.create_subscription(
+            test_user.user_id,
+            SubscriptionCreateSchema(duration_days=30),
+        )
+        assert await active_subscription_cache.get(test_user.user_id) == (False, None)
+
+        active_subscription = await subscription_service.get_active_subscription(test_user.user_id)
+        assert active_subscription.subscription_id == subscription.subscription_id
+        assert await active_subscription_cache.get(test_user.user_id) == (True, active_subscription)
+
+    @pytest.mark.asyncio
+    async def test_deleted_subscription_invalidates_cache(
+        self,
+        subscription_service: SubscriptionService,
+        active_subscription_cache: ActiveSubscriptionCache,
+        test_user: UserReadDTO,
+    ):
+        subscription = await subscription_service.create_subscription(
+            test_user.user_id,
+            SubscriptionCreateSchema(duration_days=30),
+        )
+        active_subscription = await subscription_service.get_active_subscription(test_user.user_id)
+        assert active_subscription.subscription_id == subscription.subscription_id
+        assert await active_subscription_cache.get(test_user.user_id) == (True, active_subscription)
+
+        await subscription_service.delete_subscription(subscription.subscription_id)
+        assert await active_subscription_cache.get(test_user.user_id) == (False, None)
+        assert await subscription_service.get_active_subscription(test_user.user_id) is None
+
+    @pytest.mark.asyncio
+    async def test_delete_unknown_subscription(self, subscription_service: SubscriptionService):
+        with pytest.raises(SubscriptionNotFoundError):
+            await subscription_service.delete_subscription(uuid.uuid4())
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_is_not_cached(
+        self,
+        subscription_service: SubscriptionService,
+        active_subscription_cache: ActiveSubscriptionCache,
+    ):
+        user_id = uuid.uuid4()
+
+        with pytest.raises(UserNotFoundError):
+            await subscription_service.get_active_subscription(user_id)
+        assert await active_subscription_cache.get(user_id) == (False, None)
+
+
+class TestSubscriptionCacheAPI:
+    @pytest.mark.asyncio
+    async def test_bot_code_follows_created_subscription(
+        self,
+        authorized_test_client: AsyncClient,
+        subscription_service: SubscriptionService,
+        dialogue_repository: DialogueRepository,
+        test_user: UserReadDTO,
+        test_project: ProjectReadDTO,
+    ):
+        for _ in range(2):
+            await dialogue_repository.create_dialogue(DialogueCreateSchemaFactory().to_dto(test_project.project_id))
+
+        response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code')
+        assert response.status_code == 403
+
+        await subscription_service.create_subscription(test_user.user_id, SubscriptionCreateSchema(duration_days=30))
+
+        response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code')
+        assert response.status_code == 200
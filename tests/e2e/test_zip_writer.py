@@ -0,0 +1,84 @@
+import io
+import zipfile
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+
+from src.apps.code_gen.dependencies.cache_dependencies import get_code_gen_zip_cache
+from src.apps.code_gen.zip_writer import ZIP_STORED, ZipStreamWriter, build_zip_entry
+from src.apps.projects.dto import ProjectReadDTO
+from src.main import app
+
+
+@pytest_asyncio.fixture(scope='function', loop_scope='session')
+async def disabled_code_gen_zip_cache():
+    app.dependency_overrides[get_code_gen_zip_cache] = lambda: None
+    yield
+    app.dependency_overrides.pop(get_code_gen_zip_cache)
+
+
+def read_zip(data: bytes) -> dict[str, bytes]:
+    with zipfile.ZipFile(io.BytesIO(data)) as zipf:
+        assert zipf.testzip() is None
+        return {name: zipf.read(name) for name in zipf.namelist()}
+
+
+class TestZipStreamWriter:
+    def test_write_entries(self):
+        writer = ZipStreamWriter()
+        parts = [
+            *writer.write_entry(build_zip_entry('main.py', b'print("hello")\n' * 100)),
+            *writer.write_entry(build_zip_entry('img/cover.png', b'\x89PNG', compress_type=ZIP_STORED)),
+            *writer.write_entry(build_zip_entry('ИНСТРУКЦИЯ.txt', 'Привет'.encode())),
+            *writer.close(),
+        ]
+
+        assert read_zip(b''.join(parts)) == {
+            'main.py': b'print("hello")\n' * 100,
+            'img/cover.png': b'\x89PNG',
+            'ИНСТРУКЦИЯ.txt': 'Привет'.encode(),
+        }
+
+    def test_write_file_in_chunks(self, tmp_path):
+        path = tmp_path / 'image.png'
+        path.write_bytes(bytes(range(256)) * 10)
+
+        writer = ZipStreamWriter()
+        file_parts = list(writer.write_file('img/image.png', path, chunk_size=100))
+        parts = [*file_parts, *writer.close()]
+
+        assert max(len(part) for part in file_parts[1:]) == 100
+        assert read_zip(b''.join(parts)) == {'img/image.png': bytes(range(256)) * 10}
+
+    def test_write_file_changed_while_writing(self, tmp_path):
+        path = tmp_path / 'image.png'
+        path.write_bytes(b'a' * 100)
+
+        writer = ZipStreamWriter()
+        file_parts = writer.write_file('img/image.png', path, chunk_size=10)
+        next(file_parts)
+        path.write_bytes(b'a' * 50)
+
+        with pytest.raises(RuntimeError):
+            list(file_parts)
+
+    def test_empty_archive(self):
+        assert read_zip(b''.join(ZipStreamWriter().close())) == {}
+
+
+class TestBotCodeStreamingAPI:
+    @pytest.mark.asyncio
+    async def test_get_bot_code_without_cache(
+        self,
+        authorized_test_client: AsyncClient,
+        test_project: ProjectReadDTO,
+        disabled_code_gen_zip_cache,
+    ):
+        response = await authorized_test_client.get(f'/projects/{test_project.project_id}/code')
+        assert response.status_code == 200
+        assert response.headers['content-disposition'] == 'attachment; filename=bot.zip'
+
+        files = read_zip(response.content)
+        assert {'main.py', 'handlers/custom.py', 'handlers/__init__.py', 'db/__init__.py'} <= files.keys()
+        assert test_project.start_message in files['handlers/custom.py'].decode()
@@ -0,0 +1,72 @@
+import factory
+from faker import Faker
+
+from src.api.v1.blocks.schemas.api import APIBlockCreateSchema
+from src.api.v1.blocks.schemas.email import EmailBlockCreateSchema
+from src.api.v1.blocks.schemas.excel import ExcelBlockCreateSchema
+from src.api.v1.blocks.schemas.image import ImageBlockCreateSchema
+from src.api.v1.blocks.schemas.question import QuestionBlockCreateSchema
+from src.api.v1.blocks.schemas.text import TextBlockCreateSchema, TextBlockUpdateSchema
+from src.apps.enums import AnswerMessageType, BlockType, HTTPMethod
+
+fake = Faker()
+
+
+class TextBlockCreateSchemaFactory(factory.Factory):
+    class Meta:
+        model = TextBlockCreateSchema
+
+    type = BlockType.TEXT_BLOCK
+    message_text = factory.LazyFunction(lambda: fake.sentence(nb_words=6))
+
+
+class TextBlockUpdateSchemaFactory(TextBlockCreateSchemaFactory):
+    class Meta:
+        model = TextBlockUpdateSchema
+
+
+class QuestionBlockCreateSchemaFactory(factory.Factory):
+    class Meta:
+        model = QuestionBlockCreateSchema
+
+    type = BlockType.QUESTION_BLOCK
+    message_text = factory.LazyFunction(lambda: fake.sentence(nb_words=6))
+    answer_type = factory.Iterator(list(AnswerMessageType))
+
+
+class APIBlockCreateSchemaFactory(factory.Factory):
+    class Meta:
+        model = APIBlockCreateSchema
+
+    type = BlockType.API_BLOCK
+    url = factory.LazyFunction(fake.url)
+    http_method = HTTPMethod.POST
+    headers = factory.LazyFunction(lambda: {'Authorization': fake.pystr()})
+    body = factory.LazyFunction(lambda: {'name': fake.name(), 'age': fake.pyint()})
+
+
+class EmailBlockCreateSchemaFactory(factory.Factory):
+    class Meta:
+        model = EmailBlockCreateSchema
+
+    type = BlockType.EMAIL_BLOCK
+    subject = factory.LazyFunction(lambda: fake.sentence(nb_words=3))
+    text = factory.LazyFunction(lambda: fake.sentence(nb_words=10))
+    recipient_email = factory.LazyFunction(fake.email)
+
+
+class ExcelBlockCreateSchemaFactory(factory.Factory):
+    class Meta:
+        model = ExcelBlockCreateSchema
+
+    type = BlockType.EXCEL_BLOCK
+    file_path = factory.LazyFunction(lambda: f'{fake.word()}.xlsx')
+    data = factory.LazyFunction(lambda: {'name': fake.name(), 'age': fake.pyint()})
+
+
+class ImageBlockCreateSchemaFactory(factory.Factory):
+    class Meta:
+        model = ImageBlockCreateSchema
+
+    type = BlockType.IMAGE_BLOCK
+    image_path = ''
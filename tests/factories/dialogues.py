@@ -1,7 +1,8 @@
 import factory
 from faker import Faker
 
-from src.api.v1.dialogues.schemas import DialogueCreateSchema, DialogueTriggerCreateSchema
+from src.api.v1.dialogues.schemas.dialogues import DialogueCreateSchema
+from src.api.v1.dialogues.schemas.triggers import DialogueTriggerCreateSchema
 from src.apps.enums import TriggerEventType
 
 fake = Faker()
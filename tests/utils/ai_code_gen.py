@@ -0,0 +1,18 @@
+import asyncio
+
+from httpx import AsyncClient
+
+
+async def create_ai_code_gen_session(client: AsyncClient, prompt: str = 'Echo bot') -> dict:
+    response = await client.post('/ai-code-gen/sessions', json={'prompt': prompt})
+    assert response.status_code == 202
+    return response.json()['session']
+
+
+async def wait_for_session_status(client: AsyncClient, session_id: str, status: str, timeout: float = 5) -> dict:
+    async with asyncio.timeout(timeout):
+        while True:
+            response = await client.get(f'/ai-code-gen/sessions/{session_id}')
+            if response.json()['session']['status'] == status:
+                return response.json()
+            await asyncio.sleep(0.05)
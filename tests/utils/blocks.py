@@ -0,0 +1,49 @@
+from httpx import AsyncClient, Response
+
+from src.apps.dialogues.dto import DialogueReadDTO
+from src.apps.projects.dto import ProjectReadDTO
+from tests.factories.blocks import ImageBlockCreateSchemaFactory, TextBlockCreateSchemaFactory
+
+
+def get_blocks_url(project: ProjectReadDTO, dialogue: DialogueReadDTO) -> str:
+    return f'/projects/{project.project_id}/dialogues/{dialogue.dialogue_id}/blocks'
+
+
+async def create_image_block(client: AsyncClient, project: ProjectReadDTO, dialogue: DialogueReadDTO) -> dict:
+    response = await client.post(
+        get_blocks_url(project, dialogue),
+        json=ImageBlockCreateSchemaFactory().model_dump(mode='json'),
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def create_text_blocks(
+    client: AsyncClient,
+    project: ProjectReadDTO,
+    dialogue: DialogueReadDTO,
+    count: int,
+) -> list[dict]:
+    blocks = []
+    for _ in range(count):
+        response = await client.post(
+            get_blocks_url(project, dialogue),
+            json=TextBlockCreateSchemaFactory().model_dump(mode='json'),
+        )
+        assert response.status_code == 201
+        blocks.append(response.json())
+    return blocks
+
+
+async def upload_block_image(
+    client: AsyncClient,
+    project: ProjectReadDTO,
+    dialogue: DialogueReadDTO,
+    block_id: int,
+    content: bytes,
+    filename: str = 'cover.png',
+) -> Response:
+    return await client.post(
+        f'{get_blocks_url(project, dialogue)}/{block_id}/upload-image',
+        files={'image': (filename, content, 'application/octet-stream')},
+    )
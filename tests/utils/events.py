@@ -0,0 +1,29 @@
+import asyncio
+
+from redis.asyncio import Redis
+
+from src.core.config import settings
+
+
+async def wait_for_subscriber(channel: str, timeout: float = 5):
+    async with Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        username=settings.REDIS_USER,
+        password=settings.REDIS_USER_PASSWORD,
+    ) as redis:
+        async with asyncio.timeout(timeout):
+            while not dict(await redis.pubsub_numsub(channel)).get(channel.encode()):
+                await asyncio.sleep(0.01)
+
+
+def parse_sse_events(content: str) -> list[tuple[str, str]]:
+    events = []
+    for message in content.split('\n\n'):
+        lines = message.split('\n')
+        if not message or lines[0].startswith(':'):
+            continue
+        event = next(line.removeprefix('event: ') for line in lines if line.startswith('event: '))
+        data = '\n'.join(line.removeprefix('data: ') for line in lines if line.startswith('data: '))
+        events.append((event, data))
+    return events
@@ -0,0 +1,9 @@
+import io
+
+from PIL import Image
+
+
+def make_image_bytes(size: tuple[int, int] = (64, 48), image_format: str = 'PNG', color: str = 'red') -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format=image_format)
+    return buffer.getvalue()
@@ -0,0 +1,57 @@
+import asyncio
+from typing import Type, TypeVar, Optional, AsyncIterator
+
+from src.apps.ai_code_gen.llm_response import LLMResponse
+from src.infrastructure.llm.cli.base import AsyncLLMClient
+from src.infrastructure.llm.types import LLMChatMessage
+
+T = TypeVar('T')
+
+
+class FakeLLMClient(AsyncLLMClient):
+    # Answers with the queued JSON documents in order, an exception in the queue is raised instead. Clearing release
+    # holds the answers back until it is set again
+    def __init__(self, chunk_size: int = 16):
+        super().__init__()
+        self.responses: list[str | Exception] = []
+        self.requests: list[list[LLMChatMessage]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self._chunk_size = chunk_size
+
+    async def make_structured_request(
+        self,
+        object_type: Type[T],
+        history: list[LLMChatMessage],
+        model: Optional[str] = None,
+        max_tokens: int = 5000,
+    ) -> T:
+        await self.release.wait()
+        return object_type.model_validate_json(self._get_response(history))
+
+    async def stream_structured_request(
+        self,
+        object_type: Type[T],
+        history: list[LLMChatMessage],
+        model: Optional[str] = None,
+        max_tokens: int = 5000,
+    ) -> AsyncIterator[str]:
+        await self.release.wait()
+        response = self._get_response(history)
+        for start in range(0, len(response), self._chunk_size):
+            yield response[start : start + self._chunk_size]
+
+    def _get_response(self, history: list[LLMChatMessage]) -> str:
+        self.requests.append(history)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def make_llm_response(
+    summary: str = 'Echo bot',
+    code: str = 'print("Hello")\n',
+    requirements: Optional[list[str]] = None,
+) -> LLMResponse:
+    return LLMResponse(summary=summary, code=code, requirements=requirements or ['aiogram==3.4.1'])